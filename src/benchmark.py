@@ -0,0 +1,247 @@
+import argparse  # For the command line interface
+import datetime  # For timestamping reports
+import importlib  # For loading the q-variant modules in worker processes
+import json  # For reading and writing reports
+import multiprocessing  # For measuring each run in a fresh process
+import os  # For dataset paths
+import platform  # For describing the machine in reports
+import resource  # For the peak resident set size
+import shutil  # For replicating the source dataset
+import sys  # For the exit code
+import time  # For wall and CPU time
+import tracemalloc  # For allocation statistics
+from concurrent.futures import ProcessPoolExecutor  # For running measurements in isolated processes
+from typing import Any, Dict, List, Optional, Sequence  # For type annotations
+
+# Benchmarked q-variants: function name -> name of the SQL statement in queries.py
+VARIANTS: Dict[str, str] = {
+    'q1_time': 'top_dates_with_top_users',
+    'q1_memory': 'top_dates_with_top_users',
+    'q2_time': 'top_emojis',
+    'q2_memory': 'top_emojis',
+    'q3_time': 'top_influential_users',
+    'q3_memory': 'top_influential_users',
+}
+
+# Data scales (number of copies of the source dataset)
+DEFAULT_SCALES: List[int] = [1, 10, 100]
+
+# Metrics compared against a baseline report (higher is worse)
+COMPARED_METRICS: List[str] = ['wall_seconds', 'cpu_seconds', 'peak_rss_bytes', 'traced_peak_bytes']
+
+
+def build_scaled_dataset(source_path: str, scale: int, output_dir: str) -> str:
+    """Writes a dataset made of `scale` copies of the source NDJSON file.
+
+    Existing datasets of the right size are reused between runs.
+
+    Args:
+        source_path (str): Path to the NDJSON tweets file.
+        scale (int): Number of copies.
+        output_dir (str): Directory where scaled datasets are stored.
+
+    Returns:
+        str: The path of the scaled dataset (the source itself for scale 1).
+    """
+
+    if scale == 1:
+        return source_path
+
+    os.makedirs(output_dir, exist_ok=True)
+    base_name = os.path.basename(source_path)
+    scaled_path = os.path.join(output_dir, f'{scale}x-{base_name}')
+
+    source_size = os.path.getsize(source_path)
+    with open(source_path, 'rb') as source:
+        source.seek(max(source_size - 1, 0))
+        needs_newline = source_size > 0 and source.read(1) != b'\n'  # Copies must not merge lines
+    copy_size = source_size + (1 if needs_newline else 0)
+
+    if os.path.exists(scaled_path) and os.path.getsize(scaled_path) == copy_size * scale:
+        return scaled_path  # Reuse the dataset of a previous run
+
+    with open(scaled_path, 'wb') as scaled:
+        for _ in range(scale):
+            with open(source_path, 'rb') as source:
+                shutil.copyfileobj(source, scaled)
+            if needs_newline:
+                scaled.write(b'\n')
+
+    return scaled_path
+
+
+def run_variant(variant: str, file_path: str, trace_allocations: bool) -> Dict[str, Any]:
+    """Runs a q-variant once through the local backend and measures it.
+
+    Meant to be executed in a fresh process, so the peak RSS belongs to this run only.
+
+    Args:
+        variant (str): One of the keys of VARIANTS.
+        file_path (str): Path to the NDJSON tweets file.
+        trace_allocations (bool): If True, trace allocations with tracemalloc (slower run).
+
+    Returns:
+        Dict[str, Any]: The measured metrics and the number of result rows.
+    """
+
+    import queries  # SQL statements used as query keys by the local backend
+    from local import LocalClient  # Local NDJSON backend
+
+    function = getattr(importlib.import_module(variant), variant)
+    query = getattr(queries, VARIANTS[variant])
+    client = LocalClient(file_path, fused=False)
+
+    if trace_allocations:
+        tracemalloc.start()
+    blocks_before = sys.getallocatedblocks()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+
+    rows = function(client, query)
+
+    metrics: Dict[str, Any] = {
+        'wall_seconds': time.perf_counter() - wall_start,
+        'cpu_seconds': time.process_time() - cpu_start,
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,  # KiB on Linux
+        'allocated_blocks_delta': sys.getallocatedblocks() - blocks_before,
+        'rows': len(rows),
+    }
+    if trace_allocations:
+        metrics['traced_peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return metrics
+
+
+def measure_in_fresh_process(variant: str, file_path: str, trace_allocations: bool) -> Dict[str, Any]:
+    """Runs `run_variant` in a new spawned process and returns its metrics."""
+
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(run_variant, variant, file_path, trace_allocations).result()
+
+
+def run_benchmarks(
+    source_path: str,
+    scales: Sequence[int] = DEFAULT_SCALES,
+    variants: Optional[Sequence[str]] = None,
+    data_dir: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Benchmarks every q-variant at every data scale.
+
+    Each measurement runs twice in fresh processes: once for wall time, CPU time and
+    peak RSS, and once under tracemalloc for the allocation peak, so tracing overhead
+    does not distort the timings.
+
+    Args:
+        source_path (str): Path to the NDJSON tweets file (scale 1).
+        scales (Sequence[int], optional): Data scales to run. Defaults to 1x, 10x and 100x.
+        variants (Optional[Sequence[str]], optional): Variants to run. Defaults to all of them.
+        data_dir (Optional[str], optional): Where scaled datasets are written. Defaults to a
+            'benchmark-data' folder next to the source file.
+
+    Returns:
+        Dict[str, Any]: The benchmark report.
+    """
+
+    data_dir = data_dir or os.path.join(os.path.dirname(os.path.abspath(source_path)), 'benchmark-data')
+    results: List[Dict[str, Any]] = []
+
+    for scale in scales:
+        file_path = build_scaled_dataset(source_path, scale, data_dir)
+        for variant in variants or VARIANTS:
+            metrics = measure_in_fresh_process(variant, file_path, trace_allocations=False)
+            traced = measure_in_fresh_process(variant, file_path, trace_allocations=True)
+            metrics['traced_peak_bytes'] = traced['traced_peak_bytes']
+            results.append({'variant': variant, 'scale': scale, 'input_bytes': os.path.getsize(file_path), **metrics})
+            print(f"{variant} @ {scale}x: {metrics['wall_seconds']:.2f} s wall, "
+                  f"{metrics['peak_rss_bytes'] / 2**20:.1f} MiB peak RSS")
+
+    return {
+        'created_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'source': os.path.abspath(source_path),
+        'results': results,
+    }
+
+
+def compare_reports(
+    baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.10
+) -> List[Dict[str, Any]]:
+    """Flags metrics that got worse than the baseline by more than a tolerance.
+
+    Args:
+        baseline (Dict[str, Any]): The stored baseline report.
+        current (Dict[str, Any]): The new report.
+        tolerance (float, optional): Allowed relative increase. Defaults to 10%.
+
+    Returns:
+        List[Dict[str, Any]]: One entry per regression with the variant, scale, metric,
+        baseline and current values and the relative change.
+    """
+
+    baseline_results = {(result['variant'], result['scale']): result for result in baseline['results']}
+    regressions: List[Dict[str, Any]] = []
+
+    for result in current['results']:
+        reference = baseline_results.get((result['variant'], result['scale']))
+        if reference is None:
+            continue  # New variant or scale, nothing to compare with
+        for metric in COMPARED_METRICS:
+            before, after = reference.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            if change > tolerance:
+                regressions.append({
+                    'variant': result['variant'], 'scale': result['scale'], 'metric': metric,
+                    'baseline': before, 'current': after, 'change': change,
+                })
+
+    return regressions
+
+
+def main() -> None:
+    """Runs the benchmark suite from the command line."""
+
+    parser = argparse.ArgumentParser(description="Benchmark the q1/q2/q3 time and memory variants across data scales.")
+    parser.add_argument('file_path', nargs='?', default=None, help="Path to the NDJSON tweets file (scale 1).")
+    parser.add_argument('--synthetic-rows', type=int, default=None,
+                        help="Generate a synthetic source dataset with this many tweets instead of reading file_path.")
+    parser.add_argument('--scales', type=int, nargs='+', default=DEFAULT_SCALES, help="Data scales to run.")
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=None, help="Variants to run.")
+    parser.add_argument('--data-dir', default=None, help="Directory for the scaled datasets.")
+    parser.add_argument('--output', default='benchmark-report.json', help="Path of the JSON report.")
+    parser.add_argument('--baseline', default=None, help="Baseline report to compare against.")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="Allowed relative regression.")
+    args = parser.parse_args()
+
+    file_path = args.file_path
+    if args.synthetic_rows is not None:
+        from synthetic import generate_tweets  # Synthetic corpus generator
+        data_dir = args.data_dir or 'benchmark-data'
+        os.makedirs(data_dir, exist_ok=True)
+        file_path = os.path.join(data_dir, f'synthetic-{args.synthetic_rows}.json')
+        if not os.path.exists(file_path):
+            with open(file_path, 'w', encoding='utf-8') as file:
+                generate_tweets(file, rows=args.synthetic_rows)
+    elif file_path is None:
+        parser.error("file_path is required unless --synthetic-rows is given")
+
+    report = run_benchmarks(file_path, args.scales, args.variants, args.data_dir)
+    with open(args.output, 'w') as file:
+        json.dump(report, file, indent=2)
+    print(f"Report written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, 'r') as file:
+            regressions = compare_reports(json.load(file), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['variant']} @ {regression['scale']}x {regression['metric']}: "
+                  f"{regression['baseline']:.4g} -> {regression['current']:.4g} ({regression['change']:+.1%})")
+        if regressions:
+            sys.exit(1)
+        print("No regressions against the baseline.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,92 @@
+import argparse  # For the command line interface
+import itertools  # For limiting the number of sampled tweets
+import time  # For timing each extractor
+from typing import Callable, Dict, List, Optional  # For type annotations
+
+from emojis import REFERENCE_PATTERN, extract_emojis  # Extractors under comparison
+from local import iter_tweets  # Streams the real tweets file
+
+
+def load_tweet_texts(file_path: str, limit: Optional[int] = None) -> List[str]:
+    """Loads the `content` of the tweets in an NDJSON file.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        limit (Optional[int], optional): Maximum number of tweets to load. Defaults to all of them.
+
+    Returns:
+        List[str]: The tweet texts (tweets without content are skipped).
+    """
+
+    contents = (tweet.get('content') for tweet in iter_tweets(file_path))
+    return [content for content in itertools.islice(contents, limit) if content]
+
+
+def reference_extract_emojis(content: str) -> List[str]:
+    """Extracts emojis with the verbatim translation of the SQL alternation."""
+
+    return REFERENCE_PATTERN.findall(content)
+
+
+def time_extractor(extractor: Callable[[str], List[str]], texts: List[str], repeat: int) -> float:
+    """Returns the best wall time, in seconds, of running an extractor over every text."""
+
+    best: float = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            extractor(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_emoji_extraction(texts: List[str], repeat: int = 5) -> Dict[str, float]:
+    """Compares the compiled range-table matcher with the reference `re` alternation.
+
+    Args:
+        texts (List[str]): Tweet texts to extract emojis from.
+        repeat (int, optional): Number of timed runs; the best one is kept. Defaults to 5.
+
+    Returns:
+        Dict[str, float]: Best times in seconds for each extractor, texts per second of
+        the compiled matcher and the speedup over the reference.
+
+    Raises:
+        ValueError: If both extractors do not return the same sequences.
+    """
+
+    for text in texts:
+        if extract_emojis(text) != reference_extract_emojis(text):
+            raise ValueError(f"Extractors disagree on: {text[:200]!r}")
+
+    reference_seconds = time_extractor(reference_extract_emojis, texts, repeat)
+    compiled_seconds = time_extractor(extract_emojis, texts, repeat)
+
+    return {
+        'texts': len(texts),
+        'reference_seconds': reference_seconds,
+        'compiled_seconds': compiled_seconds,
+        'compiled_texts_per_second': len(texts) / compiled_seconds if compiled_seconds else float('inf'),
+        'speedup': reference_seconds / compiled_seconds if compiled_seconds else float('inf'),
+    }
+
+
+def main() -> None:
+    """Runs the micro-benchmark over a tweets file from the command line."""
+
+    parser = argparse.ArgumentParser(description="Emoji extraction micro-benchmark against the reference regex.")
+    parser.add_argument('file_path', help="Path to the NDJSON tweets file.")
+    parser.add_argument('--limit', type=int, default=None, help="Maximum number of tweets to sample.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of timed runs per extractor.")
+    args = parser.parse_args()
+
+    results = benchmark_emoji_extraction(load_tweet_texts(args.file_path, args.limit), args.repeat)
+    print(f"Texts: {results['texts']}")
+    print(f"Reference re alternation: {results['reference_seconds']:.4f} seconds")
+    print(f"Compiled range table:     {results['compiled_seconds']:.4f} seconds "
+          f"({results['compiled_texts_per_second']:.0f} texts/second)")
+    print(f"Speedup: {results['speedup']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+import argparse  # For the command line interface
+import itertools  # For limiting the number of sampled lines
+import json  # Baseline decoder
+import time  # For timing each decoder
+from typing import Callable, Dict, List, Optional  # For type annotations
+
+from tweet_reader import TweetDecoder, available_backends  # Decoders under comparison
+
+
+def load_tweet_lines(file_path: str, limit: Optional[int] = None) -> List[bytes]:
+    """Loads the non-blank lines of an NDJSON file.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        limit (Optional[int], optional): Maximum number of lines to load. Defaults to all of them.
+
+    Returns:
+        List[bytes]: The raw JSON lines.
+    """
+
+    with open(file_path, 'rb') as file:
+        return list(itertools.islice((line for line in file if line.strip()), limit))
+
+
+def time_decoder(decode: Callable[[bytes], object], lines: List[bytes], repeat: int) -> float:
+    """Returns the best wall time, in seconds, of decoding every line."""
+
+    best: float = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for line in lines:
+            decode(line)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def benchmark_json_decoding(lines: List[bytes], repeat: int = 5) -> Dict[str, Dict[str, float]]:
+    """Compares plain `json.loads` with the projected decoding of every available backend.
+
+    Args:
+        lines (List[bytes]): Raw JSON tweet lines.
+        repeat (int, optional): Number of timed runs; the best one is kept. Defaults to 5.
+
+    Returns:
+        Dict[str, Dict[str, float]]: For 'json.loads' and each backend, the best time in
+        seconds, the lines per second and the speedup over `json.loads`.
+
+    Raises:
+        ValueError: If a backend does not return the same projected tweets as `json`.
+    """
+
+    reference = TweetDecoder('json')
+    decoders: Dict[str, Callable[[bytes], object]] = {'json.loads': json.loads}
+    for backend in available_backends():
+        decoder = TweetDecoder(backend)
+        for line in lines:
+            if decoder.decode(line) != reference.decode(line):
+                raise ValueError(f"Backend {backend} disagrees with json on: {line[:200]!r}")
+        decoders[f'{backend} (projected)'] = decoder.decode
+
+    baseline_seconds = time_decoder(json.loads, lines, repeat)
+    results: Dict[str, Dict[str, float]] = {}
+    for name, decode in decoders.items():
+        seconds = baseline_seconds if decode is json.loads else time_decoder(decode, lines, repeat)
+        results[name] = {
+            'seconds': seconds,
+            'lines_per_second': len(lines) / seconds if seconds else float('inf'),
+            'speedup': baseline_seconds / seconds if seconds else float('inf'),
+        }
+    return results
+
+
+def main() -> None:
+    """Runs the decoding micro-benchmark over a tweets file from the command line."""
+
+    parser = argparse.ArgumentParser(description="JSON decoding micro-benchmark against plain json.loads.")
+    parser.add_argument('file_path', help="Path to the NDJSON tweets file.")
+    parser.add_argument('--limit', type=int, default=None, help="Maximum number of lines to sample.")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of timed runs per decoder.")
+    args = parser.parse_args()
+
+    lines = load_tweet_lines(args.file_path, args.limit)
+    print(f"Lines: {len(lines)}")
+    for name, result in benchmark_json_decoding(lines, args.repeat).items():
+        print(f"{name:<24} {result['seconds']:.4f} seconds "
+              f"({result['lines_per_second']:.0f} lines/second, {result['speedup']:.2f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+import datetime  # For tagging dates in the cached rows
+import hashlib  # For hashing cache keys
+import json  # For serializing result rows (never executable, unlike pickle)
+import logging  # For logging cache events
+import os  # For managing cache files
+import re  # For normalizing queries and finding referenced tables
+import tempfile  # For atomic writes
+import time  # For TTL and LRU bookkeeping
+from typing import Any, List, Optional, Tuple  # For type annotations
+
+# Per-user cache root ($XDG_CACHE_HOME or ~/.cache), never a shared temporary directory
+USER_CACHE_ROOT: str = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache'), 'latam-challenge'
+)
+
+# Default location of the on-disk query result cache
+DEFAULT_CACHE_DIR: str = os.path.join(USER_CACHE_ROOT, 'query-results')
+
+# Extension of the cache entry files
+CACHE_FILE_EXTENSION: str = '.json'
+
+
+def ensure_private_dir(path: str) -> None:
+    """Creates a cache directory readable by its owner only and checks that the current user owns it.
+
+    Cached data is trusted when read back, so a directory another user can write to
+    (or owns) is refused.
+
+    Args:
+        path (str): The directory.
+
+    Raises:
+        PermissionError: If the directory belongs to another user or is writable by others.
+    """
+
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if not hasattr(os, 'getuid'):  # Ownership checks are POSIX only
+        return
+    stat = os.stat(path)
+    if stat.st_uid != os.getuid():
+        raise PermissionError(f"Cache directory '{path}' belongs to another user.")
+    if stat.st_mode & 0o022:
+        raise PermissionError(f"Cache directory '{path}' is writable by other users.")
+
+
+def encode_value(value: Any) -> Any:
+    """Returns the JSON form of a cached value, tagging dates and datetimes so they decode back."""
+
+    if isinstance(value, datetime.datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, (list, tuple)):
+        return [encode_value(item) for item in value]
+    return value
+
+
+def decode_value(value: Any) -> Any:
+    """Inverse of `encode_value` (rows come back as tuples)."""
+
+    if isinstance(value, dict):
+        if '$datetime' in value:
+            return datetime.datetime.fromisoformat(value['$datetime'])
+        if '$date' in value:
+            return datetime.date.fromisoformat(value['$date'])
+        raise ValueError(f"Unexpected object in a cached row: {value}")
+    if isinstance(value, list):
+        return tuple(decode_value(item) for item in value)
+    return value
+
+
+def normalize_query(query: str) -> str:
+    """Normalizes a SQL statement so formatting-only changes share the same cache entry.
+
+    Whitespace runs are collapsed and leading/trailing whitespace is removed. Case is
+    preserved because string literals and regular expressions are case sensitive.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        str: The normalized SQL statement.
+    """
+
+    return re.sub(r'\s+', ' ', query).strip()
+
+
+def referenced_tables(query: str) -> List[str]:
+    """Returns the `dataset.table` names read by a SQL statement.
+
+    CTE names (without a dataset prefix) are ignored.
+
+    Args:
+        query (str): The SQL statement.
+
+    Returns:
+        List[str]: The sorted, de-duplicated table names.
+    """
+
+    names = re.findall(r'\b(?:FROM|JOIN)\s+`?([\w-]+(?:\.[\w-]+)+)`?', query, flags=re.IGNORECASE)
+    return sorted(set(names))
+
+
+def table_fingerprint(client: Any, query: str) -> str:
+    """Describes the current state of every table read by a query.
+
+    Uses the table metadata only (last-modified time and row count), so it costs no scan.
+
+    Args:
+        client (Any): BigQuery client object.
+        query (str): The SQL statement.
+
+    Returns:
+        str: A string that changes whenever one of the source tables changes.
+    """
+
+    fingerprints: List[str] = []
+    for table_name in referenced_tables(query):
+        table = client.get_table(table_name)
+        modified = table.modified.isoformat() if table.modified else ''
+        fingerprints.append(f'{table_name}:{modified}:{table.num_rows}')
+    return '|'.join(fingerprints)
+
+
+class QueryResultCache:
+    """On-disk cache of query results with TTL expiry and LRU, size-based eviction.
+
+    Each entry is a JSON file (dates tagged, see `encode_value`) named after the hash of
+    the normalized query and the source tables' fingerprint, so any change in the data
+    produces a new key. The file modification time records the last access and drives
+    LRU eviction. The directory must be private to the current user (see `ensure_private_dir`).
+
+    Args:
+        cache_dir (str, optional): Directory holding the cache files. Defaults to a
+            folder in the per-user cache directory.
+        max_entries (int, optional): Maximum number of cached results. Defaults to 128.
+        max_bytes (int, optional): Maximum total size of the cache files. Defaults to 64 MiB.
+        ttl_seconds (float, optional): Lifetime of an entry since it was stored. Defaults to one day.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = DEFAULT_CACHE_DIR,
+        max_entries: int = 128,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl_seconds: float = 24 * 60 * 60,
+    ) -> None:
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        ensure_private_dir(cache_dir)
+
+    @staticmethod
+    def make_key(query: str, fingerprint: str) -> str:
+        """Builds the cache key of a query for a given state of its source tables."""
+
+        return hashlib.sha256(f'{normalize_query(query)}\n{fingerprint}'.encode('utf-8')).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key + CACHE_FILE_EXTENSION)
+
+    def get(self, key: str) -> Optional[List[Tuple[Any, Any]]]:
+        """Returns the cached rows for a key, or None on a miss or an expired entry.
+
+        Args:
+            key (str): The cache key.
+
+        Returns:
+            Optional[List[Tuple[Any, Any]]]: The cached rows.
+        """
+
+        path = self._path(key)
+        try:
+            with open(path, 'r', encoding='utf-8') as file:
+                entry = json.load(file)
+            stored_at = entry['stored_at']
+            rows = [decode_value(row) for row in entry['rows']]
+        except FileNotFoundError:
+            return None
+        except Exception as e:  # Corrupted entries are dropped
+            logging.warning(f"Discarding unreadable cache entry '{path}': {e}")
+            self._remove(path)
+            return None
+
+        if time.time() - stored_at > self.ttl_seconds:
+            self._remove(path)
+            return None
+
+        try:
+            os.utime(path)  # Record the access for LRU eviction
+        except OSError:
+            pass  # Evicted concurrently; the rows were already read
+        return rows
+
+    def put(self, key: str, rows: List[Tuple[Any, Any]]) -> None:
+        """Stores rows under a key and evicts entries beyond the configured limits.
+
+        Args:
+            key (str): The cache key.
+            rows (List[Tuple[Any, Any]]): The result rows.
+        """
+
+        # Write to a temporary file first so readers never see a partial entry
+        descriptor, temporary_path = tempfile.mkstemp(dir=self.cache_dir)
+        try:
+            with os.fdopen(descriptor, 'w', encoding='utf-8') as file:
+                json.dump({'stored_at': time.time(), 'rows': [encode_value(row) for row in rows]}, file, ensure_ascii=False)
+            os.replace(temporary_path, self._path(key))
+        except Exception:
+            self._remove(temporary_path)  # Not a cache entry: evict() and clear() would never remove it
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Removes expired entries, then the least recently used ones until within limits."""
+
+        entries: List[Tuple[float, int, str]] = []
+        for file_name in os.listdir(self.cache_dir):
+            if not file_name.endswith(CACHE_FILE_EXTENSION):
+                continue
+            path = os.path.join(self.cache_dir, file_name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue  # Removed concurrently
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()  # Least recently used first
+        total_bytes = sum(size for _, size, _ in entries)
+        now = time.time()
+
+        for index, (accessed_at, size, path) in enumerate(entries):
+            remaining = len(entries) - index
+            expired = now - accessed_at > self.ttl_seconds
+            if not expired and remaining <= self.max_entries and total_bytes <= self.max_bytes:
+                break
+            self._remove(path)
+            total_bytes -= size
+
+    def clear(self) -> None:
+        """Removes every cache entry."""
+
+        for file_name in os.listdir(self.cache_dir):
+            if file_name.endswith(CACHE_FILE_EXTENSION):
+                self._remove(os.path.join(self.cache_dir, file_name))
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
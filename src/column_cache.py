@@ -0,0 +1,221 @@
+import hashlib  # For cache keys and content hashes
+import json  # For the manifest and string dictionaries
+import logging  # For logging cache events
+import mmap  # For zero-copy column files
+import os  # For managing cache files
+import shutil  # For removing stale entries
+import sys  # For the byte order of the columns
+import tempfile  # For atomic writes
+from array import array  # For empty columns
+from typing import Any, Dict, List, Optional  # For type annotations
+
+from cache import USER_CACHE_ROOT, ensure_private_dir  # Per-user, private cache location
+from tweet_store import COLUMN_TYPECODES, StringDictionary, TweetStore  # The cached columns
+
+# Default location of the column cache
+DEFAULT_COLUMN_CACHE_DIR: str = os.path.join(USER_CACHE_ROOT, 'columns')
+
+# Layout version of the cache entries; bumped whenever the files change
+CACHE_FORMAT_VERSION: int = 1
+
+# Size of the blocks read when hashing a source file
+HASH_BLOCK_SIZE: int = 8 * 1024 * 1024
+
+# Extension of the column files
+COLUMN_FILE_EXTENSION: str = '.bin'
+
+
+def file_sha256(file_path: str) -> str:
+    """Returns the SHA-256 of a file's content, read in blocks."""
+
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def map_column(path: str, typecode: str) -> Any:
+    """Memory-maps a column file as a typed, read-only memoryview (an empty array if the file is empty)."""
+
+    with open(path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return array(typecode)  # Empty files cannot be mapped
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapping).cast(typecode)
+
+
+class ColumnCache:
+    """On-disk cache of the projected tweet columns of NDJSON files, for instant warm starts.
+
+    Each entry is a directory holding one raw file per TweetStore column (see
+    COLUMN_TYPECODES), the username and emoji dictionaries as JSON lists, and a
+    manifest. Loading memory-maps the column files, so a warm start only reads the
+    dictionaries; the columns are paged in by the first query.
+
+    Entries are keyed by the source path, size and modification time, or, with
+    `hash_content`, by the SHA-256 of the content (slower to key, but survives copies
+    and touches). A changed source gets a new key, and its previous entries are
+    removed when the new one is written. The directory must be private to the current
+    user (see `cache.ensure_private_dir`), since the mapped columns are trusted as read.
+
+    Args:
+        cache_dir (str, optional): Directory holding the cache entries. Defaults to a
+            folder in the per-user cache directory.
+        hash_content (bool, optional): Whether to key entries by content hash. Defaults to False.
+
+    Raises:
+        PermissionError: If the cache directory belongs to another user or is writable by others.
+    """
+
+    def __init__(self, cache_dir: str = DEFAULT_COLUMN_CACHE_DIR, hash_content: bool = False) -> None:
+        self.cache_dir = cache_dir
+        self.hash_content = hash_content
+        ensure_private_dir(cache_dir)
+
+    def source_signature(self, file_path: str) -> Dict[str, Any]:
+        """Describes the current state of a source file."""
+
+        stat = os.stat(file_path)
+        signature: Dict[str, Any] = {'path': os.path.abspath(file_path), 'size': stat.st_size}
+        if self.hash_content:
+            signature['sha256'] = file_sha256(file_path)
+        else:
+            signature['mtime_ns'] = stat.st_mtime_ns
+        return signature
+
+    @staticmethod
+    def make_key(signature: Dict[str, Any]) -> str:
+        """Builds the cache key of a source state (content-hashed keys ignore the path)."""
+
+        keyed = {'sha256': signature['sha256']} if 'sha256' in signature else signature
+        payload = json.dumps({'version': CACHE_FORMAT_VERSION, 'source': keyed}, sort_keys=True)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key)
+
+    def load(self, file_path: str) -> Optional[TweetStore]:
+        """Returns the cached columns of a file, or None on a miss.
+
+        The returned store is read-only: its columns are memory-mapped views.
+
+        Args:
+            file_path (str): Path to the NDJSON tweets file.
+
+        Returns:
+            Optional[TweetStore]: The cached store.
+        """
+
+        entry_dir = self._entry_dir(self.make_key(self.source_signature(file_path)))
+        try:
+            with open(os.path.join(entry_dir, 'manifest.json'), encoding='utf-8') as file:
+                manifest = json.load(file)
+            if manifest['byteorder'] != sys.byteorder or manifest['typecodes'] != COLUMN_TYPECODES:
+                return None
+            store = TweetStore()
+            for name, typecode in COLUMN_TYPECODES.items():
+                column = map_column(os.path.join(entry_dir, name + COLUMN_FILE_EXTENSION), typecode)
+                if len(column) != manifest['lengths'][name]:
+                    return None
+                setattr(store, name, column)
+            with open(os.path.join(entry_dir, 'usernames.json'), encoding='utf-8') as file:
+                store.usernames = StringDictionary(json.load(file))
+            with open(os.path.join(entry_dir, 'emojis.json'), encoding='utf-8') as file:
+                store.emoji_values = StringDictionary(json.load(file))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logging.warning(f"Column cache entry for '{file_path}' is unreadable, ignoring it: {e}")
+            return None
+
+        logging.info(f"Column cache hit for '{file_path}'.")
+        return store
+
+    def save(self, file_path: str, store: TweetStore, signature: Optional[Dict[str, Any]] = None) -> str:
+        """Writes the columns of a file to the cache and removes the entries of its previous states.
+
+        Args:
+            file_path (str): Path to the NDJSON tweets file the store was built from.
+            store (TweetStore): Its columns.
+            signature (Optional[Dict[str, Any]], optional): State of the source when the store
+                was built. Defaults to its current state.
+
+        Returns:
+            str: The directory of the cache entry.
+        """
+
+        signature = signature or self.source_signature(file_path)
+        key = self.make_key(signature)
+        entry_dir = self._entry_dir(key)
+        temporary_dir = tempfile.mkdtemp(dir=self.cache_dir, prefix='.tmp-')
+        try:
+            for name in COLUMN_TYPECODES:
+                column = getattr(store, name)
+                with open(os.path.join(temporary_dir, name + COLUMN_FILE_EXTENSION), 'wb') as file:
+                    file.write(column if isinstance(column, memoryview) else column.tobytes())
+            with open(os.path.join(temporary_dir, 'usernames.json'), 'w', encoding='utf-8') as file:
+                json.dump(store.usernames.values, file, ensure_ascii=False)
+            with open(os.path.join(temporary_dir, 'emojis.json'), 'w', encoding='utf-8') as file:
+                json.dump(store.emoji_values.values, file, ensure_ascii=False)
+            manifest = {
+                'version': CACHE_FORMAT_VERSION,
+                'source': signature,
+                'byteorder': sys.byteorder,
+                'typecodes': COLUMN_TYPECODES,
+                'lengths': {name: len(getattr(store, name)) for name in COLUMN_TYPECODES},
+            }
+            with open(os.path.join(temporary_dir, 'manifest.json'), 'w', encoding='utf-8') as file:
+                json.dump(manifest, file)  # Written last: an entry without a manifest is a miss
+
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            os.replace(temporary_dir, entry_dir)
+        except Exception:
+            shutil.rmtree(temporary_dir, ignore_errors=True)
+            raise
+
+        self.remove_stale_entries(signature['path'], keep=key)
+        return entry_dir
+
+    def remove_stale_entries(self, source_path: str, keep: Optional[str] = None) -> List[str]:
+        """Removes the entries built from earlier states of a source file.
+
+        Args:
+            source_path (str): Absolute path of the source file.
+            keep (Optional[str], optional): Key of the entry to keep. Defaults to None.
+
+        Returns:
+            List[str]: The removed keys.
+        """
+
+        removed: List[str] = []
+        for key in os.listdir(self.cache_dir):
+            if key == keep or key.startswith('.'):
+                continue
+            try:
+                with open(os.path.join(self._entry_dir(key), 'manifest.json'), encoding='utf-8') as file:
+                    entry_source = json.load(file)['source']['path']
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            if entry_source == source_path:
+                shutil.rmtree(self._entry_dir(key), ignore_errors=True)
+                removed.append(key)
+        return removed
+
+    def load_or_build(self, file_path: str) -> TweetStore:
+        """Returns the cached columns of a file, building and caching them on a miss.
+
+        Args:
+            file_path (str): Path to the NDJSON tweets file.
+
+        Returns:
+            TweetStore: The projected columns.
+        """
+
+        store = self.load(file_path)
+        if store is not None:
+            return store
+        signature = self.source_signature(file_path)  # Taken before reading, so a concurrent change is a later miss
+        store = TweetStore.from_file(file_path)
+        self.save(file_path, store, signature)
+        return store
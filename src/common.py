@@ -1,20 +1,50 @@
 import logging  # Import module for logging error and warning messages
-import io  # Memory-efficient file-like object operations for zip handling
+from typing import Optional  # For type annotations
 from google.cloud import storage  # Access to Google Cloud Storage services
 import zipfile  # Library for working with ZIP archives
 
+# Chunk size for streamed reads and resumable uploads (must be a multiple of 256 KiB)
+CHUNK_SIZE: int = 8 * 1024 * 1024
+
+# Custom metadata key storing the CRC-32 of the ZIP member an extracted blob comes from
+ZIP_CRC32_METADATA_KEY: str = 'zip-crc32'
+
+def is_member_already_extracted(
+    json_blob: Optional[storage.Blob], file_info: zipfile.ZipInfo
+) -> bool:
+    """Checks, using blob metadata only, whether a ZIP member is already extracted.
+
+    Args:
+        json_blob (Optional[storage.Blob]): The existing blob as returned by
+            `bucket.get_blob` (None if it does not exist).
+        file_info (zipfile.ZipInfo): The ZIP member to compare with.
+
+    Returns:
+        bool: True if the blob has the member's uncompressed size and, when a CRC-32
+              was stored at extraction time, the same CRC-32.
+    """
+
+    if json_blob is None or json_blob.size != file_info.file_size:
+        return False
+
+    stored_crc32 = (json_blob.metadata or {}).get(ZIP_CRC32_METADATA_KEY)
+    return stored_crc32 is None or stored_crc32 == str(file_info.CRC)
+
 def extract_zip_file_conditionally(
-    bucket: storage.Bucket, folder_name: str, zip_file_name: str
+    bucket: storage.Bucket, folder_name: str, zip_file_name: str, chunk_size: int = CHUNK_SIZE
 ) -> str:
     """Extracts a ZIP file in Google Cloud Storage conditionally.
 
-    Checks if the ZIP file exists and is identical to the local version before
-    extracting its contents to avoid redundant operations.
+    The archive is read through a seekable chunked blob reader and each member is
+    uploaded as a chunked resumable stream, so memory usage is bounded by the
+    chunk size instead of the archive size. Members whose blob already matches
+    (size and stored CRC-32 from the blob metadata) are skipped without downloading them.
 
     Args:
         bucket (storage.Bucket): The Google Cloud Storage bucket object.
         folder_name (str): The name of the folder containing the ZIP file.
         zip_file_name (str): The name of the ZIP file to extract.
+        chunk_size (int, optional): Size in bytes of each read and upload chunk. Defaults to 8 MiB.
 
     Returns:
         str: The name of the extracted JSON file, or an empty string if no
@@ -26,33 +56,29 @@ def extract_zip_file_conditionally(
     blob_name = ''       # Store the blob name for uploaded files
 
     try:
-        # Verify ZIP file existence in the bucket
-        zip_blob = bucket.blob(f'{folder_name}/{zip_file_name}')
-        if not zip_blob.exists():
+        # Verify ZIP file existence in the bucket (a single metadata request)
+        zip_blob: Optional[storage.Blob] = bucket.get_blob(f'{folder_name}/{zip_file_name}')
+        if zip_blob is None:
             print(f"ZIP file '{zip_file_name}' does not exist in bucket '{bucket.name}'.")
             return False  # Return False to indicate failure
 
-        # Open the ZIP archive in memory for efficient processing
-        with zipfile.ZipFile(io.BytesIO(zip_blob.download_as_string()), 'r') as z:
+        # Open the ZIP archive through a seekable reader that downloads it in chunks
+        with zip_blob.open('rb', chunk_size=chunk_size) as zip_stream, zipfile.ZipFile(zip_stream, 'r') as z:
             for file_info in z.infolist():  # Iterate through each file in the ZIP archive
                 blob_name = f'{folder_name}/{file_info.filename}'  # Construct blob path
                 json_file_name = file_info.filename  # Store the JSON file name
 
-                # Get a reference to the corresponding JSON blob in the bucket
-                json_blob = bucket.blob(blob_name)
-
-                # Download as string and get the size if the JSON blob exists in the bucket
-                if json_blob.exists():
-                    existing_blob_data: str = json_blob.download_as_string()
-                    existing_blob_size: int = len(existing_blob_data)
-
-                # Check for file existence and size match for conditional extraction
-                if json_blob.exists() and existing_blob_size == file_info.file_size:
+                # Compare sizes and checksums from the blob metadata only
+                if is_member_already_extracted(bucket.get_blob(blob_name), file_info):
                     print(f"File '{json_file_name}' already exists on cloud storage with exact matching size, skipping extraction.")
                 else:
-                    # Extract and upload the file if conditions are not met
+                    # Setting a chunk size makes the upload chunked and resumable
+                    json_blob = bucket.blob(blob_name, chunk_size=chunk_size)
+                    json_blob.metadata = {ZIP_CRC32_METADATA_KEY: str(file_info.CRC)}
+
+                    # Stream the extracted member straight to the bucket
                     with z.open(file_info) as file:
-                        json_blob.upload_from_file(file)  # Upload extracted file
+                        json_blob.upload_from_file(file, size=file_info.file_size)
 
                     print(f'ZIP File extracted to gs://{bucket.name}/{blob_name}')
 
@@ -0,0 +1,266 @@
+import argparse  # For the command line interface
+import datetime  # For parsing tweet dates that Arrow cannot cast
+import io  # For buffered line reading of blobs
+import json  # For decoding newline-delimited JSON records
+import logging  # For logging skipped records and conversions
+from typing import Any, BinaryIO, Dict, Iterable, List, Optional  # For type annotations
+from google.cloud import storage  # Access to Google Cloud Storage services
+
+# Size in bytes of each read and upload chunk when converting blobs
+CHUNK_SIZE: int = 8 * 1024 * 1024
+
+# Number of tweets per Parquet row group
+BATCH_SIZE: int = 100_000
+
+# Parquet compression codec (good ratio, fast to decode for BigQuery)
+COMPRESSION: str = 'zstd'
+
+# Metadata key recording which generation of the JSON blob a Parquet blob was converted from
+SOURCE_GENERATION_METADATA_KEY: str = 'source-generation'
+
+
+def import_pyarrow() -> Any:
+    """Imports pyarrow, which is only needed by the conversion stage.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+
+    try:
+        import pyarrow  # Columnar memory format and Parquet writer
+        import pyarrow.parquet  # noqa: F401 (registers the parquet module on pyarrow)
+    except ImportError as e:
+        raise ImportError("The Parquet conversion stage requires pyarrow (pip install pyarrow).") from e
+    return pyarrow
+
+
+def tweets_schema() -> Any:
+    """Returns the explicit Arrow schema of the projected tweets.
+
+    Only the fields read by queries.py are kept, with the same nesting as the JSON
+    (`user.username`, `mentionedUsers[].username`), so the queries run unchanged. The
+    author's username is also stored as the top-level `username`, because BigQuery can
+    only cluster on top-level columns (see storage.CLUSTERING_FIELDS).
+    """
+
+    pa = import_pyarrow()
+    return pa.schema([
+        pa.field('id', pa.int64()),
+        pa.field('date', pa.timestamp('us', tz='UTC')),
+        pa.field('content', pa.string()),
+        pa.field('username', pa.string()),
+        pa.field('user', pa.struct([pa.field('username', pa.string())])),
+        pa.field('mentionedUsers', pa.list_(pa.struct([pa.field('username', pa.string())]))),
+    ])
+
+
+def project_tweet(tweet: Dict[str, Any]) -> Dict[str, Any]:
+    """Keeps only the fields of a tweet that the queries read.
+
+    Args:
+        tweet (Dict[str, Any]): Decoded tweet object.
+
+    Returns:
+        Dict[str, Any]: The projected tweet (the date is still a string).
+    """
+
+    tweet_id = tweet.get('id')
+    user = tweet.get('user')
+    username = user.get('username') if isinstance(user, dict) else None
+    mentioned_users = tweet.get('mentionedUsers')
+    return {
+        'id': tweet_id if isinstance(tweet_id, int) else None,
+        'date': tweet.get('date'),
+        'content': tweet.get('content'),
+        'username': username,
+        'user': {'username': username} if isinstance(user, dict) else None,
+        'mentionedUsers': [
+            {'username': mention.get('username') if isinstance(mention, dict) else None}
+            for mention in mentioned_users
+        ] if isinstance(mentioned_users, list) else None,
+    }
+
+
+def parse_dates(dates: List[Optional[str]]) -> Any:
+    """Converts ISO 8601 dates to a UTC timestamp array.
+
+    Arrow casts the whole batch at once; if one value is malformed, the batch is
+    parsed row by row and malformed dates become nulls.
+    """
+
+    pa = import_pyarrow()
+    timestamp_type = pa.timestamp('us', tz='UTC')
+    try:
+        return pa.array(dates, pa.string()).cast(timestamp_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        parsed: List[Optional[datetime.datetime]] = []
+        for date in dates:
+            try:
+                value = datetime.datetime.fromisoformat(date.replace('Z', '+00:00'))
+                parsed.append(value if value.tzinfo else value.replace(tzinfo=datetime.timezone.utc))
+            except (AttributeError, ValueError):
+                parsed.append(None)
+        return pa.array(parsed, timestamp_type)
+
+
+def build_record_batch(tweets: List[Dict[str, Any]]) -> Any:
+    """Builds an Arrow record batch from projected tweets."""
+
+    pa = import_pyarrow()
+    schema = tweets_schema()
+    arrays = [
+        parse_dates([tweet['date'] for tweet in tweets]) if field.name == 'date'
+        else pa.array([tweet[field.name] for tweet in tweets], field.type)
+        for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def iter_projected_tweets(lines: Iterable[bytes]) -> Iterable[Dict[str, Any]]:
+    """Decodes NDJSON lines into projected tweets, skipping blank and invalid lines."""
+
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            tweet = json.loads(line)
+        except ValueError:
+            logging.warning(f"Skipping invalid JSON on line {line_number}.")
+            continue
+        if isinstance(tweet, dict):
+            yield project_tweet(tweet)
+
+
+def convert_ndjson_to_parquet(
+    source: BinaryIO,
+    destination: BinaryIO,
+    batch_size: int = BATCH_SIZE,
+    compression: str = COMPRESSION
+) -> int:
+    """Streams newline-delimited JSON tweets into a compressed, column-projected Parquet file.
+
+    Only one batch of projected tweets is held in memory at a time.
+
+    Args:
+        source (BinaryIO): Binary stream of NDJSON tweets.
+        destination (BinaryIO): Writable binary stream for the Parquet file.
+        batch_size (int, optional): Number of tweets per row group. Defaults to 100,000.
+        compression (str, optional): Parquet compression codec. Defaults to 'zstd'.
+
+    Returns:
+        int: The number of tweets written.
+    """
+
+    pa = import_pyarrow()
+    rows = 0
+    batch: List[Dict[str, Any]] = []
+
+    with pa.parquet.ParquetWriter(destination, tweets_schema(), compression=compression) as writer:
+        for tweet in iter_projected_tweets(source):
+            batch.append(tweet)
+            if len(batch) >= batch_size:
+                writer.write_batch(build_record_batch(batch))
+                rows += len(batch)
+                batch = []
+        if batch or not rows:  # An empty input still produces a valid file with the schema
+            writer.write_batch(build_record_batch(batch))
+            rows += len(batch)
+
+    return rows
+
+
+def convert_file(source_path: str, destination_path: str, batch_size: int = BATCH_SIZE) -> int:
+    """Converts a local NDJSON tweets file to Parquet.
+
+    Args:
+        source_path (str): Path to the NDJSON tweets file.
+        destination_path (str): Path of the Parquet file to write.
+        batch_size (int, optional): Number of tweets per row group. Defaults to 100,000.
+
+    Returns:
+        int: The number of tweets written.
+    """
+
+    with open(source_path, 'rb') as source, open(destination_path, 'wb') as destination:
+        return convert_ndjson_to_parquet(source, destination, batch_size)
+
+
+def parquet_file_name_for(json_file_name: str) -> str:
+    """Returns the Parquet file name of a JSON file (e.g. 'tweets.json' -> 'tweets.parquet')."""
+
+    stem = json_file_name[:-len('.json')] if json_file_name.endswith('.json') else json_file_name
+    return stem + '.parquet'
+
+
+def convert_blob_to_parquet(
+    bucket: storage.Bucket,
+    folder_name: str,
+    json_file_name: str,
+    chunk_size: int = CHUNK_SIZE,
+    batch_size: int = BATCH_SIZE
+) -> str:
+    """Converts an extracted NDJSON blob to a Parquet blob next to it.
+
+    Runs between `common.extract_zip_file_conditionally` and `storage.load_data_from_storage`
+    (with `source_format=bigquery.SourceFormat.PARQUET`). The JSON is read and the Parquet
+    uploaded as chunked streams, so memory is bounded by the chunk and batch sizes. The
+    conversion is skipped when the Parquet blob was made from the current JSON blob generation.
+
+    Args:
+        bucket (storage.Bucket): The Google Cloud Storage bucket object.
+        folder_name (str): The folder containing the JSON file.
+        json_file_name (str): The name of the extracted JSON file.
+        chunk_size (int, optional): Size in bytes of each read and upload chunk. Defaults to 8 MiB.
+        batch_size (int, optional): Number of tweets per row group. Defaults to 100,000.
+
+    Returns:
+        str: The name of the Parquet file.
+
+    Raises:
+        FileNotFoundError: If the JSON file does not exist in the bucket.
+        Exception: For unexpected errors during the conversion.
+    """
+
+    parquet_file_name = parquet_file_name_for(json_file_name)
+    json_blob = bucket.get_blob(f'{folder_name}/{json_file_name}')
+    if json_blob is None:
+        raise FileNotFoundError(f"File '{json_file_name}' does not exist in bucket '{bucket.name}'.")
+
+    source_generation = str(json_blob.generation)
+    existing_blob = bucket.get_blob(f'{folder_name}/{parquet_file_name}')
+    if existing_blob is not None and (existing_blob.metadata or {}).get(SOURCE_GENERATION_METADATA_KEY) == source_generation:
+        print(f"File '{parquet_file_name}' is already converted from the current '{json_file_name}', skipping conversion.")
+        return parquet_file_name
+
+    # Setting a chunk size makes the upload chunked and resumable
+    parquet_blob = bucket.blob(f'{folder_name}/{parquet_file_name}', chunk_size=chunk_size)
+    parquet_blob.metadata = {SOURCE_GENERATION_METADATA_KEY: source_generation}
+
+    try:
+        with json_blob.open('rb', chunk_size=chunk_size) as reader, parquet_blob.open('wb') as destination:
+            source = io.BufferedReader(reader, buffer_size=chunk_size)  # Line reads without per-byte calls
+            rows = convert_ndjson_to_parquet(source, destination, batch_size)
+    except Exception as e:
+        logging.error(f"Error converting '{json_file_name}' to Parquet: {e}")
+        raise
+
+    print(f"{rows} tweets converted to gs://{bucket.name}/{folder_name}/{parquet_file_name}")
+    return parquet_file_name
+
+
+def main() -> None:
+    """Converts a local NDJSON tweets file from the command line."""
+
+    parser = argparse.ArgumentParser(description="Convert an NDJSON tweets file to column-projected Parquet.")
+    parser.add_argument('source_path', help="Path to the NDJSON tweets file.")
+    parser.add_argument('destination_path', nargs='?', default=None, help="Path of the Parquet file.")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Number of tweets per row group.")
+    args = parser.parse_args()
+
+    destination_path = args.destination_path or parquet_file_name_for(args.source_path)
+    rows = convert_file(args.source_path, destination_path, args.batch_size)
+    print(f"{rows} tweets converted to {destination_path}")
+
+
+if __name__ == '__main__':
+    main()
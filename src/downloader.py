@@ -0,0 +1,373 @@
+import hashlib  # For verifying the Drive MD5 checksum
+import json  # For persisting the resume state
+import logging  # For logging retries and skipped downloads
+import os  # For positional writes and file management
+import random  # For jittered retry delays
+import threading  # For per-thread HTTP clients
+import time  # For retry delays
+from collections import deque  # For the ranges waiting to be requested
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait  # For concurrent ranged requests
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple  # For type annotations
+
+# Size of each ranged request
+CHUNK_SIZE: int = 16 * 1024 * 1024
+
+# Number of ranged requests in flight
+CONCURRENCY: int = 4
+
+# Number of attempts per chunk before the download fails
+MAX_CHUNK_ATTEMPTS: int = 5
+
+# Suffixes of the partial download and of its resume state
+PARTIAL_SUFFIX: str = '.part'
+STATE_SUFFIX: str = '.part.json'
+
+# Block size used when hashing a downloaded file
+HASH_BLOCK_SIZE: int = 8 * 1024 * 1024
+
+
+class DriveFileInfo(NamedTuple):
+    """Size and checksum of a Drive file."""
+
+    size: int
+    md5_checksum: Optional[str]  # Hex digest; None for files without one (e.g. Google Docs)
+
+
+def get_drive_file_info(drive_service: Any, file_id: str) -> DriveFileInfo:
+    """Returns the size and MD5 checksum of a Drive file (one metadata request).
+
+    Args:
+        drive_service (Any): The Google Drive service resource.
+        file_id (str): The ID of the file.
+
+    Returns:
+        DriveFileInfo: The size in bytes and the hex MD5 checksum.
+    """
+
+    metadata = drive_service.files().get(fileId=file_id, fields='size,md5Checksum', supportsAllDrives=True).execute()
+    return DriveFileInfo(int(metadata['size']), metadata.get('md5Checksum'))
+
+
+def chunk_ranges(size: int, chunk_size: int) -> List[Tuple[int, int]]:
+    """Splits a file size into (start, end) byte ranges, end inclusive as in HTTP Range headers."""
+
+    return [(start, min(start + chunk_size, size) - 1) for start in range(0, size, chunk_size)]
+
+
+def file_md5(path: str) -> str:
+    """Returns the hex MD5 of a file, read in blocks."""
+
+    md5 = hashlib.md5()
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(HASH_BLOCK_SIZE), b''):
+            md5.update(block)
+    return md5.hexdigest()
+
+
+def authorized_http_factory(credentials: Any) -> Callable[[], Any]:
+    """Returns a factory of authorized HTTP clients for the worker threads of a RangeFetcher.
+
+    Args:
+        credentials (Any): The Google credentials of the Drive service.
+
+    Returns:
+        Callable[[], Any]: Builds a new `google_auth_httplib2.AuthorizedHttp` on each call.
+    """
+
+    import google_auth_httplib2  # Installed with google-api-python-client
+    import httplib2
+
+    return lambda: google_auth_httplib2.AuthorizedHttp(credentials, http=httplib2.Http())
+
+
+def require_http_factory(concurrency: int, http_factory: Optional[Callable[[], Any]]) -> None:
+    """Checks that concurrent requests do not share the service's HTTP client.
+
+    Raises:
+        ValueError: If `concurrency` is not positive, or above 1 without an `http_factory`.
+    """
+
+    if concurrency < 1:
+        raise ValueError(f"concurrency must be positive, got {concurrency}.")
+    if concurrency > 1 and http_factory is None:
+        raise ValueError(
+            "Concurrent requests need one HTTP client per thread: pass an http_factory "
+            "(see authorized_http_factory) or concurrency=1."
+        )
+
+
+class RangeFetcher:
+    """Fetches byte ranges of a Drive file, retrying failed requests with jittered backoff.
+
+    The HTTP client of `googleapiclient` is not thread-safe: pass an `http_factory`
+    returning a new authorized client (see `authorized_http_factory`), and each worker
+    thread gets its own. Without a factory, requests use the service's client, which is
+    only safe with a single worker (see `require_http_factory`).
+
+    Args:
+        drive_service (Any): The Google Drive service resource.
+        file_id (str): The ID of the file.
+        http_factory (Optional[Callable[[], Any]], optional): Builds one HTTP client per thread. Defaults to None.
+        max_attempts (int, optional): Attempts per range. Defaults to 5.
+    """
+
+    def __init__(
+        self,
+        drive_service: Any,
+        file_id: str,
+        http_factory: Optional[Callable[[], Any]] = None,
+        max_attempts: int = MAX_CHUNK_ATTEMPTS
+    ) -> None:
+        self.drive_service = drive_service
+        self.file_id = file_id
+        self.http_factory = http_factory
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+
+    def _http(self) -> Any:
+        if self.http_factory is None:
+            return None
+        if not hasattr(self._local, 'http'):
+            self._local.http = self.http_factory()
+        return self._local.http
+
+    def fetch(self, start: int, end: int) -> bytes:
+        """Returns bytes `start` to `end` (inclusive) of the file.
+
+        Raises:
+            Exception: If the range still fails (or comes back truncated) after `max_attempts`.
+        """
+
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                request = self.drive_service.files().get_media(fileId=self.file_id, supportsAllDrives=True)
+                request.headers['Range'] = f'bytes={start}-{end}'
+                http = self._http()
+                data = request.execute(http=http) if http is not None else request.execute()
+                if len(data) != end - start + 1:
+                    raise Exception(f"Expected {end - start + 1} bytes, received {len(data)}.")
+                return data
+            except Exception as e:
+                if attempt == self.max_attempts:
+                    raise
+                delay = min(2 ** attempt, 30) * (0.5 + random.random() / 2)
+                logging.warning(f"Range {start}-{end} failed (attempt {attempt}), retrying in {delay:.1f}s: {e}")
+                time.sleep(delay)
+        raise AssertionError("unreachable")
+
+
+def fetch_concurrently(
+    fetcher: RangeFetcher, ranges: List[Tuple[int, int]], concurrency: int, window: Optional[int] = None
+) -> Iterator[Tuple[Tuple[int, int], bytes]]:
+    """Yields (range, data) pairs as ranges complete, keeping at most `concurrency` in flight.
+
+    Ranges are requested in order. With a `window`, a range is only requested if it starts
+    less than `window` bytes after the first range not yielded yet, so a consumer holding
+    out-of-order ranges until their predecessors arrive holds less than `window` bytes.
+    Pending requests are cancelled if the consumer stops early or a range fails.
+
+    Args:
+        fetcher (RangeFetcher): Fetches one range.
+        ranges (List[Tuple[int, int]]): The (start, end) ranges, in increasing order.
+        concurrency (int): Maximum number of requests in flight.
+        window (Optional[int], optional): Maximum distance in bytes between the first range
+            not yielded and the start of a requested range. Defaults to None (no limit).
+    """
+
+    pending = deque(ranges)
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        in_flight: Dict[Future, Tuple[int, int]] = {}
+
+        def submit_ranges() -> None:
+            while pending and len(in_flight) < concurrency:
+                if window is not None:
+                    first_missing = min([start for start, _ in in_flight.values()] + [pending[0][0]])
+                    if pending[0][0] >= first_missing + window:
+                        break
+                byte_range = pending.popleft()
+                in_flight[executor.submit(fetcher.fetch, *byte_range)] = byte_range
+
+        try:
+            submit_ranges()
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    byte_range = in_flight.pop(future)
+                    yield byte_range, future.result()
+                    submit_ranges()
+        finally:
+            for future in in_flight:
+                future.cancel()
+
+
+def load_resume_state(state_path: str, expected: Dict[str, Any]) -> Set[int]:
+    """Returns the chunk offsets already downloaded, if the saved state matches the download."""
+
+    try:
+        with open(state_path, 'r') as file:
+            state = json.load(file)
+    except (OSError, ValueError):
+        return set()
+    if any(state.get(key) != value for key, value in expected.items()):
+        return set()
+    return set(state.get('completed', []))
+
+
+def save_resume_state(state_path: str, state: Dict[str, Any]) -> None:
+    """Writes the resume state atomically."""
+
+    temporary_path = state_path + '.tmp'
+    with open(temporary_path, 'w') as file:
+        json.dump(state, file)
+    os.replace(temporary_path, state_path)
+
+
+def download_drive_file(
+    drive_service: Any,
+    file_id: str,
+    destination_path: str,
+    chunk_size: int = CHUNK_SIZE,
+    concurrency: int = CONCURRENCY,
+    progress: Optional[Callable[[int, int], None]] = None,
+    http_factory: Optional[Callable[[], Any]] = None
+) -> str:
+    """Downloads a Drive file to disk with concurrent ranged requests, resuming partial downloads.
+
+    Replaces `gdrive.download_file_from_drive`, which holds the whole file in memory:
+    chunks are written at their offset in `<destination>.part` as they arrive, so memory
+    is bounded by `concurrency * chunk_size`. Completed chunks are recorded in
+    `<destination>.part.json` (after their data is flushed to disk), and a later call
+    with the same file, size, checksum and chunk size only fetches the missing chunks.
+    The finished file is verified against the Drive MD5 checksum before being renamed
+    to `destination_path`; an existing destination with the right checksum is kept.
+
+    The result can be passed to `ingest.upload_drive_file_to_cloud_storage` as an open file.
+
+    Args:
+        drive_service (Any): The Google Drive service resource.
+        file_id (str): The ID of the file to download.
+        destination_path (str): Path of the downloaded file.
+        chunk_size (int, optional): Size of each ranged request. Defaults to 16 MiB.
+        concurrency (int, optional): Number of requests in flight. Defaults to 4.
+        progress (Optional[Callable[[int, int], None]], optional): Called with (downloaded bytes,
+            total bytes) after each chunk. Defaults to None.
+        http_factory (Optional[Callable[[], Any]], optional): Builds one HTTP client per worker
+            thread (see RangeFetcher); required when `concurrency` is above 1. Defaults to None.
+
+    Returns:
+        str: The destination path.
+
+    Raises:
+        ValueError: If `concurrency` is above 1 without an `http_factory`.
+        Exception: If a chunk keeps failing or the checksum does not match (the partial
+            download is then discarded).
+    """
+
+    require_http_factory(concurrency, http_factory)
+    info = get_drive_file_info(drive_service, file_id)
+    if info.md5_checksum and os.path.exists(destination_path) and os.path.getsize(destination_path) == info.size:
+        if file_md5(destination_path) == info.md5_checksum:
+            print(f"File '{destination_path}' already downloaded with matching checksum, skipping download.")
+            if progress:
+                progress(info.size, info.size)
+            return destination_path
+
+    partial_path = destination_path + PARTIAL_SUFFIX
+    state_path = destination_path + STATE_SUFFIX
+    expected = {'file_id': file_id, 'size': info.size, 'md5_checksum': info.md5_checksum, 'chunk_size': chunk_size}
+    completed = load_resume_state(state_path, expected) if os.path.exists(partial_path) else set()
+    if completed:
+        print(f"Resuming download of '{destination_path}' ({len(completed)} chunks already downloaded).")
+
+    ranges = [byte_range for byte_range in chunk_ranges(info.size, chunk_size) if byte_range[0] not in completed]
+    downloaded = info.size - sum(end - start + 1 for start, end in ranges)
+
+    descriptor = os.open(partial_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        os.ftruncate(descriptor, info.size)
+        for (start, end), data in fetch_concurrently(RangeFetcher(drive_service, file_id, http_factory), ranges, concurrency):
+            os.pwrite(descriptor, data, start)
+            os.fsync(descriptor)  # The chunk is on disk before it is recorded as completed
+            completed.add(start)
+            save_resume_state(state_path, {**expected, 'completed': sorted(completed)})
+            downloaded += end - start + 1
+            if progress:
+                progress(downloaded, info.size)
+    finally:
+        os.close(descriptor)
+
+    if info.md5_checksum:
+        md5 = file_md5(partial_path)
+        if md5 != info.md5_checksum:
+            os.remove(partial_path)
+            os.remove(state_path)
+            raise Exception(f"Checksum mismatch after download: expected {info.md5_checksum}, got {md5}")
+    else:
+        logging.warning(f"Drive file '{file_id}' has no MD5 checksum, the download is not verified.")
+
+    os.replace(partial_path, destination_path)
+    if os.path.exists(state_path):
+        os.remove(state_path)
+    return destination_path
+
+
+def stream_drive_file(
+    drive_service: Any,
+    file_id: str,
+    sink: BinaryIO,
+    chunk_size: int = CHUNK_SIZE,
+    concurrency: int = CONCURRENCY,
+    progress: Optional[Callable[[int, int], None]] = None,
+    http_factory: Optional[Callable[[], Any]] = None
+) -> int:
+    """Streams a Drive file in order to a writable sink with concurrent ranged requests.
+
+    Chunks arriving out of order are held until their predecessors are written. Only the
+    chunks within `concurrency * chunk_size` bytes of the written content are requested,
+    so the held chunks and the requests in flight never exceed `concurrency` chunks, however
+    slow the first missing chunk is.
+    The sink can be a streaming upload, e.g. `blob.open('wb', chunk_size=...)` for a
+    Cloud Storage blob. Streams cannot be resumed: use `download_drive_file` for that.
+
+    Args:
+        drive_service (Any): The Google Drive service resource.
+        file_id (str): The ID of the file to download.
+        sink (BinaryIO): Writable binary stream receiving the file content.
+        chunk_size (int, optional): Size of each ranged request. Defaults to 16 MiB.
+        concurrency (int, optional): Number of requests in flight. Defaults to 4.
+        progress (Optional[Callable[[int, int], None]], optional): Called with (written bytes,
+            total bytes) after each written chunk. Defaults to None.
+        http_factory (Optional[Callable[[], Any]], optional): Builds one HTTP client per worker
+            thread (see RangeFetcher); required when `concurrency` is above 1. Defaults to None.
+
+    Returns:
+        int: The number of bytes written.
+
+    Raises:
+        ValueError: If `concurrency` is above 1 without an `http_factory`.
+        Exception: If a chunk keeps failing or the checksum of the streamed content does not
+            match (the sink has then received the whole, corrupted content).
+    """
+
+    require_http_factory(concurrency, http_factory)
+    info = get_drive_file_info(drive_service, file_id)
+    md5 = hashlib.md5()
+    held: Dict[int, bytes] = {}
+    written = 0
+
+    for (start, _), data in fetch_concurrently(
+        RangeFetcher(drive_service, file_id, http_factory), chunk_ranges(info.size, chunk_size), concurrency,
+        window=concurrency * chunk_size
+    ):
+        held[start] = data
+        while written in held:  # Write every chunk that is now contiguous
+            data = held.pop(written)
+            sink.write(data)
+            md5.update(data)
+            written += len(data)
+            if progress:
+                progress(written, info.size)
+
+    if info.md5_checksum and md5.hexdigest() != info.md5_checksum:
+        raise Exception(f"Checksum mismatch after download: expected {info.md5_checksum}, got {md5.hexdigest()}")
+    return written
@@ -0,0 +1,106 @@
+import re  # For compiling the emoji matchers
+from typing import List, Optional, Tuple  # For type annotations
+
+# How the sequence continues after a codepoint of each kind, as in queries.top_emojis:
+NO_SELECTOR: int = 0         # Single codepoint, a following U+FE0F is not part of the emoji
+OPTIONAL_SELECTOR: int = 1   # Codepoint followed by an optional U+FE0F variation selector
+REGIONAL_INDICATOR: int = 2  # One or two regional indicators (flag pairs)
+KEYCAP: int = 3              # Base character, optional U+FE0F, then the mandatory U+20E3 keycap
+
+# Codepoint range table equivalent to the character classes of the top_emojis pattern.
+# Entries are (first codepoint, last codepoint, kind), sorted and non-overlapping.
+EMOJI_RANGES: Tuple[Tuple[int, int, int], ...] = tuple(sorted((
+    (0x0023, 0x0023, KEYCAP), (0x002A, 0x002A, KEYCAP), (0x0030, 0x0039, KEYCAP),
+    (0x00A9, 0x00AE, OPTIONAL_SELECTOR),
+    (0x203C, 0x2049, OPTIONAL_SELECTOR),
+    (0x2122, 0x2122, OPTIONAL_SELECTOR), (0x2139, 0x2139, OPTIONAL_SELECTOR),
+    (0x2194, 0x2199, OPTIONAL_SELECTOR), (0x21A9, 0x21AA, OPTIONAL_SELECTOR),
+    (0x231A, 0x231B, OPTIONAL_SELECTOR), (0x2328, 0x2328, OPTIONAL_SELECTOR),
+    (0x23CF, 0x23CF, OPTIONAL_SELECTOR), (0x23E9, 0x23E9, OPTIONAL_SELECTOR),
+    (0x23F3, 0x23F3, OPTIONAL_SELECTOR), (0x23F8, 0x23F8, OPTIONAL_SELECTOR),
+    (0x23FA, 0x23FA, OPTIONAL_SELECTOR),
+    (0x24C2, 0x24C2, OPTIONAL_SELECTOR),
+    (0x2600, 0x26FF, OPTIONAL_SELECTOR), (0x2700, 0x27BF, OPTIONAL_SELECTOR),
+    (0x2934, 0x2935, OPTIONAL_SELECTOR),
+    (0x2B05, 0x2B07, OPTIONAL_SELECTOR), (0x2B1B, 0x2B1C, OPTIONAL_SELECTOR),
+    (0x2B50, 0x2B50, OPTIONAL_SELECTOR), (0x2B55, 0x2B55, OPTIONAL_SELECTOR),
+    (0x3297, 0x3297, OPTIONAL_SELECTOR), (0x3299, 0x3299, OPTIONAL_SELECTOR),
+    (0x1F004, 0x1F004, OPTIONAL_SELECTOR), (0x1F0CF, 0x1F0CF, OPTIONAL_SELECTOR),
+    (0x1F170, 0x1F171, OPTIONAL_SELECTOR), (0x1F17E, 0x1F17F, OPTIONAL_SELECTOR),
+    (0x1F18E, 0x1F18E, OPTIONAL_SELECTOR), (0x1F191, 0x1F19A, OPTIONAL_SELECTOR),
+    (0x1F1E6, 0x1F1FF, REGIONAL_INDICATOR),
+    (0x1F201, 0x1F202, OPTIONAL_SELECTOR), (0x1F21A, 0x1F21A, OPTIONAL_SELECTOR),
+    (0x1F22F, 0x1F22F, OPTIONAL_SELECTOR), (0x1F232, 0x1F232, OPTIONAL_SELECTOR),
+    (0x1F23A, 0x1F23A, OPTIONAL_SELECTOR), (0x1F250, 0x1F251, OPTIONAL_SELECTOR),
+    (0x1F300, 0x1F5FF, NO_SELECTOR), (0x1F600, 0x1F64F, NO_SELECTOR),
+    (0x1F680, 0x1F6FF, NO_SELECTOR), (0x1F900, 0x1F9FF, NO_SELECTOR),
+)))
+
+# Python translation of the REGEXP_EXTRACT_ALL alternation in queries.top_emojis, kept
+# as the reference implementation for tests and benchmarks.
+REFERENCE_PATTERN: re.Pattern = re.compile(
+    r"(?:[\U0001F300-\U0001F5FF]|[\U0001F900-\U0001F9FF]|[\U0001F600-\U0001F64F]|[\U0001F680-\U0001F6FF]"
+    r"|[\u2600-\u26FF]\uFE0F?|[\u2700-\u27BF]\uFE0F?|\u24C2\uFE0F?|[\U0001F1E6-\U0001F1FF]{1,2}"
+    r"|[\U0001F170\U0001F171\U0001F17E\U0001F17F\U0001F18E\U0001F191-\U0001F19A]\uFE0F?"
+    r"|[\u0023\u002A\u0030-\u0039]\uFE0F?\u20E3|[\u2194-\u2199\u21A9-\u21AA]\uFE0F?"
+    r"|[\u2B05-\u2B07\u2B1B\u2B1C\u2B50\u2B55]\uFE0F?|[\u2934\u2935]\uFE0F?"
+    r"|[\u3297\u3299]\uFE0F?|[\U0001F201\U0001F202\U0001F21A\U0001F22F\U0001F232\U0001F23A\U0001F250\U0001F251]\uFE0F?"
+    r"|[\u203C-\u2049]\uFE0F?|[\u00A9-\u00AE]\uFE0F?|[\u2122\u2139]\uFE0F?"
+    r"|\U0001F004\uFE0F?|\U0001F0CF\uFE0F?|[\u231A\u231B\u2328\u23CF\u23E9\u23F3\u23F8\u23FA]\uFE0F?)"
+)
+
+
+def compile_emoji_pattern(ranges: Tuple[Tuple[int, int, int], ...] = EMOJI_RANGES) -> re.Pattern:
+    """Compiles a range table into a regular expression with one branch per kind.
+
+    Every range of the same kind is merged into a single character class, so the
+    engine tests at most four branches per position instead of the nineteen
+    alternatives of the SQL pattern. Because the classes are disjoint, the first
+    codepoint alone decides the branch and leftmost-first matching returns the
+    same sequences as `REFERENCE_PATTERN`.
+
+    Args:
+        ranges (Tuple[Tuple[int, int, int], ...], optional): The range table. Defaults to EMOJI_RANGES.
+
+    Returns:
+        re.Pattern: The compiled matcher.
+    """
+
+    classes: List[List[str]] = [[], [], [], []]
+    for start, end, kind in ranges:
+        escaped = f'\\U{start:08X}' if start == end else f'\\U{start:08X}-\\U{end:08X}'
+        classes[kind].append(escaped)
+
+    branches = {
+        NO_SELECTOR: '[{}]',
+        OPTIONAL_SELECTOR: '[{}]\\uFE0F?',
+        REGIONAL_INDICATOR: '[{}]{{1,2}}',
+        KEYCAP: '[{}]\\uFE0F?\\u20E3',
+    }
+    pattern = '|'.join(
+        template.format(''.join(classes[kind])) for kind, template in branches.items() if classes[kind]
+    )
+    return re.compile(pattern)
+
+
+# Compiled matcher used by the local engines
+EMOJI_PATTERN: re.Pattern = compile_emoji_pattern()
+
+
+def extract_emojis(content: Optional[str]) -> List[str]:
+    """Extracts every emoji sequence from a tweet's content.
+
+    Counts exactly the sequences matched by the `top_emojis` SQL pattern. Pure ASCII
+    text is skipped without running the matcher: every sequence starts (or, for
+    keycaps, ends) with a non-ASCII codepoint.
+
+    Args:
+        content (Optional[str]): The tweet text; None yields no emojis.
+
+    Returns:
+        List[str]: The emoji sequences in order of appearance (duplicates included).
+    """
+
+    if not content or content.isascii():
+        return []
+    return EMOJI_PATTERN.findall(content)
@@ -0,0 +1,372 @@
+import datetime  # For the max tweet date of a delta
+import hashlib  # For deterministic load job ids
+import io  # For loading a delta from memory
+import json  # For summarizing the new rows
+import logging  # For logging load progress
+from typing import Any, List, NamedTuple, Optional, Tuple  # For type annotations
+from google.api_core.exceptions import Conflict, NotFound  # For job id reuse and missing files
+from google.cloud import bigquery  # For load jobs and the watermark table
+from google.cloud.storage import Bucket  # For ranged downloads of the source file
+
+import rollups  # Pre-aggregated tables updated together with the watermark
+from storage import fill_username_statement  # For the clustering column that JSON loads leave NULL
+
+# Table recording how much of each source file was loaded
+WATERMARK_TABLE: str = 'load_watermarks'
+
+WATERMARK_SCHEMA: List[bigquery.SchemaField] = [
+    bigquery.SchemaField('source_uri', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('byte_offset', 'INT64', mode='REQUIRED'),
+    bigquery.SchemaField('loaded_rows', 'INT64', mode='REQUIRED'),
+    bigquery.SchemaField('max_id', 'INT64'),
+    bigquery.SchemaField('max_date', 'TIMESTAMP'),
+    bigquery.SchemaField('updated_at', 'TIMESTAMP'),
+    bigquery.SchemaField('pending_offset', 'INT64'),
+]
+
+# Maximum number of new bytes downloaded and loaded per load job
+DELTA_CHUNK_SIZE: int = 256 * 1024 * 1024
+
+# Number of job ids tried for the load of a byte range (failed jobs cannot be resubmitted)
+MAX_LOAD_ATTEMPTS: int = 5
+
+
+class Watermark(NamedTuple):
+    """High-water mark of a source file: everything before `byte_offset` is already loaded.
+
+    `pending_offset` is the end of the range being loaded, recorded before its load job is
+    submitted, so a rerun after a failure loads exactly the same range.
+    """
+
+    byte_offset: int = 0
+    loaded_rows: int = 0
+    max_id: Optional[int] = None
+    max_date: Optional[datetime.datetime] = None
+    pending_offset: Optional[int] = None
+
+
+def create_watermark_table(client: bigquery.Client, dataset_name: str) -> None:
+    """Creates the watermark table if it does not exist yet, adding columns missing from older tables."""
+
+    table = bigquery.Table(client.dataset(dataset_name).table(WATERMARK_TABLE), schema=WATERMARK_SCHEMA)
+    table = client.create_table(table, exists_ok=True)
+    existing_fields = {field.name for field in table.schema}
+    missing_fields = [field for field in WATERMARK_SCHEMA if field.name not in existing_fields]
+    if existing_fields and missing_fields:
+        table.schema = [*table.schema, *missing_fields]
+        client.update_table(table, ['schema'])
+
+
+def get_watermark(client: bigquery.Client, dataset_name: str, source_uri: str) -> Watermark:
+    """
+    Reads the high-water mark of a source file.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        dataset_name (str): Name of the dataset holding the watermark table.
+        source_uri (str): URI of the source file in Cloud Storage.
+
+    Returns:
+        Watermark: The stored watermark, or an empty one if the file was never loaded.
+    """
+
+    query = f"""
+        SELECT byte_offset, loaded_rows, max_id, max_date, pending_offset
+        FROM `{dataset_name}.{WATERMARK_TABLE}`
+        WHERE source_uri = @source_uri
+    """
+    job_config = bigquery.QueryJobConfig(
+        query_parameters=[bigquery.ScalarQueryParameter('source_uri', 'STRING', source_uri)]
+    )
+    for row in client.query(query, job_config=job_config).result():
+        return Watermark(row['byte_offset'], row['loaded_rows'], row['max_id'], row['max_date'], row['pending_offset'])
+    return Watermark()
+
+
+def complete_lines(data: bytes) -> bytes:
+    """Returns the data up to its last newline (a partial last line is left for the next run)."""
+
+    return data[:data.rfind(b'\n') + 1]
+
+
+def max_of(first: Any, second: Any) -> Any:
+    """Returns the largest of two optional values (None when both are None)."""
+
+    return max((value for value in (first, second) if value is not None), default=None)
+
+
+def summarize_delta(data: bytes) -> Tuple[int, Optional[int], Optional[datetime.datetime]]:
+    """
+    Counts the rows of an NDJSON delta and finds its max tweet id and date.
+
+    Args:
+        data (bytes): Complete NDJSON lines.
+
+    Returns:
+        Tuple[int, Optional[int], Optional[datetime.datetime]]: Number of non-blank lines, max id and max date.
+    """
+
+    rows, max_id, max_date = 0, None, None
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        rows += 1
+        try:
+            tweet = json.loads(line)
+            tweet_id, date = tweet.get('id'), tweet.get('date')
+            if isinstance(tweet_id, int) and (max_id is None or tweet_id > max_id):
+                max_id = tweet_id
+            if date:
+                parsed_date = datetime.datetime.fromisoformat(date.replace('Z', '+00:00'))
+                if parsed_date.tzinfo is None:
+                    parsed_date = parsed_date.replace(tzinfo=datetime.timezone.utc)  # BigQuery reads them as UTC
+                if max_date is None or parsed_date > max_date:
+                    max_date = parsed_date
+        except (ValueError, AttributeError, TypeError):  # Rejected or ignored by the load job as well
+            continue
+    return rows, max_id, max_date
+
+
+def load_job_id(dataset_name: str, table_name: str, source_uri: str, start: int, end: int) -> str:
+    """
+    Builds the job id of the load of a byte range.
+
+    BigQuery rejects a second job with the same id, so a rerun after a failure can never
+    append the same range twice.
+    """
+
+    digest = hashlib.sha256(f'{dataset_name}.{table_name}|{source_uri}|{start}|{end}'.encode('utf-8')).hexdigest()
+    return f'incremental_load_{digest[:40]}'
+
+
+def run_load_job(
+    client: bigquery.Client,
+    data: bytes,
+    destination: bigquery.TableReference,
+    job_id: str,
+    job_config: bigquery.LoadJobConfig
+) -> None:
+    """
+    Loads a delta with a deterministic job id, reusing the job submitted by a previous run if there is one.
+
+    A failed load appends nothing, so it is retried under the next attempt id; a running or
+    successful one is waited for instead of being submitted again.
+
+    Raises:
+        RuntimeError: If every attempt id belongs to a failed job.
+        Exception: For errors of the load job.
+    """
+
+    for attempt in range(MAX_LOAD_ATTEMPTS):
+        attempt_job_id = f'{job_id}_{attempt}'
+        try:
+            load_job = client.load_table_from_file(
+                io.BytesIO(data), destination, size=len(data), job_id=attempt_job_id, job_config=job_config
+            )
+        except Conflict:
+            load_job = client.get_job(attempt_job_id)
+            if load_job.done() and load_job.error_result:
+                continue  # Failed in a previous run, nothing was appended
+            logging.info(f"Load job '{attempt_job_id}' was already submitted, waiting for it instead.")
+        load_job.result()
+        return
+    raise RuntimeError(f"Load job '{job_id}' failed {MAX_LOAD_ATTEMPTS} times, see the previous jobs for details.")
+
+
+def plan_statements(dataset_name: str) -> List[str]:
+    """
+    Builds the script recording the end of the next range (`@byte_offset`) before it is loaded.
+
+    The plan is only recorded when the watermark is still at the offset the run read and no
+    other range is pending; otherwise the ASSERT fails the script instead of loading a range
+    that another run is loading.
+    """
+
+    return [
+        f"""
+        MERGE `{dataset_name}.{WATERMARK_TABLE}` AS W
+        USING (SELECT @source_uri AS source_uri) AS S
+        ON W.source_uri = S.source_uri
+        WHEN MATCHED AND W.byte_offset = @previous_offset AND W.pending_offset IS NULL THEN
+            UPDATE SET
+                pending_offset = @byte_offset,
+                updated_at = CURRENT_TIMESTAMP()
+        WHEN NOT MATCHED AND @previous_offset = 0 THEN
+            INSERT (source_uri, byte_offset, loaded_rows, pending_offset, updated_at)
+            VALUES (@source_uri, 0, 0, @byte_offset, CURRENT_TIMESTAMP())
+    """,
+        "ASSERT @@row_count = 1 AS 'The watermark changed since it was read, another load of the file is running'",
+    ]
+
+
+def watermark_statements(dataset_name: str) -> List[str]:
+    """
+    Builds the statements advancing a watermark to its planned offset, guarded by the offset the load started from.
+
+    When the guard matches no row (a concurrent or stale run), the ASSERT fails the
+    transaction, so the rollup MERGEs committed with it are rolled back as well.
+    """
+
+    return [
+        f"""
+        MERGE `{dataset_name}.{WATERMARK_TABLE}` AS W
+        USING (SELECT @source_uri AS source_uri) AS S
+        ON W.source_uri = S.source_uri
+        WHEN MATCHED AND W.byte_offset = @previous_offset AND W.pending_offset = @byte_offset THEN
+            UPDATE SET
+                byte_offset = @byte_offset,
+                loaded_rows = @loaded_rows,
+                max_id = @max_id,
+                max_date = @max_date,
+                pending_offset = NULL,
+                updated_at = CURRENT_TIMESTAMP()
+    """,
+        "ASSERT @@row_count = 1 AS 'The watermark moved since the load started, the range was not committed'",
+    ]
+
+
+def load_new_data_from_storage(
+    client: bigquery.Client,
+    bucket: Bucket,
+    folder_name: str,
+    dataset_name: str,
+    table_name: str,
+    json_file_name: str,
+    update_rollups: bool = False,
+    chunk_size: int = DELTA_CHUNK_SIZE
+) -> int:
+    """
+    Appends only the rows added to a newline-delimited JSON file since its last load.
+
+    The watermark table stores, per source file, the byte offset already loaded plus the
+    max tweet id and date seen. Each run downloads only the bytes after the offset (ranged
+    reads, at most `chunk_size` per load job), appends the complete lines to the table and
+    advances the watermark, so a daily refresh costs time proportional to the new data.
+
+    Reruns are idempotent: the end of each byte range is recorded in the watermark table
+    before its load, so a rerun after a failure loads the same range (even if the file grew
+    meanwhile) with the same deterministic job id, which BigQuery refuses to run twice. The
+    watermark only moves forward from the offset a run started from. With `update_rollups`,
+    the range is also loaded into the staging table and the rollups are merged in the same
+    transaction as the watermark update, which fails as a whole if the watermark moved.
+
+    The table must not be recreated with `storage.create_table(mode="overwrite")` between
+    incremental loads, since the watermarks would then describe rows that no longer exist.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        bucket (Bucket): Bucket holding the source file.
+        folder_name (str): Folder of the source file in the bucket.
+        dataset_name (str): Name of the dataset containing the table.
+        table_name (str): Name of the table to append data to.
+        json_file_name (str): Name of the JSON file in the folder.
+        update_rollups (bool, optional): Whether to update the rollup tables with the new rows. Defaults to False.
+        chunk_size (int, optional): Maximum number of bytes per load job. Defaults to 256 MiB.
+
+    Returns:
+        int: The number of new rows loaded.
+
+    Raises:
+        NotFound: If the source file does not exist.
+        ValueError: If the file is smaller than its watermark (it was replaced, not appended to)
+            or contains a line longer than `chunk_size`.
+        Exception: For unexpected errors during loading.
+    """
+
+    blob_name = f'{folder_name}/{json_file_name}' if folder_name else json_file_name
+    source_uri = f'gs://{bucket.name}/{blob_name}'
+
+    blob = bucket.get_blob(blob_name)
+    if blob is None:
+        raise NotFound(f"Source file '{source_uri}' not found.")
+
+    create_watermark_table(client, dataset_name)
+    watermark = get_watermark(client, dataset_name, source_uri)
+
+    if blob.size < max(watermark.byte_offset, watermark.pending_offset or 0):
+        raise ValueError(
+            f"Source file '{source_uri}' is smaller than its watermark ({blob.size} < {watermark.byte_offset} bytes); "
+            f"it was replaced, so it must be reloaded in full."
+        )
+
+    job_config = bigquery.LoadJobConfig()
+    job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+    job_config.autodetect = True
+    job_config.ignore_unknown_values = True
+    job_config.write_disposition = bigquery.WriteDisposition.WRITE_APPEND
+    job_config.schema_update_options = [bigquery.SchemaUpdateOption.ALLOW_FIELD_ADDITION]
+
+    staging_job_config = bigquery.LoadJobConfig()
+    staging_job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON
+    staging_job_config.autodetect = True
+    staging_job_config.ignore_unknown_values = True
+    staging_job_config.write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
+
+    table_ref = client.dataset(dataset_name).table(table_name)
+    staging_table_name = table_name + rollups.STAGING_TABLE_SUFFIX
+    loaded_rows = 0
+
+    # A table created with storage.TWEETS_SCHEMA clusters on `username`, which JSON rows leave NULL:
+    try:
+        has_username = 'username' in {field.name for field in client.get_table(table_ref).schema}
+    except NotFound:
+        has_username = False  # Created by the first load from the JSON columns only
+    fill_statements = [fill_username_statement(dataset_name, table_name)] if has_username else []
+    commit_statements = fill_statements + watermark_statements(dataset_name)
+
+    while watermark.byte_offset < blob.size:
+        start = watermark.byte_offset
+        if watermark.pending_offset is not None:
+            # Planned by a run that failed before committing it, load exactly the same range again:
+            end = watermark.pending_offset
+            data = blob.download_as_bytes(start=start, end=end - 1)  # `end` is inclusive
+        else:
+            end = min(start + chunk_size, blob.size)
+            data = complete_lines(blob.download_as_bytes(start=start, end=end - 1))
+            if not data:
+                if end == blob.size:
+                    break  # Only a partial last line was appended, load it on the next run
+                raise ValueError(f"A line of '{source_uri}' after byte {start} is longer than {chunk_size} bytes.")
+            end = start + len(data)
+            plan = bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter('source_uri', 'STRING', source_uri),
+                bigquery.ScalarQueryParameter('previous_offset', 'INT64', start),
+                bigquery.ScalarQueryParameter('byte_offset', 'INT64', end),
+            ])
+            client.query(';\n'.join(plan_statements(dataset_name)) + ';', job_config=plan).result()
+
+        job_id = load_job_id(dataset_name, table_name, source_uri, start, end)
+        run_load_job(client, data, table_ref, job_id, job_config)
+
+        rows, max_id, max_date = summarize_delta(data)
+        next_watermark = Watermark(
+            end,
+            watermark.loaded_rows + rows,
+            max_of(watermark.max_id, max_id),
+            max_of(watermark.max_date, max_date),
+        )
+        parameters = bigquery.QueryJobConfig(query_parameters=[
+            bigquery.ScalarQueryParameter('source_uri', 'STRING', source_uri),
+            bigquery.ScalarQueryParameter('previous_offset', 'INT64', start),
+            bigquery.ScalarQueryParameter('byte_offset', 'INT64', next_watermark.byte_offset),
+            bigquery.ScalarQueryParameter('loaded_rows', 'INT64', next_watermark.loaded_rows),
+            bigquery.ScalarQueryParameter('max_id', 'INT64', next_watermark.max_id),
+            bigquery.ScalarQueryParameter('max_date', 'TIMESTAMP', next_watermark.max_date),
+        ])
+
+        if update_rollups:
+            staging_ref = client.dataset(dataset_name).table(staging_table_name)
+            run_load_job(client, data, staging_ref, job_id + rollups.STAGING_TABLE_SUFFIX, staging_job_config)
+            rollups.update_rollups(
+                client, dataset_name, staging_table_name, job_id, commit_statements, parameters
+            )
+        else:
+            rollups.run_in_transaction(client, commit_statements, parameters)
+
+        logging.info(f"Loaded bytes {start}-{end} ({rows} rows) of '{source_uri}' to table '{dataset_name}.{table_name}'.")
+        loaded_rows += rows
+        watermark = next_watermark
+
+    if not loaded_rows:
+        logging.info(f"No new data in '{source_uri}' since byte {watermark.byte_offset}.")
+    return loaded_rows
@@ -1,71 +1,396 @@
 # Import libraries for working with Google Cloud Storage and file-like objects
-import io # For working with inputs and outputs (downloaded file content)
+import base64  # For encoding checksums as Cloud Storage does
+import hashlib  # For computing MD5 checksums while streaming
+import json  # For persisting resumable upload sessions
+import os  # For checking and removing the resume state file
+import shutil  # For spooling non-seekable streams
+import tempfile  # For spooling non-seekable streams to disk instead of memory
+from importlib import metadata  # For the installed versions named by the compatibility checks
+from typing import Any, BinaryIO, Dict, Optional, Tuple  # For type annotations
+from urllib.parse import quote  # For the bucket name in the upload URL
+import google_crc32c  # For computing CRC32C checksums while streaming
 from google.cloud import storage  # For working with Google Cloud Storage
+from google.resumable_media import UPLOAD_CHUNK_SIZE  # Resumable chunks must be multiples of 256 KiB
+from google.resumable_media.requests import ResumableUpload  # Resumable upload protocol with recovery
+
+# Size of each uploaded chunk (resumable uploads require multiples of 256 KiB)
+CHUNK_SIZE: int = 8 * 1024 * 1024
+
+# Endpoint creating resumable upload sessions
+UPLOAD_URL_TEMPLATE: str = 'https://storage.googleapis.com/upload/storage/v1/b/{bucket}/o?uploadType=resumable'
+
+# Number of times an interrupted upload is resumed before giving up
+MAX_RESUME_ATTEMPTS: int = 5
+
+def compute_stream_checksums(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Tuple[str, str, int]:
+    """Computes the MD5 and CRC32C checksums of a stream, reading it chunk by chunk.
+
+    The checksums are base64-encoded like the `md5_hash` and `crc32c` properties of
+    a `storage.Blob`, so they can be compared with its metadata. The stream is read
+    from its current position to the end and then rewound to that position.
+
+    Args:
+        stream (BinaryIO): A seekable readable stream.
+        chunk_size (int, optional): Number of bytes read at a time. Defaults to 8 MiB.
+
+    Returns:
+        Tuple[str, str, int]: The base64 MD5, the base64 CRC32C and the size in bytes.
+    """
+
+    start: int = stream.tell()
+    md5 = hashlib.md5()
+    crc32c = google_crc32c.Checksum()
+    size: int = 0
+
+    for chunk in iter(lambda: stream.read(chunk_size), b''):
+        md5.update(chunk)
+        crc32c.update(chunk)
+        size += len(chunk)
+
+    stream.seek(start)
+    return (
+        base64.b64encode(md5.digest()).decode('ascii'),
+        base64.b64encode(crc32c.digest()).decode('ascii'),
+        size,
+    )
+
+def ensure_seekable(stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> BinaryIO:
+    """Returns a seekable version of a readable stream.
+
+    Seekable streams are returned unchanged. Other streams (e.g. HTTP responses)
+    are spooled to a temporary file so they never have to fit in memory.
+
+    Args:
+        stream (BinaryIO): Any readable binary stream.
+        chunk_size (int, optional): Number of bytes copied at a time. Defaults to 8 MiB.
+
+    Returns:
+        BinaryIO: A seekable stream positioned at the start of the data.
+    """
+
+    if stream.seekable():
+        return stream
+
+    spooled = tempfile.TemporaryFile()
+    shutil.copyfileobj(stream, spooled, chunk_size)
+    spooled.seek(0)
+    return spooled
+
+class ChecksummingReader:
+    """Read-only view of a seekable stream from its current position, checksummed while it is read.
+
+    Each byte is added to the MD5/CRC32C checksums the first time it is read, so the
+    upload computes the checksums in the same pass. Bytes skipped by a seek forward
+    (e.g. when resuming a session after `recover()`) are read once to keep the
+    checksums complete; bytes read again after a seek backward are not counted twice.
+
+    Args:
+        stream (BinaryIO): A seekable stream positioned at the start of the data.
+        chunk_size (int, optional): Number of bytes read at a time when catching up. Defaults to 8 MiB.
+    """
+
+    def __init__(self, stream: BinaryIO, chunk_size: int = CHUNK_SIZE) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.base: int = stream.tell()
+        self.md5 = hashlib.md5()
+        self.crc32c = google_crc32c.Checksum()
+        self.checksummed: int = 0
+
+    def tell(self) -> int:
+        return self.stream.tell() - self.base
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_SET:
+            offset += self.base
+        return self.stream.seek(offset, whence) - self.base
+
+    def _update(self, data: bytes) -> None:
+        self.md5.update(data)
+        self.crc32c.update(data)
+        self.checksummed += len(data)
+
+    def read(self, size: int = -1) -> bytes:
+        position = self.tell()
+        if position > self.checksummed:  # Catch up on the bytes skipped by a seek forward
+            self.seek(self.checksummed)
+            while self.checksummed < position:
+                data = self.stream.read(min(self.chunk_size, position - self.checksummed))
+                if not data:  # A seek past the end: the skipped bytes do not exist
+                    raise EOFError(f"Stream ended at byte {self.checksummed}, before position {position}.")
+                self._update(data)
+        data = self.stream.read(size)
+        if position + len(data) > self.checksummed:
+            self._update(data[self.checksummed - position:])
+        return data
+
+    def checksums(self) -> Tuple[str, str]:
+        """Returns the base64 MD5 and CRC32C of the bytes read so far (like `compute_stream_checksums`)."""
+
+        return (
+            base64.b64encode(self.md5.digest()).decode('ascii'),
+            base64.b64encode(self.crc32c.digest()).decode('ascii'),
+        )
+
+def stream_size(stream: BinaryIO) -> int:
+    """Returns the number of bytes from the current position of a seekable stream to its end."""
+
+    start: int = stream.tell()
+    size: int = stream.seek(0, os.SEEK_END) - start
+    stream.seek(start)
+    return size
+
+def validate_chunk_size(chunk_size: int) -> None:
+    """Raises ValueError if a chunk size is not a positive multiple of 256 KiB, as resumable uploads require."""
+
+    if chunk_size <= 0 or chunk_size % UPLOAD_CHUNK_SIZE != 0:
+        raise ValueError(f"The chunk size must be a positive multiple of {UPLOAD_CHUNK_SIZE} bytes, got {chunk_size}.")
+
+# ---------------------------------------------------------------------------------------------
+# Compatibility shim: the only code relying on private attributes of google-cloud-storage and
+# google-resumable-media. Tested against the versions pinned in requirements.txt; each access is
+# checked, so an upgrade that renames these attributes raises instead of silently misbehaving.
+# ---------------------------------------------------------------------------------------------
+
+# Private attributes of ResumableUpload set by `attach_resumable_upload` (normally set by `initiate()`)
+RESUMABLE_UPLOAD_SESSION_ATTRIBUTES: Tuple[str, ...] = ('_resumable_url', '_stream', '_total_bytes', '_content_type')
+
+def incompatible_library_error(distribution: str, detail: str) -> RuntimeError:
+    """Builds the error raised when a private attribute used by the compatibility shim is missing."""
+
+    try:
+        version = metadata.version(distribution)
+    except metadata.PackageNotFoundError:
+        version = 'unknown'
+    return RuntimeError(
+        f"Unsupported {distribution} {version}: {detail}. Pin the version listed in requirements.txt."
+    )
+
+def storage_transport(bucket: storage.Bucket) -> Any:
+    """Returns the authorized session of a bucket's client (the transport `Blob` uploads use).
+
+    Raises:
+        RuntimeError: If the installed google-cloud-storage no longer exposes it.
+    """
+
+    transport = getattr(bucket.client, '_http', None)
+    if transport is None:
+        raise incompatible_library_error('google-cloud-storage', "the client has no '_http' session")
+    return transport
+
+def write_resume_state(resume_state_path: str, state: Dict[str, Any]) -> None:
+    """Writes the resume state readable by the owner only: the session URL grants write access to the upload."""
+
+    descriptor = os.open(resume_state_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    os.fchmod(descriptor, 0o600)  # Also restrict a state file created earlier with wider permissions
+    with os.fdopen(descriptor, 'w') as file:
+        json.dump(state, file)
+
+def attach_resumable_upload(
+    transport: Any, session_url: str, stream: Any, size: int, chunk_size: int, content_type: str
+) -> ResumableUpload:
+    """Attaches a ResumableUpload to a session created by an earlier run and recovers its offset.
+
+    `ResumableUpload` only creates sessions through `initiate()`, so the session URL, stream
+    and size are set on its private attributes (see RESUMABLE_UPLOAD_SESSION_ATTRIBUTES)
+    before `recover()` asks Cloud Storage for the bytes it persisted and seeks the stream there.
+
+    Args:
+        transport (Any): An authorized session (see `storage_transport`).
+        session_url (str): The resumable upload session URL.
+        stream (Any): The data, positioned at its start.
+        size (int): Total size of the upload in bytes.
+        chunk_size (int): Size of each uploaded chunk.
+        content_type (str): Content type of the object.
+
+    Returns:
+        ResumableUpload: The upload, ready to transmit its remaining chunks.
+
+    Raises:
+        RuntimeError: If the installed google-resumable-media no longer has these attributes.
+        Exception: If the session is no longer valid.
+    """
+
+    upload = ResumableUpload(session_url, chunk_size)
+    missing = [name for name in RESUMABLE_UPLOAD_SESSION_ATTRIBUTES if not hasattr(upload, name)]
+    if missing:  # Setting renamed attributes would succeed but have no effect
+        raise incompatible_library_error('google-resumable-media', f"ResumableUpload has no {missing}")
+    upload._resumable_url = session_url
+    upload._stream = stream
+    upload._total_bytes = size
+    upload._content_type = content_type
+    upload.recover(transport)
+    return upload
+
+# End of the compatibility shim
+
+def upload_stream_resumable(
+    transport: Any,
+    upload: ResumableUpload,
+    max_resume_attempts: int = MAX_RESUME_ATTEMPTS
+) -> Any:
+    """Transmits the remaining chunks of an initiated resumable upload.
+
+    Transient errors are retried by `transmit_next_chunk` itself; after any other failure
+    the upload is recovered (`recover()` asks Cloud Storage for the persisted offset) and
+    continues from there instead of restarting.
+
+    Args:
+        transport (Any): An authorized session (see `storage_transport`).
+        upload (ResumableUpload): An initiated (or attached) upload.
+        max_resume_attempts (int, optional): Number of consecutive failures tolerated. Defaults to 5.
+
+    Returns:
+        Any: The HTTP response of the final chunk (None if the upload had already finished).
+
+    Raises:
+        Exception: If the upload keeps failing after `max_resume_attempts` resumes.
+    """
+
+    attempts: int = 0
+    response: Any = None
+    while not upload.finished:
+        try:
+            response = upload.transmit_next_chunk(transport)
+            attempts = 0
+        except Exception as e:
+            attempts += 1
+            if attempts > max_resume_attempts:
+                raise
+            print(f"Upload interrupted at byte {upload.bytes_uploaded}, resuming: {e}")
+            try:
+                upload.recover(transport)  # Continue from what the server actually persisted
+            except Exception as recover_error:
+                print(f"Could not query the upload offset, retrying: {recover_error}")
+    return response
 
 def upload_drive_file_to_cloud_storage(
-    bucket: storage.Bucket, 
-    folder_name: str, 
-    downloaded: io.BytesIO, 
-    zip_file_name: str
+    bucket: storage.Bucket,
+    folder_name: str,
+    downloaded: BinaryIO,
+    zip_file_name: str,
+    chunk_size: int = CHUNK_SIZE,
+    resume_state_path: Optional[str] = None
 ) -> storage.Blob:
     """Uploads a file to Google Cloud Storage.
 
-    This function uploads a file provided as a BytesIO object to a specified folder
-    within a Google Cloud Storage bucket with a conditional check.
+    This function streams any readable binary object to a specified folder within a
+    Google Cloud Storage bucket with a chunked `ResumableUpload`. When the existing blob
+    has the same size, the MD5/CRC32C checksums are computed first and compared with its
+    metadata, so re-uploading an unchanged file costs a single metadata request and one
+    read. Otherwise the stream is read once: the checksums are computed while uploading
+    and verified against the uploaded object.
 
     Args:
         bucket (storage.Bucket): The Google Cloud Storage bucket where the file will be uploaded.
         folder_name (str): The name of the folder within the bucket to upload the file to.
-        downloaded (io.BytesIO): The BytesIO object containing the file data to upload.
+        downloaded (BinaryIO): A readable binary stream (e.g. BytesIO or an open file) with the file data.
         zip_file_name (str): The name of the file to be uploaded.
+        chunk_size (int, optional): Size of each uploaded chunk, a multiple of 256 KiB. Defaults to 8 MiB.
+        resume_state_path (Optional[str], optional): Local JSON file (mode 0600) where the upload
+            session is saved, so a later run can resume an interrupted upload of the same content.
+            The content is then checksummed before uploading. Defaults to None (resume within
+            this call only).
 
     Returns:
         storage.Blob: The uploaded blob object representing the uploaded file in Cloud Storage.
 
+    Raises:
+        ValueError: If `chunk_size` is not a multiple of 256 KiB.
+        Exception: If the upload fails or the uploaded checksum does not match.
+
     Assumptions:
         - The user has authenticated with Google Cloud and has permission to access and write to the specified bucket.
-        - The `downloaded` object is a valid BytesIO object containing the file data.
+        - `downloaded` is positioned at the start of the file data.
 
     Suggestions for Improvement:
-        - Error Handling: Implement checks for potential errors during upload (e.g., network errors, permission issues). Use `try-except` blocks with informative error messages.
-        - Progress Reporting: For large files, consider adding progress reporting mechanisms using third-party libraries or manual tracking.
-        - Variable Naming: Use more descriptive variable names (e.g., `uploaded_file` instead of `downloaded`).
-        - Type Annotations: Consider adding type annotations for clarity and potential type checking.
-        - Folder Creation: Explore alternative methods like `Blob.make_dirs()`.
+        - Progress Reporting: Report the uploaded offset through a callback for large files.
         - Logging: Use a logging library for structured logging instead of `print` statements.
     """
 
-    # Create a blob object referencing the folder path within the bucket
-    folder_blob: storage.Blob = bucket.blob(f"{folder_name}/")
+    validate_chunk_size(chunk_size)
+    blob_name: str = f'{folder_name}/{zip_file_name}'
 
-    # Check if the folder exists. If not, create an empty file object to serve as a placeholder.
-    if not folder_blob.exists():
-        try:
-            folder_blob.upload_from_string('', content_type='application/x-www-form-urlencoded;charset=UTF-8')
-            print(f"Folder '{folder_name}' created in bucket gs://{bucket.name}")  # Informational message
-        except Exception as e:  # Catch potential errors during folder creation
-            print(f"Error creating folder: {e}")
-            raise  # Re-raise the exception for further handling
-
-    # Create a blob object referencing the specific file to be uploaded within the folder
-    blob: storage.Blob = bucket.blob(f'{folder_name}/{zip_file_name}')
-
-    # Download as string and get the size if the ZIP blob exists in the bucket
-    if blob.exists():
-        existing_blob_data: str = blob.download_as_string()
-        existing_blob_size: int = len(existing_blob_data)
-
-    # Check if a blob with the same name and size already exists
-    if blob.exists() and existing_blob_size == len(downloaded.getvalue()):
-        print(f"File '{zip_file_name}' already exists on cloud storage with exact matching size, skipping upload.")
-    else:
-        # Upload the file if conditions aren't met
-        try:
-            blob.upload_from_string(downloaded.getvalue(), content_type='application/zip')
-            print(f'File uploaded to gs://{bucket.name}/{blob.name}')
-        except Exception as e:  # Catch potential errors during upload
-            print(f"Error uploading file: {e}")
-            raise  # Re-raise the exception for further handling
+    # Single metadata request: the existing blob (if any) and its checksums
+    existing_blob: Optional[storage.Blob] = bucket.get_blob(blob_name)
+
+    # The folder placeholder only needs checking when the file itself is missing
+    if existing_blob is None:
+        folder_blob: storage.Blob = bucket.blob(f"{folder_name}/")
+        if not folder_blob.exists():
+            try:
+                folder_blob.upload_from_string('', content_type='application/x-www-form-urlencoded;charset=UTF-8')
+                print(f"Folder '{folder_name}' created in bucket gs://{bucket.name}")  # Informational message
+            except Exception as e:  # Catch potential errors during folder creation
+                print(f"Error creating folder: {e}")
+                raise  # Re-raise the exception for further handling
+
+    # Non-seekable streams are spooled to disk
+    stream: BinaryIO = ensure_seekable(downloaded, chunk_size)
+    size: int = stream_size(stream)
+
+    # Checksum up front only when a blob of the same size may already hold the content,
+    # or when the content identifies a resumable session across runs
+    md5_hash: Optional[str] = None
+    if resume_state_path or (existing_blob is not None and existing_blob.size == size):
+        md5_hash, crc32c_hash, _ = compute_stream_checksums(stream, chunk_size)
+        if existing_blob is not None and (
+            existing_blob.md5_hash == md5_hash
+            or (existing_blob.md5_hash is None and existing_blob.crc32c == crc32c_hash)  # Composite objects have no MD5
+        ):
+            print(f"File '{zip_file_name}' already exists on cloud storage with matching checksum, skipping upload.")
+            if stream is not downloaded:
+                stream.close()
+            return existing_blob
+
+    transport: Any = storage_transport(bucket)
+    reader = ChecksummingReader(stream, chunk_size)
+    blob: storage.Blob = bucket.blob(blob_name)
+    try:
+        # Reuse a saved session for the same content, or open a new one
+        upload: Optional[ResumableUpload] = None
+        if resume_state_path and os.path.exists(resume_state_path):
+            with open(resume_state_path, 'r') as file:
+                state = json.load(file)
+            if state.get('blob_name') == blob_name and state.get('md5_hash') == md5_hash:
+                try:
+                    upload = attach_resumable_upload(
+                        transport, state['session_url'], reader, size, chunk_size, 'application/zip'
+                    )
+                    print(f"Resuming upload of '{zip_file_name}'")
+                except Exception as e:  # Expired sessions are replaced by a new one
+                    print(f"Saved upload session is no longer valid, restarting upload: {e}")
+                    reader.seek(0)
+
+        if upload is None:
+            upload = ResumableUpload(UPLOAD_URL_TEMPLATE.format(bucket=quote(bucket.name, safe='')), chunk_size)
+            upload.initiate(transport, reader, {'name': blob_name}, 'application/zip', total_bytes=size)
+            if resume_state_path:
+                write_resume_state(
+                    resume_state_path,
+                    {'blob_name': blob_name, 'md5_hash': md5_hash, 'session_url': upload.resumable_url}
+                )
+
+        upload_stream_resumable(transport, upload)
+
+        # Verify the server-side checksum of the finished upload against the streamed bytes
+        uploaded_md5_hash, _ = reader.checksums()
+        blob.reload()
+        if blob.md5_hash != uploaded_md5_hash:
+            raise Exception(f"Checksum mismatch after upload: expected {uploaded_md5_hash}, got {blob.md5_hash}")
+
+        if resume_state_path and os.path.exists(resume_state_path):
+            os.remove(resume_state_path)  # The session is complete
+
+        print(f'File uploaded to gs://{bucket.name}/{blob.name}')
+    except Exception as e:  # Catch potential errors during upload
+        print(f"Error uploading file: {e}")
+        raise  # Re-raise the exception for further handling
+    finally:
+        if stream is not downloaded:
+            stream.close()  # Remove the spooled temporary file
 
     # Return the uploaded blob object
     return blob
@@ -0,0 +1,329 @@
+import collections.abc  # For recognizing iterator results
+import contextlib  # For the measuring context manager
+import csv  # For the CSV sink
+import functools  # For preserving the metadata of decorated functions
+import json  # For the JSON lines sink
+import logging  # For reporting failing sinks
+import os  # For the resident set size and atomic file replacement
+import threading  # For serializing sink writes
+import time  # For wall and CPU time
+import tracemalloc  # For the allocation peak
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple  # For type annotations
+
+# Columns of the CSV sink, in order
+CSV_FIELDS: List[str] = [
+    'stage', 'status', 'started_at', 'wall_seconds', 'cpu_seconds', 'traced_peak_bytes', 'rss_delta_bytes', 'labels'
+]
+
+# Prefix of the metric names written by the Prometheus sink
+METRIC_PREFIX: str = 'tweets_stage'
+
+# tracemalloc is process-wide, so the running peaks of the open measurements of every
+# Instrumentation (and thread) are kept together, under one lock
+_tracing_lock = threading.Lock()
+_open_peaks: Dict[object, int] = {}  # Running allocation peak of each open measurement
+_started_tracing = False  # Whether tracemalloc was started by the first open measurement
+
+
+class StageMetrics(NamedTuple):
+    """Resources used by one run of an instrumented stage.
+
+    Attributes:
+        stage: Name of the stage (e.g. 'q1_time').
+        status: 'ok', or 'error' if the stage raised.
+        started_at: Unix time at which the stage started.
+        wall_seconds: Elapsed wall-clock time.
+        cpu_seconds: CPU time of the process (user + system) spent during the stage.
+        traced_peak_bytes: Peak of the Python allocations above the start level (None if not traced).
+        rss_delta_bytes: Change of the resident set size (None where it cannot be read).
+        labels: Extra labels attached to the run (e.g. the backend).
+    """
+
+    stage: str
+    status: str
+    started_at: float
+    wall_seconds: float
+    cpu_seconds: float
+    traced_peak_bytes: Optional[int]
+    rss_delta_bytes: Optional[int]
+    labels: Dict[str, str]
+
+
+def current_rss_bytes() -> Optional[int]:
+    """Returns the current resident set size of the process, or None where it cannot be read.
+
+    Reads /proc/self/statm (Linux); `resource.getrusage` only reports the peak, which
+    cannot tell how much a single stage added.
+    """
+
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class JsonLinesSink:
+    """Appends each run as one JSON object per line.
+
+    Args:
+        path (str): Path of the JSON lines file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def emit(self, metrics: StageMetrics) -> None:
+        with open(self.path, 'a', encoding='utf-8') as output:
+            output.write(json.dumps(metrics._asdict()) + '\n')
+
+
+class CsvSink:
+    """Appends each run as one CSV row (CSV_FIELDS), writing the header to a new file.
+
+    Labels are stored as a JSON object in the `labels` column.
+
+    Args:
+        path (str): Path of the CSV file.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def emit(self, metrics: StageMetrics) -> None:
+        new_file = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        with open(self.path, 'a', encoding='utf-8', newline='') as output:
+            writer = csv.DictWriter(output, fieldnames=CSV_FIELDS)
+            if new_file:
+                writer.writeheader()
+            row = metrics._asdict()
+            row['labels'] = json.dumps(metrics.labels, sort_keys=True)
+            writer.writerow(row)
+
+
+class PrometheusSink:
+    """Exposes the runs in the Prometheus text format (e.g. for the node exporter's textfile collector).
+
+    The file holds the metrics of the latest run of every stage and label set, plus a
+    run counter, and is replaced atomically so scrapers never read a partial file.
+
+    Args:
+        path (str): Path of the .prom file.
+        prefix (str, optional): Prefix of the metric names. Defaults to 'tweets_stage'.
+    """
+
+    # Metric suffix, StageMetrics field and help text of the exposed gauges
+    GAUGES: List[Tuple[str, str, str]] = [
+        ('wall_seconds', 'wall_seconds', 'Wall-clock time of the latest run.'),
+        ('cpu_seconds', 'cpu_seconds', 'CPU time of the latest run.'),
+        ('traced_peak_bytes', 'traced_peak_bytes', 'Peak Python allocations of the latest run.'),
+        ('rss_delta_bytes', 'rss_delta_bytes', 'Resident set size change of the latest run.'),
+        ('last_run_timestamp_seconds', 'started_at', 'Unix time at which the latest run started.'),
+    ]
+
+    def __init__(self, path: str, prefix: str = METRIC_PREFIX) -> None:
+        self.path = path
+        self.prefix = prefix
+        self.latest: Dict[Tuple[Tuple[str, str], ...], StageMetrics] = {}
+        self.runs: Dict[Tuple[Tuple[str, str], ...], int] = {}
+
+    @staticmethod
+    def format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+        escaped = (
+            (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+            for name, value in labels
+        )
+        return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+    def render(self) -> str:
+        """Returns the metrics of the latest runs in the Prometheus text format."""
+
+        lines: List[str] = []
+        for suffix, field, help_text in self.GAUGES:
+            name = f'{self.prefix}_{suffix}'
+            lines += [f'# HELP {name} {help_text}', f'# TYPE {name} gauge']
+            for key, metrics in sorted(self.latest.items()):
+                value = getattr(metrics, field)
+                if value is not None:
+                    lines.append(f'{name}{self.format_labels(key)} {value}')
+        name = f'{self.prefix}_runs_total'
+        lines += [f'# HELP {name} Number of runs.', f'# TYPE {name} counter']
+        for key, count in sorted(self.runs.items()):
+            lines.append(f'{name}{self.format_labels(key)} {count}')
+        return '\n'.join(lines) + '\n'
+
+    def emit(self, metrics: StageMetrics) -> None:
+        key = tuple(sorted({**metrics.labels, 'stage': metrics.stage, 'status': metrics.status}.items()))
+        self.latest[key] = metrics
+        self.runs[key] = self.runs.get(key, 0) + 1
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as output:
+            output.write(self.render())
+        os.replace(temporary_path, self.path)
+
+
+class Instrumentation:
+    """Measures stages (wall time, CPU time, tracemalloc peak, RSS delta) and emits them to sinks.
+
+    Use `measure` as a context manager around any block, or `instrumented` as a decorator.
+    Without sinks, both are no-ops, so instrumented code costs nothing when unobserved.
+    Sinks are objects with an `emit(StageMetrics)` method; a failing sink is logged and
+    never fails the measured stage.
+
+    Allocation tracing slows Python code down; it is only active inside measured blocks
+    and can be disabled with `trace_allocations=False`. Nested measurements each report
+    their own peak.
+
+    Args:
+        sinks (Optional[List[Any]], optional): Metric sinks (JsonLinesSink, CsvSink, PrometheusSink...). Defaults to None.
+        trace_allocations (bool, optional): Whether to record the tracemalloc peak. Defaults to True.
+    """
+
+    def __init__(self, sinks: Optional[List[Any]] = None, trace_allocations: bool = True) -> None:
+        self.sinks: List[Any] = list(sinks or [])
+        self.trace_allocations = trace_allocations
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _start_tracing() -> Tuple[object, int]:
+        global _started_tracing
+        with _tracing_lock:
+            if not _open_peaks:
+                _started_tracing = not tracemalloc.is_tracing()
+                if _started_tracing:
+                    tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            for token in _open_peaks:
+                _open_peaks[token] = max(_open_peaks[token], peak)  # Keep the open peaks before resetting it
+            token = object()
+            _open_peaks[token] = current
+            tracemalloc.reset_peak()
+            return token, current
+
+    @staticmethod
+    def _stop_tracing(token: object, start_level: int) -> int:
+        global _started_tracing
+        with _tracing_lock:
+            peak = max(_open_peaks.pop(token), tracemalloc.get_traced_memory()[1])
+            if not _open_peaks and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+            return max(peak - start_level, 0)
+
+    def emit(self, metrics: StageMetrics) -> None:
+        """Sends metrics to every sink."""
+
+        with self._lock:
+            for sink in self.sinks:
+                try:
+                    sink.emit(metrics)
+                except Exception as e:
+                    logging.warning(f"Metric sink {type(sink).__name__} failed for stage '{metrics.stage}': {e}")
+
+    @contextlib.contextmanager
+    def measure(self, stage: str, **labels: str) -> Iterator[None]:
+        """Measures the enclosed block as one run of `stage`.
+
+        Args:
+            stage (str): Name of the stage.
+            **labels (str): Extra labels of the run.
+        """
+
+        if not self.sinks:
+            yield
+            return
+
+        status = 'ok'
+        traced = self.trace_allocations
+        if traced:
+            token, start_level = self._start_tracing()
+        rss_before = current_rss_bytes()
+        started_at = time.time()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        try:
+            yield
+        except BaseException:
+            status = 'error'
+            raise
+        finally:
+            wall_seconds = time.perf_counter() - wall_start
+            cpu_seconds = time.process_time() - cpu_start
+            rss_after = current_rss_bytes()
+            traced_peak = self._stop_tracing(token, start_level) if traced else None
+            self.emit(StageMetrics(
+                stage=stage,
+                status=status,
+                started_at=started_at,
+                wall_seconds=wall_seconds,
+                cpu_seconds=cpu_seconds,
+                traced_peak_bytes=traced_peak,
+                rss_delta_bytes=None if rss_before is None or rss_after is None else rss_after - rss_before,
+                labels={name: str(value) for name, value in labels.items()},
+            ))
+
+    def instrumented(self, stage: Optional[str] = None, **labels: str) -> Callable[[Callable], Callable]:
+        """Decorator measuring every call of a function (see `measure`).
+
+        When the function returns an iterator (e.g. rows streamed page by page), the run
+        lasts until the iterator is exhausted or closed, so it includes the consumption.
+
+        Args:
+            stage (Optional[str], optional): Name of the stage. Defaults to the function name.
+            **labels (str): Extra labels of the runs.
+        """
+
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args: Any, **kwargs: Any) -> Any:
+                with contextlib.ExitStack() as run:
+                    run.enter_context(self.measure(stage or function.__name__, **labels))
+                    result = function(*args, **kwargs)
+                    if isinstance(result, collections.abc.Iterator):
+                        return consume_within(run.pop_all(), result)  # The iterator ends the run
+                    return result
+            return wrapper
+
+        return decorator
+
+
+def consume_within(run: contextlib.ExitStack, iterator: Iterator[Any]) -> Iterator[Any]:
+    """Yields the items of an iterator, closing `run` once it is exhausted, fails or is closed."""
+
+    with run:
+        yield from iterator
+
+
+# Process-wide instrumentation used by the module-level helpers; without sinks it does nothing
+default_instrumentation = Instrumentation()
+
+
+def configure(sinks: Optional[List[Any]] = None, trace_allocations: bool = True) -> Instrumentation:
+    """Sets the sinks of the process-wide instrumentation (None disables it).
+
+    Args:
+        sinks (Optional[List[Any]], optional): Metric sinks. Defaults to None.
+        trace_allocations (bool, optional): Whether to record the tracemalloc peak. Defaults to True.
+
+    Returns:
+        Instrumentation: The process-wide instrumentation.
+    """
+
+    default_instrumentation.sinks = list(sinks or [])
+    default_instrumentation.trace_allocations = trace_allocations
+    return default_instrumentation
+
+
+def measure(stage: str, **labels: str) -> contextlib.AbstractContextManager:
+    """Measures a block with the process-wide instrumentation (see `Instrumentation.measure`)."""
+
+    return default_instrumentation.measure(stage, **labels)
+
+
+def instrumented(stage: Optional[str] = None, **labels: str) -> Callable[[Callable], Callable]:
+    """Decorator measuring a function with the process-wide instrumentation (see `Instrumentation.instrumented`).
+
+    The sinks are looked up at call time, so functions can be decorated at import time
+    and observed once `configure` is called.
+    """
+
+    return default_instrumentation.instrumented(stage, **labels)
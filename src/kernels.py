@@ -0,0 +1,179 @@
+import datetime  # For converting day ordinals back to dates
+from typing import Any, List, Optional, Sequence, Tuple  # For type annotations
+
+import numpy as np  # Vectorized group-by kernels
+
+from local import TOP_N, TopResults  # Number of rows per question and the fused result type
+from tweet_store import MISSING_CODE, MISSING_DAY, TweetStore  # Columnar tweets and their sentinels
+
+# Largest number of (day, author) groups counted with a dense `bincount` instead of a sort
+DENSE_GROUPS_LIMIT: int = 1 << 25
+
+
+def as_array(column: Any) -> np.ndarray:
+    """Returns a column as an ndarray, without copying buffers (array.array, memoryview, mmap slices)."""
+
+    if isinstance(column, np.ndarray):
+        return column
+    try:
+        return np.asarray(memoryview(column))
+    except TypeError:  # Not a buffer, e.g. a list
+        return np.asarray(column)
+
+
+def sort_ranks(values: Sequence[str]) -> np.ndarray:
+    """Returns the rank of every dictionary code in ascending string order.
+
+    Dictionary codes follow insertion order, so ties are broken on these ranks to
+    order them alphabetically, like the `ORDER BY ... username ASC` of queries.py.
+    Python compares strings by codepoint, which is the UTF-8 byte order of BigQuery.
+
+    Args:
+        values (Sequence[str]): The dictionary values, indexed by code.
+
+    Returns:
+        np.ndarray: int64 ranks indexed by code.
+    """
+
+    ranks = np.empty(len(values), dtype=np.int64)
+    ranks[sorted(range(len(values)), key=values.__getitem__)] = np.arange(len(values), dtype=np.int64)
+    return ranks
+
+
+def top_indices(counts: np.ndarray, ranks: np.ndarray, limit: int) -> np.ndarray:
+    """Returns the positions of the highest non-zero counts, ties ordered by ascending rank.
+
+    Only the candidates reaching the `limit`-th highest count are sorted.
+
+    Args:
+        counts (np.ndarray): Counts indexed by code.
+        ranks (np.ndarray): Tie-breaking ranks indexed by code.
+        limit (int): Number of positions to return.
+
+    Returns:
+        np.ndarray: Positions ordered by count descending, then rank ascending.
+    """
+
+    candidates = np.flatnonzero(counts)
+    if len(candidates) > limit:
+        threshold = np.partition(counts[candidates], -limit)[-limit]
+        candidates = candidates[counts[candidates] >= threshold]
+    order = np.lexsort((ranks[candidates], -counts[candidates]))
+    return candidates[order[:limit]]
+
+
+def top_codes(codes: Any, values: Sequence[str], limit: int = TOP_N) -> List[Tuple[str, int]]:
+    """Counts dictionary codes with `bincount` and returns the most frequent values.
+
+    Equivalent to `local.top_counts` over the decoded values (ties by value ascending).
+
+    Args:
+        codes (Any): Flattened codes (e.g. `TweetStore.emojis` or `TweetStore.mentions`).
+        values (Sequence[str]): The dictionary values, indexed by code.
+        limit (int, optional): Number of entries to return. Defaults to 10.
+
+    Returns:
+        List[Tuple[str, int]]: The (value, count) pairs ordered by count descending.
+    """
+
+    counts = np.bincount(as_array(codes), minlength=len(values))
+    return [(values[code], int(counts[code])) for code in top_indices(counts, sort_ranks(values), limit)]
+
+
+def top_dates_with_top_users(
+    days: Any,
+    authors: Any,
+    usernames: Sequence[str],
+    limit: int = TOP_N,
+    ranks: Optional[np.ndarray] = None
+) -> List[Tuple[datetime.date, Optional[str]]]:
+    """Vectorized q1: the busiest days and their most active author.
+
+    Days are counted with `bincount` over their offsets from the first day and ordered
+    by tweet count descending, then date ascending. On each selected day, authors are
+    grouped on a combined (day, username rank) int64 key, counted densely with `bincount`
+    when the key space is small enough and with `unique` otherwise; the top
+    author has the highest count, ties resolved alphabetically with NULL usernames
+    first (see `local.top_dates_from_counts`).
+
+    Args:
+        days (Any): int32 day ordinals (MISSING_DAY for undated tweets).
+        authors (Any): int32 author codes (MISSING_CODE for NULL usernames).
+        usernames (Sequence[str]): The username dictionary, indexed by code.
+        limit (int, optional): Number of days to return. Defaults to 10.
+        ranks (Optional[np.ndarray], optional): Precomputed `sort_ranks(usernames)`. Defaults to None.
+
+    Returns:
+        List[Tuple[datetime.date, Optional[str]]]: The busiest days with their most active username.
+    """
+
+    days, authors = as_array(days), as_array(authors)
+    ranks = sort_ranks(usernames) if ranks is None else ranks
+
+    dated = days != MISSING_DAY
+    if not dated.all():  # Copies are only made when some tweets are undated
+        days, authors = days[dated], authors[dated]
+    if not len(days):
+        return []
+    first_day = int(days.min())
+    day_offsets = days - first_day
+    day_counts = np.bincount(day_offsets)
+    present = np.flatnonzero(day_counts)
+    top_days = present[np.lexsort((present, -day_counts[present]))[:limit]]  # Offsets from first_day
+
+    if len(top_days) < len(present):
+        is_top_day = np.zeros(len(day_counts), dtype=bool)
+        is_top_day[top_days] = True
+        selected = is_top_day[day_offsets]  # Lookup table instead of np.isin
+        day_offsets, authors = day_offsets[selected], authors[selected]
+
+    # Author ranks shifted by one so that NULL usernames (MISSING_CODE, rank 0) sort first; the
+    # table starts with -MISSING_CODE entries so that `authors - MISSING_CODE` indexes it
+    rank_table = np.concatenate((np.zeros(-MISSING_CODE, dtype=np.int64), ranks + 1))
+    author_ranks = rank_table[authors - MISSING_CODE]
+    width = len(usernames) + 1
+    group_keys = day_offsets.astype(np.int64) * width + author_ranks
+    if (int(top_days.max()) + 1) * width <= DENSE_GROUPS_LIMIT:
+        counts = np.bincount(group_keys)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(group_keys, return_counts=True)
+    key_days, key_ranks = keys // width, keys % width
+
+    # Sort by day, then count descending, then rank ascending: the first row of each day wins
+    order = np.lexsort((key_ranks, -counts, key_days))
+    key_days, key_ranks = key_days[order], key_ranks[order]
+    first = np.ones(len(order), dtype=bool)
+    first[1:] = key_days[1:] != key_days[:-1]
+    winners = dict(zip(key_days[first].tolist(), key_ranks[first].tolist()))
+
+    codes_by_rank = np.argsort(ranks)
+    return [
+        (
+            datetime.date.fromordinal(first_day + day),
+            None if winners[day] == 0 else usernames[int(codes_by_rank[winners[day] - 1])],
+        )
+        for day in top_days.tolist()
+    ]
+
+
+def top_results(store: TweetStore, limit: int = TOP_N) -> TopResults:
+    """Answers the three questions from the columns of a store with vectorized kernels.
+
+    Args:
+        store (TweetStore): The projected tweets.
+        limit (int, optional): Number of rows per question. Defaults to 10.
+
+    Returns:
+        TopResults: The same three lists as `local.fused_top_n`.
+    """
+
+    usernames = store.usernames.values
+    ranks = sort_ranks(usernames)
+    mention_counts = np.bincount(as_array(store.mentions), minlength=len(usernames))
+    return TopResults(
+        top_dates_with_top_users(store.days, store.authors, usernames, limit, ranks),
+        top_codes(store.emojis, store.emoji_values.values, limit),
+        [(usernames[code], int(mention_counts[code])) for code in top_indices(mention_counts, ranks, limit)],
+    )
@@ -0,0 +1,273 @@
+import bisect  # For locating byte offsets among line starts
+import json  # For the index metadata
+import logging  # For reporting rebuilt indexes
+import mmap  # For zero-copy access to the tweets and index files
+import os  # For file sizes and modification times
+import struct  # For the index header
+import sys  # For the byte order of the offsets
+from array import array  # For building the line offsets
+from typing import Any, Dict, Iterator, List, Optional, Tuple  # For type annotations
+
+from local import tweet_day  # UTC day of a tweet timestamp, as in BigQuery
+from tweet_reader import TweetDecoder  # Fast projected JSON decoding
+
+# Suffix of the sidecar index file written next to the tweets file
+INDEX_SUFFIX: str = '.idx'
+
+# First bytes of an index file; bumped whenever the layout changes
+INDEX_MAGIC: bytes = b'NDJIDX1\n'
+
+# Header: magic, then the byte length of the JSON metadata
+HEADER_FORMAT: str = '<8sQ'
+
+
+def index_path_for(file_path: str) -> str:
+    """Returns the path of the sidecar index of an NDJSON file (e.g. 'tweets.json.idx')."""
+
+    return file_path + INDEX_SUFFIX
+
+
+def source_signature(file_path: str) -> Dict[str, int]:
+    """Returns the size and modification time recorded in an index, to detect a changed source."""
+
+    stat = os.stat(file_path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def line_day(decoder: TweetDecoder, line: bytes) -> Optional[str]:
+    """Returns the UTC day of the tweet on a line, or None for blank, invalid or undated lines."""
+
+    if not line.strip():
+        return None
+    try:
+        tweet = decoder.decode(line)
+        return tweet_day(tweet['date']) if isinstance(tweet, dict) and tweet.get('date') else None
+    except (ValueError, TypeError):
+        return None
+
+
+def build_index(file_path: str, index_path: Optional[str] = None) -> str:
+    """Scans an NDJSON file once and writes its sidecar index.
+
+    The index holds the byte offset of every line start (plus the file size, so line
+    `i` spans `offsets[i]:offsets[i + 1]`) as native int64 values, and JSON
+    metadata with the source size and modification time, and the runs of consecutive
+    lines sharing a tweet day (one run per day when the file is sorted by date).
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        index_path (Optional[str], optional): Path of the index. Defaults to `index_path_for(file_path)`.
+
+    Returns:
+        str: The path of the index.
+    """
+
+    index_path = index_path or index_path_for(file_path)
+    signature = source_signature(file_path)
+    decoder = TweetDecoder(fields={'date': None})
+    offsets = array('q')
+    day_runs: List[List[Any]] = []  # [day, first line, end line (exclusive)]
+
+    with open(file_path, 'rb') as file:
+        position = 0
+        for line_number, line in enumerate(file):
+            offsets.append(position)
+            position += len(line)
+            day = line_day(decoder, line)
+            if day_runs and day_runs[-1][0] == day and day_runs[-1][2] == line_number:
+                day_runs[-1][2] = line_number + 1
+            elif day is not None:
+                day_runs.append([day, line_number, line_number + 1])
+        offsets.append(position)
+
+    metadata = json.dumps({
+        'source': signature, 'byteorder': sys.byteorder, 'lines': len(offsets) - 1, 'day_runs': day_runs
+    }).encode('utf-8')
+    padding = -(struct.calcsize(HEADER_FORMAT) + len(metadata)) % 8  # Keep the offsets 8-byte aligned
+    temporary_path = index_path + '.tmp'
+    with open(temporary_path, 'wb') as index:
+        index.write(struct.pack(HEADER_FORMAT, INDEX_MAGIC, len(metadata) + padding))
+        index.write(metadata + b' ' * padding)
+        offsets.tofile(index)
+    os.replace(temporary_path, index_path)  # Readers never see a partial index
+    return index_path
+
+
+class LineIndex:
+    """Memory-mapped NDJSON file with a persisted index of its line offsets and day runs.
+
+    The index is built by one sequential scan (see `build_index`) and reused while the
+    source keeps the same size and modification time; a stale or unreadable index is
+    rebuilt. Both files are memory-mapped, so opening an indexed file is instant and
+    records are zero-copy `memoryview` slices of the mapping.
+
+    Views returned by `record`/`records` are only valid while the index is open.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        index_path (Optional[str], optional): Path of the index. Defaults to `index_path_for(file_path)`.
+        rebuild (bool, optional): If True, rebuild the index even if it is up to date. Defaults to False.
+    """
+
+    def __init__(self, file_path: str, index_path: Optional[str] = None, rebuild: bool = False) -> None:
+        self.file_path = file_path
+        self.index_path = index_path or index_path_for(file_path)
+        self._data: Any = b''
+        self._index: Any = b''
+        self.offsets: Any = None
+
+        if rebuild or not self._load():
+            logging.info(f"Building the line index of '{file_path}'.")
+            build_index(file_path, self.index_path)
+            if not self._load():
+                raise ValueError(f"The line index '{self.index_path}' could not be read after being built.")
+
+        with open(file_path, 'rb') as file:
+            if self.size:  # Empty files cannot be mapped
+                self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _load(self) -> bool:
+        """Maps an up-to-date index, returning False if it is missing, stale or malformed."""
+
+        try:
+            with open(self.index_path, 'rb') as file:
+                index = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        try:
+            header_size = struct.calcsize(HEADER_FORMAT)
+            magic, metadata_size = struct.unpack_from(HEADER_FORMAT, index)
+            metadata = json.loads(index[header_size:header_size + metadata_size]) if magic == INDEX_MAGIC else None
+            up_to_date = (
+                metadata is not None
+                and metadata['source'] == source_signature(self.file_path)
+                and metadata['byteorder'] == sys.byteorder
+                and len(index) - header_size - metadata_size == 8 * (metadata['lines'] + 1)
+            )
+        except (struct.error, ValueError, KeyError, TypeError):
+            up_to_date = False
+        if not up_to_date:
+            index.close()
+            return False
+
+        offsets = memoryview(index)[header_size + metadata_size:].cast('q')
+        self._index = index
+        self.offsets = offsets
+        self.size: int = metadata['source']['size']
+        self.day_runs: List[Tuple[str, int, int]] = [tuple(run) for run in metadata['day_runs']]
+        return True
+
+    def __enter__(self) -> 'LineIndex':
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Unmaps the tweets and index files."""
+
+        if isinstance(self.offsets, memoryview):
+            self.offsets.release()
+        for mapping in (self._data, self._index):
+            if isinstance(mapping, mmap.mmap):
+                try:
+                    mapping.close()
+                except BufferError:
+                    logging.warning(f"Record views of '{self.file_path}' are still in use; unmapped when released.")
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def record(self, line_number: int) -> memoryview:
+        """Returns a zero-copy view of one line (without its line break).
+
+        Args:
+            line_number (int): 0-based line number (negative values count from the end).
+
+        Returns:
+            memoryview: The bytes of the line.
+
+        Raises:
+            IndexError: If the line does not exist.
+        """
+
+        if line_number < 0:
+            line_number += len(self)
+        if not 0 <= line_number < len(self):
+            raise IndexError(f"Line {line_number} is out of range (the file has {len(self)} lines).")
+        start, end = self.offsets[line_number], self.offsets[line_number + 1]
+        if end > start and self._data[end - 1:end] == b'\n':
+            end -= 1
+        return memoryview(self._data)[start:end]
+
+    def records(self, start: int = 0, end: Optional[int] = None) -> Iterator[memoryview]:
+        """Yields zero-copy views of the lines in [start, end), skipping blank lines.
+
+        Args:
+            start (int, optional): First line. Defaults to 0.
+            end (Optional[int], optional): Line after the last one. Defaults to the end of the file.
+        """
+
+        for line_number in range(start, len(self) if end is None else min(end, len(self))):
+            line = self.record(line_number)
+            if line.nbytes and (line[0] not in b' \t\r' or line.tobytes().strip()):
+                yield line
+
+    def byte_range(self, start: int, end: int) -> Tuple[int, int]:
+        """Returns the (start, end) byte offsets of the lines in [start, end)."""
+
+        return self.offsets[start], self.offsets[end]
+
+    def line_at(self, byte_offset: int) -> int:
+        """Returns the number of the line containing a byte offset."""
+
+        return bisect.bisect_right(self.offsets, byte_offset, 0, len(self)) - 1
+
+    def days(self) -> List[str]:
+        """Returns the distinct tweet days of the file, in ascending order."""
+
+        return sorted({day for day, _, _ in self.day_runs})
+
+    def day_line_ranges(self, day: str) -> List[Tuple[int, int]]:
+        """Returns the (start, end) line ranges holding the tweets of one day.
+
+        Args:
+            day (str): ISO day, e.g. '2021-02-24'.
+
+        Returns:
+            List[Tuple[int, int]]: Line ranges, end exclusive (a single range when the file is sorted by date).
+        """
+
+        return [(start, end) for run_day, start, end in self.day_runs if run_day == day]
+
+    def shards(self, count: int) -> List[Tuple[int, int]]:
+        """Splits the lines into at most `count` contiguous ranges of balanced byte sizes.
+
+        Split points come from the index, so splitting needs no I/O.
+
+        Args:
+            count (int): Desired number of shards.
+
+        Returns:
+            List[Tuple[int, int]]: (start, end) line ranges, end exclusive, covering every line.
+
+        Raises:
+            ValueError: If `count` is lower than 1.
+        """
+
+        if count < 1:
+            raise ValueError("The number of shards must be at least 1.")
+
+        boundaries = [0]
+        for shard in range(1, count):
+            line = bisect.bisect_left(self.offsets, self.size * shard // count, 0, len(self))
+            if boundaries[-1] < line < len(self):
+                boundaries.append(line)
+        boundaries.append(len(self))
+        return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+    def byte_ranges(self, count: int) -> List[Tuple[int, int]]:
+        """Same as `shards`, as (start, end) byte offsets (see `parallel.split_byte_ranges`)."""
+
+        return [self.byte_range(start, end) for start, end in self.shards(count)]
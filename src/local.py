@@ -0,0 +1,519 @@
+import datetime  # For working with dates
+from collections import Counter  # For bounded per-key counting
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple, Union  # For type annotations
+
+import queries  # SQL definitions answered by this local backend
+from emojis import extract_emojis  # Emoji matcher equivalent to the top_emojis pattern
+from sketches import SpaceSaving  # Bounded-memory approximate counters
+from tweet_reader import TWEET_FIELDS, read_tweets  # Fast projected JSON decoding
+
+if TYPE_CHECKING:
+    from column_cache import ColumnCache  # Imported for annotations only (it imports this module)
+
+# Number of rows returned by every top-N question (LIMIT 10 in queries.py)
+TOP_N: int = 10
+
+
+def iter_tweets(
+    file_path: str, fields: Optional[Dict[str, Optional[Tuple[str, ...]]]] = TWEET_FIELDS
+) -> Iterator[Dict[str, Any]]:
+    """Yields tweets from a newline-delimited JSON file, one line at a time.
+
+    Only the current line is held in memory, so memory usage does not depend on
+    the size of the file. Lines are decoded by `tweet_reader.TweetDecoder` with the
+    fastest available JSON backend, keeping only the fields read by the questions.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        fields (Optional[Dict[str, Optional[Tuple[str, ...]]]], optional): Projection of the
+            records (None keeps whole records). Defaults to `tweet_reader.TWEET_FIELDS`.
+
+    Yields:
+        Dict[str, Any]: The decoded tweet record.
+
+    Assumptions:
+        - Blank lines are ignored.
+        - Lines that are not valid JSON objects are logged and skipped, mirroring
+          `ignore_unknown_values` in the BigQuery load job.
+    """
+
+    return read_tweets(file_path, fields)
+
+
+def tweet_day(date_value: str) -> str:
+    """Returns the UTC calendar day of a tweet timestamp as an ISO 'YYYY-MM-DD' string.
+
+    Equivalent to `CAST(date AS DATE)` on the TIMESTAMP column inferred by BigQuery.
+
+    Args:
+        date_value (str): ISO 8601 timestamp, e.g. '2021-02-24T09:23:35+00:00'.
+
+    Returns:
+        str: The UTC day of the timestamp.
+    """
+
+    # Fast path: timestamps in the dataset are already expressed in UTC
+    if date_value.endswith(('+00:00', 'Z')):
+        return date_value[:10]
+
+    timestamp = datetime.datetime.fromisoformat(date_value)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(datetime.timezone.utc)
+    return timestamp.date().isoformat()
+
+
+def mentioned_usernames(tweet: Dict[str, Any]) -> List[str]:
+    """Returns the usernames mentioned in a tweet, skipping null entries.
+
+    Args:
+        tweet (Dict[str, Any]): The decoded tweet record.
+
+    Returns:
+        List[str]: The mentioned usernames (duplicates included).
+    """
+
+    mentioned_users = tweet.get('mentionedUsers') or []
+    return [user['username'] for user in mentioned_users if user and user.get('username') is not None]
+
+
+def tweet_username(tweet: Dict[str, Any]) -> Optional[str]:
+    """Returns the author's username of a tweet, or None if it is missing."""
+
+    user = tweet.get('user') or {}
+    return user.get('username')
+
+
+def username_sort_key(username: Optional[str]) -> Tuple[bool, str]:
+    """Sort key for usernames in ascending order with NULLs first, as in BigQuery."""
+
+    return (username is not None, username or '')
+
+
+def top_dates_from_counts(
+    day_counts: Counter, day_user_counts: Counter, limit: int = TOP_N
+) -> List[Tuple[datetime.date, str]]:
+    """Builds the top dates result from per-day and per-(day, username) tweet counts.
+
+    Args:
+        day_counts (Counter): Tweet counts keyed by ISO day.
+        day_user_counts (Counter): Tweet counts keyed by (ISO day, username).
+        limit (int, optional): Number of dates to return. Defaults to 10.
+
+    Returns:
+        List[Tuple[datetime.date, str]]: The busiest dates with their most active username,
+        ordered by tweet count.
+
+    Assumptions:
+        - Dates with the same tweet count are ordered by date ascending.
+        - Users with the same number of tweets on the same date are resolved alphabetically.
+    """
+
+    top_days = sorted(day_counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    # Best (count, username) per selected day
+    best_users: Dict[str, Tuple[int, Optional[str]]] = {}
+    selected_days = {day for day, _ in top_days}
+    for (day, username), count in day_user_counts.items():
+        if day not in selected_days:
+            continue
+        best = best_users.get(day)
+        if (
+            best is None
+            or count > best[0]
+            or (count == best[0] and username_sort_key(username) < username_sort_key(best[1]))
+        ):
+            best_users[day] = (count, username)
+
+    return [(datetime.date.fromisoformat(day), best_users[day][1]) for day, _ in top_days]
+
+
+def top_counts(counts: Counter, limit: int = TOP_N) -> List[Tuple[str, int]]:
+    """Returns the highest counts, ties ordered by key ascending for a deterministic output.
+
+    Args:
+        counts (Counter): Counts keyed by emoji or username.
+        limit (int, optional): Number of entries to return. Defaults to 10.
+
+    Returns:
+        List[Tuple[str, int]]: The (key, count) pairs ordered by count descending.
+    """
+
+    return sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+def top_counts_with_errors(counts: Union[Counter, SpaceSaving], limit: int = TOP_N) -> List[Tuple[str, int, int]]:
+    """Returns the highest counts with the maximum overestimate of each count.
+
+    Args:
+        counts (Union[Counter, SpaceSaving]): Exact counts (errors are 0) or an approximate summary.
+        limit (int, optional): Number of entries to return. Defaults to 10.
+
+    Returns:
+        List[Tuple[str, int, int]]: The (key, count, error) triples ordered by count descending;
+        the true count lies in [count - error, count].
+    """
+
+    if isinstance(counts, SpaceSaving):
+        return counts.top(limit)
+    return [(key, count, 0) for key, count in top_counts(counts, limit)]
+
+
+def top_dates_with_top_users(file_path: str) -> List[Tuple[datetime.date, str]]:
+    """Local equivalent of `queries.top_dates_with_top_users`.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+
+    Returns:
+        List[Tuple[datetime.date, str]]: The top 10 dates and their most active username.
+    """
+
+    day_counts: Counter = Counter()
+    day_user_counts: Counter = Counter()
+
+    for tweet in iter_tweets(file_path):
+        if tweet.get('id') is None or tweet.get('date') is None:
+            continue  # A valid tweet has an id
+        day = tweet_day(tweet['date'])
+        day_counts[day] += 1
+        day_user_counts[(day, tweet_username(tweet))] += 1
+
+    return top_dates_from_counts(day_counts, day_user_counts)
+
+
+def top_emojis(file_path: str) -> List[Tuple[str, int]]:
+    """Local equivalent of `queries.top_emojis`.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+
+    Returns:
+        List[Tuple[str, int]]: The top 10 emojis with their counts.
+    """
+
+    emoji_counts: Counter = Counter()
+
+    for tweet in iter_tweets(file_path):
+        if tweet.get('id') is None:
+            continue  # A valid tweet has an id
+        emoji_counts.update(extract_emojis(tweet.get('content')))
+
+    return top_counts(emoji_counts)
+
+
+def top_influential_users(file_path: str) -> List[Tuple[str, int]]:
+    """Local equivalent of `queries.top_influential_users`.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+
+    Returns:
+        List[Tuple[str, int]]: The top 10 mentioned usernames with their mention counts.
+    """
+
+    mention_counts: Counter = Counter()
+
+    for tweet in iter_tweets(file_path):
+        if tweet.get('id') is None:
+            continue  # A valid tweet has an id
+        mention_counts.update(mentioned_usernames(tweet))
+
+    return top_counts(mention_counts)
+
+
+class TweetAggregates:
+    """Counters behind the three questions, updated together in a single pass over the tweets.
+
+    With a `capacity`, emojis and mentions are counted with Space-Saving summaries that
+    keep at most `capacity` keys each, so memory stays constant however many distinct
+    emojis and usernames the feed contains; their counts become upper bounds with a
+    known error (see `top_emojis_with_errors` and `top_influential_users_with_errors`).
+
+    Args:
+        capacity (Optional[int], optional): Number of keys kept by the approximate emoji and
+            mention counters. Defaults to None (exact counters).
+
+    Attributes:
+        day_counts (Counter): Tweet counts keyed by ISO day.
+        day_user_counts (Counter): Tweet counts keyed by (ISO day, username).
+        emoji_counts (Union[Counter, SpaceSaving]): Emoji sequence counts.
+        mention_counts (Union[Counter, SpaceSaving]): Mention counts keyed by mentioned username.
+    """
+
+    def __init__(self, capacity: Optional[int] = None) -> None:
+        self.capacity = capacity
+        self.day_counts: Counter = Counter()
+        self.day_user_counts: Counter = Counter()
+        self.emoji_counts: Union[Counter, SpaceSaving] = SpaceSaving(capacity) if capacity else Counter()
+        self.mention_counts: Union[Counter, SpaceSaving] = SpaceSaving(capacity) if capacity else Counter()
+
+    def update(self, tweet: Dict[str, Any]) -> None:
+        """Adds a single tweet to every counter.
+
+        Args:
+            tweet (Dict[str, Any]): The decoded tweet record. Tweets without an id are ignored.
+        """
+
+        if tweet.get('id') is None:
+            return  # A valid tweet has an id
+
+        date_value = tweet.get('date')
+        if date_value is not None:
+            day = tweet_day(date_value)
+            self.day_counts[day] += 1
+            self.day_user_counts[(day, tweet_username(tweet))] += 1
+
+        self.emoji_counts.update(extract_emojis(tweet.get('content')))
+
+        self.mention_counts.update(mentioned_usernames(tweet))
+
+    def merge(self, other: 'TweetAggregates') -> 'TweetAggregates':
+        """Adds the counters of another partial aggregation (e.g. from another shard) in place.
+
+        Counting is associative, so merging per-shard partials gives exactly the
+        counters of a single pass over the whole file (approximate summaries keep
+        their error guarantees).
+
+        Args:
+            other (TweetAggregates): The partial counters to add.
+
+        Returns:
+            TweetAggregates: This instance, to allow chaining.
+        """
+
+        self.day_counts.update(other.day_counts)
+        self.day_user_counts.update(other.day_user_counts)
+        self.emoji_counts.update(other.emoji_counts)
+        self.mention_counts.update(other.mention_counts)
+        return self
+
+    def top_dates_with_top_users(self) -> List[Tuple[datetime.date, str]]:
+        """Returns the top 10 dates and their most active username."""
+        return top_dates_from_counts(self.day_counts, self.day_user_counts)
+
+    def top_emojis(self) -> List[Tuple[str, int]]:
+        """Returns the top 10 emojis with their counts."""
+        return top_counts(self.emoji_counts)
+
+    def top_influential_users(self) -> List[Tuple[str, int]]:
+        """Returns the top 10 mentioned usernames with their mention counts."""
+        return top_counts(self.mention_counts)
+
+    def top_emojis_with_errors(self) -> List[Tuple[str, int, int]]:
+        """Returns the top 10 emojis with their counts and maximum overestimates."""
+        return top_counts_with_errors(self.emoji_counts)
+
+    def top_influential_users_with_errors(self) -> List[Tuple[str, int, int]]:
+        """Returns the top 10 mentioned usernames with their counts and maximum overestimates."""
+        return top_counts_with_errors(self.mention_counts)
+
+    def top_results(self) -> 'TopResults':
+        """Returns the three top-10 lists."""
+        return TopResults(self.top_dates_with_top_users(), self.top_emojis(), self.top_influential_users())
+
+
+class TopResults(NamedTuple):
+    """The answers to the three questions produced by a fused scan."""
+
+    top_dates_with_top_users: List[Tuple[datetime.date, str]]
+    top_emojis: List[Tuple[str, int]]
+    top_influential_users: List[Tuple[str, int]]
+
+
+def scan_tweets(file_path: str, capacity: Optional[int] = None) -> TweetAggregates:
+    """Reads every tweet once and updates the counters of all three questions.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        capacity (Optional[int], optional): Keys kept by the approximate emoji and mention
+            counters. Defaults to None (exact counters).
+
+    Returns:
+        TweetAggregates: The counters for the whole file.
+    """
+
+    aggregates = TweetAggregates(capacity)
+    for tweet in iter_tweets(file_path):
+        aggregates.update(tweet)
+    return aggregates
+
+
+def fused_top_n(file_path: str) -> TopResults:
+    """Answers the three questions with a single scan of the tweets file.
+
+    Replaces the three (four, counting the `TopDates` join of q1) separate scans
+    needed when each question is executed on its own.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+
+    Returns:
+        TopResults: The three top-10 lists.
+    """
+
+    return scan_tweets(file_path).top_results()
+
+
+# Local implementation for each SQL statement defined in queries.py (rollup variants give the same answers)
+LOCAL_QUERIES: Dict[str, Callable[[str], List[Tuple[Any, Any]]]] = {
+    queries.top_dates_with_top_users: top_dates_with_top_users,
+    queries.top_emojis: top_emojis,
+    queries.top_influential_users: top_influential_users,
+    queries.top_dates_with_top_users_rollup: top_dates_with_top_users,
+    queries.top_emojis_rollup: top_emojis,
+    queries.top_influential_users_rollup: top_influential_users,
+}
+
+# Method of TweetAggregates answering each SQL statement defined in queries.py
+FUSED_QUERIES: Dict[str, Callable[[TweetAggregates], List[Tuple[Any, Any]]]] = {
+    queries.top_dates_with_top_users: TweetAggregates.top_dates_with_top_users,
+    queries.top_emojis: TweetAggregates.top_emojis,
+    queries.top_influential_users: TweetAggregates.top_influential_users,
+    queries.top_dates_with_top_users_rollup: TweetAggregates.top_dates_with_top_users,
+    queries.top_emojis_rollup: TweetAggregates.top_emojis,
+    queries.top_influential_users_rollup: TweetAggregates.top_influential_users,
+}
+
+# TopResults field answering each SQL statement defined in queries.py
+TOP_RESULTS_FIELDS: Dict[str, str] = {
+    queries.top_dates_with_top_users: 'top_dates_with_top_users',
+    queries.top_emojis: 'top_emojis',
+    queries.top_influential_users: 'top_influential_users',
+    queries.top_dates_with_top_users_rollup: 'top_dates_with_top_users',
+    queries.top_emojis_rollup: 'top_emojis',
+    queries.top_influential_users_rollup: 'top_influential_users',
+}
+
+
+class LocalRowIterator(list):
+    """Result rows of a local query, exposing the `pages` of a `bigquery.table.RowIterator`.
+
+    Args:
+        rows (List[Tuple[Any, Any]]): The result rows.
+        page_size (Optional[int], optional): Number of rows per page. Defaults to a single page.
+    """
+
+    def __init__(self, rows: List[Tuple[Any, Any]], page_size: Optional[int] = None) -> None:
+        super().__init__(rows)
+        self.page_size = page_size
+
+    @property
+    def pages(self) -> Iterator[List[Tuple[Any, Any]]]:
+        """Yields the rows in pages of `page_size` rows."""
+
+        page_size = self.page_size or len(self) or 1
+        for start in range(0, len(self), page_size):
+            yield self[start:start + page_size]
+
+
+class LocalQueryJob:
+    """Minimal stand-in for `bigquery.QueryJob` holding locally computed rows."""
+
+    def __init__(self, rows: List[Tuple[Any, Any]]) -> None:
+        self._rows = rows
+
+    def result(self, page_size: Optional[int] = None, max_results: Optional[int] = None) -> LocalRowIterator:
+        """Returns the rows of the finished job.
+
+        Args:
+            page_size (Optional[int], optional): Number of rows per page. Defaults to a single page.
+            max_results (Optional[int], optional): Maximum number of rows. Defaults to all rows.
+
+        Returns:
+            LocalRowIterator: The result rows.
+        """
+        return LocalRowIterator(self._rows[:max_results], page_size)
+
+    def done(self) -> bool:
+        """Local jobs are computed on submission, so they are always done."""
+        return True
+
+    def cancel(self) -> bool:
+        """Finished jobs cannot be cancelled."""
+        return False
+
+
+class LocalClient:
+    """Local backend exposing the subset of `bigquery.Client` used by `process_bigquery_results`.
+
+    It answers the statements defined in `queries.py` by streaming a local NDJSON
+    tweets file, so `q1_time(LocalClient(path), queries.top_dates_with_top_users)`
+    and the other q-functions run without a BigQuery round trip.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        fused (bool, optional): If True, the first query scans the file once for all
+            three questions and later queries are answered from the same counters.
+            If False, every query scans the file on its own. Defaults to True.
+        workers (int, optional): Number of processes used by the fused scan. Values
+            greater than 1 use `parallel.parallel_scan_tweets`. Defaults to 1.
+        capacity (Optional[int], optional): If set, emojis and mentions are counted with
+            Space-Saving summaries of this many keys (approximate, constant-memory q2/q3;
+            implies a fused scan). Defaults to None (exact counts).
+        column_cache (Optional[ColumnCache], optional): If set, the projected columns of the
+            file are loaded from (or built into) this `column_cache.ColumnCache` and the
+            questions are answered by the vectorized kernels of kernels.py, so later runs
+            over the same file skip JSON decoding. Exact only, so it excludes `capacity`.
+            Defaults to None.
+
+    Raises:
+        ValueError: If both `capacity` and `column_cache` are set.
+    """
+
+    def __init__(
+        self,
+        file_path: str,
+        fused: bool = True,
+        workers: int = 1,
+        capacity: Optional[int] = None,
+        column_cache: Optional['ColumnCache'] = None
+    ) -> None:
+        if capacity and column_cache is not None:
+            raise ValueError("The column cache answers exact counts only, it cannot be combined with a capacity.")
+        self.file_path = file_path
+        self.fused = fused
+        self.workers = workers
+        self.capacity = capacity
+        self.column_cache = column_cache
+        self._aggregates: Optional[TweetAggregates] = None
+        self._top_results: Optional[TopResults] = None
+
+    def aggregates(self) -> TweetAggregates:
+        """Returns the counters of the fused scan, scanning the file on first use."""
+
+        if self._aggregates is None:
+            if self.workers > 1:
+                from parallel import parallel_scan_tweets  # Imported here to avoid a circular import
+                self._aggregates = parallel_scan_tweets(self.file_path, workers=self.workers, capacity=self.capacity)
+            else:
+                self._aggregates = scan_tweets(self.file_path, self.capacity)
+        return self._aggregates
+
+    def top_results(self) -> TopResults:
+        """Returns the three top-10 lists computed from the cached columns, loading them on first use."""
+
+        if self._top_results is None:
+            from kernels import top_results  # Imported here to avoid a circular import
+            self._top_results = top_results(self.column_cache.load_or_build(self.file_path))
+        return self._top_results
+
+    def query(self, query: str) -> LocalQueryJob:
+        """Runs one of the `queries.py` statements against the local file.
+
+        Args:
+            query (str): One of the SQL strings defined in `queries.py`.
+
+        Returns:
+            LocalQueryJob: A finished job whose `result()` returns the rows.
+
+        Raises:
+            ValueError: If the query is not one of the statements defined in `queries.py`.
+        """
+
+        if query not in LOCAL_QUERIES:
+            raise ValueError("The local backend only supports the queries defined in queries.py.")
+        if self.column_cache is not None:
+            return LocalQueryJob(getattr(self.top_results(), TOP_RESULTS_FIELDS[query]))
+        if self.fused or self.capacity:
+            return LocalQueryJob(FUSED_QUERIES[query](self.aggregates()))
+        return LocalQueryJob(LOCAL_QUERIES[query](self.file_path))
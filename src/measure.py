@@ -1,4 +1,8 @@
+import contextlib  # For the notebook measuring context manager
 import time  # Import the time module for time-related functions
+from typing import Iterator  # For type annotations
+
+import instrumentation  # Process-wide stage metrics and their sinks
 
 def measure_notebook_elapsed_time(start_time: float) -> float:
     """Calculates the elapsed time since the provided start time.
@@ -29,4 +33,25 @@ def print_notebook_elapsed_time(elapsed_time: float) -> None:
             elapsed_time /= 60
             time_unit = "hours"
 
-    print(f"Elapsed time in the notebook: {elapsed_time:.2f} {time_unit}")  # Print the formatted elapsed time
\ No newline at end of file
+    print(f"Elapsed time in the notebook: {elapsed_time:.2f} {time_unit}")  # Print the formatted elapsed time
+
+@contextlib.contextmanager
+def measure_notebook(stage: str = 'notebook', **labels: str) -> Iterator[None]:
+    """Measures a notebook run (or any section of it) as a stage of the process-wide instrumentation.
+
+    With sinks set by `instrumentation.configure`, the wall time, CPU time, allocation peak
+    and RSS delta are emitted to them like those of the q-functions; otherwise the elapsed
+    time is printed (see `print_notebook_elapsed_time`).
+
+    Args:
+        stage (str, optional): Name of the stage. Defaults to 'notebook'.
+        **labels (str): Extra labels of the run.
+    """
+
+    start_time = time.time()
+    try:
+        with instrumentation.measure(stage, **labels):
+            yield
+    finally:
+        if not instrumentation.default_instrumentation.sinks:
+            print_notebook_elapsed_time(measure_notebook_elapsed_time(start_time))
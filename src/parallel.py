@@ -0,0 +1,154 @@
+import logging  # For logging skipped records
+import os  # For file sizes and CPU counts
+from concurrent.futures import ProcessPoolExecutor  # For multi-core aggregation
+from typing import List, Optional, Tuple  # For type annotations
+
+from local import TopResults, TweetAggregates  # Mergeable counters shared with the single-process path
+from line_index import LineIndex  # Persisted line offsets for exact split points
+from tweet_reader import TweetDecoder  # Fast projected JSON decoding
+
+
+def split_byte_ranges(file_path: str, shards: int) -> List[Tuple[int, int]]:
+    """Splits a newline-delimited file into contiguous byte ranges aligned to line boundaries.
+
+    Each boundary is moved forward to the start of the next line, so every line
+    belongs to exactly one range.
+
+    Args:
+        file_path (str): Path to the NDJSON file.
+        shards (int): Desired number of ranges. Fewer ranges are returned when the
+            file has fewer lines than requested shards.
+
+    Returns:
+        List[Tuple[int, int]]: (start, end) byte offsets, end exclusive, covering the whole file.
+
+    Raises:
+        ValueError: If `shards` is lower than 1.
+    """
+
+    if shards < 1:
+        raise ValueError("The number of shards must be at least 1.")
+
+    file_size: int = os.path.getsize(file_path)
+    boundaries: List[int] = [0]
+
+    with open(file_path, 'rb') as file:
+        for shard in range(1, shards):
+            target = file_size * shard // shards
+            if target <= boundaries[-1]:
+                continue  # Previous line already extends past this target
+            # Step back one byte so a target at the start of a line is kept as is
+            file.seek(target - 1)
+            file.readline()
+            boundary = file.tell()
+            if boundaries[-1] < boundary < file_size:
+                boundaries.append(boundary)
+
+    boundaries.append(file_size)
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if start < end]
+
+
+def scan_byte_range(file_path: str, start: int, end: int, capacity: Optional[int] = None) -> TweetAggregates:
+    """Builds the partial counters of all three questions for one byte range.
+
+    Args:
+        file_path (str): Path to the NDJSON file.
+        start (int): Offset of the first byte of the range (a line start).
+        end (int): Offset one past the last byte of the range (a line start or the file size).
+        capacity (Optional[int], optional): Keys kept by the approximate emoji and mention
+            counters. Defaults to None (exact counters).
+
+    Returns:
+        TweetAggregates: The counters for the lines in the range.
+    """
+
+    aggregates = TweetAggregates(capacity)
+    decoder = TweetDecoder()
+
+    with open(file_path, 'rb') as file:
+        file.seek(start)
+        position = start
+        while position < end:
+            line = file.readline()
+            if not line:
+                break  # End of file
+            line_start, position = position, position + len(line)
+            if not line.strip():
+                continue  # Skip blank lines
+            try:
+                tweet = decoder.decode(line)
+            except ValueError as e:
+                logging.warning(f"Skipping invalid JSON at byte {line_start} of '{file_path}': {e}")
+                continue
+            if isinstance(tweet, dict):
+                aggregates.update(tweet)
+
+    return aggregates
+
+
+def _scan_byte_range(args: Tuple[str, int, int, Optional[int]]) -> TweetAggregates:
+    """Unpacks the worker arguments for `ProcessPoolExecutor.map`."""
+
+    return scan_byte_range(*args)
+
+
+def parallel_scan_tweets(
+    file_path: str,
+    workers: Optional[int] = None,
+    shards: Optional[int] = None,
+    capacity: Optional[int] = None,
+    use_index: bool = False
+) -> TweetAggregates:
+    """Aggregates the tweets file on several processes and merges the partial counters.
+
+    The result is exactly the one of `local.scan_tweets`: counts are merged by
+    addition and ties are only resolved when the top-10 lists are built. With a
+    `capacity`, the per-shard Space-Saving summaries are merged with their error bounds.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        workers (Optional[int], optional): Number of worker processes. Defaults to the CPU count.
+        shards (Optional[int], optional): Number of byte ranges. Defaults to `workers`.
+        capacity (Optional[int], optional): Keys kept by the approximate emoji and mention
+            counters. Defaults to None (exact counters).
+        use_index (bool, optional): If True, take the split points from the sidecar line index
+            (see line_index.py), built on first use. Defaults to False.
+
+    Returns:
+        TweetAggregates: The merged counters for the whole file.
+    """
+
+    workers = workers or os.cpu_count() or 1
+    if use_index:
+        with LineIndex(file_path) as index:
+            byte_ranges = index.byte_ranges(shards or workers)
+    else:
+        byte_ranges = split_byte_ranges(file_path, shards or workers)
+
+    aggregates = TweetAggregates(capacity)
+    if workers == 1 or len(byte_ranges) <= 1:
+        # Avoid the process pool overhead when there is nothing to parallelize (or an empty file)
+        for start, end in byte_ranges:
+            aggregates.merge(scan_byte_range(file_path, start, end, capacity))
+        return aggregates
+
+    with ProcessPoolExecutor(max_workers=min(workers, len(byte_ranges))) as executor:
+        tasks = [(file_path, start, end, capacity) for start, end in byte_ranges]
+        for partial in executor.map(_scan_byte_range, tasks):
+            aggregates.merge(partial)
+
+    return aggregates
+
+
+def parallel_top_n(file_path: str, workers: Optional[int] = None) -> TopResults:
+    """Answers the three questions using every available core.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        workers (Optional[int], optional): Number of worker processes. Defaults to the CPU count.
+
+    Returns:
+        TopResults: The three top-10 lists.
+    """
+
+    return parallel_scan_tweets(file_path, workers=workers).top_results()
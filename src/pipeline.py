@@ -0,0 +1,540 @@
+import argparse  # For the command line interface
+import datetime  # For the execution timestamps of the manifest
+import hashlib  # For code and input fingerprints
+import inspect  # For the source code of the stage functions
+import json  # For the manifest
+import logging  # For logging stage decisions
+import os  # For the manifest and download paths
+import sys  # For the source of modules
+import time  # For per-stage timings
+import uuid  # For the run identifiers of executed stages
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, NamedTuple, Optional, Sequence, Tuple  # For type annotations
+
+from google.cloud import bigquery, storage  # Clients of the loading and query stages
+
+import queries  # SQL of the q-functions
+from common import extract_zip_file_conditionally  # Conditional extraction in Cloud Storage
+from downloader import authorized_http_factory, download_drive_file, get_drive_file_info  # Ranged Drive downloads and Drive checksums
+from ingest import upload_drive_file_to_cloud_storage  # Checksummed resumable uploads
+from instrumentation import measure  # Optional metric sinks for stage runs
+from processing import iterate_bigquery_pages, iterate_bigquery_results, process_bigquery_results  # Result processing
+from q1_memory import q1_memory  # Query functions
+from q1_time import q1_time
+from q2_memory import q2_memory
+from q2_time import q2_time
+from q3_memory import q3_memory
+from q3_time import q3_time
+from storage import authenticate_bigquery, create_dataset, create_table, load_data_from_storage  # BigQuery setup
+
+# Default location of the manifest
+DEFAULT_MANIFEST_PATH: str = 'pipeline-manifest.json'
+
+# Layout version of the manifest; bumped whenever its records change
+MANIFEST_VERSION: int = 1
+
+# OAuth scope of the Drive client (the file is only read)
+DRIVE_SCOPES: Tuple[str, ...] = ('https://www.googleapis.com/auth/drive.readonly',)
+
+# Default configuration, matching the definitions of challenge.ipynb (overridable with the LC_* variables)
+DEFAULT_CONFIG: Dict[str, Any] = {
+    'project_id': os.environ.get('LC_PROJECT_ID', 'tw-techdash'),
+    'bucket_name': os.environ.get('LC_BUCKET_NAME', 'tw-gcp-public-lab'),
+    'folder_name': os.environ.get('LC_FOLDER_NAME', 'raw'),
+    'zip_file_name': os.environ.get('LC_ZIP_FILE_NAME', 'tweets.json.zip'),
+    'file_id': os.environ.get('LC_FILE_ID', '1ig2ngoXFTxP5Pa8muXo02mDTFexZzsis'),
+    'dataset_name': os.environ.get('LC_DATASET_NAME', 'tweets_dataset'),
+    'table_name': os.environ.get('LC_TABLE_NAME', 'tweets'),
+    'download_dir': os.environ.get('LC_DOWNLOAD_DIR', '.'),
+}
+
+
+class Stage(NamedTuple):
+    """One step of a pipeline, with declared inputs and a JSON-serializable output.
+
+    `run` is called as `run(params, inputs, resources)`: the values of the `params`
+    configuration keys, the outputs of the `inputs` stages keyed by stage name, and the
+    shared resources (clients). A stage is fingerprinted by the source of its `code`
+    callables (`run` by default), its params, the value of its `probe` (a cheap content
+    hash of external data, e.g. a Drive checksum) and the runs of its inputs.
+
+    Attributes:
+        name: Unique name of the stage.
+        run: Function producing the output.
+        inputs: Names of the upstream stages.
+        params: Configuration keys read by the stage.
+        code: Callables whose source is hashed. Defaults to `run`.
+        probe: Called as `probe(params, resources)`; returns a JSON-serializable fingerprint. Defaults to None.
+    """
+
+    name: str
+    run: Callable[[Dict[str, Any], Dict[str, Any], Mapping[str, Any]], Any]
+    inputs: Tuple[str, ...] = ()
+    params: Tuple[str, ...] = ()
+    code: Tuple[Callable, ...] = ()
+    probe: Optional[Callable[[Dict[str, Any], Mapping[str, Any]], Any]] = None
+
+
+class StageResult(NamedTuple):
+    """Outcome of one stage in a pipeline run.
+
+    Attributes:
+        name: Name of the stage.
+        status: 'executed', 'skipped' (unchanged, output read from the manifest) or
+            'pending' (would execute; dry runs only).
+        output: Output of the stage (its JSON form when skipped).
+        wall_seconds: Duration of the execution (of the recorded one when skipped).
+        fingerprint: Hash of the code and inputs of the stage.
+    """
+
+    name: str
+    status: str
+    output: Any
+    wall_seconds: Optional[float]
+    fingerprint: str
+
+
+class Resources(Mapping):
+    """Lazily created shared resources: a factory only runs the first time its key is read.
+
+    Skipped stages never read their resources, but probes run on every run: a cached run
+    only creates the resources read by the probes (e.g. the Drive client of the checksum probe).
+
+    Args:
+        factories (Mapping[str, Callable[[], Any]]): Resource factories by name.
+    """
+
+    def __init__(self, factories: Mapping[str, Callable[[], Any]]) -> None:
+        self.factories = dict(factories)
+        self.values: Dict[str, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.values:
+            self.values[key] = self.factories[key]()
+        return self.values[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.factories)
+
+    def __len__(self) -> int:
+        return len(self.factories)
+
+
+def json_value(value: Any) -> Any:
+    """Returns the JSON form of a value (dates and other objects as strings, tuples as lists)."""
+
+    return json.loads(json.dumps(value, default=str))
+
+
+def hash_value(value: Any) -> str:
+    """Returns the SHA-256 of the canonical JSON form of a value."""
+
+    return hashlib.sha256(json.dumps(value, default=str, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def callable_source(function: Callable) -> str:
+    """Returns the source of a callable (decorators unwrapped), or its qualified name if unavailable."""
+
+    function = inspect.unwrap(function)
+    try:
+        return inspect.getsource(function)
+    except (OSError, TypeError):
+        module = sys.modules.get(getattr(function, '__module__', None) or '')
+        try:
+            return inspect.getsource(module) if module is not None else ''
+        except (OSError, TypeError):
+            return f"{getattr(function, '__module__', '')}.{getattr(function, '__qualname__', repr(function))}"
+
+
+def code_hash(functions: Iterable[Callable]) -> str:
+    """Returns the SHA-256 of the sources of callables."""
+
+    digest = hashlib.sha256()
+    for function in functions:
+        digest.update(callable_source(function).encode('utf-8'))
+    return digest.hexdigest()
+
+
+class Pipeline:
+    """Runs stages in order, skipping the stages whose fingerprint matches the manifest.
+
+    The manifest (a JSON file) records, per stage, the fingerprint and output of its last
+    successful execution, a run identifier, the code hash and the timings. A stage executes
+    when its fingerprint changed: its code, params or probe changed, or an input stage
+    executed since (its run identifier changed). Everything else is skipped, and its output
+    is read back from the manifest, so changing the code of q2 only reruns q2.
+
+    Stage runs are also reported to `instrumentation.measure` as 'pipeline.<stage>'.
+
+    Args:
+        stages (Sequence[Stage]): The stages, each after its inputs.
+        manifest_path (str, optional): Path of the manifest. Defaults to 'pipeline-manifest.json'.
+
+    Raises:
+        ValueError: If stage names are duplicated or a stage comes before one of its inputs.
+    """
+
+    def __init__(self, stages: Sequence[Stage], manifest_path: str = DEFAULT_MANIFEST_PATH) -> None:
+        self.stages: Dict[str, Stage] = {}
+        for stage in stages:
+            if stage.name in self.stages:
+                raise ValueError(f"Duplicate stage '{stage.name}'.")
+            missing = [name for name in stage.inputs if name not in self.stages]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' comes before its inputs {missing}.")
+            self.stages[stage.name] = stage
+        self.manifest_path = manifest_path
+
+    def load_manifest(self) -> Dict[str, Any]:
+        """Returns the stage records of the manifest (empty if it is missing, unreadable or outdated)."""
+
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as file:
+                manifest = json.load(file)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            logging.warning(f"Pipeline manifest '{self.manifest_path}' is unreadable, running every stage: {e}")
+            return {}
+        if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+            return {}
+        return manifest.get('stages', {})
+
+    def save_manifest(self, records: Dict[str, Any]) -> None:
+        """Writes the stage records atomically."""
+
+        temporary_path = self.manifest_path + '.tmp'
+        with open(temporary_path, 'w', encoding='utf-8') as file:
+            json.dump({'version': MANIFEST_VERSION, 'stages': records}, file, indent=2, ensure_ascii=False)
+        os.replace(temporary_path, self.manifest_path)
+
+    def selected(self, targets: Optional[Iterable[str]] = None) -> List[str]:
+        """Returns the stages to visit for some targets (with their upstream stages), in order.
+
+        Raises:
+            ValueError: If a target is not a stage.
+        """
+
+        if targets is None:
+            return list(self.stages)
+        needed = set()
+        pending = list(targets)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage '{name}'; stages are {list(self.stages)}.")
+            if name not in needed:
+                needed.add(name)
+                pending.extend(self.stages[name].inputs)
+        return [name for name in self.stages if name in needed]
+
+    def fingerprint(
+        self, stage: Stage, params: Dict[str, Any], resources: Mapping[str, Any], run_ids: Dict[str, Optional[str]]
+    ) -> Tuple[str, str, Any]:
+        """Returns the fingerprint, code hash and probe value of a stage."""
+
+        stage_code_hash = code_hash(stage.code or (stage.run,))
+        probe = json_value(stage.probe(params, resources)) if stage.probe else None
+        fingerprint = hash_value({
+            'code': stage_code_hash,
+            'params': params,
+            'probe': probe,
+            'inputs': {name: run_ids[name] for name in stage.inputs},
+        })
+        return fingerprint, stage_code_hash, probe
+
+    def run(
+        self,
+        config: Mapping[str, Any],
+        resources: Optional[Mapping[str, Any]] = None,
+        targets: Optional[Iterable[str]] = None,
+        force: Iterable[str] = (),
+        dry_run: bool = False
+    ) -> Dict[str, StageResult]:
+        """Runs the pipeline, executing only the stages that changed.
+
+        The manifest is saved after every executed stage, so a failure keeps the progress
+        made before it.
+
+        Args:
+            config (Mapping[str, Any]): Values of the stage params.
+            resources (Optional[Mapping[str, Any]], optional): Shared resources passed to the stages
+                (e.g. a Resources of clients). Defaults to None.
+            targets (Optional[Iterable[str]], optional): Stages to bring up to date, with their
+                inputs. Defaults to every stage.
+            force (Iterable[str], optional): Stages to execute even if unchanged. Defaults to ().
+            dry_run (bool, optional): If True, only report which stages would execute (probes still
+                run). Defaults to False.
+
+        Returns:
+            Dict[str, StageResult]: The result of every visited stage, in order.
+
+        Raises:
+            Exception: Whatever a stage raises, after recording the failure in the manifest.
+        """
+
+        resources = resources if resources is not None else {}
+        force = set(force)
+        records = self.load_manifest()
+        run_ids: Dict[str, Optional[str]] = {}
+        outputs: Dict[str, Any] = {}
+        results: Dict[str, StageResult] = {}
+
+        for name in self.selected(targets):
+            stage = self.stages[name]
+            params = {key: config[key] for key in stage.params}
+            fingerprint, stage_code_hash, probe = self.fingerprint(stage, params, resources, run_ids)
+            record = records.get(name, {})
+
+            if (
+                name not in force
+                and record.get('fingerprint') == fingerprint
+                and all(run_ids[upstream] is not None for upstream in stage.inputs)
+            ):
+                print(f"Stage '{name}' is up to date, skipping.")
+                run_ids[name], outputs[name] = record['run_id'], record['output']
+                results[name] = StageResult(name, 'skipped', record['output'], record.get('wall_seconds'), fingerprint)
+                continue
+
+            if dry_run:
+                print(f"Stage '{name}' would execute.")
+                run_ids[name] = None  # Unknown until executed: every downstream stage is pending too
+                results[name] = StageResult(name, 'pending', None, None, fingerprint)
+                continue
+
+            print(f"Executing stage '{name}'...")
+            started = time.perf_counter()
+            try:
+                with measure(f'pipeline.{name}'):
+                    output = stage.run(params, {upstream: outputs[upstream] for upstream in stage.inputs}, resources)
+            except Exception as e:
+                logging.error(f"Pipeline stage '{name}' failed: {e}")
+                records[name] = {**record, 'status': 'failed', 'error': str(e), 'fingerprint': None}
+                self.save_manifest(records)
+                raise
+            wall_seconds = time.perf_counter() - started
+
+            run_ids[name], outputs[name] = uuid.uuid4().hex, output
+            records[name] = {
+                'status': 'executed',
+                'fingerprint': fingerprint,
+                'run_id': run_ids[name],
+                'code_hash': stage_code_hash,
+                'params': json_value(params),
+                'probe': probe,
+                'output': json_value(output),
+                'output_hash': hash_value(output),
+                'executed_at': datetime.datetime.now(datetime.timezone.utc).isoformat(),
+                'wall_seconds': wall_seconds,
+            }
+            self.save_manifest(records)
+            print(f"Stage '{name}' executed in {wall_seconds:.2f}s.")
+            results[name] = StageResult(name, 'executed', output, wall_seconds, fingerprint)
+
+        return results
+
+
+def drive_file_checksum(params: Dict[str, Any], resources: Mapping[str, Any]) -> Any:
+    """Probe of the upload stage: the size and MD5 of the Drive file (one metadata request)."""
+
+    return get_drive_file_info(resources['drive_service'], params['file_id'])._asdict()
+
+
+def upload_stage(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> Dict[str, Any]:
+    """Downloads the Drive file to disk, one authorized HTTP client per thread, and uploads it to Cloud Storage."""
+
+    local_path = os.path.join(params['download_dir'], params['zip_file_name'])
+    download_drive_file(
+        resources['drive_service'], params['file_id'], local_path,
+        http_factory=authorized_http_factory(resources['drive_credentials'])
+    )
+    with open(local_path, 'rb') as downloaded:
+        blob = upload_drive_file_to_cloud_storage(
+            resources['bucket'], params['folder_name'], downloaded, params['zip_file_name']
+        )
+    return {'blob_name': blob.name, 'md5_hash': blob.md5_hash, 'content_type': blob.content_type}
+
+
+def extract_stage(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> str:
+    """Extracts the uploaded ZIP file and returns the name of the JSON file (as in the notebook).
+
+    Raises:
+        RuntimeError: If the archive is missing or nothing was extracted (so the stage is not cached).
+    """
+
+    if inputs['upload_drive_file_to_cloud_storage']['content_type'] != 'application/zip':
+        return params['zip_file_name']  # Not an archive: the uploaded file is the data file
+    json_file_name = extract_zip_file_conditionally(resources['bucket'], params['folder_name'], params['zip_file_name'])
+    if not json_file_name:
+        raise RuntimeError(f"Extraction of '{params['folder_name']}/{params['zip_file_name']}' failed.")
+    return json_file_name
+
+
+def create_dataset_stage(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> str:
+    """Creates (overwrites) the dataset."""
+
+    create_dataset(resources['bigquery_client'], params['dataset_name'], mode='overwrite')
+    return params['dataset_name']
+
+
+def create_table_stage(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> str:
+    """Creates (overwrites) the tweets table."""
+
+    create_table(resources['bigquery_client'], params['dataset_name'], params['table_name'], mode='overwrite')
+    return f"{params['dataset_name']}.{params['table_name']}"
+
+
+def load_stage(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> str:
+    """Loads the extracted JSON file into the tweets table."""
+
+    source_uri = f"gs://{params['bucket_name']}/{params['folder_name']}/"
+    json_file_name = inputs['extract_zip_file_conditionally']
+    load_data_from_storage(
+        resources['bigquery_client'], source_uri, params['dataset_name'], params['table_name'], json_file_name
+    )
+    return f"{source_uri}{json_file_name}"
+
+
+def query_stage(
+    name: str, function: Callable[[bigquery.Client, str], Any], query: str, helpers: Tuple[Callable, ...]
+) -> Stage:
+    """Builds the stage of one q-function; its query text is probed, so editing it reruns the stage.
+
+    The stage fails on an empty result: `process_bigquery_results` prints and swallows query
+    errors, returning no rows, and an empty output must not be cached as a successful run.
+    """
+
+    def run(params: Dict[str, Any], inputs: Dict[str, Any], resources: Mapping[str, Any]) -> Any:
+        rows = list(function(resources['bigquery_client'], query))
+        if not rows:
+            raise RuntimeError(f"Query of stage '{name}' returned no rows.")
+        return rows
+
+    return Stage(
+        name, run, inputs=('load_data_from_storage',), code=(query_stage, function) + helpers,
+        probe=lambda params, resources: {'query': query}
+    )
+
+
+def challenge_stages() -> List[Stage]:
+    """Returns the stages of challenge.ipynb, in order."""
+
+    time_helpers = (process_bigquery_results,)
+    memory_helpers = (iterate_bigquery_results, iterate_bigquery_pages)
+    return [
+        Stage(
+            'upload_drive_file_to_cloud_storage', upload_stage,
+            params=('file_id', 'download_dir', 'folder_name', 'zip_file_name', 'bucket_name'),
+            code=(upload_stage, download_drive_file, upload_drive_file_to_cloud_storage), probe=drive_file_checksum
+        ),
+        Stage(
+            'extract_zip_file_conditionally', extract_stage, inputs=('upload_drive_file_to_cloud_storage',),
+            params=('folder_name', 'zip_file_name', 'bucket_name'), code=(extract_stage, extract_zip_file_conditionally)
+        ),
+        Stage(
+            'create_dataset', create_dataset_stage, params=('project_id', 'dataset_name'),
+            code=(create_dataset_stage, create_dataset)
+        ),
+        Stage(
+            'create_table', create_table_stage, inputs=('create_dataset',),
+            params=('project_id', 'dataset_name', 'table_name'), code=(create_table_stage, create_table)
+        ),
+        Stage(
+            'load_data_from_storage', load_stage, inputs=('extract_zip_file_conditionally', 'create_table'),
+            params=('bucket_name', 'folder_name', 'dataset_name', 'table_name'), code=(load_stage, load_data_from_storage)
+        ),
+        query_stage('q1_time', q1_time, queries.top_dates_with_top_users, time_helpers),
+        query_stage('q2_time', q2_time, queries.top_emojis, time_helpers),
+        query_stage('q3_time', q3_time, queries.top_influential_users, time_helpers),
+        query_stage('q1_memory', q1_memory, queries.top_dates_with_top_users, memory_helpers),
+        query_stage('q2_memory', q2_memory, queries.top_emojis, memory_helpers),
+        query_stage('q3_memory', q3_memory, queries.top_influential_users, memory_helpers),
+    ]
+
+
+def challenge_resources(config: Mapping[str, Any]) -> Resources:
+    """Returns the lazily authenticated clients of the challenge stages.
+
+    The Drive client is created on every run (the upload stage probes the Drive checksum);
+    the Cloud Storage and BigQuery clients only when a stage using them executes.
+    """
+
+    def drive_credentials() -> Any:
+        import google.auth  # Only needed when the Drive file is checked
+        credentials, _ = google.auth.default(scopes=list(DRIVE_SCOPES))
+        return credentials
+
+    def drive_service() -> Any:
+        from googleapiclient.discovery import build  # Only needed when the Drive file is checked
+        return build('drive', 'v3', credentials=resources['drive_credentials'])
+
+    resources = Resources({
+        'drive_credentials': drive_credentials,
+        'drive_service': drive_service,
+        'bucket': lambda: storage.Client(project=config['project_id']).bucket(config['bucket_name']),
+        'bigquery_client': lambda: authenticate_bigquery(config['project_id']),
+    })
+    return resources
+
+
+def run_challenge(
+    config: Optional[Mapping[str, Any]] = None,
+    targets: Optional[Iterable[str]] = None,
+    force: Iterable[str] = (),
+    dry_run: bool = False,
+    manifest_path: str = DEFAULT_MANIFEST_PATH,
+    resources: Optional[Mapping[str, Any]] = None
+) -> Dict[str, StageResult]:
+    """Runs the challenge pipeline headlessly (the notebook without Colab).
+
+    Args:
+        config (Optional[Mapping[str, Any]], optional): Overrides of DEFAULT_CONFIG. Defaults to None.
+        targets (Optional[Iterable[str]], optional): Stages to bring up to date. Defaults to every stage.
+        force (Iterable[str], optional): Stages to execute even if unchanged. Defaults to ().
+        dry_run (bool, optional): If True, only report which stages would execute. Defaults to False.
+        manifest_path (str, optional): Path of the manifest. Defaults to 'pipeline-manifest.json'.
+        resources (Optional[Mapping[str, Any]], optional): Clients to use instead of authenticating, keyed
+            as in challenge_resources. Defaults to None.
+
+    Returns:
+        Dict[str, StageResult]: The result of every visited stage.
+    """
+
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    pipeline = Pipeline(challenge_stages(), manifest_path)
+    return pipeline.run(config, resources or challenge_resources(config), targets, force, dry_run)
+
+
+def main() -> None:
+    """Runs the challenge pipeline from the command line."""
+
+    parser = argparse.ArgumentParser(description="Run the challenge pipeline, skipping the stages that did not change.")
+    parser.add_argument('targets', nargs='*', help="Stages to bring up to date (default: every stage).")
+    parser.add_argument('--manifest', default=DEFAULT_MANIFEST_PATH, help="Path of the pipeline manifest.")
+    parser.add_argument('--force', nargs='+', default=[], help="Stages to execute even if unchanged.")
+    parser.add_argument('--dry-run', action='store_true', help="Only report the stages that would execute.")
+    parser.add_argument('--list', action='store_true', help="List the stages and exit.")
+    for key, value in DEFAULT_CONFIG.items():
+        parser.add_argument(f"--{key.replace('_', '-')}", dest=key, default=value, help=f"Defaults to {value!r}.")
+    args = parser.parse_args()
+
+    if args.list:
+        for stage in challenge_stages():
+            print(f"{stage.name}: inputs={list(stage.inputs)}")
+        return
+
+    names = [stage.name for stage in challenge_stages()]
+    unknown = [name for name in args.targets + args.force if name not in names]
+    if unknown:
+        parser.error(f"unknown stages {unknown}; stages are {names}")
+
+    config = {key: getattr(args, key) for key in DEFAULT_CONFIG}
+    results = run_challenge(config, args.targets or None, args.force, args.dry_run, args.manifest)
+    for result in results.values():
+        seconds = f"{result.wall_seconds:.2f}s" if result.wall_seconds is not None else '-'
+        print(f"{result.name:36} {result.status:9} {seconds}")
+        if result.name.startswith('q') and result.status != 'pending':
+            print(f"    {result.output}")
+
+
+if __name__ == '__main__':
+    main()
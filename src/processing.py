@@ -1,16 +1,82 @@
+import itertools  # For flattening result pages lazily
+import logging  # For logging cache bypasses
+import random  # For jittering the polling intervals
+import time  # For polling deadlines
 from google.api_core.exceptions import BadRequest, NotFound  # Specific exceptions
 from google.cloud import bigquery
-from typing import List, Tuple,  Any
+from typing import Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple,  Any
+from cache import QueryResultCache, table_fingerprint  # On-disk query result cache
+from query_stats import QueryStats, estimate_query, query_stats_from_job  # Query cost and execution statistics
+
+# Default number of rows fetched per page when streaming results
+DEFAULT_PAGE_SIZE: int = 1000
+
+# Polling intervals (seconds) of concurrently running query jobs: exponential backoff between these bounds
+INITIAL_POLL_INTERVAL: float = 0.25
+MAX_POLL_INTERVAL: float = 5.0
+
+def lookup_cached_results(
+    client: bigquery.Client,
+    query: str,
+    cache: Optional[QueryResultCache],
+    use_cache: bool = True,
+    stats: Optional[List[QueryStats]] = None
+) -> Tuple[Optional[str], Optional[List[Tuple[Any, Any]]]]:
+    """
+    Looks a query up in the result cache, recording a cache hit in `stats`.
+
+    Args:
+        client: BigQuery client object.
+        query: BigQuery SQL query string.
+        cache: Optional on-disk result cache.
+        use_cache: If False, the cached result is ignored (the key is still returned, to refresh it).
+        stats: Optional list receiving the QueryStats of a cache hit.
+
+    Returns:
+        The cache key (None without a cache or when the tables cannot be fingerprinted)
+        and the cached rows (None on a miss).
+    """
+
+    if cache is None:
+        return None, None
+    try:
+        cache_key = cache.make_key(query, table_fingerprint(client, query))
+    except Exception as e:  # e.g. clients without table metadata
+        logging.warning(f"Query result cache bypassed, source tables could not be fingerprinted: {e}")
+        return None, None
+
+    cached_data = cache.get(cache_key) if use_cache else None
+    if cached_data is not None and stats is not None:
+        stats.append(QueryStats(bytes_processed=0, bytes_billed=0, result_cache_hit=True))
+    return cache_key, cached_data
 
 def process_bigquery_results(
-    client: bigquery.Client, query: str
+    client: bigquery.Client,
+    query: str,
+    cache: Optional[QueryResultCache] = None,
+    use_cache: bool = True,
+    stats: Optional[List[QueryStats]] = None,
+    dry_run: bool = False
 ) -> List[Tuple[Any, Any]]:
     """
     Executes a BigQuery query, handles results, and performs data conversion.
 
+    When a cache is given, results are looked up by normalized query text and the
+    source tables' last-modified time and row count, so reruns over unchanged tables
+    return from local disk without running (or billing) a query.
+
+    When a `stats` list is given, the QueryStats of the query are appended to it: bytes
+    processed and billed, slot-milliseconds, BigQuery cache hit, queue and run times and
+    per-stage timings of the query plan. With `dry_run`, the query is only estimated (a
+    free dry run), its estimate is appended to `stats` and no rows are returned.
+
     Args:
-        client: BigQuery client object.
+        client: BigQuery client object (or `local.LocalClient` to run against a local NDJSON file).
         query: BigQuery SQL query string.
+        cache: Optional on-disk result cache.
+        use_cache: If False, the cached result is ignored and refreshed with a new execution.
+        stats: Optional list receiving the QueryStats of this query.
+        dry_run: If True, only estimate the query cost without executing it.
 
     Returns:
         A list of tuples containing the extracted data (date and username).
@@ -21,8 +87,21 @@ def process_bigquery_results(
     """
 
     extracted_data: List[Tuple[str, str]] = []
+    cache_key: Optional[str] = None
 
     try:
+        if dry_run:
+            estimate = estimate_query(client, query)
+            if stats is not None:
+                stats.append(estimate)
+            print(f"Query would process {estimate.bytes_processed} bytes (~${estimate.estimated_cost_usd or 0:.6f}).")
+            return extracted_data
+
+        cache_key, cached_data = lookup_cached_results(client, query, cache, use_cache, stats)
+        if cached_data is not None:
+            extracted_data = cached_data
+            return extracted_data
+
         query_job: bigquery.QueryJob = client.query(query)
         results = query_job.result() # Type notation not possible for this
 
@@ -31,6 +110,12 @@ def process_bigquery_results(
 
         extracted_data = [(row[0], row[1]) for row in results]
 
+        if stats is not None:
+            stats.append(query_stats_from_job(query_job))
+
+        if cache_key is not None:
+            cache.put(cache_key, extracted_data)
+
     except BadRequest as e:
         print(f"BigQuery error: {e}")
         raise
@@ -41,3 +126,278 @@ def process_bigquery_results(
         raise
     finally:
         return extracted_data
+
+def iterate_bigquery_pages(
+    client: bigquery.Client,
+    query: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_rows: Optional[int] = None,
+    cache: Optional[QueryResultCache] = None,
+    use_cache: bool = True,
+    stats: Optional[List[QueryStats]] = None
+) -> Iterator[List[Tuple[Any, Any]]]:
+    """
+    Executes a BigQuery query and returns an iterator over its results, one page at a time.
+
+    Only the current page is held in memory, so memory stays flat regardless of the
+    number of rows returned (e.g. without a `LIMIT`). Arguments are validated and the
+    query is submitted when this function is called; pages are fetched as they are consumed.
+
+    Errors, the result cache and statistics are handled as in `process_bigquery_results`:
+    a cache hit is served from disk, the QueryStats are appended to `stats` once the last
+    page is read, and a complete result is stored in the cache (its rows are then also
+    collected, so memory grows with the result). Results truncated by `max_rows` are not cached.
+
+    Args:
+        client: BigQuery client object (or `local.LocalClient` to run against a local NDJSON file).
+        query: BigQuery SQL query string.
+        page_size: Number of rows fetched per page.
+        max_rows: Maximum number of rows to yield. Defaults to all rows.
+        cache: Optional on-disk result cache.
+        use_cache: If False, the cached result is ignored and refreshed with a new execution.
+        stats: Optional list receiving the QueryStats of this query.
+
+    Returns:
+        An iterator yielding a list of (first column, second column) tuples for each page
+        (nothing if the query returned no results).
+
+    Raises:
+        ValueError: If `page_size` is lower than 1.
+        BadRequest: If BigQuery rejects the query.
+        Exception: For other errors during query execution.
+    """
+
+    if page_size < 1:
+        raise ValueError("The page size must be at least 1.")
+
+    cache_key, cached_data = lookup_cached_results(client, query, cache if max_rows is None else None, use_cache, stats)
+    if cached_data is not None:
+        return iter([cached_data[start:start + page_size] for start in range(0, len(cached_data), page_size)])
+
+    try:
+        query_job: bigquery.QueryJob = client.query(query)
+        results = query_job.result(page_size=page_size, max_results=max_rows)
+    except BadRequest as e:
+        print(f"BigQuery error: {e}")
+        raise
+    except NotFound as e:
+        print(f"Query returned no results: {e}")
+        return iter(())
+    except Exception as e:
+        print(f"Error: {e}")
+        raise
+
+    return stream_result_pages(query_job, results, cache if cache_key is not None else None, cache_key, stats)
+
+def stream_result_pages(
+    query_job: bigquery.QueryJob,
+    results: Any,
+    cache: Optional[QueryResultCache] = None,
+    cache_key: Optional[str] = None,
+    stats: Optional[List[QueryStats]] = None
+) -> Iterator[List[Tuple[Any, Any]]]:
+    """
+    Yields the pages of a query result, then records its statistics and caches it.
+
+    Args:
+        query_job: The executed query job.
+        results: Its row iterator.
+        cache: Optional on-disk result cache receiving the complete result.
+        cache_key: Cache key of the result.
+        stats: Optional list receiving the QueryStats of the query.
+
+    Yields:
+        A list of (first column, second column) tuples for each page.
+    """
+
+    cached_rows: Optional[List[Tuple[Any, Any]]] = [] if cache is not None else None
+    for page in results.pages:
+        rows = [(row[0], row[1]) for row in page]
+        if cached_rows is not None:
+            cached_rows.extend(rows)
+        yield rows
+
+    if stats is not None:
+        stats.append(query_stats_from_job(query_job))
+    if cached_rows is not None:
+        cache.put(cache_key, cached_rows)
+
+def iterate_bigquery_results(
+    client: bigquery.Client,
+    query: str,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    max_rows: Optional[int] = None,
+    cache: Optional[QueryResultCache] = None,
+    use_cache: bool = True,
+    stats: Optional[List[QueryStats]] = None
+) -> Iterator[Tuple[Any, Any]]:
+    """
+    Executes a BigQuery query and returns a lazy iterator over its rows, fetched page by page.
+
+    See `iterate_bigquery_pages`: arguments are validated and the query is submitted
+    immediately, with the same error, cache and statistics handling.
+
+    Args:
+        client: BigQuery client object (or `local.LocalClient` to run against a local NDJSON file).
+        query: BigQuery SQL query string.
+        page_size: Number of rows fetched per page.
+        max_rows: Maximum number of rows to yield. Defaults to all rows.
+        cache: Optional on-disk result cache.
+        use_cache: If False, the cached result is ignored and refreshed with a new execution.
+        stats: Optional list receiving the QueryStats of this query.
+
+    Returns:
+        An iterator yielding a (first column, second column) tuple for each row.
+    """
+
+    pages = iterate_bigquery_pages(client, query, page_size, max_rows, cache, use_cache, stats)
+    return itertools.chain.from_iterable(pages)
+
+class QueryOutcome(NamedTuple):
+    """
+    Outcome of one of several concurrently running queries.
+
+    Attributes:
+        name: Name given to the query.
+        rows: The (first column, second column) result rows (empty on error).
+        error: The exception that ended the job (e.g. TimeoutError), or None on success.
+        elapsed_seconds: Time from submission to completion.
+    """
+
+    name: str
+    rows: List[Tuple[Any, Any]]
+    error: Optional[BaseException]
+    elapsed_seconds: float
+
+def submit_queries(
+    client: bigquery.Client,
+    queries: Mapping[str, str],
+    submitted_at: Optional[Dict[str, float]] = None
+) -> Dict[str, bigquery.QueryJob]:
+    """
+    Starts every query without waiting for any of them (`client.query` only submits the job).
+
+    Args:
+        client: BigQuery client object (or `local.LocalClient`).
+        queries: SQL query strings keyed by a name.
+        submitted_at: Optional dict receiving the `time.monotonic()` submission time of each job.
+
+    Returns:
+        The running jobs keyed by the same names.
+
+    Raises:
+        Exception: If a submission fails (the jobs already submitted are cancelled).
+    """
+
+    jobs: Dict[str, bigquery.QueryJob] = {}
+    try:
+        for name, query in queries.items():
+            if submitted_at is not None:
+                submitted_at[name] = time.monotonic()
+            jobs[name] = client.query(query)
+    except Exception as e:
+        print(f"Error submitting query '{name}': {e}")
+        for job in jobs.values():
+            job.cancel()
+        raise
+    return jobs
+
+def poll_query_jobs(
+    jobs: Mapping[str, bigquery.QueryJob],
+    timeout: Optional[float] = None,
+    initial_interval: float = INITIAL_POLL_INTERVAL,
+    max_interval: float = MAX_POLL_INTERVAL,
+    rng: Optional[random.Random] = None,
+    submitted_at: Optional[Mapping[str, float]] = None
+) -> Iterator[QueryOutcome]:
+    """
+    Polls running jobs and yields each one's outcome as soon as it completes.
+
+    Jobs are checked with `done()` (a cheap status request) and the waits between rounds
+    grow exponentially up to `max_interval`, with jitter so many clients do not poll in lockstep.
+    A job still running `timeout` seconds after its submission is cancelled and reported with
+    a TimeoutError. Jobs still pending when the caller stops iterating are cancelled as well.
+
+    Args:
+        jobs: Running jobs keyed by name.
+        timeout: Maximum seconds per job since its submission. Defaults to no limit.
+        initial_interval: First wait between polling rounds, in seconds.
+        max_interval: Longest wait between polling rounds, in seconds.
+        rng: Random generator for the jitter. Defaults to a new, OS-seeded `random.Random()`.
+        submitted_at: `time.monotonic()` submission time of each job (see `submit_queries`).
+            Jobs missing from it are timed from the start of polling.
+
+    Yields:
+        A QueryOutcome per job, in completion order.
+    """
+
+    rng = rng or random.Random()
+    pending = dict(jobs)
+    started = time.monotonic()
+    submitted = {name: (submitted_at or {}).get(name, started) for name in jobs}
+    attempt = 0
+
+    try:
+        while pending:
+            for name, job in list(pending.items()):
+                elapsed = time.monotonic() - submitted[name]
+                try:
+                    done = job.done()
+                    if done:
+                        del pending[name]
+                        rows = [(row[0], row[1]) for row in job.result()]
+                        yield QueryOutcome(name, rows, None, elapsed)
+                    elif timeout is not None and elapsed >= timeout:
+                        del pending[name]
+                        job.cancel()
+                        logging.warning(f"Query '{name}' cancelled after {elapsed:.1f} s.")
+                        yield QueryOutcome(name, [], TimeoutError(f"Query '{name}' timed out after {timeout} s."), elapsed)
+                except Exception as e:
+                    pending.pop(name, None)
+                    print(f"Error in query '{name}': {e}")
+                    yield QueryOutcome(name, [], e, elapsed)
+
+            if pending:
+                # Exponential backoff with "equal jitter": half fixed, half random
+                interval = min(max_interval, initial_interval * 2 ** attempt)
+                delay = interval / 2 + rng.uniform(0, interval / 2)
+                if timeout is not None:
+                    first_deadline = min(submitted[name] for name in pending) + timeout
+                    delay = min(delay, max(0.0, first_deadline - time.monotonic()))
+                time.sleep(delay)
+                attempt += 1
+    finally:
+        for name, job in pending.items():  # The caller stopped early
+            job.cancel()
+            logging.info(f"Query '{name}' cancelled.")
+
+def run_queries_concurrently(
+    client: bigquery.Client,
+    queries: Mapping[str, str],
+    timeout: Optional[float] = None,
+    initial_interval: float = INITIAL_POLL_INTERVAL,
+    max_interval: float = MAX_POLL_INTERVAL
+) -> Iterator[QueryOutcome]:
+    """
+    Submits all queries up front (when called, not on first iteration), then yields their results as they complete.
+
+    Total wall time approaches the latency of the slowest query instead of the sum
+    of the latencies of queries run one after another.
+
+    Args:
+        client: BigQuery client object (or `local.LocalClient`).
+        queries: SQL query strings keyed by a name (e.g. {'q1': queries.top_dates_with_top_users}).
+        timeout: Maximum seconds per job since its submission; slower jobs are cancelled. Defaults to no limit.
+        initial_interval: First wait between polling rounds, in seconds.
+        max_interval: Longest wait between polling rounds, in seconds.
+
+    Returns:
+        An iterator yielding a QueryOutcome per query, in completion order.
+
+    Raises:
+        Exception: If a submission fails (the jobs already submitted are cancelled).
+    """
+
+    submitted_at: Dict[str, float] = {}
+    jobs = submit_queries(client, queries, submitted_at)
+    return poll_query_jobs(jobs, timeout, initial_interval, max_interval, submitted_at=submitted_at)
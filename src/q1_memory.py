@@ -1,24 +1,25 @@
 import datetime  # For working with dates
-from typing import List, Tuple  # For type annotations
+from typing import List, Optional, Tuple  # For type annotations
 from google.cloud import bigquery  # For interacting with BigQuery
-from processing import process_bigquery_results  # External function for processing results
-import memory_profiler  # Module for memory profiling # type: ignore
+from processing import iterate_bigquery_results  # External generator streaming the results page by page
+from instrumentation import instrumented  # Stage metrics emitted to the configured sinks
 
-# Decorator to profile memory usage of the function
-@memory_profiler.profile
-def q1_memory(client: bigquery.Client, query: str) -> List[Tuple[datetime.date, str]]:
+# Decorator measuring the wall time, CPU time and memory of every call (see instrumentation.configure)
+@instrumented()
+def q1_memory(client: bigquery.Client, query: str, max_rows: Optional[int] = None) -> List[Tuple[datetime.date, str]]:
     """
-    Executes a BigQuery query, profiles its memory usage, and returns extracted date-string pairs.
+    Executes a BigQuery query, measures its memory usage (see instrumentation.py), and returns extracted date-string pairs.
 
     Args:
         client: BigQuery client object.
         query: BigQuery SQL query string.
+        max_rows: Maximum number of rows to return. Defaults to all rows.
 
     Returns:
         List of tuples containing date and string pairs extracted from BigQuery results.
     """
 
-    # Delegate query execution and data extraction to the external function:
-    # - Assumes 'process_bigquery_results' handles query execution, result processing,
-    #   and extraction of date-string pairs.
-    return process_bigquery_results(client, query)
+    # Delegate query execution and data extraction to the external iterator:
+    # - 'iterate_bigquery_results' fetches the rows page by page as the list is built,
+    #   so only one page of raw results is held in memory besides the returned rows.
+    return list(iterate_bigquery_results(client, query, max_rows=max_rows))
@@ -1,18 +1,19 @@
-from typing import List, Tuple  # For type annotations
+from typing import List, Optional, Tuple  # For type annotations
 from google.cloud import bigquery  # For interacting with BigQuery
-from processing import process_bigquery_results  # External function for processing results
-import memory_profiler  # Module for memory profiling # type: ignore
+from processing import iterate_bigquery_results  # External generator streaming the results page by page
+from instrumentation import instrumented  # Stage metrics emitted to the configured sinks
 
-# Decorator to profile memory usage of the function
-@memory_profiler.profile
-def q2_memory(client: bigquery.Client, query: str) -> List[Tuple[str, int]]:
+# Decorator measuring the wall time, CPU time and memory of every call (see instrumentation.configure)
+@instrumented()
+def q2_memory(client: bigquery.Client, query: str, max_rows: Optional[int] = None) -> List[Tuple[str, int]]:
     """
-    Executes a BigQuery query, profiles its memory usage, extracts string-integer pairs,
+    Executes a BigQuery query, measures its memory usage (see instrumentation.py), extracts string-integer pairs,
     and handles potential conversion errors.
 
     Args:
         client: BigQuery client object.
         query: BigQuery SQL query string.
+        max_rows: Maximum number of rows to return. Defaults to all rows.
 
     Returns:
         List of tuples containing string-integer pairs extracted from BigQuery results.
@@ -20,11 +21,11 @@ def q2_memory(client: bigquery.Client, query: str) -> List[Tuple[str, int]]:
     """
 
     try:
-        # Delegate query execution and data extraction to the external function:
-        results = process_bigquery_results(client, query)
+        # Delegate query execution to the external iterator, which fetches rows page by page:
+        results = iterate_bigquery_results(client, query, max_rows=max_rows)
 
-        # Extract string-integer pairs, validating data format:
-        # - Assumes 'process_bigquery_results' returns a list of iterables with two elements.
+        # Extract string-integer pairs as the pages arrive, validating data format:
+        # - Assumes 'iterate_bigquery_results' yields iterables with two elements.
         # - Attempts to convert the second element of each row to an integer.
         return [(row[0], int(row[1])) for row in results]
 
@@ -1,34 +1,34 @@
-from typing import List, Tuple  # For type annotations
+from typing import List, Optional, Tuple  # For type annotations
 from google.cloud import bigquery  # For interacting with BigQuery
-from processing import process_bigquery_results  # External function for processing results
-import memory_profiler  # Module for memory profiling # type: ignore
+from processing import iterate_bigquery_results  # External generator streaming the results page by page
+from instrumentation import instrumented  # Stage metrics emitted to the configured sinks
 
-@memory_profiler.profile  # Decorator to profile memory usage
-def q3_memory(client: bigquery.Client, query: str) -> List[Tuple[str, int]]:
+@instrumented()  # Decorator measuring the wall time, CPU time and memory of every call
+def q3_memory(client: bigquery.Client, query: str, max_rows: Optional[int] = None) -> List[Tuple[str, int]]:
    """
-   Executes a BigQuery query, profiles its memory usage, extracts string-integer pairs,
-   and considers memory-efficient return strategies for large datasets.
+   Executes a BigQuery query, measures its memory usage (see instrumentation.py), extracts string-integer pairs,
+   and reads the results one page at a time.
 
    Args:
        client: BigQuery client object.
        query: BigQuery SQL query string.
+       max_rows: Maximum number of rows to return, capping the memory of large results. Defaults to all rows.
 
    Returns:
        List of tuples containing string-integer pairs extracted from BigQuery results.
-       Might suggest alternative return strategies (streaming or pagination) for large results.
+       Returns an empty list if data conversion fails.
    """
 
    try:
-       # Delegate query execution and data extraction to the external function:
-       results = process_bigquery_results(client, query)
+       # Delegate query execution to the external iterator, which fetches rows page by page:
+       results = iterate_bigquery_results(client, query, max_rows=max_rows)
 
-       # Extract string-integer pairs, validating data format:
+       # Extract string-integer pairs as the pages arrive, validating data format:
        formatted_results = [(row[0], int(row[1])) for row in results]
 
-       # Consider memory-efficient return strategies based on result size:
+       # Warn about large results, which max_rows can cap:
        if len(formatted_results) > 1000:  # Adjust threshold as needed
-           print("Warning: Returning a large dataset. Consider using streaming or pagination for memory optimization.")
-           # Potentially explore implementation of streaming or pagination techniques here
+           print("Warning: Returning a large dataset. Consider passing max_rows to cap the result.")
 
        return formatted_results
 
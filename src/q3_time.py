@@ -1,13 +1,13 @@
 from typing import List, Tuple  # For type annotations
 from google.cloud import bigquery  # For interacting with BigQuery
 from processing import process_bigquery_results  # External function for processing results
-import line_profiler  # Module for line-by-line profiling # type: ignore
+from instrumentation import instrumented  # Stage metrics emitted to the configured sinks
 
-# Decorator for line-by-line profiling of the function's execution time
-@line_profiler.profile
+# Decorator measuring the wall time, CPU time and memory of every call (see instrumentation.configure)
+@instrumented()
 def q3_time(client: bigquery.Client, query: str) -> List[Tuple[str, int]]:
     """
-    Executes a BigQuery query, profiles its execution time line-by-line,
+    Executes a BigQuery query, measures its execution time (see instrumentation.py),
     and returns extracted date-string pairs.
 
     Args:
@@ -21,6 +21,6 @@ def q3_time(client: bigquery.Client, query: str) -> List[Tuple[str, int]]:
     # Delegate query execution and data extraction to the external function:
     # - Assumes 'process_bigquery_results' handles query execution, result processing,
     #   and extraction of date-string pairs.
-    # - The decorator will profile the execution time of each line within this function,
-    #   including the time spent within 'process_bigquery_results'.
+    # - The decorator measures the whole call, including the time spent within
+    #   'process_bigquery_results', and emits it to the configured metric sinks.
     return process_bigquery_results(client, query)
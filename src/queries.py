@@ -3,14 +3,18 @@ The top 10 dates with the most tweets. Mention the user (username) with the most
 Assumption: In cases where users have the same number of tweets on the same date, the user whose username comes first alphabetically should be selected.
 Assumption: A valid tweet has an id
 """
-top_dates_with_top_users = r"""
+import datetime  # For date-bounded query builders
+import re  # For validating dataset names
+from typing import Dict, Optional, Tuple  # For type annotations
+
+TOP_DATES_WITH_TOP_USERS_TEMPLATE = r"""
     WITH 
     TopDates AS (
         SELECT
             CAST(date AS DATE) AS tweets_date,
             COUNT(id) AS tweet_count
         FROM tweets_dataset.tweets
-        WHERE id IS NOT NULL
+        WHERE id IS NOT NULL{date_filter}
         GROUP BY tweets_date
         ORDER BY tweet_count DESC
         LIMIT 10
@@ -28,7 +32,7 @@ top_dates_with_top_users = r"""
         FROM tweets_dataset.tweets AS TW
         INNER JOIN TopDates AS TD
             ON TD.tweets_date = CAST(TW.date AS DATE)
-        WHERE TW.id IS NOT NULL
+        WHERE TW.id IS NOT NULL{tw_date_filter}
         GROUP BY
             TD.tweets_date,
             TW.user.username
@@ -45,30 +49,37 @@ top_dates_with_top_users = r"""
     WHERE row_number = 1
 """
 
+"""
+Emoji pattern of the top_emojis question, also used by the emoji rollup (see rollups.py).
+It is a BigQuery string expression (concatenated raw literals) for the pattern argument of REGEXP_EXTRACT_ALL.
+"""
+EMOJI_REGEX = r"""
+                    r"(?:[\x{1F300}-\x{1F5FF}]|[\x{1F900}-\x{1F9FF}]|[\x{1F600}-\x{1F64F}]|[\x{1F680}-\x{1F6FF}]" ||
+                    r"|[\x{2600}-\x{26FF}]\x{FE0F}?|[\x{2700}-\x{27BF}]\x{FE0F}?|\x{24C2}\x{FE0F}?|[\x{1F1E6}-\x{1F1FF}]{1,2}" || 
+                    r"|[\x{1F170}\x{1F171}\x{1F17E}\x{1F17F}\x{1F18E}\x{1F191}-\x{1F19A}]\x{FE0F}?" ||
+                    r"|[\x{0023}\x{002A}\x{0030}-\x{0039}]\x{FE0F}?\x{20E3}|[\x{2194}-\x{2199}\x{21A9}-\x{21AA}]\x{FE0F}?" ||
+                    r"|[\x{2B05}-\x{2B07}\x{2B1B}\x{2B1C}\x{2B50}\x{2B55}]\x{FE0F}?|[\x{2934}\x{2935}]\x{FE0F}?" ||
+                    r"|[\x{3297}\x{3299}]\x{FE0F}?|[\x{1F201}\x{1F202}\x{1F21A}\x{1F22F}\x{1F232}\x{1F23A}\x{1F250}\x{1F251}]\x{FE0F}?" ||
+                    r"|[\x{203C}-\x{2049}]\x{FE0F}?|[\x{00A9}-\x{00AE}]\x{FE0F}?|[\x{2122}\x{2139}]\x{FE0F}?" ||
+                    r"|\x{1F004}\x{FE0F}?|\x{1F0CF}\x{FE0F}?|[\x{231A}\x{231B}\x{2328}\x{23CF}\x{23E9}\x{23F3}\x{23F8}\x{23FA}]\x{FE0F}?)"
+""".rstrip()
+
 """
 Top 10 most used emojis with their respective counts.
 Assumption: The query does not contain duplicate entries, as the tweet with 'id = 1362813218952007687' contains two heart and two fist emojis.
 Assumption: A valid tweet has an id
 """
-top_emojis = r"""
+TOP_EMOJIS_TEMPLATE = r"""
     WITH 
     ExtractedEmojis AS (
         SELECT
             REGEXP_EXTRACT_ALL(
                 content, 
-                FORMAT(
-                    r"(?:[\x{1F300}-\x{1F5FF}]|[\x{1F900}-\x{1F9FF}]|[\x{1F600}-\x{1F64F}]|[\x{1F680}-\x{1F6FF}]" ||
-                    r"|[\x{2600}-\x{26FF}]\x{FE0F}?|[\x{2700}-\x{27BF}]\x{FE0F}?|\x{24C2}\x{FE0F}?|[\x{1F1E6}-\x{1F1FF}]{1,2}" || 
-                    r"|[\x{1F170}\x{1F171}\x{1F17E}\x{1F17F}\x{1F18E}\x{1F191}-\x{1F19A}]\x{FE0F}?" ||
-                    r"|[\\x{0023}\x{002A}\x{0030}-\x{0039}]\x{FE0F}?\x{20E3}|[\x{2194}-\x{2199}\x{21A9}-\x{21AA}]\x{FE0F}?" ||
-                    r"|[\x{2B05}-\x{2B07}\x{2B1B}\x{2B1C}\x{2B50}\x{2B55}]\x{FE0F}?|[\x{2934}\x{2935}]\x{FE0F}?" ||
-                    r"|[\x{3297}\x{3299}]\x{FE0F}?|[\x{1F201}\x{1F202}\x{1F21A}\x{1F22F}\x{1F232}\x{1F23A}\x{1F250}\x{1F251}]\x{FE0F}?" ||
-                    r"|[\x{203C}-\x{2049}]\x{FE0F}?|[\x{00A9}-\x{00AE}]\x{FE0F}?|[\x{2122}\x{2139}]\x{FE0F}?" ||
-                    r"|\x{1F004}\x{FE0F}?|\x{1F0CF}\x{FE0F}?|[\x{231A}\x{231B}\x{2328}\x{23CF}\x{23E9}\x{23F3}\x{23F8}\x{23FA}]\x{FE0F}?)"
+                FORMAT({emoji_regex}
                 )
             ) AS emojis
         FROM tweets_dataset.tweets
-        WHERE id IS NOT NULL
+        WHERE id IS NOT NULL{date_filter}
     )
 
     SELECT
@@ -85,7 +96,7 @@ top_emojis = r"""
 Top 10 all-time most influential users (username) based on the count of mentions (@) each of them receives.
 Assumption: A valid tweet has an id
 """
-top_influential_users = r"""
+TOP_INFLUENTIAL_USERS_TEMPLATE = r"""
     WITH 
     MentionedUsersCount AS (
         SELECT
@@ -94,7 +105,7 @@ top_influential_users = r"""
         FROM
             tweets_dataset.tweets as TW,
             UNNEST(mentionedUsers) AS user
-        WHERE TW.id IS NOT NULL
+        WHERE TW.id IS NOT NULL{tw_date_filter}
         GROUP BY username
     )
 
@@ -104,4 +115,168 @@ top_influential_users = r"""
     FROM MentionedUsersCount
     ORDER BY count DESC
     LIMIT 10
-"""
\ No newline at end of file
+"""
+
+def format_question(template: str, date_filter: str = '', tw_date_filter: str = '') -> str:
+    """Fills a question template with the emoji pattern and the extra filters of its tweets scans."""
+
+    return template.format(emoji_regex=EMOJI_REGEX, date_filter=date_filter, tw_date_filter=tw_date_filter)
+
+top_dates_with_top_users = format_question(TOP_DATES_WITH_TOP_USERS_TEMPLATE)
+top_emojis = format_question(TOP_EMOJIS_TEMPLATE)
+top_influential_users = format_question(TOP_INFLUENTIAL_USERS_TEMPLATE)
+
+"""
+Rollup-backed variants of the three questions. They read the pre-aggregated tables maintained by rollups.py,
+so their cost depends on the number of days, users and emojis instead of the number of tweets.
+Assumption: The rollups were populated by every load of the tweets table (see storage.load_data_from_storage).
+Assumption: Tweets without a date are not part of the daily counts.
+"""
+TOP_DATES_WITH_TOP_USERS_ROLLUP_TEMPLATE = r"""
+    WITH
+    TopDates AS (
+        SELECT
+            tweets_date,
+            SUM(tweet_count) AS tweet_count
+        FROM {dataset}.daily_user_tweet_counts
+        GROUP BY tweets_date
+        ORDER BY tweet_count DESC
+        LIMIT 10
+    )
+
+    SELECT
+        TD.tweets_date,
+        ARRAY_AGG(
+            STRUCT(R.username)
+            ORDER BY R.tweet_count DESC, R.username ASC
+            LIMIT 1
+        )[OFFSET(0)].username AS username
+    FROM TopDates AS TD
+    INNER JOIN {dataset}.daily_user_tweet_counts AS R
+        ON R.tweets_date = TD.tweets_date
+    GROUP BY
+        TD.tweets_date,
+        TD.tweet_count
+    ORDER BY TD.tweet_count DESC
+"""
+
+TOP_EMOJIS_ROLLUP_TEMPLATE = r"""
+    SELECT
+        emoji,
+        count
+    FROM {dataset}.emoji_counts
+    ORDER BY count DESC
+    LIMIT 10
+"""
+
+TOP_INFLUENTIAL_USERS_ROLLUP_TEMPLATE = r"""
+    SELECT
+        username,
+        mention_count
+    FROM {dataset}.mention_counts
+    ORDER BY mention_count DESC
+    LIMIT 10
+"""
+
+# Dataset and project ids only use letters, digits, underscores (and dashes/dots for projects)
+DATASET_NAME_PATTERN = re.compile(r'^(?:[A-Za-z0-9-]+\.)?[A-Za-z0-9_]+$')
+
+def rollup_queries(dataset_name: str = 'tweets_dataset') -> Tuple[str, str, str]:
+    """Builds the three rollup-backed questions over the rollup tables of a dataset.
+
+    Args:
+        dataset_name (str): Dataset holding the rollups (optionally prefixed by 'project.'). Defaults to 'tweets_dataset'.
+
+    Returns:
+        Tuple[str, str, str]: The top dates, top emojis and top influential users statements.
+
+    Raises:
+        ValueError: If the dataset name is not a valid identifier.
+    """
+
+    if not DATASET_NAME_PATTERN.match(dataset_name):
+        raise ValueError(f"Invalid dataset name {dataset_name!r}.")
+    return tuple(
+        template.format(dataset=dataset_name)
+        for template in (
+            TOP_DATES_WITH_TOP_USERS_ROLLUP_TEMPLATE, TOP_EMOJIS_ROLLUP_TEMPLATE, TOP_INFLUENTIAL_USERS_ROLLUP_TEMPLATE
+        )
+    )
+
+top_dates_with_top_users_rollup, top_emojis_rollup, top_influential_users_rollup = rollup_queries()
+
+
+"""
+Date-bounded variants of the three questions. The bounds are applied to the raw `date` column, so on a table
+partitioned by day on `date` (see storage.create_table) BigQuery only scans the partitions inside the range.
+Assumption: Both bounds are inclusive calendar days in UTC, like CAST(date AS DATE).
+"""
+def date_range_condition(column: str, start_date: Optional[datetime.date], end_date: Optional[datetime.date]) -> str:
+    """Builds a partition-pruning condition on a TIMESTAMP column for an inclusive range of days.
+
+    Args:
+        column (str): The TIMESTAMP column (e.g. 'date' or 'TW.date').
+        start_date (Optional[datetime.date]): First day of the range, unbounded if None.
+        end_date (Optional[datetime.date]): Last day of the range, unbounded if None.
+
+    Returns:
+        str: The SQL condition ('TRUE' when both bounds are None).
+
+    Raises:
+        TypeError: If a bound is not a date.
+        ValueError: If the start date is after the end date.
+    """
+
+    for bound in (start_date, end_date):
+        if bound is not None and not isinstance(bound, datetime.date):
+            raise TypeError(f"Date bounds must be datetime.date objects, got {bound!r}.")
+    if start_date is not None and end_date is not None and start_date > end_date:
+        raise ValueError(f"The start date {start_date} is after the end date {end_date}.")
+
+    conditions = []
+    if start_date is not None:
+        conditions.append(f"{column} >= TIMESTAMP('{start_date.isoformat()}')")
+    if end_date is not None:
+        conditions.append(f"{column} < TIMESTAMP('{(end_date + datetime.timedelta(days=1)).isoformat()}')")
+    return ' AND '.join(conditions) or 'TRUE'
+
+# Template of each question that can be bounded by dates
+DATE_BOUNDED_TEMPLATES: Dict[str, str] = {
+    top_dates_with_top_users: TOP_DATES_WITH_TOP_USERS_TEMPLATE,
+    top_emojis: TOP_EMOJIS_TEMPLATE,
+    top_influential_users: TOP_INFLUENTIAL_USERS_TEMPLATE,
+}
+
+def bound_by_dates(query: str, start_date: Optional[datetime.date], end_date: Optional[datetime.date]) -> str:
+    """Rebuilds one of the questions above from its template with a date range on every scan of the tweets table.
+
+    Raises:
+        ValueError: If the query is not one of the date-boundable questions.
+    """
+
+    if query not in DATE_BOUNDED_TEMPLATES:
+        raise ValueError("The query has no date-bounded template.")
+    return format_question(
+        DATE_BOUNDED_TEMPLATES[query],
+        date_filter=f' AND {date_range_condition("date", start_date, end_date)}',
+        tw_date_filter=f' AND {date_range_condition("TW.date", start_date, end_date)}',
+    )
+
+def top_dates_with_top_users_between(
+    start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None
+) -> str:
+    """top_dates_with_top_users restricted to the tweets posted between two days (inclusive)."""
+
+    return bound_by_dates(top_dates_with_top_users, start_date, end_date)
+
+def top_emojis_between(start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None) -> str:
+    """top_emojis restricted to the tweets posted between two days (inclusive)."""
+
+    return bound_by_dates(top_emojis, start_date, end_date)
+
+def top_influential_users_between(
+    start_date: Optional[datetime.date] = None, end_date: Optional[datetime.date] = None
+) -> str:
+    """top_influential_users restricted to the tweets posted between two days (inclusive)."""
+
+    return bound_by_dates(top_influential_users, start_date, end_date)
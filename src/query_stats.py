@@ -0,0 +1,173 @@
+import datetime  # For job timestamps
+from typing import Any, NamedTuple, Optional, Tuple  # For type annotations
+from google.cloud import bigquery  # For dry-run job configurations
+
+# On-demand price in USD per TiB processed, used by cost estimates
+PRICE_PER_TIB: float = 6.25
+
+# Number of bytes in a tebibyte
+TIB: int = 1024 ** 4
+
+
+class StageStats(NamedTuple):
+    """Timings and volumes of one stage of a query plan.
+
+    Attributes:
+        name: Stage name (e.g. 'S00: Input').
+        status: Stage status (e.g. 'COMPLETE').
+        duration_ms: Time between the stage start and end, in milliseconds.
+        wait_ms_avg: Average time workers waited to be scheduled.
+        read_ms_avg: Average time workers spent reading input.
+        compute_ms_avg: Average time workers spent computing.
+        write_ms_avg: Average time workers spent writing output.
+        records_read: Number of records read by the stage.
+        records_written: Number of records written by the stage.
+    """
+
+    name: str
+    status: Optional[str]
+    duration_ms: Optional[float]
+    wait_ms_avg: Optional[int]
+    read_ms_avg: Optional[int]
+    compute_ms_avg: Optional[int]
+    write_ms_avg: Optional[int]
+    records_read: Optional[int]
+    records_written: Optional[int]
+
+
+class QueryStats(NamedTuple):
+    """Cost and execution statistics of one query.
+
+    Attributes:
+        job_id: BigQuery job id (None for local results).
+        bytes_processed: Bytes scanned (estimated for dry runs).
+        bytes_billed: Bytes billed (0 for cache hits and dry runs).
+        slot_millis: Slot-milliseconds consumed.
+        cache_hit: Whether BigQuery answered from its query cache.
+        result_cache_hit: Whether the rows came from the local `cache.QueryResultCache`.
+        dry_run: Whether the query was only estimated.
+        queue_seconds: Time between job creation and start.
+        run_seconds: Time between job start and end.
+        stages: Per-stage timings of the query plan.
+    """
+
+    job_id: Optional[str] = None
+    bytes_processed: Optional[int] = None
+    bytes_billed: Optional[int] = None
+    slot_millis: Optional[int] = None
+    cache_hit: Optional[bool] = None
+    result_cache_hit: bool = False
+    dry_run: bool = False
+    queue_seconds: Optional[float] = None
+    run_seconds: Optional[float] = None
+    stages: Tuple[StageStats, ...] = ()
+
+    @property
+    def estimated_cost_usd(self) -> Optional[float]:
+        """On-demand cost of the billed bytes (of the processed bytes for dry runs)."""
+
+        billed = self.bytes_processed if self.dry_run else self.bytes_billed
+        return None if billed is None else billed / TIB * PRICE_PER_TIB
+
+
+def seconds_between(start: Optional[datetime.datetime], end: Optional[datetime.datetime]) -> Optional[float]:
+    """Returns the seconds between two timestamps, or None if one is missing."""
+
+    if start is None or end is None:
+        return None
+    return (end - start).total_seconds()
+
+
+def stage_stats(entry: Any) -> StageStats:
+    """Extracts the statistics of a `bigquery.QueryPlanEntry`."""
+
+    start, end = getattr(entry, 'start', None), getattr(entry, 'end', None)
+    duration = seconds_between(start, end)
+    return StageStats(
+        name=getattr(entry, 'name', ''),
+        status=getattr(entry, 'status', None),
+        duration_ms=None if duration is None else duration * 1000,
+        wait_ms_avg=getattr(entry, 'wait_ms_avg', None),
+        read_ms_avg=getattr(entry, 'read_ms_avg', None),
+        compute_ms_avg=getattr(entry, 'compute_ms_avg', None),
+        write_ms_avg=getattr(entry, 'write_ms_avg', None),
+        records_read=getattr(entry, 'records_read', None),
+        records_written=getattr(entry, 'records_written', None),
+    )
+
+
+def query_stats_from_job(query_job: Any, dry_run: bool = False) -> QueryStats:
+    """Collects the statistics of a finished (or dry-run) query job.
+
+    Attributes missing from the job (e.g. `local.LocalQueryJob`) are reported as None.
+
+    Args:
+        query_job (Any): The `bigquery.QueryJob`.
+        dry_run (bool, optional): Whether the job was a dry run. Defaults to False.
+
+    Returns:
+        QueryStats: The job statistics.
+    """
+
+    created, started, ended = (getattr(query_job, name, None) for name in ('created', 'started', 'ended'))
+    return QueryStats(
+        job_id=getattr(query_job, 'job_id', None),
+        bytes_processed=getattr(query_job, 'total_bytes_processed', None),
+        bytes_billed=0 if dry_run else getattr(query_job, 'total_bytes_billed', None),
+        slot_millis=getattr(query_job, 'slot_millis', None),
+        cache_hit=getattr(query_job, 'cache_hit', None),
+        dry_run=dry_run,
+        queue_seconds=seconds_between(created, started),
+        run_seconds=seconds_between(started, ended),
+        stages=tuple(stage_stats(entry) for entry in getattr(query_job, 'query_plan', None) or []),
+    )
+
+
+def estimate_query(client: bigquery.Client, query: str) -> QueryStats:
+    """Estimates the bytes a query would process with a free dry run, without executing it.
+
+    The query cache is disabled so the estimate reflects a real execution.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        query (str): BigQuery SQL query string.
+
+    Returns:
+        QueryStats: The estimate (`bytes_processed` and `estimated_cost_usd`).
+    """
+
+    job_config = bigquery.QueryJobConfig(dry_run=True, use_query_cache=False)
+    return query_stats_from_job(client.query(query, job_config=job_config), dry_run=True)
+
+
+def format_query_stats(name: str, stats: QueryStats) -> str:
+    """Formats the statistics of a query as a short report, slowest stages first.
+
+    Args:
+        name (str): Label of the query.
+        stats (QueryStats): Its statistics.
+
+    Returns:
+        str: A multi-line report.
+    """
+
+    def megabytes(value: Optional[int]) -> str:
+        return 'n/a' if value is None else f'{value / 2**20:.1f} MiB'
+
+    def seconds(value: Optional[float]) -> str:
+        return 'n/a' if value is None else f'{value:.2f} s'
+
+    cost = stats.estimated_cost_usd
+    kind = 'dry run' if stats.dry_run else 'local result cache' if stats.result_cache_hit else 'executed'
+    lines = [
+        f"{name} ({kind}): processed {megabytes(stats.bytes_processed)}, billed {megabytes(stats.bytes_billed)}, "
+        f"cost {'n/a' if cost is None else f'${cost:.6f}'}, slot ms {stats.slot_millis}, cache hit {stats.cache_hit}, "
+        f"queued {seconds(stats.queue_seconds)}, ran {seconds(stats.run_seconds)}"
+    ]
+    for stage in sorted(stats.stages, key=lambda stage: -(stage.duration_ms or 0)):
+        lines.append(
+            f"  {stage.name}: {stage.duration_ms or 0:.0f} ms (wait {stage.wait_ms_avg}, read {stage.read_ms_avg}, "
+            f"compute {stage.compute_ms_avg}, write {stage.write_ms_avg} ms avg), "
+            f"{stage.records_read} records in, {stage.records_written} out"
+        )
+    return '\n'.join(lines)
@@ -0,0 +1,243 @@
+import logging  # For logging rollup maintenance
+from typing import Dict, List, Optional  # For type annotations
+from google.cloud import bigquery  # For creating and updating the rollup tables
+
+from queries import EMOJI_REGEX  # Emoji pattern shared with the top_emojis question
+
+# Rollup table names (the *_rollup statements in queries.py read them, see queries.rollup_queries)
+DAILY_USER_COUNTS_TABLE: str = 'daily_user_tweet_counts'
+EMOJI_COUNTS_TABLE: str = 'emoji_counts'
+MENTION_COUNTS_TABLE: str = 'mention_counts'
+
+# Ledger of the loads already added to the rollups, so reloading the same data adds nothing
+ROLLUP_LOADS_TABLE: str = 'rollup_loads'
+
+ROLLUP_LOADS_SCHEMA: List[bigquery.SchemaField] = [
+    bigquery.SchemaField('load_id', 'STRING', mode='REQUIRED'),
+    bigquery.SchemaField('loaded_at', 'TIMESTAMP'),
+]
+
+# Schema of each rollup table
+ROLLUP_SCHEMAS: Dict[str, List[bigquery.SchemaField]] = {
+    DAILY_USER_COUNTS_TABLE: [
+        bigquery.SchemaField('tweets_date', 'DATE', mode='REQUIRED'),
+        bigquery.SchemaField('username', 'STRING'),
+        bigquery.SchemaField('tweet_count', 'INT64', mode='REQUIRED'),
+    ],
+    EMOJI_COUNTS_TABLE: [
+        bigquery.SchemaField('emoji', 'STRING', mode='REQUIRED'),
+        bigquery.SchemaField('count', 'INT64', mode='REQUIRED'),
+    ],
+    MENTION_COUNTS_TABLE: [
+        bigquery.SchemaField('username', 'STRING', mode='REQUIRED'),
+        bigquery.SchemaField('mention_count', 'INT64', mode='REQUIRED'),
+    ],
+}
+
+# Suffix of the table holding the last loaded file when rollups are maintained
+STAGING_TABLE_SUFFIX: str = '_staging'
+
+
+def create_rollup_tables(client: bigquery.Client, dataset_name: str) -> None:
+    """
+    Creates the rollup tables that do not exist yet.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        dataset_name (str): Name of the dataset holding the tweets table.
+    """
+
+    for table_name, schema in {**ROLLUP_SCHEMAS, ROLLUP_LOADS_TABLE: ROLLUP_LOADS_SCHEMA}.items():
+        table = bigquery.Table(client.dataset(dataset_name).table(table_name), schema=schema)
+        client.create_table(table, exists_ok=True)
+
+
+def rollup_merge_statements(dataset_name: str, source_table_name: str) -> List[str]:
+    """
+    Builds the MERGE statements adding the aggregates of a tweets table to the rollups.
+
+    Each statement aggregates the source table once and adds its counts to the matching
+    rollup rows, inserting the keys seen for the first time. Tweets without a date are left
+    out of the daily counts, whose `tweets_date` is REQUIRED.
+
+    Args:
+        dataset_name (str): Name of the dataset holding the tables.
+        source_table_name (str): Table with the tweets to add (e.g. the staging table of a load).
+
+    Returns:
+        List[str]: The daily user, emoji and mention MERGE statements.
+    """
+
+    source = f'`{dataset_name}.{source_table_name}`'
+
+    daily_user_counts = f"""
+        MERGE `{dataset_name}.{DAILY_USER_COUNTS_TABLE}` AS R
+        USING (
+            SELECT
+                CAST(date AS DATE) AS tweets_date,
+                user.username AS username,
+                COUNT(id) AS tweet_count
+            FROM {source}
+            WHERE id IS NOT NULL AND date IS NOT NULL
+            GROUP BY
+                tweets_date,
+                username
+        ) AS S
+        ON R.tweets_date = S.tweets_date AND R.username IS NOT DISTINCT FROM S.username
+        WHEN MATCHED THEN
+            UPDATE SET tweet_count = R.tweet_count + S.tweet_count
+        WHEN NOT MATCHED THEN
+            INSERT (tweets_date, username, tweet_count) VALUES (S.tweets_date, S.username, S.tweet_count)
+    """
+
+    emoji_counts = f"""
+        MERGE `{dataset_name}.{EMOJI_COUNTS_TABLE}` AS R
+        USING (
+            SELECT
+                emoji,
+                COUNT(emoji) AS count
+            FROM {source}
+            CROSS JOIN UNNEST(REGEXP_EXTRACT_ALL(content, FORMAT({EMOJI_REGEX}))) AS emoji
+            WHERE id IS NOT NULL
+            GROUP BY emoji
+        ) AS S
+        ON R.emoji = S.emoji
+        WHEN MATCHED THEN
+            UPDATE SET count = R.count + S.count
+        WHEN NOT MATCHED THEN
+            INSERT (emoji, count) VALUES (S.emoji, S.count)
+    """
+
+    mention_counts = f"""
+        MERGE `{dataset_name}.{MENTION_COUNTS_TABLE}` AS R
+        USING (
+            SELECT
+                user.username AS username,
+                COUNT(user.username) AS mention_count
+            FROM {source} AS TW, UNNEST(mentionedUsers) AS user
+            WHERE TW.id IS NOT NULL AND user.username IS NOT NULL
+            GROUP BY username
+        ) AS S
+        ON R.username = S.username
+        WHEN MATCHED THEN
+            UPDATE SET mention_count = R.mention_count + S.mention_count
+        WHEN NOT MATCHED THEN
+            INSERT (username, mention_count) VALUES (S.username, S.mention_count)
+    """
+
+    return [daily_user_counts, emoji_counts, mention_counts]
+
+
+def run_in_transaction(
+    client: bigquery.Client,
+    statements: List[str],
+    job_config: Optional[bigquery.QueryJobConfig] = None
+) -> None:
+    """
+    Runs statements as one multi-statement transaction, so the rollups never diverge from each other.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        statements (List[str]): The DML statements to run.
+        job_config (Optional[bigquery.QueryJobConfig], optional): Configuration of the script
+            (e.g. query parameters used by the statements). Defaults to None.
+
+    Raises:
+        Exception: For errors during the script execution (the transaction is rolled back).
+    """
+
+    script = ';\n'.join(['BEGIN TRANSACTION', *statements, 'COMMIT TRANSACTION']) + ';'
+    client.query(script, job_config=job_config).result()
+
+
+def guarded_by_load_id(dataset_name: str, statements: List[str]) -> str:
+    """
+    Wraps statements so they only run for a load id missing from the ledger, and records it.
+
+    The load id is read from the `@rollup_load_id` query parameter (see `with_load_id`).
+
+    Args:
+        dataset_name (str): Name of the dataset holding the ledger.
+        statements (List[str]): The statements adding one load to the tables.
+
+    Returns:
+        str: A single IF statement, to be run inside a transaction.
+    """
+
+    ledger = f'`{dataset_name}.{ROLLUP_LOADS_TABLE}`'
+    record = f'INSERT INTO {ledger} (load_id, loaded_at) VALUES (@rollup_load_id, CURRENT_TIMESTAMP())'
+    body = ';\n'.join([*statements, record])
+    return f'IF NOT EXISTS (SELECT 1 FROM {ledger} WHERE load_id = @rollup_load_id) THEN\n{body};\nEND IF'
+
+
+def with_load_id(job_config: Optional[bigquery.QueryJobConfig], load_id: str) -> bigquery.QueryJobConfig:
+    """Returns a copy of a script configuration with the `@rollup_load_id` parameter added."""
+
+    parameters = list(job_config.query_parameters) if job_config is not None else []
+    parameters.append(bigquery.ScalarQueryParameter('rollup_load_id', 'STRING', load_id))
+    return bigquery.QueryJobConfig(query_parameters=parameters)
+
+
+def update_rollups(
+    client: bigquery.Client,
+    dataset_name: str,
+    staging_table_name: str,
+    load_id: str,
+    extra_statements: Optional[List[str]] = None,
+    job_config: Optional[bigquery.QueryJobConfig] = None
+) -> None:
+    """
+    Adds the tweets of a newly loaded file (held in a staging table) to the rollups.
+
+    Only the staging table is scanned, so the cost of an update depends on the size of
+    the new file rather than on the whole tweets table.
+
+    Updates are keyed by `load_id`: the ledger table records it in the same transaction,
+    and a load id already in the ledger adds nothing, so reloading the same data (or
+    rerunning after a failure) never counts it twice.
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        dataset_name (str): Name of the dataset holding the tables.
+        staging_table_name (str): Table holding only the newly loaded tweets.
+        load_id (str): Deterministic id of the loaded data (e.g. its URI and generation).
+        extra_statements (Optional[List[str]], optional): Statements committed in the same
+            transaction and skipped with the merges for a known load id (e.g. the insert
+            into the tweets table or a load watermark update). Defaults to None.
+        job_config (Optional[bigquery.QueryJobConfig], optional): Configuration of the script. Defaults to None.
+
+    Raises:
+        Exception: For unexpected errors during the update.
+    """
+
+    create_rollup_tables(client, dataset_name)
+    try:
+        statements = rollup_merge_statements(dataset_name, staging_table_name) + (extra_statements or [])
+        run_in_transaction(client, [guarded_by_load_id(dataset_name, statements)], with_load_id(job_config, load_id))
+        logging.info(f"Rollups of dataset '{dataset_name}' updated from table '{staging_table_name}' (load '{load_id}').")
+    except Exception as e:
+        logging.error(f"Error updating rollups from table '{staging_table_name}': {e}")
+        raise
+
+
+def rebuild_rollups(client: bigquery.Client, dataset_name: str, table_name: str) -> None:
+    """
+    Recomputes the rollups from scratch from the full tweets table (backfill or repair).
+
+    Args:
+        client (bigquery.Client): BigQuery client object.
+        dataset_name (str): Name of the dataset holding the tables.
+        table_name (str): Name of the tweets table.
+
+    Raises:
+        Exception: For unexpected errors during the rebuild.
+    """
+
+    create_rollup_tables(client, dataset_name)
+    clear_statements = [f'DELETE FROM `{dataset_name}.{name}` WHERE TRUE' for name in ROLLUP_SCHEMAS]
+    try:
+        run_in_transaction(client, clear_statements + rollup_merge_statements(dataset_name, table_name))
+        logging.info(f"Rollups of dataset '{dataset_name}' rebuilt from table '{table_name}'.")
+    except Exception as e:
+        logging.error(f"Error rebuilding rollups from table '{table_name}': {e}")
+        raise
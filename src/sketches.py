@@ -0,0 +1,204 @@
+import heapq  # For finding the least counted monitored item
+import itertools  # For heap entry tie-breaking
+from typing import Any, Dict, Hashable, ItemsView, Iterable, List, Mapping, Tuple, Union  # For type annotations
+
+# Number of heap entries per monitored item before the heap is rebuilt from the live counts
+HEAP_COMPACTION_FACTOR: int = 4
+
+
+class SpaceSaving:
+    """Space-Saving summary: approximate top-K counts in a fixed amount of memory.
+
+    At most `capacity` items are monitored. An unmonitored item replaces the least counted
+    one and inherits its count as a possible overestimate, recorded as the item's error.
+    For every monitored item, `count - error <= true count <= count`; an unmonitored item
+    occurred at most `min_count()` times; and every error is at most `total / capacity`.
+    Any item occurring more than `total / capacity` times is guaranteed to be monitored.
+
+    Summaries built on different shards can be merged (`merge`) with the same guarantees.
+    The summary mimics the `Counter` methods used by `local.TweetAggregates` (`update`,
+    `items`), so it can replace the exact counters.
+
+    Args:
+        capacity (int): Maximum number of monitored items.
+
+    Raises:
+        ValueError: If the capacity is lower than 1.
+    """
+
+    def __init__(self, capacity: int) -> None:
+        if capacity < 1:
+            raise ValueError("The capacity must be at least 1.")
+        self.capacity = capacity
+        self.total = 0  # Sum of all added weights
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+        self._heap: List[Tuple[int, int, Hashable]] = []  # (count, order, item), stale entries skipped lazily
+        self._order = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.counts
+
+    def __getitem__(self, item: Hashable) -> int:
+        """Returns the estimated (upper bound) count of an item."""
+        return self.estimate(item)[0]
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        del state['_order']  # itertools.count cannot be pickled (summaries travel between processes)
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._order = itertools.count()
+        self._rebuild_heap()
+
+    def is_full(self) -> bool:
+        """Returns True once `capacity` items are monitored (unseen items then evict others)."""
+        return len(self.counts) >= self.capacity
+
+    def _push(self, item: Hashable) -> None:
+        heapq.heappush(self._heap, (self.counts[item], next(self._order), item))
+        if len(self._heap) > HEAP_COMPACTION_FACTOR * self.capacity:
+            self._rebuild_heap()
+
+    def _rebuild_heap(self) -> None:
+        self._heap = [(count, next(self._order), item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+    def _discard_stale_entries(self) -> None:
+        # An entry is live when it holds the current count of a monitored item
+        while self._heap and self.counts.get(self._heap[0][2]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def min_count(self) -> int:
+        """Returns the smallest monitored count (0 until the summary is full).
+
+        It bounds the true count of every unmonitored item.
+        """
+
+        if not self.is_full():
+            return 0
+        self._discard_stale_entries()
+        return self._heap[0][0]
+
+    def add(self, item: Hashable, weight: int = 1) -> None:
+        """Counts `weight` occurrences of an item.
+
+        Args:
+            item (Hashable): The item.
+            weight (int, optional): Number of occurrences. Defaults to 1.
+        """
+
+        self.total += weight
+        count = self.counts.get(item)
+        if count is not None:
+            self.counts[item] = count + weight
+        elif not self.is_full():
+            self.counts[item] = weight
+            self.errors[item] = 0
+        else:
+            # Replace the least counted item, whose count becomes the newcomer's possible overestimate
+            self._discard_stale_entries()
+            min_count, _, min_item = heapq.heappop(self._heap)
+            del self.counts[min_item], self.errors[min_item]
+            self.counts[item] = min_count + weight
+            self.errors[item] = min_count
+        self._push(item)
+
+    def update(self, values: Union['SpaceSaving', Mapping[Hashable, int], Iterable[Hashable]]) -> None:
+        """Adds items like `Counter.update`: one occurrence per item of an iterable, the
+        weights of a mapping, or the counts of another summary (see `merge`)."""
+
+        if isinstance(values, SpaceSaving):
+            self.merge(values)
+        elif isinstance(values, Mapping):
+            for item, weight in values.items():
+                self.add(item, weight)
+        else:
+            for item in values:
+                self.add(item)
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """Adds the counts of another summary (e.g. from another shard) in place.
+
+        Items missing from a full summary are counted with that summary's minimum count,
+        which bounds their true count there, so the error guarantees still hold after the
+        merged items are truncated back to `capacity`.
+
+        Args:
+            other (SpaceSaving): The summary to add.
+
+        Returns:
+            SpaceSaving: This instance, to allow chaining.
+        """
+
+        own_floor, other_floor = self.min_count(), other.min_count()
+        items = list(self.counts) + [item for item in other.counts if item not in self.counts]
+        merged = [
+            (
+                item,
+                self.counts.get(item, own_floor) + other.counts.get(item, other_floor),
+                self.errors.get(item, own_floor) + other.errors.get(item, other_floor),
+            )
+            for item in items
+        ]
+        merged.sort(key=lambda entry: -entry[1])  # Stable, so ties keep a deterministic order
+        kept = merged[:self.capacity]
+
+        self.counts = {item: count for item, count, _ in kept}
+        self.errors = {item: error for item, _, error in kept}
+        self.total += other.total
+        self._rebuild_heap()
+        return self
+
+    def items(self) -> ItemsView:
+        """Returns the (item, estimated count) pairs of the monitored items."""
+        return self.counts.items()
+
+    def estimate(self, item: Hashable) -> Tuple[int, int]:
+        """Returns the estimated count of an item and its maximum overestimate.
+
+        Args:
+            item (Hashable): The item.
+
+        Returns:
+            Tuple[int, int]: (count, error), with `count - error <= true count <= count`.
+        """
+
+        if item in self.counts:
+            return self.counts[item], self.errors[item]
+        floor = self.min_count()
+        return floor, floor
+
+    def top(self, limit: int) -> List[Tuple[Any, int, int]]:
+        """Returns the most counted items with their error bounds.
+
+        Args:
+            limit (int): Number of items to return.
+
+        Returns:
+            List[Tuple[Any, int, int]]: (item, count, error) ordered by count descending,
+            ties ordered by item ascending.
+        """
+
+        ranked = sorted(self.counts.items(), key=lambda entry: (-entry[1], entry[0]))[:limit]
+        return [(item, count, self.errors[item]) for item, count in ranked]
+
+    def is_top_exact(self, limit: int) -> bool:
+        """Returns True if `top(limit)` is guaranteed to hold the true top `limit` items.
+
+        That is the case when the guaranteed count (`count - error`) of every reported item
+        is at least the estimated count of every other item, monitored or not.
+        """
+
+        ranked = sorted(self.counts.values(), reverse=True)
+        top = self.top(limit)
+        if not top:
+            return True
+        lowest_guaranteed = min(count - error for _, count, error in top)
+        highest_other = max(ranked[limit] if len(ranked) > limit else 0, self.min_count())
+        return lowest_guaranteed >= highest_other
@@ -1,7 +1,24 @@
 import logging  # Library for logging events
-from typing import Any  # Library for type annotations
+from typing import Any, List, Optional  # Library for type annotations
 from google.cloud import bigquery  # Library for interacting with BigQuery
 from google.api_core.exceptions import NotFound  # For handling potential resource not found errors (not actively used here)
+import rollups  # Pre-aggregated tables for the top-N questions
+
+# Explicit schema of the projected tweets (see convert.py); required to create a partitioned or clustered table.
+# BigQuery cannot cluster on nested fields, so the author's username is also stored as the top-level `username`
+# (written by convert.py for Parquet files and copied from `user.username` after JSON loads, see fill_username_statement).
+TWEETS_SCHEMA: List[bigquery.SchemaField] = [
+    bigquery.SchemaField('id', 'INT64'),
+    bigquery.SchemaField('date', 'TIMESTAMP'),
+    bigquery.SchemaField('content', 'STRING'),
+    bigquery.SchemaField('username', 'STRING'),
+    bigquery.SchemaField('user', 'RECORD', fields=[bigquery.SchemaField('username', 'STRING')]),
+    bigquery.SchemaField('mentionedUsers', 'RECORD', mode='REPEATED', fields=[bigquery.SchemaField('username', 'STRING')]),
+]
+
+# Default layout of the tweets table: daily partitions on the tweet date, clustered by author
+PARTITION_FIELD: str = 'date'
+CLUSTERING_FIELDS: List[str] = ['username']
 
 # Function for authenticating with BigQuery
 def authenticate_bigquery(project_id: str) -> bigquery.Client:
@@ -67,21 +84,64 @@ def create_dataset(
         logging.error(f"Error creating dataset '{dataset_name}': {e}")
         raise
 
+def build_table(
+    table_ref: bigquery.TableReference,
+    partition_field: Optional[str] = None,
+    clustering_fields: Optional[List[str]] = None,
+    schema: Optional[List[bigquery.SchemaField]] = None
+) -> bigquery.Table:
+    """
+    Builds the definition of a table, optionally partitioned by day and clustered.
+
+    Args:
+        table_ref (bigquery.TableReference): Reference of the table.
+        partition_field (Optional[str], optional): TIMESTAMP/DATE column to partition by day. Defaults to None.
+        clustering_fields (Optional[List[str]], optional): Top-level columns to cluster by. Defaults to None.
+        schema (Optional[List[bigquery.SchemaField]], optional): Explicit schema. Defaults to TWEETS_SCHEMA
+            when partitioning or clustering.
+
+    Returns:
+        bigquery.Table: The table definition.
+    """
+
+    if schema is None and (partition_field or clustering_fields):
+        schema = TWEETS_SCHEMA  # Partitioning and clustering columns must exist on creation
+    table = bigquery.Table(table_ref, schema=schema)
+    if partition_field:
+        table.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY, field=partition_field
+        )
+    if clustering_fields:
+        table.clustering_fields = clustering_fields
+    return table
+
 def create_table(
     client: bigquery.Client,
     dataset_name: str,
     table_name: str,
     mode: str = "create",  # Default mode is "create"
+    partition_field: Optional[str] = None,
+    clustering_fields: Optional[List[str]] = None,
+    schema: Optional[List[bigquery.SchemaField]] = None
 ) -> None:
     """
     Creates a BigQuery table, handling existence checks and potential overwriting.
     Infers table schema from data upon creation.
 
+    With a `partition_field` and/or `clustering_fields`, the table is created with daily time
+    partitioning and clustering (e.g. PARTITION_FIELD and CLUSTERING_FIELDS), so date-bounded
+    queries only scan the partitions they need. Those columns must exist at creation time,
+    so the table then gets an explicit schema (TWEETS_SCHEMA by default).
+
     Args:
         client (bigquery.Client): BigQuery client object.
         dataset_name (str): Name of the dataset containing the table.
         table_name (str): Name of the table to create.
         mode (str, optional): Action to take if the table exists ('create' or 'overwrite'). Defaults to 'create'.
+        partition_field (Optional[str], optional): TIMESTAMP/DATE column to partition by day. Defaults to None.
+        clustering_fields (Optional[List[str]], optional): Top-level columns to cluster by. Defaults to None.
+        schema (Optional[List[bigquery.SchemaField]], optional): Explicit schema. Defaults to TWEETS_SCHEMA
+            when partitioning or clustering, and to an inferred schema otherwise.
 
     Raises:
         Exception: For unexpected errors during table creation, existence check, or overwrite operation.
@@ -102,13 +162,13 @@ def create_table(
             client.delete_table(table_ref)  # Delete the existing table
 
             # Create a new empty table with the same name (schema inferred by BigQuery upon data insertion)
-            table = bigquery.Table(table_ref)
+            table = build_table(table_ref, partition_field, clustering_fields, schema)
             client.create_table(table)
             logging.info(f"Table '{table_name}' overwritten.")
     except NotFound:
         # Table doesn't exist, create it:
         logging.info(f"Table '{table_name}' not found, creating...")
-        table = bigquery.Table(table_ref)
+        table = build_table(table_ref, partition_field, clustering_fields, schema)
         client.create_table(table)
         logging.info(f"Table '{table_name}' created.")
     except Exception as e:
@@ -121,33 +181,83 @@ def load_data_from_storage(
     source_uri: str,
     dataset_name: str,
     table_name: str,
-    json_file_name: str
+    json_file_name: str,
+    update_rollups: bool = False,
+    source_format: str = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON,
+    partition_field: Optional[str] = None,
+    clustering_fields: Optional[List[str]] = None,
+    load_id: Optional[str] = None
 ) -> None:
     """
     Loads newline-delimited JSON data from Cloud Storage to a BigQuery table.
     Infers table schema from data and ignores unknown values.
 
+    With `source_format=bigquery.SourceFormat.PARQUET`, loads the column-projected file
+    written by `convert.convert_blob_to_parquet` instead; its schema is explicit, and list
+    inference keeps `mentionedUsers` a repeated record so the queries run unchanged.
+
+    When `update_rollups` is set, the file is loaded into a staging table instead (load jobs
+    are free), then appended to the table and merged into the rollup tables (see rollups.py)
+    in one transaction keyed by `load_id`, so the *_rollup questions of queries.py stay up to
+    date without rescanning the tweets table, and loading the same load id twice adds nothing.
+
+    Every call loads the whole file; `incremental.load_new_data_from_storage` appends only
+    the rows added since the previous load.
+
+    `partition_field`/`clustering_fields` give the table created by the load the same layout
+    as `create_table` (they must match an existing table). JSON files are then loaded with
+    TWEETS_SCHEMA instead of autodetection, and the top-level `username` clustering column
+    (only present in Parquet files) is then copied from `user.username`.
+
     Args:
         client (bigquery.Client): BigQuery client object.
         source_uri (str): URI of the data file in Cloud Storage (excluding the filename).
         dataset_name (str): Name of the dataset containing the table.
         table_name (str): Name of the table to load data into.
-        json_file_name (str): Name of the JSON file in the bucket.
+        json_file_name (str): Name of the JSON (or Parquet) file in the bucket.
+        update_rollups (bool, optional): Whether to update the rollup tables with the loaded file. Defaults to False.
+        source_format (str, optional): Format of the file (NEWLINE_DELIMITED_JSON or PARQUET). Defaults to NEWLINE_DELIMITED_JSON.
+        partition_field (Optional[str], optional): TIMESTAMP column to partition by day. Defaults to None.
+        clustering_fields (Optional[List[str]], optional): Top-level columns to cluster by. Defaults to None.
+        load_id (Optional[str], optional): Id of the loaded data for the rollups; pass a new one (e.g. the
+            URI and object generation) when a file is replaced in place. Defaults to the full source URI.
 
     Raises:
-        Exception: For unexpected errors during data loading.
+        Exception: For unexpected errors during data loading or rollup maintenance.
     """
 
     job_config = bigquery.LoadJobConfig()
 
     # Set job configuration properties (type hints for these properties are not supported):
-    job_config.source_format = bigquery.SourceFormat.NEWLINE_DELIMITED_JSON  # Specify data format
-    job_config.autodetect = True  # Auto-detect schema from data
-    job_config.ignore_unknown_values = True  # Ignore unknown values during loading
+    job_config.source_format = source_format  # Specify data format
+    if source_format == bigquery.SourceFormat.PARQUET:
+        parquet_options = bigquery.ParquetOptions()
+        parquet_options.enable_list_inference = True  # Load LIST columns as REPEATED fields
+        job_config.parquet_options = parquet_options  # The schema is read from the Parquet file
+    elif partition_field or clustering_fields:
+        job_config.schema = TWEETS_SCHEMA  # Layout columns must match the partitioned table
+        job_config.ignore_unknown_values = True  # Ignore fields outside the schema during loading
+    else:
+        job_config.autodetect = True  # Auto-detect schema from data
+        job_config.ignore_unknown_values = True  # Ignore unknown values during loading
+
+    if partition_field:
+        job_config.time_partitioning = bigquery.TimePartitioning(
+            type_=bigquery.TimePartitioningType.DAY, field=partition_field
+        )
+    if clustering_fields:
+        job_config.clustering_fields = clustering_fields
 
     # Construct the full URI for the JSON file:
     full_source_uri = source_uri + json_file_name
 
+    if update_rollups:
+        load_through_staging_table(
+            client, full_source_uri, dataset_name, table_name, job_config,
+            load_id or full_source_uri, partition_field, clustering_fields
+        )
+        return
+
     # Initiate the load job:
     load_job = client.load_table_from_uri(
         full_source_uri,  # Load from the full URI
@@ -157,7 +267,83 @@ def load_data_from_storage(
 
     try:
         load_job.result()  # Wait for the load job to complete
+        if job_config.schema == TWEETS_SCHEMA:
+            client.query(fill_username_statement(dataset_name, table_name)).result()  # JSON has no top-level username
         logging.info(f"Data loaded from '{full_source_uri}' to table '{dataset_name}.{table_name}'.")
     except Exception as e:
         logging.error(f"Error loading data: {e}")
         raise
+
+def fill_username_statement(dataset_name: str, table_name: str) -> str:
+    """
+    Builds the UPDATE copying the author's username to the top-level `username` column where a load left it NULL.
+
+    JSON tweets only have `user.username`, so without it the rows loaded from JSON files
+    would all share a NULL clustering value.
+
+    Args:
+        dataset_name (str): Name of the dataset containing the table.
+        table_name (str): Name of the table with a `username` column.
+
+    Returns:
+        str: The UPDATE statement (a no-op for rows already filled).
+    """
+
+    return (
+        f'UPDATE `{dataset_name}.{table_name}` SET username = user.username '
+        f'WHERE username IS NULL AND user.username IS NOT NULL'
+    )
+
+def select_expression(field: bigquery.SchemaField, field_names: List[str]) -> str:
+    """Returns the SELECT expression copying a staging column, filling `username` from `user.username`."""
+
+    if field.name == 'username' and 'user' in field_names:
+        return 'COALESCE(`username`, `user`.username) AS `username`'
+    return f'`{field.name}`'
+
+def load_through_staging_table(
+    client: bigquery.Client,
+    full_source_uri: str,
+    dataset_name: str,
+    table_name: str,
+    job_config: bigquery.LoadJobConfig,
+    load_id: str,
+    partition_field: Optional[str] = None,
+    clustering_fields: Optional[List[str]] = None
+) -> None:
+    """
+    Loads a file into the staging table, then appends it to the table and the rollups in one transaction.
+
+    The append is an INSERT of the staging columns (created from the staging schema if the
+    table does not exist yet, with `username` filled from `user.username`), committed together with the rollup MERGEs and keyed by
+    `load_id` (see `rollups.update_rollups`), so a failed run leaves neither table changed
+    and reloading the same load id changes nothing.
+
+    Raises:
+        Exception: For unexpected errors during the staging load or the transaction.
+    """
+
+    # Load the file alone into the staging table, replacing the previous file:
+    staging_table_name = table_name + rollups.STAGING_TABLE_SUFFIX
+    staging_ref = client.dataset(dataset_name).table(staging_table_name)
+    job_config.write_disposition = bigquery.WriteDisposition.WRITE_TRUNCATE
+    staging_job = client.load_table_from_uri(full_source_uri, staging_ref, job_config=job_config)
+    try:
+        staging_job.result()
+    except Exception as e:
+        logging.error(f"Error loading data to staging table '{staging_table_name}': {e}")
+        raise
+
+    staging_schema = client.get_table(staging_ref).schema
+    table = build_table(client.dataset(dataset_name).table(table_name), partition_field, clustering_fields, staging_schema)
+    client.create_table(table, exists_ok=True)
+
+    field_names = [field.name for field in staging_schema]
+    columns = ', '.join(f'`{name}`' for name in field_names)
+    expressions = ', '.join(select_expression(field, field_names) for field in staging_schema)
+    insert_statement = (
+        f'INSERT INTO `{dataset_name}.{table_name}` ({columns}) '
+        f'SELECT {expressions} FROM `{dataset_name}.{staging_table_name}`'
+    )
+    rollups.update_rollups(client, dataset_name, staging_table_name, load_id, [insert_statement])
+    logging.info(f"Data loaded from '{full_source_uri}' to table '{dataset_name}.{table_name}' with its rollups.")
@@ -0,0 +1,209 @@
+import argparse  # For the command line interface
+import datetime  # For tweet dates
+import itertools  # For cumulative weights
+import json  # For writing NDJSON records
+import math  # For Poisson sampling
+import random  # For reproducible pseudo-random sampling
+from collections import Counter  # For per-day user counts
+from typing import Any, Dict, List, Optional, TextIO  # For type annotations
+
+# Emoji palette covering every kind of sequence matched by queries.top_emojis
+EMOJI_PALETTE: List[str] = [
+    '\U0001F64F', '❤️', '\U0001F69C', '\U0001F1EE\U0001F1F3', '\U0001F621',
+    '\U0001F44D', '\U0001F33E', '\U0001F4AA', '✊', '\U0001F602',
+    '❤', '\U0001F525', '\U0001F447', '\U0001F622', '✅',
+    '⚠️', '©️', '1️⃣', '#️⃣', '\U0001F914',
+]
+
+# Filler words for tweet contents
+WORDS: List[str] = [
+    'farmers', 'protest', 'support', 'India', 'Delhi', 'laws', 'kisan', '#FarmersProtest',
+    'stand', 'with', 'the', 'we', 'rights', 'justice', 'government', 'ਕਿਸਾਨ', 'किसान',
+]
+
+# First id of the generated tweets (realistic 19-digit tweet ids)
+FIRST_TWEET_ID: int = 1_360_000_000_000_000_000
+
+# Number of lines buffered before each write
+WRITE_BATCH_SIZE: int = 10_000
+
+
+def zipf_cumulative_weights(size: int, skew: float) -> List[float]:
+    """Returns the cumulative Zipf weights 1/rank^skew for ranks 1..size."""
+
+    return list(itertools.accumulate(1.0 / rank ** skew for rank in range(1, size + 1)))
+
+
+def poisson(rng: random.Random, mean: float) -> int:
+    """Samples a Poisson-distributed count (Knuth's algorithm, suited to small means)."""
+
+    if mean <= 0:
+        return 0
+    threshold, count, product = math.exp(-mean), 0, rng.random()
+    while product > threshold:
+        count += 1
+        product *= rng.random()
+    return count
+
+
+def rows_per_day(rows: int, days: int, rng: random.Random, skew: float = 0.8) -> List[int]:
+    """Splits the rows over the days with Zipf-skewed volumes in a random day order.
+
+    Args:
+        rows (int): Total number of rows.
+        days (int): Number of days.
+        rng (random.Random): Seeded random generator.
+        skew (float, optional): Zipf exponent of the daily volumes. Defaults to 0.8.
+
+    Returns:
+        List[int]: Number of rows for each day, summing to `rows`.
+
+    Raises:
+        ValueError: If `days` is below 1 or `rows` is negative.
+    """
+
+    if days < 1:
+        raise ValueError(f"days must be at least 1, got {days}.")
+    if rows < 0:
+        raise ValueError(f"rows must not be negative, got {rows}.")
+    weights = [1.0 / rank ** skew for rank in range(1, days + 1)]
+    rng.shuffle(weights)
+    total = sum(weights)
+    counts = [int(rows * weight / total) for weight in weights]
+    for day in range(rows - sum(counts)):  # Distribute the rounding remainder
+        counts[day % days] += 1
+    return counts
+
+
+def generate_tweets(
+    output: TextIO,
+    rows: int = 100_000,
+    start_date: datetime.date = datetime.date(2021, 2, 12),
+    days: int = 12,
+    users: int = 10_000,
+    mentioned_users: int = 5_000,
+    user_skew: float = 1.1,
+    mention_skew: float = 1.2,
+    emoji_skew: float = 1.0,
+    emoji_density: float = 0.8,
+    mention_rate: float = 1.0,
+    tie_days: int = 1,
+    seed: int = 42,
+) -> int:
+    """Writes a synthetic NDJSON tweet corpus with the fields read by the queries.
+
+    Each record has `id`, `date`, `content` (words, @mentions and emojis), `user.username`
+    and `mentionedUsers[].username`. Authors, mentioned users and emojis follow Zipf
+    distributions, daily volumes are skewed, and the output only depends on the arguments.
+
+    Deliberate ties: on each of the first `tie_days` days, extra tweets are appended so that
+    the day's most active user is tied with another user whose username comes first
+    alphabetically, exercising the alphabetical tie-break of q1.
+
+    Args:
+        output (TextIO): Text stream the NDJSON lines are written to.
+        rows (int, optional): Number of regular tweets (tie padding adds a few more). Defaults to 100,000.
+        start_date (datetime.date, optional): First day of the corpus. Defaults to 2021-02-12.
+        days (int, optional): Number of days spanned. Defaults to 12.
+        users (int, optional): Number of distinct authors. Defaults to 10,000.
+        mentioned_users (int, optional): Number of distinct mentionable users. Defaults to 5,000.
+        user_skew (float, optional): Zipf exponent of the authors. Defaults to 1.1.
+        mention_skew (float, optional): Zipf exponent of the mentioned users. Defaults to 1.2.
+        emoji_skew (float, optional): Zipf exponent of the emoji palette. Defaults to 1.0.
+        emoji_density (float, optional): Mean number of emojis per tweet. Defaults to 0.8.
+        mention_rate (float, optional): Mean number of mentions per tweet. Defaults to 1.0.
+        tie_days (int, optional): Number of days with a tied top user. Defaults to 1.
+        seed (int, optional): Seed of the random generator. Defaults to 42.
+
+    Returns:
+        int: The number of tweets written.
+
+    Raises:
+        ValueError: If `days`, `users` or `mentioned_users` is below 1 or `rows` is negative
+            (checked before anything is written).
+    """
+
+    if users < 1 or mentioned_users < 1:
+        raise ValueError(f"users and mentioned_users must be at least 1, got {users} and {mentioned_users}.")
+    rng = random.Random(seed)
+    user_names = [f'user{rank:07d}' for rank in range(1, users + 1)]
+    mention_names = [f'mention{rank:07d}' for rank in range(1, mentioned_users + 1)]
+    user_weights = zipf_cumulative_weights(users, user_skew)
+    mention_weights = zipf_cumulative_weights(mentioned_users, mention_skew)
+    emoji_weights = zipf_cumulative_weights(len(EMOJI_PALETTE), emoji_skew)
+
+    tweet_id = FIRST_TWEET_ID
+    written = 0
+    batch: List[str] = []
+
+    def write(username: str, day: datetime.date) -> None:
+        nonlocal tweet_id, written
+        mentions = rng.choices(mention_names, cum_weights=mention_weights, k=poisson(rng, mention_rate))
+        emojis = rng.choices(EMOJI_PALETTE, cum_weights=emoji_weights, k=poisson(rng, emoji_density))
+        words = rng.choices(WORDS, k=rng.randint(3, 12))
+        content = ' '.join(words + [f'@{mention}' for mention in mentions] + emojis)
+        seconds = rng.randrange(24 * 60 * 60)
+        tweet: Dict[str, Any] = {
+            'id': tweet_id,
+            'date': f'{day.isoformat()}T{seconds // 3600:02d}:{seconds // 60 % 60:02d}:{seconds % 60:02d}+00:00',
+            'content': content,
+            'user': {'username': username},
+            'mentionedUsers': [{'username': mention} for mention in mentions] or None,
+        }
+        batch.append(json.dumps(tweet, ensure_ascii=False))
+        if len(batch) >= WRITE_BATCH_SIZE:
+            output.write('\n'.join(batch) + '\n')
+            batch.clear()
+        tweet_id += 1
+        written += 1
+
+    for day_index, day_rows in enumerate(rows_per_day(rows, days, rng)):
+        day = start_date + datetime.timedelta(days=day_index)
+        day_user_counts: Counter = Counter()
+        for username in rng.choices(user_names, cum_weights=user_weights, k=day_rows):
+            day_user_counts[username] += 1
+            write(username, day)
+
+        if day_index < tie_days and day_user_counts:
+            # Tie the top user with a user that wins the alphabetical tie-break
+            top_user, top_count = day_user_counts.most_common(1)[0]
+            challenger = f'{top_user[:-1]}!'  # '!' sorts before every alphanumeric character
+            for _ in range(top_count):
+                write(challenger, day)
+
+    if batch:
+        output.write('\n'.join(batch) + '\n')
+    return written
+
+
+def main() -> None:
+    """Writes a synthetic corpus from the command line."""
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic NDJSON tweets corpus.")
+    parser.add_argument('output_path', help="Path of the NDJSON file to write.")
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--start-date', type=datetime.date.fromisoformat, default=datetime.date(2021, 2, 12))
+    parser.add_argument('--days', type=int, default=12)
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--mentioned-users', type=int, default=5_000)
+    parser.add_argument('--user-skew', type=float, default=1.1)
+    parser.add_argument('--mention-skew', type=float, default=1.2)
+    parser.add_argument('--emoji-skew', type=float, default=1.0)
+    parser.add_argument('--emoji-density', type=float, default=0.8)
+    parser.add_argument('--mention-rate', type=float, default=1.0)
+    parser.add_argument('--tie-days', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    if args.days < 1 or args.rows < 0 or args.users < 1 or args.mentioned_users < 1:
+        parser.error("--days, --users and --mentioned-users must be at least 1 and --rows not negative.")
+
+    options: Dict[str, Any] = vars(args).copy()
+    output_path: Optional[str] = options.pop('output_path')
+    with open(output_path, 'w', encoding='utf-8') as output:
+        written = generate_tweets(output, **options)
+    print(f"{written} tweets written to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+import unittest
+import json
+import os
+import tempfile
+
+from benchmark import build_scaled_dataset, compare_reports, run_benchmarks
+
+class TestBuildScaledDataset(unittest.TestCase):
+
+    def test_build_scaled_dataset_repeats_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            source_path = os.path.join(directory, 'tweets.json')
+            with open(source_path, 'w') as file:
+                file.write('{"id": 1}\n{"id": 2}')  # No trailing newline
+
+            # Act
+            scaled_path = build_scaled_dataset(source_path, 3, os.path.join(directory, 'data'))
+
+            # Assert
+            with open(scaled_path) as file:
+                self.assertEqual(file.read().splitlines(), ['{"id": 1}', '{"id": 2}'] * 3)
+            self.assertEqual(build_scaled_dataset(source_path, 1, directory), source_path)
+
+class TestCompareReports(unittest.TestCase):
+
+    def test_compare_reports_flags_regressions_above_tolerance(self):
+        # Arrange
+        baseline = {'results': [{'variant': 'q1_time', 'scale': 1, 'wall_seconds': 1.0, 'peak_rss_bytes': 100}]}
+        current = {'results': [
+            {'variant': 'q1_time', 'scale': 1, 'wall_seconds': 1.5, 'peak_rss_bytes': 105},
+            {'variant': 'q2_time', 'scale': 1, 'wall_seconds': 9.0},
+        ]}
+
+        # Act
+        result = compare_reports(baseline, current, tolerance=0.10)
+
+        # Assert
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]['metric'], 'wall_seconds')
+        self.assertAlmostEqual(result[0]['change'], 0.5)
+
+class TestRunBenchmarks(unittest.TestCase):
+
+    def test_run_benchmarks_measures_each_variant_and_scale(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            source_path = os.path.join(directory, 'tweets.json')
+            with open(source_path, 'w', encoding='utf-8') as file:
+                file.write(json.dumps({"id": 1, "date": "2021-02-24T09:23:35+00:00", "content": "🚜",
+                                       "user": {"username": "a"}, "mentionedUsers": [{"username": "b"}]}) + '\n')
+
+            # Act
+            report = run_benchmarks(source_path, scales=[1, 2], variants=['q2_time'])
+
+        # Assert
+        self.assertEqual([(r['variant'], r['scale'], r['rows']) for r in report['results']],
+                         [('q2_time', 1, 1), ('q2_time', 2, 1)])
+        for metric in ('wall_seconds', 'cpu_seconds', 'peak_rss_bytes', 'traced_peak_bytes'):
+            self.assertGreater(report['results'][0][metric], 0)
+
+if __name__ == '__main__':
+    unittest.main()
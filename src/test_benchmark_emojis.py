@@ -0,0 +1,27 @@
+import unittest
+from unittest.mock import patch
+
+from benchmark_emojis import benchmark_emoji_extraction
+
+class TestBenchmarkEmojiExtraction(unittest.TestCase):
+
+    def test_benchmark_emoji_extraction_reports_both_extractors(self):
+        # Arrange
+        texts = ["Farmers ❤️ protest 🚜🇮🇳", "plain text", "#️⃣ keycap"]
+
+        # Act
+        result = benchmark_emoji_extraction(texts, repeat=1)
+
+        # Assert
+        self.assertEqual(result['texts'], 3)
+        self.assertGreater(result['reference_seconds'], 0)
+        self.assertGreater(result['compiled_seconds'], 0)
+
+    def test_disagreeing_extractors_raise_value_error(self):
+        # Act & Assert
+        with patch('benchmark_emojis.extract_emojis', return_value=[]):
+            with self.assertRaises(ValueError):
+                benchmark_emoji_extraction(["Farmers ❤️"], repeat=1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,36 @@
+import unittest
+import json
+from unittest.mock import patch
+
+from benchmark_json import benchmark_json_decoding
+
+class TestBenchmarkJsonDecoding(unittest.TestCase):
+
+    def test_benchmark_json_decoding_reports_every_backend(self):
+        # Arrange
+        lines = [json.dumps({'id': 1, 'content': 'Farmers ❤️', 'user': {'username': 'alice'}}).encode('utf-8')]
+
+        # Act
+        result = benchmark_json_decoding(lines, repeat=1)
+
+        # Assert
+        self.assertIn('json.loads', result)
+        self.assertIn('json (projected)', result)
+        self.assertEqual(result['json.loads']['speedup'], 1.0)
+
+    def test_disagreeing_backend_raises_value_error(self):
+        # Arrange
+        class DisagreeingDecoder:
+            def __init__(self, backend):
+                self.backend = backend
+
+            def decode(self, line):
+                return self.backend
+
+        # Act & Assert
+        with patch('benchmark_json.TweetDecoder', DisagreeingDecoder):
+            with self.assertRaises(ValueError):
+                benchmark_json_decoding([b'{"id": 1}'], repeat=1)
+
+if __name__ == '__main__':
+    unittest.main()
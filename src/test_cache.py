@@ -0,0 +1,137 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import datetime
+import json
+import os
+import tempfile
+
+import queries
+from cache import QueryResultCache, normalize_query, referenced_tables, table_fingerprint
+
+class TestQueryHelpers(unittest.TestCase):
+
+    def test_normalize_query_collapses_whitespace(self):
+        # Act & Assert
+        self.assertEqual(normalize_query("\n  SELECT a,\n\t b  FROM t \n"), "SELECT a, b FROM t")
+
+    def test_referenced_tables_ignores_ctes(self):
+        # Act
+        result = referenced_tables(queries.top_dates_with_top_users)
+
+        # Assert
+        self.assertEqual(result, ['tweets_dataset.tweets'])
+
+    def test_table_fingerprint_uses_metadata(self):
+        # Arrange
+        client = MagicMock()
+        client.get_table.return_value = MagicMock(modified=datetime.datetime(2024, 1, 1), num_rows=42)
+
+        # Act
+        result = table_fingerprint(client, queries.top_emojis)
+
+        # Assert
+        self.assertEqual(result, 'tweets_dataset.tweets:2024-01-01T00:00:00:42')
+        client.get_table.assert_called_once_with('tweets_dataset.tweets')
+
+class TestQueryResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_put_and_get(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name)
+        key = cache.make_key("SELECT 1", "fingerprint")
+
+        # Act
+        cache.put(key, [(datetime.date(2021, 2, 12), 'user')])
+
+        # Assert
+        self.assertEqual(cache.get(key), [(datetime.date(2021, 2, 12), 'user')])
+        self.assertIsNone(cache.get(cache.make_key("SELECT 1", "changed")))
+
+    def test_entries_are_stored_as_json(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name)
+
+        # Act
+        cache.put('key', [(datetime.date(2021, 2, 12), 'user'), ('🙏', 5)])
+
+        # Assert
+        with open(os.path.join(self.directory.name, 'key.json'), encoding='utf-8') as file:
+            self.assertEqual(json.load(file)['rows'], [[{'$date': '2021-02-12'}, 'user'], ['🙏', 5]])
+        self.assertEqual(cache.get('key'), [(datetime.date(2021, 2, 12), 'user'), ('🙏', 5)])
+
+    def test_failed_put_leaves_no_temporary_file(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name)
+
+        # Act & Assert
+        with self.assertRaises(TypeError):
+            cache.put('key', [(object(), 1)])  # Not JSON serializable
+        self.assertEqual(os.listdir(self.directory.name), [])
+
+    def test_shared_cache_directories_are_refused(self):
+        # Arrange
+        os.chmod(self.directory.name, 0o777)
+
+        # Act & Assert
+        with self.assertRaises(PermissionError):
+            QueryResultCache(self.directory.name)
+
+    def test_concurrently_evicted_entry_is_still_returned(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name)
+        cache.put('key', [('a', 1)])
+
+        # Act
+        with patch('cache.os.utime', side_effect=FileNotFoundError):
+            rows = cache.get('key')
+
+        # Assert
+        self.assertEqual(rows, [('a', 1)])
+
+    def test_entries_expire_after_ttl(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name, ttl_seconds=10)
+        with patch('cache.time.time', return_value=1000):
+            cache.put('key', [('a', 1)])
+
+        # Act & Assert
+        with patch('cache.time.time', return_value=1005):
+            self.assertEqual(cache.get('key'), [('a', 1)])
+        with patch('cache.time.time', return_value=1011):
+            self.assertIsNone(cache.get('key'))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name, max_entries=2)
+        cache.put('first', [('a', 1)])
+        cache.put('second', [('b', 2)])
+        os.utime(os.path.join(self.directory.name, 'first.json'), (0, 0))
+        os.utime(os.path.join(self.directory.name, 'second.json'), (1, 1))
+        cache.ttl_seconds = float('inf')
+
+        # Act
+        cache.put('third', [('c', 3)])
+
+        # Assert
+        self.assertIsNone(cache.get('first'))
+        self.assertEqual(cache.get('second'), [('b', 2)])
+        self.assertEqual(cache.get('third'), [('c', 3)])
+
+    def test_size_limit_is_enforced(self):
+        # Arrange
+        cache = QueryResultCache(self.directory.name, max_bytes=1)
+
+        # Act
+        cache.put('key', [('a', 1)])
+
+        # Assert
+        self.assertIsNone(cache.get('key'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+from column_cache import ColumnCache
+from local import fused_top_n
+from tweet_fixtures import sample_tweets, write_tweets
+import kernels
+import tweet_store
+
+class TestColumnCache(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, 'cache')
+        self.file_path = os.path.join(self.directory.name, 'tweets.json')
+        self.write_tweets(40)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_tweets(self, count):
+        write_tweets(self.file_path, sample_tweets(count, usernames=['anna', 'mike', None], days=5, mentioned_users=4))
+
+    def test_warm_load_maps_the_same_columns(self):
+        # Arrange
+        cache = ColumnCache(self.cache_dir)
+        built = cache.load_or_build(self.file_path)
+
+        # Act
+        with patch('tweet_store.TweetStore.from_file', wraps=tweet_store.TweetStore.from_file) as mock_from_file:
+            loaded = ColumnCache(self.cache_dir).load_or_build(self.file_path)
+            mock_from_file.assert_not_called()
+
+        # Assert
+        self.assertIsInstance(loaded.ids, memoryview)
+        self.assertEqual(list(loaded.mentions), list(built.mentions))
+        self.assertEqual(loaded.usernames.values, built.usernames.values)
+        self.assertEqual(loaded[4].mentioned_usernames, ['user0'])
+        self.assertEqual(kernels.top_results(loaded), fused_top_n(self.file_path))
+
+    def test_changed_source_is_rebuilt_and_stale_entries_removed(self):
+        # Arrange
+        cache = ColumnCache(self.cache_dir)
+        cache.load_or_build(self.file_path)
+
+        # Act
+        self.write_tweets(50)
+        os.utime(self.file_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        missed = cache.load(self.file_path)
+        store = cache.load_or_build(self.file_path)
+
+        # Assert
+        self.assertIsNone(missed)
+        self.assertEqual(len(store), 50)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_content_hash_survives_touching_the_source(self):
+        # Arrange
+        cache = ColumnCache(self.cache_dir, hash_content=True)
+        cache.load_or_build(self.file_path)
+
+        # Act
+        os.utime(self.file_path, ns=(time.time_ns(), time.time_ns() + 10**9))
+        store = cache.load(self.file_path)
+
+        # Assert
+        self.assertIsNotNone(store)
+        self.assertEqual(len(store), 40)
+
+    def test_entry_without_manifest_is_a_miss(self):
+        # Arrange
+        cache = ColumnCache(self.cache_dir)
+        entry_dir = cache.save(self.file_path, tweet_store.TweetStore.from_file(self.file_path))
+        os.remove(os.path.join(entry_dir, 'manifest.json'))
+
+        # Act
+        store = cache.load(self.file_path)
+
+        # Assert
+        self.assertIsNone(store)
+
+    def test_shared_cache_directory_is_refused(self):
+        # Arrange
+        os.makedirs(self.cache_dir)
+        os.chmod(self.cache_dir, 0o777)
+
+        # Act & Assert
+        with self.assertRaises(PermissionError):
+            ColumnCache(self.cache_dir)
+
+    def test_new_cache_directory_is_private(self):
+        # Act
+        ColumnCache(self.cache_dir)
+
+        # Assert
+        self.assertEqual(os.stat(self.cache_dir).st_mode & 0o777, 0o700)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,17 @@
 import unittest
 from unittest.mock import MagicMock, patch
 from google.cloud import storage
-from common import extract_zip_file_conditionally, dummy_function
+import io
+import zipfile
+from common import extract_zip_file_conditionally, dummy_function, ZIP_CRC32_METADATA_KEY
+
+def build_zip(file_name, content):
+    """Returns an in-memory ZIP archive with a single member."""
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, 'w') as z:
+        z.writestr(file_name, content)
+    archive.seek(0)
+    return archive
 
 class TestExtractZipFileConditionally(unittest.TestCase):
 
@@ -26,6 +36,47 @@ class TestExtractZipFileConditionally(unittest.TestCase):
             mock_print.assert_called_once_with(f"ZIP file '{zip_file_name}' does not exist in bucket '{bucket.name}'.")
             self.assertFalse(result)
 
+    def test_extract_zip_file_conditionally_skips_matching_member_using_metadata(self):
+        # Arrange
+        content = b'{"id": 1}\n'
+        archive = build_zip('tweets.json', content)
+        crc32 = str(zipfile.ZipFile(archive).getinfo('tweets.json').CRC)
+        archive.seek(0)
+
+        zip_blob = MagicMock()
+        zip_blob.open.return_value = archive
+        json_blob = MagicMock(size=len(content), metadata={ZIP_CRC32_METADATA_KEY: crc32})
+        bucket = MagicMock(spec=storage.Bucket)
+        bucket.get_blob.side_effect = [zip_blob, json_blob]
+
+        # Act
+        result = extract_zip_file_conditionally(bucket, 'raw', 'tweets.json.zip')
+
+        # Assert
+        self.assertEqual(result, 'tweets.json')
+        json_blob.download_as_string.assert_not_called()
+        bucket.blob.assert_not_called()
+
+    def test_extract_zip_file_conditionally_streams_changed_member(self):
+        # Arrange
+        content = b'{"id": 1}\n'
+        zip_blob = MagicMock()
+        zip_blob.open.return_value = build_zip('tweets.json', content)
+        stale_blob = MagicMock(size=len(content), metadata={ZIP_CRC32_METADATA_KEY: '0'})
+        bucket = MagicMock(spec=storage.Bucket)
+        bucket.get_blob.side_effect = [zip_blob, stale_blob]
+        uploaded = {}
+        bucket.blob.return_value.upload_from_file.side_effect = lambda file, size: uploaded.update(data=file.read(), size=size)
+
+        # Act
+        result = extract_zip_file_conditionally(bucket, 'raw', 'tweets.json.zip', chunk_size=256 * 1024)
+
+        # Assert
+        self.assertEqual(result, 'tweets.json')
+        zip_blob.open.assert_called_once_with('rb', chunk_size=256 * 1024)
+        bucket.blob.assert_called_once_with('raw/tweets.json', chunk_size=256 * 1024)
+        self.assertEqual(uploaded, {'data': content, 'size': len(content)})
+
     # Add more test cases for different scenarios
 
 class TestDummyFunction(unittest.TestCase):
@@ -0,0 +1,123 @@
+import unittest
+from unittest.mock import MagicMock
+import datetime
+import io
+import json
+import os
+import tempfile
+
+import pyarrow.parquet as pq
+
+from convert import (
+    SOURCE_GENERATION_METADATA_KEY, convert_blob_to_parquet, convert_file, convert_ndjson_to_parquet,
+    parquet_file_name_for, tweets_schema
+)
+
+TWEETS = [
+    {"id": 1, "date": "2021-02-24T09:23:35+00:00", "content": "Farmers ❤️", "user": {"username": "zoe", "followersCount": 3},
+     "mentionedUsers": [{"username": "narendramodi", "id": 7}], "quotedTweet": {"id": 9, "content": "nested"}},
+    {"id": 2, "date": "2021-02-23T23:30:00-03:00", "content": "late", "user": {"username": "adam"},
+     "mentionedUsers": None},
+]
+
+class NonClosingBytesIO(io.BytesIO):
+    def close(self):
+        pass
+
+class TestConvertNdjsonToParquet(unittest.TestCase):
+
+    def test_convert_projects_columns_with_explicit_schema(self):
+        # Arrange
+        source = io.BytesIO(b''.join(json.dumps(tweet).encode('utf-8') + b'\n' for tweet in TWEETS) + b'\n{bad\n')
+        destination = NonClosingBytesIO()
+
+        # Act
+        result = convert_ndjson_to_parquet(source, destination, batch_size=1)
+
+        # Assert
+        self.assertEqual(result, 2)
+        table = pq.read_table(io.BytesIO(destination.getvalue()))
+        self.assertTrue(table.schema.equals(tweets_schema()))
+        rows = table.to_pylist()
+        self.assertEqual(rows[0]['user'], {'username': 'zoe'})
+        self.assertEqual(rows[0]['mentionedUsers'], [{'username': 'narendramodi'}])
+        self.assertIsNone(rows[1]['mentionedUsers'])
+        self.assertEqual(rows[1]['date'], datetime.datetime(2021, 2, 24, 2, 30, tzinfo=datetime.timezone.utc))
+
+    def test_malformed_dates_become_nulls(self):
+        # Arrange
+        source = io.BytesIO(b'{"id": 1, "date": "yesterday"}\n{"id": 2, "date": "2021-02-24T09:00:00"}\n')
+        destination = NonClosingBytesIO()
+
+        # Act
+        convert_ndjson_to_parquet(source, destination)
+
+        # Assert
+        dates = pq.read_table(io.BytesIO(destination.getvalue())).column('date').to_pylist()
+        self.assertEqual(dates, [None, datetime.datetime(2021, 2, 24, 9, tzinfo=datetime.timezone.utc)])
+
+    def test_convert_file_is_smaller_than_the_source(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            source_path = os.path.join(directory, 'tweets.json')
+            with open(source_path, 'w', encoding='utf-8') as file:
+                for index in range(200):
+                    file.write(json.dumps(dict(TWEETS[0], id=index)) + '\n')
+            destination_path = os.path.join(directory, 'tweets.parquet')
+
+            # Act
+            result = convert_file(source_path, destination_path)
+
+            # Assert
+            self.assertEqual(result, 200)
+            self.assertLess(os.path.getsize(destination_path), os.path.getsize(source_path))
+
+    def test_parquet_file_name_for(self):
+        # Act & Assert
+        self.assertEqual(parquet_file_name_for('tweets.json'), 'tweets.parquet')
+        self.assertEqual(parquet_file_name_for('tweets'), 'tweets.parquet')
+
+class TestConvertBlobToParquet(unittest.TestCase):
+
+    def test_skips_conversion_of_current_generation(self):
+        # Arrange
+        json_blob, parquet_blob = MagicMock(generation=5), MagicMock(metadata={SOURCE_GENERATION_METADATA_KEY: '5'})
+        bucket = MagicMock()
+        bucket.get_blob.side_effect = lambda name: json_blob if name.endswith('.json') else parquet_blob
+
+        # Act
+        result = convert_blob_to_parquet(bucket, 'raw', 'tweets.json')
+
+        # Assert
+        self.assertEqual(result, 'tweets.parquet')
+        json_blob.open.assert_not_called()
+        bucket.blob.assert_not_called()
+
+    def test_converts_and_records_source_generation(self):
+        # Arrange
+        json_blob = MagicMock(generation=6)
+        json_blob.open.return_value = io.BytesIO(json.dumps(TWEETS[0]).encode('utf-8') + b'\n')
+        destination = NonClosingBytesIO()
+        bucket = MagicMock()
+        bucket.get_blob.side_effect = lambda name: json_blob if name.endswith('.json') else None
+        bucket.blob.return_value.open.return_value = destination
+
+        # Act
+        convert_blob_to_parquet(bucket, 'raw', 'tweets.json')
+
+        # Assert
+        bucket.blob.assert_called_once_with('raw/tweets.parquet', chunk_size=unittest.mock.ANY)
+        self.assertEqual(bucket.blob.return_value.metadata, {SOURCE_GENERATION_METADATA_KEY: '6'})
+        self.assertEqual(pq.read_table(io.BytesIO(destination.getvalue())).num_rows, 1)
+
+    def test_missing_json_blob_raises(self):
+        # Arrange
+        bucket = MagicMock()
+        bucket.get_blob.return_value = None
+
+        # Act & Assert
+        with self.assertRaises(FileNotFoundError):
+            convert_blob_to_parquet(bucket, 'raw', 'tweets.json')
+
+if __name__ == '__main__':
+    unittest.main()
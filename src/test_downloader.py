@@ -0,0 +1,194 @@
+import unittest
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from unittest.mock import patch
+
+from downloader import (
+    STATE_SUFFIX, PARTIAL_SUFFIX, RangeFetcher, chunk_ranges, download_drive_file, fetch_concurrently, stream_drive_file
+)
+
+class FakeRequest:
+
+    def __init__(self, drive, result=None):
+        self.drive = drive
+        self.result = result
+        self.headers = {}
+
+    def execute(self, http=None):
+        if self.result is not None:
+            return self.result
+        start, end = (int(value) for value in self.headers['Range'][len('bytes='):].split('-'))
+        with self.drive.lock:
+            self.drive.ranges.append((start, end))
+            self.drive.clients.add(http)
+            if start in self.drive.failures and self.drive.failures[start] > 0:
+                self.drive.failures[start] -= 1
+                raise ConnectionError('Connection reset')
+        return self.drive.content[start:end + 1]
+
+class FakeFiles:
+
+    def __init__(self, drive):
+        self.drive = drive
+
+    def get(self, fileId, fields, supportsAllDrives):
+        md5 = self.drive.md5 or hashlib.md5(self.drive.content).hexdigest()
+        return FakeRequest(self.drive, {'size': str(len(self.drive.content)), 'md5Checksum': md5})
+
+    def get_media(self, fileId, supportsAllDrives):
+        return FakeRequest(self.drive)
+
+class FakeDriveService:
+    """Serves ranged requests over an in-memory file, like the Drive API v3 resource."""
+
+    def __init__(self, content, md5=None, failures=None):
+        self.content = content
+        self.md5 = md5
+        self.failures = dict(failures or {})
+        self.ranges = []
+        self.clients = set()
+        self.lock = threading.Lock()
+
+    def files(self):
+        return FakeFiles(self)
+
+@patch('downloader.time.sleep')
+class TestDownloadDriveFile(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.destination = os.path.join(self.directory.name, 'tweets.json.zip')
+        self.content = os.urandom(1000)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_concurrent_chunks_are_written_in_place(self, mock_sleep):
+        # Arrange
+        service = FakeDriveService(self.content)
+        progress = []
+
+        # Act
+        path = download_drive_file(
+            service, 'file-id', self.destination, chunk_size=64, concurrency=4,
+            progress=lambda done, total: progress.append((done, total)), http_factory=object
+        )
+
+        # Assert
+        with open(path, 'rb') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(sorted(service.ranges), chunk_ranges(1000, 64))
+        self.assertEqual(progress[-1], (1000, 1000))
+        self.assertNotIn(None, service.clients)  # Every thread used its own client
+        self.assertFalse(os.path.exists(self.destination + PARTIAL_SUFFIX))
+        self.assertFalse(os.path.exists(self.destination + STATE_SUFFIX))
+
+    def test_failed_chunks_are_retried(self, mock_sleep):
+        # Arrange
+        service = FakeDriveService(self.content, failures={128: 2})
+
+        # Act
+        download_drive_file(service, 'file-id', self.destination, chunk_size=64, http_factory=object)
+
+        # Assert
+        with open(self.destination, 'rb') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(service.ranges.count((128, 191)), 3)
+
+    def test_interrupted_download_resumes_missing_chunks(self, mock_sleep):
+        # Arrange
+        service = FakeDriveService(self.content, failures={512: 100})
+        with self.assertRaises(ConnectionError):
+            download_drive_file(service, 'file-id', self.destination, chunk_size=64, concurrency=1)
+        with open(self.destination + STATE_SUFFIX) as file:
+            self.assertEqual(json.load(file)['completed'], list(range(0, 512, 64)))
+        resumed = FakeDriveService(self.content)
+
+        # Act
+        download_drive_file(resumed, 'file-id', self.destination, chunk_size=64, http_factory=object)
+
+        # Assert
+        with open(self.destination, 'rb') as file:
+            self.assertEqual(file.read(), self.content)
+        self.assertEqual(min(start for start, _ in resumed.ranges), 512)
+
+    def test_checksum_mismatch_discards_the_download(self, mock_sleep):
+        # Arrange
+        service = FakeDriveService(self.content, md5='0' * 32)
+
+        # Act & Assert
+        with self.assertRaises(Exception) as context:
+            download_drive_file(service, 'file-id', self.destination, chunk_size=64, http_factory=object)
+        self.assertIn('Checksum mismatch', str(context.exception))
+        self.assertFalse(os.path.exists(self.destination))
+        self.assertFalse(os.path.exists(self.destination + PARTIAL_SUFFIX))
+
+    def test_verified_destination_is_not_downloaded_again(self, mock_sleep):
+        # Arrange
+        with open(self.destination, 'wb') as file:
+            file.write(self.content)
+        service = FakeDriveService(self.content)
+
+        # Act
+        download_drive_file(service, 'file-id', self.destination, chunk_size=64, http_factory=object)
+
+        # Assert
+        self.assertEqual(service.ranges, [])
+
+    def test_concurrency_without_an_http_factory_is_rejected(self, mock_sleep):
+        # Arrange
+        service = FakeDriveService(self.content)
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            download_drive_file(service, 'file-id', self.destination, chunk_size=64, concurrency=2)
+        self.assertEqual(service.ranges, [])
+
+class TestStreamDriveFile(unittest.TestCase):
+
+    def test_stream_writes_chunks_in_order(self):
+        # Arrange
+        content = os.urandom(1000)
+        service = FakeDriveService(content)
+        sink = io.BytesIO()
+
+        # Act
+        written = stream_drive_file(service, 'file-id', sink, chunk_size=100, concurrency=3, http_factory=object)
+
+        # Assert
+        self.assertEqual(written, 1000)
+        self.assertEqual(sink.getvalue(), content)
+
+    def test_ranges_beyond_the_window_wait_for_the_first_missing_range(self):
+        # Arrange: the first range is stalled until two later ranges have been consumed
+        service = FakeDriveService(os.urandom(1000))
+        released = threading.Event()
+
+        class StalledFetcher(RangeFetcher):
+            def fetch(self, start, end):
+                if start == 0:
+                    released.wait(timeout=5)
+                return super().fetch(start, end)
+
+        fetcher = StalledFetcher(service, 'file-id', http_factory=object)
+
+        # Act
+        results = fetch_concurrently(fetcher, chunk_ranges(1000, 100), concurrency=3, window=300)
+        first = [next(results)[0], next(results)[0]]
+        requested_while_stalled = sorted(service.ranges)
+        released.set()
+        rest = [byte_range for byte_range, _ in results]
+
+        # Assert
+        self.assertEqual(sorted(first), [(100, 199), (200, 299)])
+        self.assertEqual(requested_while_stalled, [(100, 199), (200, 299)])
+        self.assertEqual(rest[0], (0, 99))
+        self.assertEqual(sorted(first + rest), chunk_ranges(1000, 100))
+
+if __name__ == '__main__':
+    unittest.main()
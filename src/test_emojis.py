@@ -0,0 +1,40 @@
+import unittest
+
+from emojis import EMOJI_RANGES, REFERENCE_PATTERN, extract_emojis
+
+class TestEmojiRangeTable(unittest.TestCase):
+
+    def test_ranges_are_sorted_and_disjoint(self):
+        # Act & Assert
+        for (_, previous_end, _), (start, _, _) in zip(EMOJI_RANGES, EMOJI_RANGES[1:]):
+            self.assertLess(previous_end, start)
+
+class TestExtractEmojis(unittest.TestCase):
+
+    def test_matches_reference_pattern_for_every_codepoint_and_suffix(self):
+        # Arrange: every codepoint up to the last range, alone and followed by the selector/keycap
+        last_codepoint = EMOJI_RANGES[-1][1] + 1
+        for suffix in ('', '\ufe0f', '\u20e3', '\ufe0f\u20e3', '\U0001F1EE', 'x'):
+            text = ''.join(chr(codepoint) + suffix for codepoint in range(1, last_codepoint))
+
+            # Act
+            result = extract_emojis(text)
+
+            # Assert
+            self.assertEqual(result, REFERENCE_PATTERN.findall(text))
+
+    def test_sequences(self):
+        # Act
+        result = extract_emojis("Farmers ❤️ 🇮🇳🇮 #️⃣ 1⃣ ©️ 😀️")
+
+        # Assert
+        self.assertEqual(result, ['❤️', '🇮🇳', '🇮', '#️⃣', '1⃣', '©️', '😀'])
+
+    def test_ascii_and_empty_text(self):
+        # Act & Assert
+        self.assertEqual(extract_emojis("only #ascii 123 *"), [])
+        self.assertEqual(extract_emojis(None), [])
+        self.assertEqual(extract_emojis(""), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,227 @@
+import unittest
+from unittest.mock import MagicMock
+import datetime
+import json
+
+from google.api_core.exceptions import Conflict
+from google.cloud import bigquery
+
+import incremental
+from incremental import Watermark, complete_lines, load_new_data_from_storage, summarize_delta
+
+def tweet_line(tweet_id, date='2021-02-24T09:00:00+00:00'):
+    return (json.dumps({'id': tweet_id, 'date': date, 'content': 'text'}) + '\n').encode('utf-8')
+
+def make_bucket(data):
+    blob = MagicMock()
+    blob.size = len(data)
+    blob.download_as_bytes.side_effect = lambda start, end: data[start:end + 1]
+    bucket = MagicMock()
+    bucket.name = 'test-bucket'
+    bucket.get_blob.return_value = blob
+    return bucket
+
+def make_client(watermark=None):
+    client = MagicMock()
+    statements = []
+
+    def query(sql, job_config=None):
+        statements.append((sql, job_config))
+        job = MagicMock()
+        if 'SELECT byte_offset' in sql and watermark is not None:
+            job.result.return_value = [watermark._asdict()]
+        else:
+            job.result.return_value = []
+        return job
+
+    client.query.side_effect = query
+    return client, statements
+
+def parameters(job_config):
+    return {parameter.name: parameter.value for parameter in job_config.query_parameters}
+
+class TestDeltaHelpers(unittest.TestCase):
+
+    def test_complete_lines_drops_partial_last_line(self):
+        # Act & Assert
+        self.assertEqual(complete_lines(b'a\nb\npart'), b'a\nb\n')
+        self.assertEqual(complete_lines(b'part'), b'')
+
+    def test_summarize_delta(self):
+        # Arrange
+        data = tweet_line(5, '2021-02-24T09:00:00Z') + b'\n' + tweet_line(9, '2021-02-23T09:00:00+00:00') + b'{bad\n'
+
+        # Act
+        rows, max_id, max_date = summarize_delta(data)
+
+        # Assert
+        self.assertEqual(rows, 3)
+        self.assertEqual(max_id, 9)
+        self.assertEqual(max_date, datetime.datetime(2021, 2, 24, 9, tzinfo=datetime.timezone.utc))
+
+class TestLoadNewDataFromStorage(unittest.TestCase):
+
+    def test_first_run_appends_complete_lines_and_records_watermark(self):
+        # Arrange
+        complete = tweet_line(1) + tweet_line(2)
+        bucket = make_bucket(complete + b'{"id": 3, "da')
+        client, statements = make_client()
+
+        # Act
+        result = load_new_data_from_storage(client, bucket, 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        self.assertEqual(result, 2)
+        load_call = client.load_table_from_file.call_args
+        self.assertEqual(load_call.args[0].getvalue(), complete)
+        self.assertEqual(load_call.kwargs['job_config'].write_disposition, bigquery.WriteDisposition.WRITE_APPEND)
+        merge_sql, merge_config = statements[-1]
+        self.assertIn('MERGE', merge_sql)
+        self.assertEqual(parameters(merge_config)['source_uri'], 'gs://test-bucket/raw/tweets.json')
+        self.assertEqual(parameters(merge_config)['previous_offset'], 0)
+        self.assertEqual(parameters(merge_config)['byte_offset'], len(complete))
+        self.assertEqual(parameters(merge_config)['max_id'], 2)
+
+    def test_rerun_without_new_data_loads_nothing(self):
+        # Arrange
+        data = tweet_line(1)
+        bucket = make_bucket(data)
+        client, _ = make_client(Watermark(len(data), 1, 1, None))
+
+        # Act
+        result = load_new_data_from_storage(client, bucket, 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        self.assertEqual(result, 0)
+        client.load_table_from_file.assert_not_called()
+        bucket.get_blob.return_value.download_as_bytes.assert_not_called()
+
+    def test_loads_only_bytes_after_watermark_in_chunks(self):
+        # Arrange
+        old, new = tweet_line(1), tweet_line(2) + tweet_line(3)
+        bucket = make_bucket(old + new)
+        client, statements = make_client(Watermark(len(old), 1, 1, None))
+
+        # Act
+        result = load_new_data_from_storage(
+            client, bucket, 'raw', 'tweets_dataset', 'tweets', 'tweets.json', chunk_size=len(tweet_line(2)) + 5
+        )
+
+        # Assert
+        self.assertEqual(result, 2)
+        loaded = [call.args[0].getvalue() for call in client.load_table_from_file.call_args_list]
+        self.assertEqual(loaded, [tweet_line(2), tweet_line(3)])
+        merges = [parameters(config) for sql, config in statements if 'loaded_rows = @loaded_rows' in sql]
+        self.assertEqual([merge['previous_offset'] for merge in merges], [len(old), len(old + tweet_line(2))])
+        self.assertEqual(merges[-1]['loaded_rows'], 3)
+
+    def test_range_is_planned_before_loading_and_committed_with_an_assert(self):
+        # Arrange
+        data = tweet_line(1)
+        client, statements = make_client()
+
+        # Act
+        load_new_data_from_storage(client, make_bucket(data), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        (plan_sql, plan_config), (commit_sql, _) = statements[-2:]
+        self.assertIn('pending_offset = @byte_offset', plan_sql)
+        self.assertEqual(parameters(plan_config)['byte_offset'], len(data))
+        self.assertTrue(commit_sql.startswith('BEGIN TRANSACTION'))
+        self.assertIn('ASSERT @@row_count = 1', commit_sql)
+        self.assertIn('pending_offset = NULL', commit_sql)
+
+    def test_clustering_username_is_filled_when_the_table_has_it(self):
+        # Arrange
+        client, statements = make_client()
+        client.get_table.return_value.schema = [bigquery.SchemaField('username', 'STRING')]
+
+        # Act
+        load_new_data_from_storage(client, make_bucket(tweet_line(1)), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        commit_sql = statements[-1][0]
+        self.assertIn('SET username = user.username', commit_sql)
+        self.assertLess(commit_sql.index('SET username'), commit_sql.index('MERGE'))
+
+    def test_pending_range_is_reloaded_unchanged_after_the_file_grew(self):
+        # Arrange
+        first, appended = tweet_line(1), tweet_line(2)
+        planned_client, _ = make_client()
+        load_new_data_from_storage(planned_client, make_bucket(first), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+        client, statements = make_client(Watermark(0, 0, None, None, len(first)))
+
+        # Act
+        result = load_new_data_from_storage(
+            client, make_bucket(first + appended), 'raw', 'tweets_dataset', 'tweets', 'tweets.json'
+        )
+
+        # Assert
+        self.assertEqual(result, 2)
+        job_ids = [call.kwargs['job_id'] for call in client.load_table_from_file.call_args_list]
+        self.assertEqual(job_ids[0], planned_client.load_table_from_file.call_args.kwargs['job_id'])
+        self.assertEqual(client.load_table_from_file.call_args_list[0].args[0].getvalue(), first)
+        plans = [parameters(config) for sql, config in statements if 'W.pending_offset IS NULL' in sql]
+        self.assertEqual([plan['previous_offset'] for plan in plans], [len(first)])
+
+    def test_job_ids_are_deterministic_and_conflicts_reuse_the_submitted_job(self):
+        # Arrange
+        data = tweet_line(1)
+        first_client, _ = make_client()
+        load_new_data_from_storage(first_client, make_bucket(data), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+        second_client, statements = make_client()
+        second_client.load_table_from_file.side_effect = Conflict("Already exists")
+        second_client.get_job.return_value.done.return_value = True
+        second_client.get_job.return_value.error_result = None
+
+        # Act
+        load_new_data_from_storage(second_client, make_bucket(data), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        job_id = first_client.load_table_from_file.call_args.kwargs['job_id']
+        second_client.get_job.assert_called_once_with(job_id)
+        second_client.get_job.return_value.result.assert_called_once()
+        self.assertIn('MERGE', statements[-1][0])
+
+    def test_failed_previous_job_is_retried_with_next_attempt_id(self):
+        # Arrange
+        client, _ = make_client()
+        client.load_table_from_file.side_effect = [Conflict("Already exists"), MagicMock()]
+        client.get_job.return_value.done.return_value = True
+        client.get_job.return_value.error_result = {'reason': 'invalid'}
+
+        # Act
+        load_new_data_from_storage(client, make_bucket(tweet_line(1)), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+        # Assert
+        job_ids = [call.kwargs['job_id'] for call in client.load_table_from_file.call_args_list]
+        self.assertTrue(job_ids[0].endswith('_0'))
+        self.assertEqual(job_ids[1], job_ids[0][:-1] + '1')
+
+    def test_rollups_and_watermark_are_updated_in_one_transaction(self):
+        # Arrange
+        client, statements = make_client()
+
+        # Act
+        load_new_data_from_storage(
+            client, make_bucket(tweet_line(1)), 'raw', 'tweets_dataset', 'tweets', 'tweets.json', update_rollups=True
+        )
+
+        # Assert
+        destinations = [call.args[1] for call in client.load_table_from_file.call_args_list]
+        self.assertEqual(len(destinations), 2)
+        script, config = statements[-1]
+        self.assertTrue(script.startswith('BEGIN TRANSACTION'))
+        self.assertIn(f'tweets_dataset.{incremental.WATERMARK_TABLE}', script)
+        self.assertEqual(parameters(config)['byte_offset'], len(tweet_line(1)))
+
+    def test_replaced_source_file_is_rejected(self):
+        # Arrange
+        client, _ = make_client(Watermark(1000, 10, 10, None))
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            load_new_data_from_storage(client, make_bucket(tweet_line(1)), 'raw', 'tweets_dataset', 'tweets', 'tweets.json')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,8 +2,64 @@ import unittest
 from unittest.mock import MagicMock, patch
 from google.cloud import storage
 from io import BytesIO
+import base64
+import hashlib
 
-from ingest import upload_drive_file_to_cloud_storage
+from google.resumable_media.requests import ResumableUpload
+from requests.structures import CaseInsensitiveDict
+import os
+import stat
+import tempfile
+
+from ingest import (
+    RESUMABLE_UPLOAD_SESSION_ATTRIBUTES, ChecksummingReader, attach_resumable_upload, compute_stream_checksums,
+    storage_transport, upload_drive_file_to_cloud_storage, upload_stream_resumable
+)
+
+# Smallest chunk size accepted by resumable uploads
+UPLOAD_CHUNK: int = 256 * 1024
+
+class FakeResponse:
+
+    def __init__(self, status_code, headers=None, body=None):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers or {})
+        self.body = body or {}
+
+    def json(self):
+        return self.body
+
+class FakeResumableSession:
+    """In-memory resumable upload endpoint failing once on the requested chunk request."""
+
+    def __init__(self, fail_on_request=None):
+        self.data = b''
+        self.total = None
+        self.requests = 0
+        self.fail_on_request = fail_on_request
+
+    def persisted(self):
+        if self.total is not None and len(self.data) == self.total:
+            return FakeResponse(200, body={'size': str(self.total)})
+        return FakeResponse(308, {'range': f'bytes=0-{len(self.data) - 1}'} if self.data else {})
+
+    def request(self, method, url, data=None, headers=None, timeout=None):
+        if method == 'POST':
+            self.total = int(headers['x-upload-content-length'])
+            return FakeResponse(200, {'location': 'https://upload/session'})
+        content_range = headers['content-range']
+        if content_range == 'bytes */*':
+            return FakeResponse(308, {'range': f'bytes=0-{len(self.data) - 1}'} if self.data else {})
+        self.requests += 1
+        if self.requests == self.fail_on_request:
+            raise OSError('Connection reset')
+        start = int(content_range.split(' ')[1].split('-')[0])
+        self.data = self.data[:start] + data
+        return self.persisted()
+
+class NonSeekableStream(BytesIO):
+    def seekable(self):
+        return False
 
 class TestUploadDriveFileToCloudStorage(unittest.TestCase):
 
@@ -11,8 +67,8 @@ class TestUploadDriveFileToCloudStorage(unittest.TestCase):
     def test_upload_drive_file_to_cloud_storage_file_already_exists(self, mock_blob):
         # Arrange
         bucket = MagicMock(spec=storage.Bucket)
-        bucket.blob.return_value.exists.return_value = True
-        bucket.blob.return_value.download_as_string.return_value = b'{}'
+        bucket.get_blob.return_value.md5_hash = base64.b64encode(hashlib.md5(b'{}').digest()).decode('ascii')
+        bucket.get_blob.return_value.size = 2
 
         downloaded = BytesIO(b'{}')
         zip_file_name = 'test.zip'
@@ -23,10 +79,139 @@ class TestUploadDriveFileToCloudStorage(unittest.TestCase):
             result = upload_drive_file_to_cloud_storage(bucket, folder_name, downloaded, zip_file_name)
 
             # Assert
-            mock_print.assert_called_once_with(f"File '{zip_file_name}' already exists on cloud storage with exact matching size, skipping upload.")
-            self.assertEqual(result, bucket.blob.return_value)
+            mock_print.assert_called_once_with(f"File '{zip_file_name}' already exists on cloud storage with matching checksum, skipping upload.")
+            self.assertEqual(result, bucket.get_blob.return_value)
+            bucket.get_blob.return_value.download_as_string.assert_not_called()
+
+    def test_upload_drive_file_to_cloud_storage_streams_changed_file(self):
+        # Arrange
+        payload = os.urandom(UPLOAD_CHUNK * 2 + 100)
+        session = FakeResumableSession()
+        bucket = MagicMock(spec=storage.Bucket)
+        bucket.name = 'test-bucket'
+        bucket.client = MagicMock(_http=session)
+        bucket.get_blob.return_value.md5_hash = 'stale'
+        blob = bucket.blob.return_value
+        blob.md5_hash = compute_stream_checksums(BytesIO(payload))[0]
+        stream = NonSeekableStream(payload)
+
+        with patch('builtins.print'), patch('ingest.compute_stream_checksums') as mock_checksums:
+            # Act
+            result = upload_drive_file_to_cloud_storage(bucket, 'raw', stream, 'tweets.json.zip', chunk_size=UPLOAD_CHUNK)
+
+        # Assert
+        self.assertEqual(result, blob)
+        self.assertEqual(session.data, payload)
+        mock_checksums.assert_not_called()  # Sizes differ: the stream is only read by the upload
+
+    def test_upload_drive_file_to_cloud_storage_rejects_unaligned_chunk_size(self):
+        # Arrange
+        bucket = MagicMock(spec=storage.Bucket)
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            upload_drive_file_to_cloud_storage(bucket, 'raw', BytesIO(b'{}'), 'tweets.json.zip', chunk_size=4096)
+        bucket.get_blob.assert_not_called()
+
+    def test_upload_drive_file_to_cloud_storage_resumes_saved_session(self):
+        # Arrange
+        payload = os.urandom(UPLOAD_CHUNK * 3)
+        session = FakeResumableSession(fail_on_request=2)
+        bucket = MagicMock(spec=storage.Bucket)
+        bucket.name = 'test-bucket'
+        bucket.client = MagicMock(_http=session)
+        bucket.get_blob.return_value = None
+        bucket.blob.return_value.md5_hash = compute_stream_checksums(BytesIO(payload))[0]
+
+        with tempfile.TemporaryDirectory() as directory, patch('builtins.print'):
+            state_path = os.path.join(directory, 'upload.json')
+            with patch('ingest.upload_stream_resumable', side_effect=[KeyboardInterrupt]):
+                with self.assertRaises(KeyboardInterrupt):
+                    upload_drive_file_to_cloud_storage(
+                        bucket, 'raw', BytesIO(payload), 'tweets.json.zip', UPLOAD_CHUNK, state_path
+                    )
+            mode = stat.S_IMODE(os.stat(state_path).st_mode)
+            session.data = payload[:UPLOAD_CHUNK]  # The interrupted run persisted one chunk
+
+            # Act
+            upload_drive_file_to_cloud_storage(bucket, 'raw', BytesIO(payload), 'tweets.json.zip', UPLOAD_CHUNK, state_path)
+
+            # Assert
+            self.assertEqual(mode, 0o600)
+            self.assertEqual(session.data, payload)
+            self.assertFalse(os.path.exists(state_path))
 
     # Add more test cases for different scenarios
 
+class TestUploadStreamResumable(unittest.TestCase):
+
+    def test_upload_stream_resumable_resumes_after_interruption(self):
+        # Arrange
+        payload = bytes(range(256)) * 4096
+        session = FakeResumableSession(fail_on_request=3)
+        reader = ChecksummingReader(BytesIO(payload))
+        upload = ResumableUpload('https://upload', UPLOAD_CHUNK)
+        upload.initiate(session, reader, {'name': 'raw/tweets.json.zip'}, 'application/zip', total_bytes=len(payload))
+
+        with patch('builtins.print') as mock_print:
+            # Act
+            upload_stream_resumable(session, upload)
+
+        # Assert
+        self.assertEqual(session.data, payload)
+        self.assertEqual(reader.checksums(), compute_stream_checksums(BytesIO(payload))[:2])
+        mock_print.assert_called_once_with(f'Upload interrupted at byte {2 * UPLOAD_CHUNK}, resuming: Connection reset')
+
+class TestChecksummingReader(unittest.TestCase):
+
+    def test_seek_past_the_end_raises_instead_of_spinning(self):
+        # Arrange
+        reader = ChecksummingReader(BytesIO(b'abc'))
+        reader.seek(10)
+
+        # Act & Assert
+        with self.assertRaises(EOFError):
+            reader.read()
+
+class TestCompatibilityShim(unittest.TestCase):
+
+    def test_private_attributes_exist_in_the_installed_versions(self):
+        # Arrange
+        upload = ResumableUpload('https://upload', UPLOAD_CHUNK)
+
+        # Assert
+        for name in RESUMABLE_UPLOAD_SESSION_ATTRIBUTES:
+            self.assertTrue(hasattr(upload, name), name)
+        self.assertTrue(hasattr(storage.Client, '_http'))
+
+    def test_attach_resumable_upload_recovers_the_saved_session(self):
+        # Arrange
+        payload = os.urandom(UPLOAD_CHUNK * 2)
+        session = FakeResumableSession()
+        session.total, session.data = len(payload), payload[:UPLOAD_CHUNK]
+        reader = ChecksummingReader(BytesIO(payload))
+
+        # Act
+        upload = attach_resumable_upload(session, 'https://upload/session', reader, len(payload), UPLOAD_CHUNK, 'application/zip')
+
+        # Assert
+        self.assertEqual(upload.resumable_url, 'https://upload/session')
+        self.assertEqual(upload.total_bytes, len(payload))
+        self.assertEqual(upload.bytes_uploaded, UPLOAD_CHUNK)
+
+    def test_renamed_private_attributes_raise_runtime_error(self):
+        # Arrange
+        class RenamedUpload:
+            def __init__(self, upload_url, chunk_size):
+                self._session_url = None
+
+        # Act & Assert
+        with patch('ingest.ResumableUpload', RenamedUpload):
+            with self.assertRaises(RuntimeError) as context:
+                attach_resumable_upload(MagicMock(), 'https://upload/session', BytesIO(), 0, UPLOAD_CHUNK, 'application/zip')
+        self.assertIn('google-resumable-media', str(context.exception))
+        with self.assertRaises(RuntimeError):
+            storage_transport(MagicMock(client=MagicMock(_http=None)))
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,170 @@
+import unittest
+import csv
+import json
+import os
+import tempfile
+import tracemalloc
+
+from instrumentation import CsvSink, Instrumentation, JsonLinesSink, PrometheusSink, StageMetrics
+
+class ListSink:
+    def __init__(self):
+        self.metrics = []
+
+    def emit(self, metrics):
+        self.metrics.append(metrics)
+
+class FailingSink:
+    def emit(self, metrics):
+        raise OSError("disk full")
+
+def sample_metrics(stage='q1', wall_seconds=1.5):
+    return StageMetrics(
+        stage=stage, status='ok', started_at=1700000000.0, wall_seconds=wall_seconds, cpu_seconds=1.25,
+        traced_peak_bytes=2048, rss_delta_bytes=None, labels={'backend': 'local'}
+    )
+
+class TestInstrumentation(unittest.TestCase):
+
+    def test_measure_records_wall_cpu_and_allocation_peak(self):
+        # Arrange
+        sink = ListSink()
+        instrumentation = Instrumentation([sink])
+
+        # Act
+        with instrumentation.measure('allocate', backend='local'):
+            data = bytearray(4 * 1024 * 1024)
+            del data
+
+        # Assert
+        metrics = sink.metrics[0]
+        self.assertEqual((metrics.stage, metrics.status, metrics.labels), ('allocate', 'ok', {'backend': 'local'}))
+        self.assertGreaterEqual(metrics.wall_seconds, 0)
+        self.assertGreaterEqual(metrics.cpu_seconds, 0)
+        self.assertGreaterEqual(metrics.traced_peak_bytes, 4 * 1024 * 1024)
+        self.assertFalse(tracemalloc.is_tracing())
+
+    def test_nested_measurements_keep_the_enclosing_peak(self):
+        # Arrange
+        sink = ListSink()
+        instrumentation = Instrumentation([sink])
+
+        # Act
+        with instrumentation.measure('outer'):
+            data = bytearray(4 * 1024 * 1024)
+            del data
+            with instrumentation.measure('inner'):
+                pass
+
+        # Assert
+        inner, outer = sink.metrics
+        self.assertLess(inner.traced_peak_bytes, 1024 * 1024)
+        self.assertGreaterEqual(outer.traced_peak_bytes, 4 * 1024 * 1024)
+
+    def test_decorator_records_errors_and_reraises(self):
+        # Arrange
+        sink = ListSink()
+        instrumentation = Instrumentation([sink, FailingSink()], trace_allocations=False)
+
+        @instrumentation.instrumented()
+        def failing_stage():
+            raise ValueError("bad input")
+
+        # Act / Assert
+        with self.assertLogs(level='WARNING'):
+            with self.assertRaises(ValueError):
+                failing_stage()
+        self.assertEqual((sink.metrics[0].stage, sink.metrics[0].status), ('failing_stage', 'error'))
+        self.assertIsNone(sink.metrics[0].traced_peak_bytes)
+
+    def test_iterator_results_are_measured_until_consumed(self):
+        # Arrange
+        sink = ListSink()
+        instrumentation = Instrumentation([sink], trace_allocations=False)
+
+        @instrumentation.instrumented('rows')
+        def rows():
+            return iter([1, 2])
+
+        # Act
+        result = rows()
+        measured_before_consuming = list(sink.metrics)
+        values = list(result)
+
+        # Assert
+        self.assertEqual(measured_before_consuming, [])
+        self.assertEqual(values, [1, 2])
+        self.assertEqual([(metrics.stage, metrics.status) for metrics in sink.metrics], [('rows', 'ok')])
+
+    def test_interleaved_measurements_keep_tracing_until_the_last_one_ends(self):
+        # Arrange
+        sink = ListSink()
+        first, second = Instrumentation([sink]), Instrumentation([sink])
+        first_run, second_run = first.measure('first'), second.measure('second')
+
+        # Act
+        first_run.__enter__()
+        second_run.__enter__()
+        first_run.__exit__(None, None, None)
+        tracing_after_first = tracemalloc.is_tracing()
+        data = bytearray(2 * 1024 * 1024)
+        del data
+        second_run.__exit__(None, None, None)
+
+        # Assert
+        self.assertTrue(tracing_after_first)
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertGreaterEqual(sink.metrics[1].traced_peak_bytes, 2 * 1024 * 1024)
+
+    def test_without_sinks_nothing_is_measured(self):
+        # Arrange
+        instrumentation = Instrumentation()
+
+        # Act
+        with instrumentation.measure('stage'):
+            tracing = tracemalloc.is_tracing()
+
+        # Assert
+        self.assertFalse(tracing)
+
+class TestSinks(unittest.TestCase):
+
+    def test_json_lines_and_csv_sinks_append_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            json_path, csv_path = os.path.join(directory, 'm.jsonl'), os.path.join(directory, 'm.csv')
+            sinks = [JsonLinesSink(json_path), CsvSink(csv_path)]
+
+            # Act
+            for sink in sinks:
+                sink.emit(sample_metrics('q1'))
+                sink.emit(sample_metrics('q2'))
+
+            # Assert
+            with open(json_path) as lines:
+                self.assertEqual([json.loads(line)['stage'] for line in lines], ['q1', 'q2'])
+            with open(csv_path, newline='') as rows:
+                records = list(csv.DictReader(rows))
+            self.assertEqual([record['stage'] for record in records], ['q1', 'q2'])
+            self.assertEqual(json.loads(records[0]['labels']), {'backend': 'local'})
+
+    def test_prometheus_sink_keeps_latest_run_and_counts_runs(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            path = os.path.join(directory, 'stages.prom')
+            sink = PrometheusSink(path)
+
+            # Act
+            sink.emit(sample_metrics('q1', wall_seconds=1.5))
+            sink.emit(sample_metrics('q1', wall_seconds=2.5))
+
+            # Assert
+            with open(path) as exposition:
+                text = exposition.read()
+            self.assertIn('# TYPE tweets_stage_wall_seconds gauge', text)
+            self.assertIn('tweets_stage_wall_seconds{backend="local",stage="q1",status="ok"} 2.5', text)
+            self.assertIn('tweets_stage_runs_total{backend="local",stage="q1",status="ok"} 2', text)
+            self.assertNotIn('rss_delta_bytes{', text)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import datetime
+
+from kernels import top_codes, top_dates_with_top_users, top_results
+from local import top_counts
+from tweet_fixtures import random_tweets
+from tweet_store import TweetStore
+
+class TestKernels(unittest.TestCase):
+
+    def test_kernels_match_the_counter_implementation(self):
+        for seed in range(5):
+            with self.subTest(seed=seed):
+                # Arrange
+                store = TweetStore.from_tweets(random_tweets(500, seed))
+
+                # Act
+                results = top_results(store)
+
+                # Assert
+                self.assertEqual(results, store.aggregates().top_results())
+
+    def test_tied_users_are_resolved_alphabetically_with_nulls_first(self):
+        # Arrange: day 1 ties 'zack' and 'anna'; day 2 ties 'anna' and a NULL username
+        days = [738000, 738000, 738000, 738000, 738001, 738001, 0]
+        usernames = ['zack', 'anna']
+        authors = [0, 1, 0, 1, 1, -1, 0]
+
+        # Act
+        result = top_dates_with_top_users(days, authors, usernames)
+
+        # Assert
+        self.assertEqual(result, [
+            (datetime.date.fromordinal(738000), 'anna'),
+            (datetime.date.fromordinal(738001), None),
+        ])
+
+    def test_tied_days_are_ordered_by_date(self):
+        # Act
+        result = top_dates_with_top_users([738002, 738001, 738003, 738003], [0, 0, 0, 0], ['anna'], limit=2)
+
+        # Assert
+        self.assertEqual([day for day, _ in result], [datetime.date.fromordinal(738003), datetime.date.fromordinal(738001)])
+
+    def test_top_codes_breaks_ties_by_value_beyond_the_limit(self):
+        # Arrange
+        values = ['d', 'c', 'b', 'a']
+        codes = [0, 1, 2, 3, 0, 1, 2, 3, 0]
+        expected = top_counts({value: codes.count(code) for code, value in enumerate(values)}, 2)
+
+        # Act
+        result = top_codes(codes, values, limit=2)
+
+        # Assert
+        self.assertEqual(result, expected)
+        self.assertEqual(result, [('d', 3), ('a', 2)])
+
+    def test_empty_columns(self):
+        # Act
+        results = top_results(TweetStore())
+
+        # Assert
+        self.assertEqual(results, ([], [], []))
+
+if __name__ == '__main__':
+    unittest.main()
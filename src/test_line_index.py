@@ -0,0 +1,90 @@
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+import line_index
+from line_index import LineIndex, index_path_for
+from parallel import split_byte_ranges
+
+class TestLineIndex(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange: tweets sorted by day, with a blank and an invalid line
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'tweets.json')
+        lines = [
+            json.dumps({"id": tweet_id, "date": f"2021-02-{12 + tweet_id // 10:02d}T12:00:00+00:00", "content": "🚜"})
+            for tweet_id in range(30)
+        ]
+        lines[15:15] = ['', '{not json}']
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+        self.lines = lines
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_records_are_random_access_slices_of_the_lines(self):
+        # Act
+        with LineIndex(self.file_path) as index:
+            first, last = bytes(index.record(0)), bytes(index.record(-1))
+            records = [bytes(record) for record in index.records()]
+            length = len(index)
+
+        # Assert
+        self.assertEqual(length, 32)
+        self.assertEqual(first, self.lines[0].encode('utf-8'))
+        self.assertEqual(last, self.lines[-1].encode('utf-8'))
+        self.assertEqual(len(records), 31)  # The blank line is skipped
+
+    def test_day_line_ranges_follow_sorted_days(self):
+        # Act
+        with LineIndex(self.file_path) as index:
+            days = index.days()
+            ranges = index.day_line_ranges('2021-02-13')
+
+        # Assert
+        self.assertEqual(days, ['2021-02-12', '2021-02-13', '2021-02-14'])
+        self.assertEqual(ranges, [(10, 15), (17, 22)])  # Interrupted by the blank and invalid lines
+
+    def test_shards_match_the_scanned_split_points(self):
+        # Act
+        with LineIndex(self.file_path) as index:
+            byte_ranges = index.byte_ranges(4)
+            shards = index.shards(4)
+
+        # Assert
+        self.assertEqual(byte_ranges, split_byte_ranges(self.file_path, 4))
+        self.assertEqual(shards[0][0], 0)
+        self.assertEqual(shards[-1][1], 32)
+
+    def test_index_is_reused_until_the_source_changes(self):
+        # Arrange
+        LineIndex(self.file_path).close()
+        self.assertTrue(os.path.exists(index_path_for(self.file_path)))
+
+        # Act / Assert: an up-to-date index is not rebuilt
+        with patch('line_index.build_index', wraps=line_index.build_index) as mock_build:
+            LineIndex(self.file_path).close()
+            mock_build.assert_not_called()
+
+            with open(self.file_path, 'a', encoding='utf-8') as file:
+                file.write(json.dumps({"id": 99, "date": "2021-02-15T00:00:00+00:00"}) + '\n')
+            with LineIndex(self.file_path) as index:
+                self.assertEqual(len(index), 33)
+            mock_build.assert_called_once()
+
+    def test_empty_file(self):
+        # Arrange
+        open(self.file_path, 'w').close()
+
+        # Act
+        with LineIndex(self.file_path) as index:
+            # Assert
+            self.assertEqual(len(index), 0)
+            self.assertEqual(index.shards(3), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,174 @@
+import unittest
+from unittest.mock import patch
+import datetime
+import json
+import os
+import tempfile
+
+import local
+import queries
+from local import (
+    LocalClient, extract_emojis, fused_top_n, top_dates_with_top_users, top_emojis,
+    top_influential_users, tweet_day
+)
+from processing import process_bigquery_results
+from column_cache import ColumnCache
+
+TWEETS = [
+    {"id": 1, "date": "2021-02-24T09:23:35+00:00", "content": "Farmers ❤️❤️ 🙏", "user": {"username": "zoe"},
+     "mentionedUsers": [{"username": "narendramodi"}, {"username": "rihanna"}]},
+    {"id": 2, "date": "2021-02-24T10:00:00+00:00", "content": "🇮🇳 support", "user": {"username": "adam"},
+     "mentionedUsers": [{"username": "narendramodi"}]},
+    {"id": 3, "date": "2021-02-23T23:30:00-03:00", "content": "late 🙏", "user": {"username": "adam"},
+     "mentionedUsers": None},
+    {"id": 4, "date": "2021-02-23T08:00:00+00:00", "content": "no emojis", "user": {"username": "bob"},
+     "mentionedUsers": []},
+    {"id": None, "date": "2021-02-23T08:00:00+00:00", "content": "❤️ ignored", "user": {"username": "bob"},
+     "mentionedUsers": [{"username": "ignored"}]},
+]
+
+class TestLocalEngine(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'tweets.json')
+        with open(self.file_path, 'w', encoding='utf-8') as file:
+            for tweet in TWEETS:
+                file.write(json.dumps(tweet) + '\n')
+            file.write('\n')  # Blank lines are ignored
+            file.write('{not json\n')  # Invalid lines are skipped
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_tweet_day_converts_to_utc(self):
+        # Act & Assert
+        self.assertEqual(tweet_day("2021-02-23T23:30:00-03:00"), "2021-02-24")
+        self.assertEqual(tweet_day("2021-02-23T23:30:00+00:00"), "2021-02-23")
+
+    def test_extract_emojis_keeps_variation_selectors_and_flags(self):
+        # Act
+        result = extract_emojis("a ❤️ b ❤ 🇮🇳 #️⃣ 😀")
+
+        # Assert
+        self.assertEqual(result, ["❤️", "❤", "🇮🇳", "#️⃣", "😀"])
+
+    def test_top_dates_with_top_users_breaks_ties_alphabetically(self):
+        # Act
+        result = top_dates_with_top_users(self.file_path)
+
+        # Assert
+        self.assertEqual(result, [(datetime.date(2021, 2, 24), 'adam'), (datetime.date(2021, 2, 23), 'bob')])
+
+    def test_top_emojis(self):
+        # Act
+        result = top_emojis(self.file_path)
+
+        # Assert
+        self.assertEqual(result, [('❤️', 2), ('🙏', 2), ('🇮🇳', 1)])
+
+    def test_top_influential_users(self):
+        # Act
+        result = top_influential_users(self.file_path)
+
+        # Assert
+        self.assertEqual(result, [('narendramodi', 2), ('rihanna', 1)])
+
+    def test_local_client_with_process_bigquery_results(self):
+        # Arrange
+        client = LocalClient(self.file_path)
+
+        # Act
+        result = process_bigquery_results(client, queries.top_influential_users)
+
+        # Assert
+        self.assertEqual(result, [('narendramodi', 2), ('rihanna', 1)])
+
+    def test_local_client_rejects_unknown_queries(self):
+        # Arrange
+        client = LocalClient(self.file_path)
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            client.query("SELECT 1")
+
+    def test_fused_top_n_matches_individual_scans(self):
+        # Act
+        result = fused_top_n(self.file_path)
+
+        # Assert
+        self.assertEqual(result.top_dates_with_top_users, top_dates_with_top_users(self.file_path))
+        self.assertEqual(result.top_emojis, top_emojis(self.file_path))
+        self.assertEqual(result.top_influential_users, top_influential_users(self.file_path))
+
+    def test_fused_local_client_scans_the_file_once(self):
+        # Arrange
+        client = LocalClient(self.file_path)
+
+        with patch('local.iter_tweets', wraps=local.iter_tweets) as mock_iter_tweets:
+            # Act
+            for query in (queries.top_dates_with_top_users, queries.top_emojis, queries.top_influential_users):
+                client.query(query).result()
+
+            # Assert
+            mock_iter_tweets.assert_called_once_with(self.file_path)
+
+    def test_local_client_answers_rollup_queries_like_the_base_queries(self):
+        # Arrange
+        client = LocalClient(self.file_path)
+        pairs = [
+            (queries.top_dates_with_top_users, queries.top_dates_with_top_users_rollup),
+            (queries.top_emojis, queries.top_emojis_rollup),
+            (queries.top_influential_users, queries.top_influential_users_rollup),
+        ]
+
+        # Act & Assert
+        for base_query, rollup_query in pairs:
+            self.assertEqual(list(client.query(rollup_query).result()), list(client.query(base_query).result()))
+
+    def test_local_client_with_column_cache_matches_the_scan(self):
+        # Arrange
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cold = LocalClient(self.file_path, column_cache=ColumnCache(cache_dir))
+            warm = LocalClient(self.file_path, column_cache=ColumnCache(cache_dir))
+            scanned = LocalClient(self.file_path)
+
+            # Act & Assert
+            for query in (queries.top_dates_with_top_users, queries.top_emojis, queries.top_influential_users):
+                expected = list(scanned.query(query).result())
+                self.assertEqual(list(cold.query(query).result()), expected)
+                self.assertEqual(list(warm.query(query).result()), expected)
+
+            with self.assertRaises(ValueError):
+                LocalClient(self.file_path, capacity=16, column_cache=ColumnCache(cache_dir))
+
+    def test_every_local_query_maps_to_a_top_results_field(self):
+        # Assert
+        self.assertEqual(set(local.TOP_RESULTS_FIELDS), set(local.LOCAL_QUERIES))
+        self.assertLessEqual(set(local.TOP_RESULTS_FIELDS.values()), set(local.TopResults._fields))
+
+    def test_approximate_local_client_matches_exact_counts_within_capacity(self):
+        # Arrange
+        client = LocalClient(self.file_path, fused=False, capacity=16)
+
+        # Act
+        emojis = client.query(queries.top_emojis).result()
+        mentions = client.aggregates().top_influential_users_with_errors()
+
+        # Assert
+        self.assertEqual(list(emojis), top_emojis(self.file_path))
+        self.assertEqual(mentions, [('narendramodi', 2, 0), ('rihanna', 1, 0)])
+
+    def test_local_client_results_are_paginated(self):
+        # Arrange
+        client = LocalClient(self.file_path)
+
+        # Act
+        result = client.query(queries.top_influential_users).result(page_size=1, max_results=2)
+
+        # Assert
+        self.assertEqual(list(result.pages), [[('narendramodi', 2)], [('rihanna', 1)]])
+
+if __name__ == '__main__':
+    unittest.main()
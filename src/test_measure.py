@@ -2,7 +2,8 @@ import unittest
 from unittest.mock import patch
 import time
 
-from measure import measure_notebook_elapsed_time, print_notebook_elapsed_time
+import instrumentation
+from measure import measure_notebook, measure_notebook_elapsed_time, print_notebook_elapsed_time
 
 class TestMeasureNotebookElapsedTime(unittest.TestCase):
 
@@ -34,5 +35,40 @@ class TestPrintNotebookElapsedTime(unittest.TestCase):
 
     # Add more test cases for different scenarios
 
+class ListSink:
+    def __init__(self):
+        self.metrics = []
+
+    def emit(self, metrics):
+        self.metrics.append(metrics)
+
+class TestMeasureNotebook(unittest.TestCase):
+
+    def tearDown(self):
+        instrumentation.configure(None)
+
+    @patch('builtins.print')
+    def test_measure_notebook_emits_to_the_configured_sinks(self, mock_print):
+        # Arrange
+        sink = ListSink()
+        instrumentation.configure([sink], trace_allocations=False)
+
+        # Act
+        with measure_notebook(backend='local'):
+            pass
+
+        # Assert
+        self.assertEqual((sink.metrics[0].stage, sink.metrics[0].labels), ('notebook', {'backend': 'local'}))
+        mock_print.assert_not_called()
+
+    @patch('builtins.print')
+    def test_measure_notebook_prints_without_sinks(self, mock_print):
+        # Act
+        with measure_notebook():
+            pass
+
+        # Assert
+        self.assertTrue(mock_print.call_args.args[0].startswith("Elapsed time in the notebook: "))
+
 if __name__ == '__main__':
     unittest.main()
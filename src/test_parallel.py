@@ -0,0 +1,100 @@
+import unittest
+import os
+import tempfile
+
+from local import LocalClient, fused_top_n
+from parallel import parallel_scan_tweets, parallel_top_n, split_byte_ranges
+import queries
+from tweet_fixtures import sample_tweets, write_tweets
+
+class TestParallelAggregation(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'tweets.json')
+        write_tweets(self.file_path, sample_tweets(200))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_split_byte_ranges_align_to_lines_and_cover_file(self):
+        # Act
+        byte_ranges = split_byte_ranges(self.file_path, 7)
+
+        # Assert
+        with open(self.file_path, 'rb') as file:
+            data = file.read()
+        self.assertEqual(byte_ranges[0][0], 0)
+        self.assertEqual(byte_ranges[-1][1], len(data))
+        for (_, end), (start, _) in zip(byte_ranges, byte_ranges[1:]):
+            self.assertEqual(end, start)
+            self.assertEqual(data[start - 1:start], b'\n')
+
+    def test_split_byte_ranges_rejects_invalid_shards(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            split_byte_ranges(self.file_path, 0)
+
+    def test_parallel_top_n_matches_single_process(self):
+        # Act
+        result = parallel_top_n(self.file_path, workers=3)
+
+        # Assert
+        self.assertEqual(result, fused_top_n(self.file_path))
+
+    def test_partials_merge_to_single_process_counters(self):
+        # Act
+        aggregates = parallel_scan_tweets(self.file_path, workers=1, shards=13)
+        expected = LocalClient(self.file_path).aggregates()
+
+        # Assert
+        self.assertEqual(aggregates.day_user_counts, expected.day_user_counts)
+        self.assertEqual(aggregates.emoji_counts, expected.emoji_counts)
+        self.assertEqual(aggregates.mention_counts, expected.mention_counts)
+
+    def test_approximate_shards_merge_within_error_bounds(self):
+        # Act
+        aggregates = parallel_scan_tweets(self.file_path, workers=2, shards=5, capacity=4)
+        expected = LocalClient(self.file_path).aggregates().mention_counts
+
+        # Assert
+        self.assertLessEqual(len(aggregates.mention_counts), 4)
+        for username, true_count in expected.items():
+            count, error = aggregates.mention_counts.estimate(username)
+            self.assertLessEqual(count - error, true_count)
+            self.assertGreaterEqual(count, true_count)
+
+    def test_indexed_split_points_match_the_scanned_ones(self):
+        # Act
+        indexed = parallel_scan_tweets(self.file_path, workers=1, shards=5, use_index=True)
+        scanned = parallel_scan_tweets(self.file_path, workers=1, shards=5)
+
+        # Assert
+        self.assertEqual(indexed.top_results(), scanned.top_results())
+
+    def test_empty_file_is_scanned_without_a_process_pool(self):
+        # Arrange
+        empty_path = os.path.join(self.directory.name, 'empty.json')
+        open(empty_path, 'w').close()
+
+        # Act
+        scanned = parallel_scan_tweets(empty_path, workers=2)
+        indexed = parallel_scan_tweets(empty_path, workers=2, use_index=True)
+
+        # Assert
+        self.assertEqual(scanned.top_results(), ([], [], []))
+        self.assertEqual(indexed.top_results(), ([], [], []))
+
+    def test_local_client_with_workers(self):
+        # Arrange
+        client = LocalClient(self.file_path, workers=2)
+
+        # Act
+        result = client.query(queries.top_dates_with_top_users).result()
+
+        # Assert
+        self.assertEqual(result, fused_top_n(self.file_path).top_dates_with_top_users)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,249 @@
+import unittest
+import datetime
+import json
+import os
+import tempfile
+from unittest.mock import patch
+
+from downloader import DriveFileInfo
+from pipeline import Pipeline, Resources, Stage, run_challenge
+
+def load(params, inputs, resources):
+    resources['calls'].append('load')
+    return {'rows': params['rows']}
+
+def transform(params, inputs, resources):
+    resources['calls'].append('transform')
+    return inputs['load']['rows'] * 2
+
+def transform_v2(params, inputs, resources):
+    resources['calls'].append('transform')
+    return inputs['load']['rows'] * 3
+
+def report(params, inputs, resources):
+    resources['calls'].append('report')
+    return [(datetime.date(2021, 2, 12), inputs['transform'])]
+
+def failing(params, inputs, resources):
+    raise RuntimeError('quota exceeded')
+
+def stages(transform_function=transform, probe=None):
+    return [
+        Stage('load', load, params=('rows',), probe=probe),
+        Stage('transform', transform_function, inputs=('load',)),
+        Stage('report', report, inputs=('transform',)),
+    ]
+
+class TestPipeline(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.directory.name, 'manifest.json')
+        self.resources = {'calls': []}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_pipeline(self, pipeline_stages=None, config=None, **kwargs):
+        self.resources['calls'] = []
+        pipeline = Pipeline(pipeline_stages or stages(), self.manifest_path)
+        return pipeline.run(config or {'rows': 5}, self.resources, **kwargs)
+
+    def test_rerun_skips_unchanged_stages_and_reuses_outputs(self):
+        # Arrange
+        first = self.run_pipeline()
+
+        # Act
+        second = self.run_pipeline()
+
+        # Assert
+        self.assertEqual([result.status for result in first.values()], ['executed'] * 3)
+        self.assertEqual([result.status for result in second.values()], ['skipped'] * 3)
+        self.assertEqual(self.resources['calls'], [])
+        self.assertEqual(second['report'].output, [['2021-02-12', 10]])
+        with open(self.manifest_path) as file:
+            record = json.load(file)['stages']['transform']
+        self.assertEqual(record['output'], 10)
+        self.assertIn('wall_seconds', record)
+
+    def test_code_change_reruns_the_stage_and_its_dependents_only(self):
+        # Arrange
+        self.run_pipeline()
+
+        # Act
+        results = self.run_pipeline(stages(transform_v2))
+
+        # Assert
+        self.assertEqual(self.resources['calls'], ['transform', 'report'])
+        self.assertEqual(results['load'].status, 'skipped')
+        self.assertEqual(results['report'].output, [(datetime.date(2021, 2, 12), 15)])
+
+    def test_param_and_probe_changes_rerun_the_stage(self):
+        # Arrange
+        self.run_pipeline(stages(probe=lambda params, resources: 'md5-a'))
+
+        # Act
+        self.run_pipeline(stages(probe=lambda params, resources: 'md5-a'), config={'rows': 6})
+        after_param = list(self.resources['calls'])
+        self.run_pipeline(stages(probe=lambda params, resources: 'md5-b'), config={'rows': 6})
+
+        # Assert
+        self.assertEqual(after_param, ['load', 'transform', 'report'])
+        self.assertEqual(self.resources['calls'], ['load', 'transform', 'report'])
+
+    def test_targets_force_and_dry_run(self):
+        # Arrange
+        self.run_pipeline()
+
+        # Act
+        targeted = self.run_pipeline(targets=['transform'], force=['load'])
+        targeted_calls = list(self.resources['calls'])
+        planned = self.run_pipeline(pipeline_stages=stages(transform_v2), dry_run=True)
+
+        # Assert
+        self.assertEqual(list(targeted), ['load', 'transform'])
+        self.assertEqual(targeted_calls, ['load', 'transform'])
+        self.assertEqual(self.resources['calls'], [])
+        self.assertEqual(planned['load'].status, 'skipped')
+        self.assertEqual([planned['transform'].status, planned['report'].status], ['pending', 'pending'])
+
+    def test_failure_is_recorded_and_earlier_progress_kept(self):
+        # Arrange
+        pipeline_stages = stages()[:2] + [Stage('report', failing, inputs=('transform',))]
+
+        # Act & Assert
+        with self.assertRaises(RuntimeError):
+            self.run_pipeline(pipeline_stages)
+        results = self.run_pipeline(stages())
+        self.assertEqual(self.resources['calls'], ['report'])
+        self.assertEqual(results['report'].status, 'executed')
+
+    def test_invalid_stage_order_raises_value_error(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            Pipeline(stages()[1:], self.manifest_path)
+        with self.assertRaises(ValueError):
+            Pipeline(stages(), self.manifest_path).selected(['unknown'])
+
+    def test_resources_are_created_on_first_use(self):
+        # Arrange
+        created = []
+        resources = Resources({'client': lambda: created.append('client') or 'client'})
+
+        # Act
+        first, second = resources['client'], resources['client']
+
+        # Assert
+        self.assertEqual((first, second), ('client', 'client'))
+        self.assertEqual(created, ['client'])
+
+class TestRunChallenge(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.directory.name, 'manifest.json')
+        self.calls = []
+        self.http_factories = []
+
+        def record(name, result=None):
+            def function(*args, **kwargs):
+                self.calls.append(name)
+                return result
+            return function
+
+        class Blob:
+            name, md5_hash, content_type = 'raw/tweets.json.zip', 'md5', 'application/zip'
+
+        def download(service, file_id, path, http_factory):
+            self.calls.append('download')
+            self.http_factories.append(http_factory)
+            with open(path, 'wb') as file:
+                file.write(b'PK')
+            return path
+
+        def q2_changed(client, query):
+            self.calls.append('q2_time')
+            return [('🙏', 5)]
+
+        self.q2_changed = q2_changed
+        self.patches = {
+            'get_drive_file_info': lambda service, file_id: DriveFileInfo(10, 'abc'),
+            'download_drive_file': download,
+            'upload_drive_file_to_cloud_storage': record('upload', Blob()),
+            'extract_zip_file_conditionally': record('extract', 'tweets.json'),
+            'create_dataset': record('create_dataset'),
+            'create_table': record('create_table'),
+            'load_data_from_storage': record('load'),
+            'authorized_http_factory': lambda credentials: (credentials, 'http'),
+            'q1_time': record('q1_time', [('2021-02-12', 'alice')]), 'q2_time': record('q2_time', [('🙏', 4)]),
+            'q3_time': record('q3_time', [('alice', 3)]), 'q1_memory': record('q1_memory', [('2021-02-12', 'alice')]),
+            'q2_memory': record('q2_memory', [('🙏', 4)]), 'q3_memory': record('q3_memory', [('alice', 3)]),
+        }
+        self.resources = {'drive_credentials': 'credentials', 'drive_service': None, 'bucket': None, 'bigquery_client': None}
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_challenge(self, **overrides):
+        self.calls = []
+        with patch.multiple('pipeline', **{**self.patches, **overrides}):
+            return run_challenge(
+                {'download_dir': self.directory.name}, manifest_path=self.manifest_path, resources=self.resources
+            )
+
+    def test_q2_code_change_reruns_only_q2(self):
+        # Arrange
+        self.run_challenge()
+        first_calls = list(self.calls)
+
+        # Act
+        results = self.run_challenge(q2_time=self.q2_changed)
+
+        # Assert
+        self.assertEqual(first_calls[:3], ['download', 'upload', 'extract'])
+        self.assertEqual(len(first_calls), 12)
+        self.assertEqual(self.calls, ['q2_time'])
+        self.assertEqual(results['q2_time'].output, [('🙏', 5)])
+        self.assertEqual(results['load_data_from_storage'].status, 'skipped')
+
+    def test_changed_drive_checksum_reruns_the_data_stages(self):
+        # Arrange
+        self.run_challenge()
+
+        # Act
+        self.run_challenge(get_drive_file_info=lambda service, file_id: DriveFileInfo(10, 'def'))
+
+        # Assert
+        self.assertEqual(self.calls[:4], ['download', 'upload', 'extract', 'load'])
+        self.assertNotIn('create_table', self.calls)
+
+    def test_download_uses_an_http_factory_of_the_drive_credentials(self):
+        # Act
+        self.run_challenge()
+
+        # Assert
+        self.assertEqual(self.http_factories, [('credentials', 'http')])
+
+    def test_swallowed_query_error_fails_the_stage_and_reruns_it(self):
+        # Arrange: process_bigquery_results prints query errors and returns no rows
+        with patch('builtins.print'), self.assertRaises(RuntimeError):
+            self.run_challenge(q2_time=lambda client, query: [])
+
+        # Act
+        results = self.run_challenge()
+
+        # Assert
+        self.assertEqual(self.calls, ['q2_time', 'q3_time', 'q1_memory', 'q2_memory', 'q3_memory'])
+        self.assertEqual(results['q2_time'].output, [('🙏', 4)])
+
+    def test_missing_archive_fails_the_extraction(self):
+        # Act & Assert
+        with patch('builtins.print'), self.assertRaises(RuntimeError):
+            self.run_challenge(extract_zip_file_conditionally=lambda bucket, folder_name, zip_file_name: False)
+        with open(self.manifest_path) as file:
+            self.assertEqual(json.load(file)['stages']['extract_zip_file_conditionally']['status'], 'failed')
+
+if __name__ == '__main__':
+    unittest.main()
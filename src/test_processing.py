@@ -3,7 +3,13 @@ from unittest.mock import MagicMock, patch
 from google.cloud import bigquery
 from google.api_core.exceptions import NotFound
 
-from processing import process_bigquery_results
+from processing import (
+    iterate_bigquery_pages, iterate_bigquery_results, poll_query_jobs, process_bigquery_results,
+    run_queries_concurrently
+)
+from cache import QueryResultCache
+import datetime
+import tempfile
 
 class TestProcessBigQueryResults(unittest.TestCase):
 
@@ -23,7 +29,239 @@ class TestProcessBigQueryResults(unittest.TestCase):
         # Assert
         self.assertEqual(result, [('2023-01-01', 'username1'), ('2023-01-02', 'username2')])
 
+    def test_process_bigquery_results_uses_cache_for_unchanged_tables(self):
+        # Arrange
+        client = MagicMock()
+        client.get_table.return_value = MagicMock(modified=datetime.datetime(2024, 1, 1), num_rows=10)
+        client.query.return_value.result.return_value = [('username1', 5)]
+        query = "SELECT username, count FROM tweets_dataset.tweets"
+
+        with tempfile.TemporaryDirectory() as cache_dir:
+            cache = QueryResultCache(cache_dir)
+
+            # Act
+            first = process_bigquery_results(client, query, cache=cache)
+            second = process_bigquery_results(client, query, cache=cache)
+            bypassed = process_bigquery_results(client, query, cache=cache, use_cache=False)
+
+        # Assert
+        self.assertEqual(first, [('username1', 5)])
+        self.assertEqual(second, first)
+        self.assertEqual(bypassed, first)
+        self.assertEqual(client.query.call_count, 2)
+
     # Add more test cases for different scenarios
 
+    def test_process_bigquery_results_appends_query_stats(self):
+        # Arrange
+        client = MagicMock()
+        client.query.return_value = MagicMock(job_id='job_1', total_bytes_billed=1024, query_plan=[])
+        client.query.return_value.result.return_value = [('username1', 5)]
+        stats = []
+
+        # Act
+        result = process_bigquery_results(client, "SELECT 1", stats=stats)
+
+        # Assert
+        self.assertEqual(result, [('username1', 5)])
+        self.assertEqual(stats[0].job_id, 'job_1')
+        self.assertEqual(stats[0].bytes_billed, 1024)
+
+    def test_process_bigquery_results_dry_run_does_not_execute(self):
+        # Arrange
+        client = MagicMock()
+        client.query.return_value = MagicMock(total_bytes_processed=2048, query_plan=[])
+        stats = []
+
+        # Act
+        result = process_bigquery_results(client, "SELECT 1", stats=stats, dry_run=True)
+
+        # Assert
+        self.assertEqual(result, [])
+        client.query.return_value.result.assert_not_called()
+        self.assertTrue(stats[0].dry_run)
+        self.assertEqual(stats[0].bytes_processed, 2048)
+
+class TestIterateBigQueryResults(unittest.TestCase):
+
+    def test_iterate_bigquery_pages_requests_page_size_and_cap(self):
+        # Arrange
+        client = MagicMock()
+        client.query.return_value.result.return_value.pages = iter([[('a', 1), ('b', 2)], [('c', 3)]])
+
+        # Act
+        result = list(iterate_bigquery_pages(client, "SELECT 1", page_size=2, max_rows=3))
+
+        # Assert
+        self.assertEqual(result, [[('a', 1), ('b', 2)], [('c', 3)]])
+        client.query.return_value.result.assert_called_once_with(page_size=2, max_results=3)
+
+    def test_iterate_bigquery_results_submits_eagerly_and_fetches_lazily(self):
+        # Arrange
+        client = MagicMock()
+        pages = iter([[('a', 1)], [('b', 2)]])
+        client.query.return_value.result.return_value.pages = pages
+
+        # Act
+        rows = iterate_bigquery_results(client, "SELECT 1")
+
+        # Assert
+        client.query.assert_called_once_with("SELECT 1")
+        self.assertEqual(next(rows), ('a', 1))
+        self.assertEqual(next(pages), [('b', 2)])  # The second page was not fetched yet
+        self.assertEqual(list(rows), [])
+
+    def test_iterate_bigquery_pages_rejects_invalid_page_size(self):
+        # Arrange
+        client = MagicMock()
+
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            iterate_bigquery_pages(client, "SELECT 1", page_size=0)
+        client.query.assert_not_called()
+
+    def test_iterate_bigquery_results_shares_cache_and_stats(self):
+        # Arrange
+        client = MagicMock()
+        client.get_table.return_value = MagicMock(modified=datetime.datetime(2024, 1, 1), num_rows=3)
+        client.query.return_value.result.return_value.pages = iter([[('a', 1), ('b', 2)], [('c', 3)]])
+        query = "SELECT username, count FROM tweets_dataset.tweets"
+        stats = []
+
+        with tempfile.TemporaryDirectory() as directory:
+            cache = QueryResultCache(directory)
+
+            # Act
+            first = list(iterate_bigquery_results(client, query, page_size=2, cache=cache, stats=stats))
+            second = list(iterate_bigquery_results(client, query, page_size=2, cache=cache, stats=stats))
+
+        # Assert
+        self.assertEqual(first, [('a', 1), ('b', 2), ('c', 3)])
+        self.assertEqual(second, first)
+        client.query.assert_called_once()
+        self.assertEqual([entry.result_cache_hit for entry in stats], [False, True])
+
+    def test_iterate_bigquery_results_returns_nothing_when_not_found(self):
+        # Arrange
+        client = MagicMock()
+        client.query.side_effect = NotFound('tweets_dataset.tweets')
+
+        # Act
+        with patch('builtins.print'):
+            rows = list(iterate_bigquery_results(client, "SELECT 1"))
+
+        # Assert
+        self.assertEqual(rows, [])
+
+class FakeJob:
+    """Query job finishing after a number of `done()` checks."""
+
+    def __init__(self, rows, checks_until_done, error=None):
+        self.rows = rows
+        self.checks_until_done = checks_until_done
+        self.error = error
+        self.cancelled = False
+
+    def done(self):
+        self.checks_until_done -= 1
+        return self.checks_until_done <= 0
+
+    def result(self):
+        if self.error:
+            raise self.error
+        return self.rows
+
+    def cancel(self):
+        self.cancelled = True
+        return True
+
+class TestConcurrentQueries(unittest.TestCase):
+
+    @patch('processing.time.sleep')
+    def test_outcomes_are_yielded_in_completion_order_with_jittered_backoff(self, mock_sleep):
+        # Arrange
+        jobs = {'slow': FakeJob([('a', 1)], 4), 'fast': FakeJob([('b', 2)], 1), 'broken': FakeJob([], 2, Exception("bad"))}
+
+        # Act
+        result = list(poll_query_jobs(jobs, initial_interval=1.0, max_interval=2.0))
+
+        # Assert
+        self.assertEqual([outcome.name for outcome in result], ['fast', 'broken', 'slow'])
+        self.assertEqual(result[2].rows, [('a', 1)])
+        self.assertEqual(str(result[1].error), "bad")
+        delays = [call.args[0] for call in mock_sleep.call_args_list]
+        self.assertEqual(len(delays), 3)
+        for delay, interval in zip(delays, [1.0, 2.0, 2.0]):
+            self.assertGreaterEqual(delay, interval / 2)
+            self.assertLessEqual(delay, interval)
+
+    @patch('processing.time.sleep')
+    def test_jobs_exceeding_the_timeout_are_cancelled(self, mock_sleep):
+        # Arrange
+        job = FakeJob([], 100)
+
+        # Act
+        with patch('processing.time.monotonic', side_effect=[0.0, 0.0, 0.5, 5.0]):
+            result = list(poll_query_jobs({'q': job}, timeout=1.0))
+
+        # Assert
+        self.assertIsInstance(result[0].error, TimeoutError)
+        self.assertTrue(job.cancelled)
+        self.assertLessEqual(mock_sleep.call_args.args[0], 1.0)
+
+    def test_pending_jobs_are_cancelled_when_the_caller_stops(self):
+        # Arrange
+        jobs = {'fast': FakeJob([], 1), 'slow': FakeJob([], 100)}
+
+        # Act
+        outcomes = poll_query_jobs(jobs)
+        next(outcomes)
+        outcomes.close()
+
+        # Assert
+        self.assertTrue(jobs['slow'].cancelled)
+        self.assertFalse(jobs['fast'].cancelled)
+
+    def test_run_queries_concurrently_submits_every_query_before_polling(self):
+        # Arrange
+        client = MagicMock()
+        submitted = []
+        client.query.side_effect = lambda query: submitted.append(query) or FakeJob([(query, 1)], 1)
+
+        # Act
+        outcomes = run_queries_concurrently(client, {'q1': 'SELECT 1', 'q2': 'SELECT 2'})
+        submitted_before_iterating = list(submitted)
+        first = next(outcomes)
+
+        # Assert
+        self.assertEqual(submitted_before_iterating, ['SELECT 1', 'SELECT 2'])
+        self.assertEqual(first.rows, [('SELECT 1', 1)])
+        self.assertEqual([outcome.name for outcome in outcomes], ['q2'])
+
+    def test_failed_submission_cancels_submitted_jobs(self):
+        # Arrange
+        client = MagicMock()
+        first_job = FakeJob([], 1)
+        client.query.side_effect = [first_job, Exception("quota exceeded")]
+
+        # Act & Assert
+        with self.assertRaises(Exception):
+            run_queries_concurrently(client, {'q1': 'SELECT 1', 'q2': 'SELECT 2'})
+        self.assertTrue(first_job.cancelled)
+
+    @patch('processing.time.sleep')
+    def test_elapsed_time_and_timeout_count_from_submission(self, mock_sleep):
+        # Arrange
+        job = FakeJob([], 100)
+
+        # Act
+        with patch('processing.time.monotonic', side_effect=[10.0, 12.0]):
+            result = list(poll_query_jobs({'q': job}, timeout=5.0, submitted_at={'q': 4.0}))
+
+        # Assert
+        self.assertIsInstance(result[0].error, TimeoutError)
+        self.assertEqual(result[0].elapsed_seconds, 8.0)
+        mock_sleep.assert_not_called()
+
 if __name__ == '__main__':
     unittest.main()
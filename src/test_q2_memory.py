@@ -6,14 +6,13 @@ from q2_memory import q2_memory
 
 class TestQ2Memory(unittest.TestCase):
 
-    @patch('processing.process_bigquery_results')
-    @patch('memory_profiler.profile')
-    def test_q2_memory(self, mock_profile, mock_process_bigquery_results):
+    @patch('q2_memory.iterate_bigquery_results')
+    def test_q2_memory(self, mock_iterate_bigquery_results):
         # Arrange
         client = MagicMock(spec=bigquery.Client)
         query = "SELECT * FROM table"
 
-        mock_process_bigquery_results.return_value = [('string1', '10'), ('string2', '20')]
+        mock_iterate_bigquery_results.return_value = iter([('string1', '10'), ('string2', '20')])
 
         # Act
         result = q2_memory(client, query)
@@ -21,6 +20,20 @@ class TestQ2Memory(unittest.TestCase):
         # Assert
         self.assertEqual(result, [('string1', 10), ('string2', 20)])
 
+    @patch('q2_memory.iterate_bigquery_results')
+    def test_q2_memory_caps_rows_and_handles_conversion_errors(self, mock_iterate_bigquery_results):
+        # Arrange
+        client = MagicMock(spec=bigquery.Client)
+        mock_iterate_bigquery_results.return_value = iter([('string1', '10'), ('string2', 'not a number')])
+
+        # Act
+        with patch('builtins.print'):
+            result = q2_memory(client, "SELECT * FROM table", max_rows=2)
+
+        # Assert
+        self.assertEqual(result, [])
+        mock_iterate_bigquery_results.assert_called_once_with(client, "SELECT * FROM table", max_rows=2)
+
     # Add more test cases for different scenarios
 
 if __name__ == '__main__':
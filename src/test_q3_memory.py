@@ -6,14 +6,13 @@ from q3_memory import q3_memory
 
 class TestQ3Memory(unittest.TestCase):
 
-    @patch('processing.process_bigquery_results')
-    @patch('memory_profiler.profile')
-    def test_q3_memory(self, mock_profile, mock_process_bigquery_results):
+    @patch('q3_memory.iterate_bigquery_results')
+    def test_q3_memory(self, mock_iterate_bigquery_results):
         # Arrange
         client = MagicMock(spec=bigquery.Client)
         query = "SELECT * FROM table"
 
-        mock_process_bigquery_results.return_value = [('string1', '10'), ('string2', '20')]
+        mock_iterate_bigquery_results.return_value = iter([('string1', '10'), ('string2', '20')])
 
         # Act
         result = q3_memory(client, query)
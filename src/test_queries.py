@@ -0,0 +1,55 @@
+import unittest
+import datetime
+
+import queries
+
+class TestDateBoundedQueries(unittest.TestCase):
+
+    def test_bounds_every_scan_of_the_tweets_table(self):
+        # Act
+        result = queries.top_dates_with_top_users_between(datetime.date(2021, 2, 12), datetime.date(2021, 2, 14))
+
+        # Assert
+        self.assertIn("WHERE id IS NOT NULL AND date >= TIMESTAMP('2021-02-12') AND date < TIMESTAMP('2021-02-15')", result)
+        self.assertIn("WHERE TW.id IS NOT NULL AND TW.date >= TIMESTAMP('2021-02-12')", result)
+
+    def test_open_ended_ranges(self):
+        # Act
+        since = queries.top_influential_users_between(start_date=datetime.date(2021, 2, 20))
+        until = queries.top_emojis_between(end_date=datetime.date(2021, 2, 20))
+        unbounded = queries.top_emojis_between()
+
+        # Assert
+        self.assertIn("TW.date >= TIMESTAMP('2021-02-20')", since)
+        self.assertNotIn("<", since)
+        self.assertIn("date < TIMESTAMP('2021-02-21')", until)
+        self.assertIn("WHERE id IS NOT NULL AND TRUE", unbounded)
+
+    def test_invalid_bounds(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            queries.top_emojis_between(datetime.date(2021, 2, 20), datetime.date(2021, 2, 19))
+        with self.assertRaises(TypeError):
+            queries.top_emojis_between("2021-02-20'; DROP TABLE tweets; --")
+        with self.assertRaises(ValueError):
+            queries.bound_by_dates(queries.top_emojis_rollup, None, None)
+
+class TestRollupQueries(unittest.TestCase):
+
+    def test_rollup_queries_read_the_given_dataset(self):
+        # Act
+        result = queries.rollup_queries('analytics')
+
+        # Assert
+        for query in result:
+            self.assertIn('FROM analytics.', query)
+            self.assertNotIn('tweets_dataset', query)
+        self.assertEqual(queries.rollup_queries()[1], queries.top_emojis_rollup)
+
+    def test_rollup_queries_reject_invalid_dataset_names(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            queries.rollup_queries('tweets; DROP TABLE tweets')
+
+if __name__ == '__main__':
+    unittest.main()
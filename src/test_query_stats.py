@@ -0,0 +1,63 @@
+import unittest
+import datetime
+from unittest.mock import MagicMock
+
+from query_stats import PRICE_PER_TIB, TIB, QueryStats, estimate_query, format_query_stats, query_stats_from_job
+
+class TestQueryStats(unittest.TestCase):
+
+    def test_query_stats_from_job_collects_cost_timings_and_stages(self):
+        # Arrange
+        created = datetime.datetime(2024, 1, 1, 12, 0, 0, tzinfo=datetime.timezone.utc)
+        stage = MagicMock(
+            status='COMPLETE', wait_ms_avg=1, read_ms_avg=20, compute_ms_avg=30, write_ms_avg=4,
+            records_read=1000, records_written=10,
+            start=created + datetime.timedelta(seconds=1), end=created + datetime.timedelta(seconds=3)
+        )
+        stage.name = 'S00: Input'
+        job = MagicMock(
+            job_id='job_1', total_bytes_processed=TIB, total_bytes_billed=TIB, slot_millis=1500, cache_hit=False,
+            created=created, started=created + datetime.timedelta(seconds=1),
+            ended=created + datetime.timedelta(seconds=4), query_plan=[stage]
+        )
+
+        # Act
+        stats = query_stats_from_job(job)
+
+        # Assert
+        self.assertEqual(stats.job_id, 'job_1')
+        self.assertEqual(stats.slot_millis, 1500)
+        self.assertEqual(stats.queue_seconds, 1.0)
+        self.assertEqual(stats.run_seconds, 3.0)
+        self.assertEqual(stats.estimated_cost_usd, PRICE_PER_TIB)
+        self.assertEqual(stats.stages[0].name, 'S00: Input')
+        self.assertEqual(stats.stages[0].duration_ms, 2000.0)
+        self.assertIn('S00: Input: 2000 ms', format_query_stats('q1', stats))
+
+    def test_query_stats_from_job_tolerates_jobs_without_statistics(self):
+        # Act
+        stats = query_stats_from_job(object())
+
+        # Assert
+        self.assertEqual(stats, QueryStats())
+        self.assertIsNone(stats.estimated_cost_usd)
+        self.assertIn('n/a', format_query_stats('q1', stats))
+
+    def test_estimate_query_runs_an_uncached_dry_run(self):
+        # Arrange
+        client = MagicMock()
+        client.query.return_value = MagicMock(total_bytes_processed=TIB // 2, query_plan=[])
+
+        # Act
+        stats = estimate_query(client, "SELECT 1")
+
+        # Assert
+        job_config = client.query.call_args.kwargs['job_config']
+        self.assertTrue(job_config.dry_run)
+        self.assertFalse(job_config.use_query_cache)
+        self.assertTrue(stats.dry_run)
+        self.assertEqual(stats.bytes_billed, 0)
+        self.assertEqual(stats.estimated_cost_usd, PRICE_PER_TIB / 2)
+
+if __name__ == '__main__':
+    unittest.main()
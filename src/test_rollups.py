@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import MagicMock
+from google.cloud import bigquery
+
+import rollups
+from queries import EMOJI_REGEX, top_emojis
+
+class TestRollupStatements(unittest.TestCase):
+
+    def test_rollup_merge_statements_read_only_the_source_table(self):
+        # Act
+        result = rollups.rollup_merge_statements('tweets_dataset', 'tweets_staging')
+
+        # Assert
+        self.assertEqual(len(result), 3)
+        for statement, table_name in zip(result, rollups.ROLLUP_SCHEMAS):
+            self.assertIn(f'MERGE `tweets_dataset.{table_name}`', statement)
+            self.assertIn('FROM `tweets_dataset.tweets_staging`', statement)
+        self.assertIn(EMOJI_REGEX, result[1])
+        self.assertIn('WHERE id IS NOT NULL AND date IS NOT NULL', result[0])
+
+    def test_emoji_regex_is_shared_with_top_emojis(self):
+        # Assert
+        self.assertIn(f'FORMAT({EMOJI_REGEX}', top_emojis)
+
+class TestRollupMaintenance(unittest.TestCase):
+
+    def test_update_rollups_creates_tables_and_runs_one_transaction(self):
+        # Arrange
+        client = MagicMock()
+
+        # Act
+        rollups.update_rollups(client, 'tweets_dataset', 'tweets_staging', 'gs://bucket/raw/tweets.json#1')
+
+        # Assert
+        self.assertEqual(client.create_table.call_count, len(rollups.ROLLUP_SCHEMAS) + 1)
+        for call in client.create_table.call_args_list:
+            self.assertTrue(call.kwargs['exists_ok'])
+        client.query.assert_called_once()
+        script = client.query.call_args.args[0]
+        self.assertTrue(script.startswith('BEGIN TRANSACTION;'))
+        self.assertTrue(script.endswith('COMMIT TRANSACTION;'))
+        self.assertEqual(script.count('MERGE'), 3)
+        client.query.return_value.result.assert_called_once()
+
+    def test_update_rollups_is_keyed_by_the_load_id(self):
+        # Arrange
+        client = MagicMock()
+        watermark = bigquery.QueryJobConfig(query_parameters=[bigquery.ScalarQueryParameter('byte_offset', 'INT64', 10)])
+
+        # Act
+        rollups.update_rollups(
+            client, 'tweets_dataset', 'tweets_staging', 'load-1', ['UPDATE watermark SET TRUE'], watermark
+        )
+
+        # Assert
+        script = client.query.call_args.args[0]
+        ledger = f'`tweets_dataset.{rollups.ROLLUP_LOADS_TABLE}`'
+        self.assertIn(f'IF NOT EXISTS (SELECT 1 FROM {ledger} WHERE load_id = @rollup_load_id) THEN', script)
+        self.assertLess(script.index('UPDATE watermark'), script.index(f'INSERT INTO {ledger}'))
+        self.assertLess(script.index(f'INSERT INTO {ledger}'), script.index('END IF'))
+        config = client.query.call_args.kwargs['job_config']
+        values = {parameter.name: parameter.value for parameter in config.query_parameters}
+        self.assertEqual(values, {'byte_offset': 10, 'rollup_load_id': 'load-1'})
+
+    def test_rebuild_rollups_clears_tables_before_merging_the_full_table(self):
+        # Arrange
+        client = MagicMock()
+
+        # Act
+        rollups.rebuild_rollups(client, 'tweets_dataset', 'tweets')
+
+        # Assert
+        script = client.query.call_args.args[0]
+        self.assertLess(script.rindex('DELETE FROM'), script.index('MERGE'))
+        self.assertIn('FROM `tweets_dataset.tweets`', script)
+
+    def test_update_rollups_propagates_errors(self):
+        # Arrange
+        client = MagicMock()
+        client.query.return_value.result.side_effect = Exception("Query failed")
+
+        # Act & Assert
+        with self.assertRaises(Exception):
+            rollups.update_rollups(client, 'tweets_dataset', 'tweets_staging', 'load-1')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import unittest
+import pickle
+import random
+from collections import Counter
+
+from sketches import HEAP_COMPACTION_FACTOR, SpaceSaving
+
+def zipf_stream(size, distinct, seed):
+    rng = random.Random(seed)
+    weights = [1.0 / rank for rank in range(1, distinct + 1)]
+    return rng.choices([f'item{rank}' for rank in range(1, distinct + 1)], weights=weights, k=size)
+
+class TestSpaceSaving(unittest.TestCase):
+
+    def assert_guarantees(self, summary, exact):
+        self.assertLessEqual(len(summary), summary.capacity)
+        self.assertEqual(summary.total, sum(exact.values()))
+        for item, true_count in exact.items():
+            count, error = summary.estimate(item)
+            self.assertLessEqual(count - error, true_count)
+            self.assertGreaterEqual(count, true_count)
+            self.assertLessEqual(error, summary.total / summary.capacity)
+            if true_count > summary.total / summary.capacity:
+                self.assertIn(item, summary)  # Heavy hitters are always monitored
+
+    def test_exact_below_capacity(self):
+        # Arrange
+        summary = SpaceSaving(10)
+
+        # Act
+        summary.update(['a', 'b', 'a', 'c', 'a'])
+
+        # Assert
+        self.assertEqual(summary.top(2), [('a', 3, 0), ('b', 1, 0)])
+        self.assertEqual(summary.min_count(), 0)
+        self.assertTrue(summary.is_top_exact(2))
+
+    def test_error_bounds_on_skewed_stream(self):
+        # Arrange
+        stream = zipf_stream(20_000, 2_000, seed=1)
+        summary = SpaceSaving(100)
+
+        # Act
+        summary.update(stream)
+
+        # Assert
+        exact = Counter(stream)
+        self.assert_guarantees(summary, exact)
+        self.assertLessEqual(len(summary._heap), HEAP_COMPACTION_FACTOR * summary.capacity)
+        self.assertEqual([item for item, _, _ in summary.top(3)], [item for item, _ in exact.most_common(3)])
+
+    def test_merged_shards_keep_error_bounds(self):
+        # Arrange
+        stream = zipf_stream(30_000, 3_000, seed=2)
+        shards = [SpaceSaving(200) for _ in range(3)]
+        for index, item in enumerate(stream):
+            shards[index % 3].add(item)
+
+        # Act
+        merged = SpaceSaving(200)
+        for shard in shards:
+            merged.update(shard)
+
+        # Assert
+        exact = Counter(stream)
+        self.assert_guarantees(merged, exact)
+        if merged.is_top_exact(5):
+            self.assertEqual({item for item, _, _ in merged.top(5)}, {item for item, _ in exact.most_common(5)})
+
+    def test_weighted_updates_and_unmonitored_estimate(self):
+        # Arrange
+        summary = SpaceSaving(2)
+
+        # Act
+        summary.update({'a': 5, 'b': 3})
+        summary.add('c')
+
+        # Assert
+        self.assertEqual(summary.estimate('c'), (4, 3))
+        self.assertEqual(summary.estimate('b'), (4, 4))  # Evicted: at most the minimum count
+        self.assertFalse(summary.is_top_exact(1) and summary.top(1)[0][0] != 'a')
+
+    def test_pickle_round_trip(self):
+        # Arrange
+        summary = SpaceSaving(3)
+        summary.update(['a', 'b', 'c', 'd', 'a'])
+
+        # Act
+        result = pickle.loads(pickle.dumps(summary))
+        result.add('e')
+
+        # Assert
+        self.assertEqual(len(result), 3)
+        self.assertEqual(result.total, 6)
+
+    def test_invalid_capacity(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            SpaceSaving(0)
+
+if __name__ == '__main__':
+    unittest.main()
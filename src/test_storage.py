@@ -81,5 +81,96 @@ class TestStorageFunctions(unittest.TestCase):
         )
         client_mock.load_table_from_uri.return_value.result.assert_called_once()
 
+    def test_load_data_from_storage_updates_rollups_from_staging_table(self):
+        client_mock = MagicMock()
+        client_mock.dataset.return_value.table.side_effect = (
+            lambda name: bigquery.TableReference.from_string(f'project.dataset_name.{name}')
+        )
+        client_mock.get_table.return_value.schema = [bigquery.SchemaField('id', 'INT64'), bigquery.SchemaField('date', 'TIMESTAMP')]
+
+        with unittest.mock.patch('storage.rollups.update_rollups') as update_rollups_mock:
+            storage.load_data_from_storage(
+                client_mock, "source_uri", "dataset_name", "table_name", "json_file_name", update_rollups=True
+            )
+
+        destinations = [call.args[1].table_id for call in client_mock.load_table_from_uri.call_args_list]
+        self.assertEqual(destinations, ["table_name_staging"])
+        self.assertEqual(client_mock.create_table.call_args.args[0].table_id, "table_name")
+        self.assertTrue(client_mock.create_table.call_args.kwargs['exists_ok'])
+        update_rollups_mock.assert_called_once_with(
+            client_mock, "dataset_name", "table_name_staging", "source_urijson_file_name",
+            ["INSERT INTO `dataset_name.table_name` (`id`, `date`) SELECT `id`, `date` FROM `dataset_name.table_name_staging`"]
+        )
+
+    def test_load_data_from_storage_parquet_uses_list_inference(self):
+        client_mock = MagicMock()
+
+        storage.load_data_from_storage(
+            client_mock, "source_uri", "dataset_name", "table_name", "tweets.parquet",
+            source_format=bigquery.SourceFormat.PARQUET
+        )
+
+        job_config = client_mock.load_table_from_uri.call_args.kwargs['job_config']
+        self.assertEqual(job_config.source_format, bigquery.SourceFormat.PARQUET)
+        self.assertTrue(job_config.parquet_options.enable_list_inference)
+        self.assertFalse(job_config.autodetect)
+
+    def test_create_table_with_partitioning_and_clustering(self):
+        client_mock = MagicMock()
+        client_mock.get_table.side_effect = NotFound("Not found")
+        client_mock.dataset.return_value.table.return_value = bigquery.TableReference.from_string("project.dataset_name.table_name")
+
+        storage.create_table(
+            client_mock, "dataset_name", "table_name",
+            partition_field=storage.PARTITION_FIELD, clustering_fields=storage.CLUSTERING_FIELDS
+        )
+
+        table = client_mock.create_table.call_args.args[0]
+        self.assertEqual(table.time_partitioning.field, "date")
+        self.assertEqual(table.time_partitioning.type_, bigquery.TimePartitioningType.DAY)
+        self.assertEqual(table.clustering_fields, ["username"])
+        self.assertEqual([field.name for field in table.schema], [field.name for field in storage.TWEETS_SCHEMA])
+
+    def test_load_data_from_storage_partitioned_json_uses_explicit_schema(self):
+        client_mock = MagicMock()
+
+        storage.load_data_from_storage(
+            client_mock, "source_uri", "dataset_name", "table_name", "tweets.json",
+            partition_field="date", clustering_fields=["username"]
+        )
+
+        job_config = client_mock.load_table_from_uri.call_args.kwargs['job_config']
+        self.assertEqual(job_config.time_partitioning.field, "date")
+        self.assertEqual(job_config.clustering_fields, ["username"])
+        self.assertFalse(job_config.autodetect)
+        self.assertEqual(len(job_config.schema), len(storage.TWEETS_SCHEMA))
+        client_mock.query.assert_called_once_with(storage.fill_username_statement("dataset_name", "table_name"))
+
+    def test_load_data_from_storage_parquet_does_not_fill_username(self):
+        client_mock = MagicMock()
+
+        storage.load_data_from_storage(
+            client_mock, "source_uri", "dataset_name", "table_name", "tweets.parquet",
+            source_format=bigquery.SourceFormat.PARQUET, partition_field="date", clustering_fields=["username"]
+        )
+
+        client_mock.query.assert_not_called()
+
+    def test_staging_insert_fills_username_from_the_author(self):
+        client_mock = MagicMock()
+        client_mock.dataset.return_value.table.side_effect = (
+            lambda name: bigquery.TableReference.from_string(f'project.dataset_name.{name}')
+        )
+        client_mock.get_table.return_value.schema = storage.TWEETS_SCHEMA
+
+        with unittest.mock.patch('storage.rollups.update_rollups') as update_rollups_mock:
+            storage.load_data_from_storage(
+                client_mock, "source_uri", "dataset_name", "table_name", "tweets.json", update_rollups=True,
+                partition_field="date", clustering_fields=["username"]
+            )
+
+        insert_statement = update_rollups_mock.call_args.args[4][0]
+        self.assertIn("SELECT `id`, `date`, `content`, COALESCE(`username`, `user`.username) AS `username`", insert_statement)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import io
+import json
+import os
+import random
+import tempfile
+from collections import Counter
+
+from local import LocalClient, tweet_day
+from queries import top_dates_with_top_users
+from synthetic import generate_tweets, rows_per_day
+
+class TestRowsPerDay(unittest.TestCase):
+
+    def test_rows_per_day_sums_to_rows_and_is_skewed(self):
+        # Act
+        result = rows_per_day(1000, 7, random.Random(1))
+
+        # Assert
+        self.assertEqual(sum(result), 1000)
+        self.assertEqual(len(result), 7)
+        self.assertGreater(max(result), min(result))
+
+    def test_rows_per_day_rejects_invalid_days_and_rows(self):
+        # Act & Assert
+        with self.assertRaises(ValueError):
+            rows_per_day(10, 0, random.Random(1))
+        with self.assertRaises(ValueError):
+            rows_per_day(-1, 3, random.Random(1))
+
+class TestGenerateTweets(unittest.TestCase):
+
+    def test_generate_tweets_matches_schema_and_is_reproducible(self):
+        # Arrange
+        first, second = io.StringIO(), io.StringIO()
+
+        # Act
+        written = generate_tweets(first, rows=500, days=5, users=50, tie_days=0, seed=7)
+        generate_tweets(second, rows=500, days=5, users=50, tie_days=0, seed=7)
+
+        # Assert
+        self.assertEqual(written, 500)
+        self.assertEqual(first.getvalue(), second.getvalue())
+        tweets = [json.loads(line) for line in first.getvalue().splitlines()]
+        self.assertEqual(len({tweet['id'] for tweet in tweets}), 500)
+        self.assertEqual(len({tweet_day(tweet['date']) for tweet in tweets}), 5)
+        for tweet in tweets:
+            self.assertIn('username', tweet['user'])
+            for mention in tweet['mentionedUsers'] or []:
+                self.assertIn(f"@{mention['username']}", tweet['content'])
+
+    def test_generate_tweets_ties_top_user_and_local_backend_breaks_tie_alphabetically(self):
+        # Arrange
+        output = io.StringIO()
+
+        # Act
+        generate_tweets(output, rows=300, days=3, users=20, tie_days=3, seed=3)
+
+        # Assert
+        tweets = [json.loads(line) for line in output.getvalue().splitlines()]
+        day_user_counts = Counter((tweet_day(tweet['date']), tweet['user']['username']) for tweet in tweets)
+        with tempfile.TemporaryDirectory() as directory:
+            file_path = os.path.join(directory, 'tweets.json')
+            with open(file_path, 'w', encoding='utf-8') as file:
+                file.write(output.getvalue())
+            rows = list(LocalClient(file_path).query(top_dates_with_top_users).result())
+        self.assertEqual(len(rows), 3)
+        for day, username in rows:
+            counts = sorted((count for (d, _), count in day_user_counts.items() if d == str(day)), reverse=True)
+            self.assertEqual(counts[0], counts[1])
+            self.assertTrue(username.endswith('!'))
+
+if __name__ == '__main__':
+    unittest.main()
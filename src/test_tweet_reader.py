@@ -0,0 +1,84 @@
+import unittest
+import json
+import os
+import tempfile
+
+from tweet_reader import TWEET_FIELDS, TweetDecoder, available_backends, read_tweets
+
+TWEET = {
+    'id': 1, 'date': '2021-02-24T09:23:35+00:00', 'content': 'Farmers ❤️',
+    'user': {'username': 'alice', 'descriptionUrls': [{'url': 'https://example.com'}]},
+    'mentionedUsers': [{'username': 'bob', 'displayname': 'Bob'}],
+    'quotedTweet': {'id': 2, 'content': 'nested'},
+}
+
+class TestTweetDecoder(unittest.TestCase):
+
+    def test_every_backend_drops_unused_fields_like_json(self):
+        # Arrange
+        line = json.dumps(TWEET).encode('utf-8')
+
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                # Act
+                tweet = TweetDecoder(backend).decode(line)
+
+                # Assert
+                self.assertEqual(set(tweet), set(TWEET_FIELDS))
+                self.assertEqual(tweet['user']['username'], 'alice')
+                self.assertEqual([user['username'] for user in tweet['mentionedUsers']], ['bob'])
+
+    def test_decoded_backends_keep_only_the_projected_nested_keys(self):
+        # Arrange
+        line = json.dumps(TWEET).encode('utf-8')
+
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                # Act
+                tweet = TweetDecoder(backend).decode(line)
+
+                # Assert
+                self.assertEqual(tweet['user'], {'username': 'alice'})
+                self.assertEqual(tweet['mentionedUsers'], [{'username': 'bob'}])
+
+    def test_without_projection_the_whole_record_is_kept(self):
+        # Act
+        tweet = TweetDecoder(fields=None).decode(json.dumps(TWEET).encode('utf-8'))
+
+        # Assert
+        self.assertEqual(tweet, TWEET)
+
+    def test_lines_rejected_by_a_fast_backend_fall_back_to_json(self):
+        # Arrange
+        line = b'{"id": 1, "content": "lone \\ud83d surrogate"}'
+
+        for backend in available_backends():
+            with self.subTest(backend=backend):
+                # Act
+                tweet = TweetDecoder(backend).decode(line)
+
+                # Assert
+                self.assertEqual(tweet, json.loads(line))
+
+    def test_unknown_backend_is_rejected(self):
+        with self.assertRaises(ValueError):
+            TweetDecoder('yaml')
+
+class TestReadTweets(unittest.TestCase):
+
+    def test_read_tweets_skips_blank_and_invalid_lines(self):
+        with tempfile.TemporaryDirectory() as directory:
+            # Arrange
+            path = os.path.join(directory, 'tweets.json')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(json.dumps(TWEET) + '\n\n{not json}\n[1, 2]\n' + json.dumps({'id': 3}) + '\n')
+
+            # Act
+            with self.assertLogs(level='WARNING'):
+                tweets = list(read_tweets(path))
+
+            # Assert
+            self.assertEqual([tweet['id'] for tweet in tweets], [1, 3])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import datetime
+import os
+import tempfile
+
+from local import fused_top_n
+from tweet_fixtures import TIED_USERNAMES, sample_tweets, tweet_record, write_tweets
+from tweet_store import MISSING_CODE, StringDictionary, TweetStore
+
+class TestTweetStore(unittest.TestCase):
+
+    def setUp(self):
+        # Arrange: a missing username, null mention lists and a tweet without an ID
+        self.directory = tempfile.TemporaryDirectory()
+        self.file_path = os.path.join(self.directory.name, 'tweets.json')
+        tweets = list(sample_tweets(100, usernames=list(TIED_USERNAMES) + [None], missing_mentions_every=4))
+        tweets.append(tweet_record(None, "2021-02-10T00:00:00+00:00", "no id 🚜", None, None))
+        write_tweets(self.file_path, tweets)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_store_answers_like_the_fused_scan(self):
+        # Act
+        store = TweetStore.from_file(self.file_path)
+
+        # Assert
+        expected = fused_top_n(self.file_path)
+        self.assertEqual(len(store), 100)
+        self.assertEqual(store.top_dates_with_top_users(), expected.top_dates_with_top_users)
+        self.assertEqual(store.top_emojis(), expected.top_emojis)
+        self.assertEqual(store.top_influential_users(), expected.top_influential_users)
+        self.assertEqual(store.aggregates().top_results(), expected)
+
+    def test_views_decode_one_row(self):
+        # Arrange
+        store = TweetStore.from_file(self.file_path)
+
+        # Act
+        view = store[5]
+
+        # Assert
+        self.assertEqual(view.id, 5)
+        self.assertEqual(view.date, datetime.date(2021, 2, 15))
+        self.assertEqual(view.username, 'mike')
+        self.assertEqual(view.mentioned_usernames, ['user5'])
+        self.assertEqual(view.emojis, ['🚜', '🚜', '❤️'])
+        self.assertIsNone(store[4].username)
+        self.assertEqual(store[4].mentioned_usernames, [])
+        self.assertFalse(hasattr(view, '__dict__'))
+        with self.assertRaises(IndexError):
+            store[100]
+
+    def test_columns_are_compact(self):
+        # Act
+        store = TweetStore.from_file(self.file_path)
+
+        # Assert
+        self.assertEqual(store.ids.itemsize, 8)
+        self.assertEqual(store.days.itemsize, 4)
+        self.assertEqual(len(store.usernames), 4 + 7)  # Authors and mentioned users share the dictionary
+        self.assertLess(store.nbytes(), 100 * 64)
+
+class TestStringDictionary(unittest.TestCase):
+
+    def test_encode_is_dense_and_stable(self):
+        # Arrange
+        dictionary = StringDictionary(['b', 'a'])
+
+        # Act
+        codes = [dictionary.encode(value) for value in ['a', 'c', 'b', None]]
+
+        # Assert
+        self.assertEqual(codes, [1, 2, 0, MISSING_CODE])
+        self.assertEqual([dictionary.decode(code) for code in codes], ['a', 'c', 'b', None])
+
+if __name__ == '__main__':
+    unittest.main()
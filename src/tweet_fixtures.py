@@ -0,0 +1,83 @@
+import json  # For writing NDJSON files
+import random  # For randomized corpora
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence  # For type annotations
+
+# Authors cycled through by `sample_tweets`: several users tie on the same day, which
+# exercises the alphabetical tie-break of q1
+TIED_USERNAMES: Sequence[Optional[str]] = ('mike', 'anna', 'zack', 'bella')
+
+
+def tweet_record(
+    tweet_id: Optional[int], date: Optional[str], content: str, username: Optional[str],
+    mentioned_usernames: Optional[Sequence[str]]
+) -> Dict[str, Any]:
+    """Returns a tweet with the fields read by the queries, shaped like the challenge dataset.
+
+    Args:
+        tweet_id (Optional[int]): The tweet ID.
+        date (Optional[str]): The ISO 8601 timestamp.
+        content (str): The text of the tweet.
+        username (Optional[str]): The author.
+        mentioned_usernames (Optional[Sequence[str]]): The mentioned users, or None for a null list.
+
+    Returns:
+        Dict[str, Any]: The tweet.
+    """
+
+    mentions = None if mentioned_usernames is None else [{"username": name} for name in mentioned_usernames]
+    return {"id": tweet_id, "date": date, "content": content, "user": {"username": username}, "mentionedUsers": mentions}
+
+
+def sample_tweets(
+    count: int,
+    usernames: Sequence[Optional[str]] = TIED_USERNAMES,
+    days: int = 12,
+    mentioned_users: int = 7,
+    missing_mentions_every: int = 0
+) -> Iterator[Dict[str, Any]]:
+    """Yields a deterministic corpus: authors, days and mentioned users cycle with the tweet ID.
+
+    Tweet `i` is written on day `i % days` (from 2021-02-10) by `usernames[i % len(usernames)]`,
+    mentions `user{i % mentioned_users}` and has `i % 3` tractor emojis, plus a heart every 5 tweets.
+
+    Args:
+        count (int): Number of tweets.
+        usernames (Sequence[Optional[str]], optional): Authors, None for a missing username. Defaults to TIED_USERNAMES.
+        days (int, optional): Number of distinct days. Defaults to 12.
+        mentioned_users (int, optional): Number of distinct mentioned users. Defaults to 7.
+        missing_mentions_every (int, optional): Every tweet whose ID is a multiple of it has a null
+            mention list; 0 for none. Defaults to 0.
+    """
+
+    for tweet_id in range(count):
+        missing_mentions = missing_mentions_every and tweet_id % missing_mentions_every == 0
+        yield tweet_record(
+            tweet_id,
+            f"2021-02-{10 + tweet_id % days:02d}T12:00:00+00:00",
+            "🚜 " * (tweet_id % 3) + ("❤️" if tweet_id % 5 == 0 else ""),
+            usernames[tweet_id % len(usernames)],
+            None if missing_mentions else [f"user{tweet_id % mentioned_users}"],
+        )
+
+
+def random_tweets(count: int, seed: int) -> Iterator[Dict[str, Any]]:
+    """Yields a seeded random corpus with missing dates and usernames, non-ASCII names and flag emojis."""
+
+    rng = random.Random(seed)
+    usernames = ['mike', 'anna', 'zack', 'bella', 'Émile', None]
+    for tweet_id in range(count):
+        yield tweet_record(
+            tweet_id,
+            f"2021-02-{rng.randint(1, 20):02d}T12:00:00+00:00" if rng.random() > 0.05 else None,
+            " ".join(rng.choices(["🚜", "❤️", "🇮🇳", "text"], k=rng.randint(0, 3))),
+            rng.choice(usernames),
+            [rng.choice(usernames[:-1]) for _ in range(rng.randint(0, 2))],
+        )
+
+
+def write_tweets(path: str, tweets: Iterable[Dict[str, Any]]) -> None:
+    """Writes tweets to an NDJSON file, one per line."""
+
+    with open(path, 'w', encoding='utf-8') as file:
+        for tweet in tweets:
+            file.write(json.dumps(tweet, ensure_ascii=False) + '\n')
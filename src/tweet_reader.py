@@ -0,0 +1,217 @@
+import json  # Reference decoder, always available
+import logging  # For logging skipped records
+from collections.abc import Mapping, Sequence  # For projecting decoded and lazy (simdjson) documents alike
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple  # For type annotations
+
+# Decoder backends by order of preference
+BACKENDS: List[str] = ['simdjson', 'orjson', 'json']
+
+# Fields read by the questions: top-level key -> keys kept in its nested object(s) (None keeps the value as is).
+# Everything else (quotedTweet, user.descriptionUrls, media...) is dropped.
+TWEET_FIELDS: Dict[str, Optional[Tuple[str, ...]]] = {
+    'id': None,
+    'date': None,
+    'content': None,
+    'user': ('username',),
+    'mentionedUsers': ('username',),
+}
+
+
+def available_backends() -> List[str]:
+    """Returns the importable decoder backends, by order of preference ('json' is always last)."""
+
+    backends: List[str] = []
+    for backend in BACKENDS[:-1]:
+        try:
+            __import__(backend)
+        except ImportError:
+            continue
+        backends.append(backend)
+    return backends + ['json']
+
+
+def as_python(value: Any) -> Any:
+    """Materializes a (possibly lazy) decoded value as plain Python objects."""
+
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    if isinstance(value, Mapping):
+        return {key: as_python(item) for key, item in value.items()}
+    if isinstance(value, Sequence) and not isinstance(value, bytes):
+        return [as_python(item) for item in value]
+    return value
+
+
+def project_lazy_value(value: Any, keys: Optional[Tuple[str, ...]]) -> Any:
+    """Materializes the given keys of a lazy nested object, or of every object of a lazy array."""
+
+    if keys is None:
+        return as_python(value)
+    if isinstance(value, Mapping):
+        return {key: as_python(value.get(key)) for key in keys}
+    if isinstance(value, Sequence) and not isinstance(value, (str, bytes)):
+        return [project_lazy_value(item, keys) if isinstance(item, Mapping) else as_python(item) for item in value]
+    return value
+
+
+def project_lazy(document: Mapping, fields: Dict[str, Optional[Tuple[str, ...]]]) -> Dict[str, Any]:
+    """Builds a tweet dict from a lazily parsed document, materializing only the projected fields.
+
+    Args:
+        document (Mapping): The lazily parsed tweet object (e.g. a `simdjson.Object`).
+        fields (Dict[str, Optional[Tuple[str, ...]]]): The projection (see TWEET_FIELDS).
+
+    Returns:
+        Dict[str, Any]: The projected tweet, with the same nesting as the JSON.
+    """
+
+    return {key: project_lazy_value(document[key], keys) for key, keys in fields.items() if key in document}
+
+
+def project_value(value: Any, keys: Optional[Tuple[str, ...]]) -> Any:
+    """Keeps the given keys of a decoded nested object, or of every object of a decoded array."""
+
+    if keys is None:
+        return value
+    if isinstance(value, dict):
+        return {key: value.get(key) for key in keys}
+    if isinstance(value, list):
+        return [project_value(item, keys) if isinstance(item, dict) else item for item in value]
+    return value
+
+
+def project(document: Dict[str, Any], fields: Dict[str, Optional[Tuple[str, ...]]]) -> Dict[str, Any]:
+    """Keeps the projected fields of an already decoded tweet, down to the nested keys.
+
+    The decoder has built the whole line by then; dropping the unused nested objects right
+    away means only the projected data stays alive in the tweets a caller holds on to, and
+    the result matches the lazy (simdjson) projection exactly.
+
+    Args:
+        document (Dict[str, Any]): The decoded tweet object.
+        fields (Dict[str, Optional[Tuple[str, ...]]]): The projection (see TWEET_FIELDS).
+
+    Returns:
+        Dict[str, Any]: The projected tweet.
+    """
+
+    return {key: project_value(document[key], keys) for key, keys in fields.items() if key in document}
+
+
+class TweetDecoder:
+    """Decodes NDJSON tweet lines with the fastest available backend, keeping only projected fields.
+
+    - simdjson (the optional `pysimdjson` package) parses each line lazily: only the projected
+      fields (down to the nested keys of TWEET_FIELDS) are turned into Python objects, so
+      unused nested objects (quotedTweet, user.descriptionUrls...) are never built.
+    - orjson decodes the whole line, nested objects included, several times faster than
+      `json`; everything outside the projection is then dropped.
+    - json, from the standard library, is the fallback and the reference.
+
+    A line rejected by a fast backend is retried with `json`, so every backend accepts
+    exactly the lines the standard library accepts (e.g. lone surrogate escapes, which
+    orjson refuses).
+
+    Args:
+        backend (Optional[str], optional): 'simdjson', 'orjson' or 'json'. Defaults to the fastest available.
+        fields (Optional[Dict[str, Optional[Tuple[str, ...]]]], optional): Projection applied to every
+            tweet (None keeps the whole record). Defaults to TWEET_FIELDS.
+
+    Raises:
+        ImportError: If the requested backend is not installed.
+        ValueError: If the backend is unknown.
+    """
+
+    def __init__(
+        self,
+        backend: Optional[str] = None,
+        fields: Optional[Dict[str, Optional[Tuple[str, ...]]]] = TWEET_FIELDS
+    ) -> None:
+        self.backend = backend or available_backends()[0]
+        self.fields = fields
+        if self.backend == 'simdjson':
+            import simdjson  # Lazy SIMD JSON parser # type: ignore
+            self._parser = simdjson.Parser()
+            self._decode = self._decode_simdjson
+        elif self.backend == 'orjson':
+            import orjson  # Fast JSON decoder # type: ignore
+            self._decode = self._projector(orjson.loads)
+        elif self.backend == 'json':
+            self._decode = self._projector(json.loads)
+        else:
+            raise ValueError(f"Unknown JSON backend '{self.backend}', expected one of {BACKENDS}.")
+
+    def _projector(self, loads: Callable[[bytes], Any]) -> Callable[[bytes], Any]:
+        if self.fields is None:
+            return loads
+        fields = self.fields
+
+        def decode(line: bytes) -> Any:
+            document = loads(line)
+            return project(document, fields) if isinstance(document, dict) else document
+
+        return decode
+
+    def _decode_simdjson(self, line: bytes) -> Any:
+        # The parser reuses its buffers: nothing may reference the document after this call
+        document = self._parser.parse(line)
+        if isinstance(document, Mapping):
+            return project_lazy(document, self.fields) if self.fields is not None else as_python(document)
+        return as_python(document)
+
+    def decode(self, line: bytes) -> Any:
+        """Decodes one JSON line, projecting it if it is an object.
+
+        Args:
+            line (bytes): The JSON text.
+
+        Returns:
+            Any: The projected tweet dict (or the decoded value if it is not an object).
+
+        Raises:
+            ValueError: If the line is not valid JSON (`json.JSONDecodeError` is a ValueError).
+        """
+
+        try:
+            return self._decode(line)
+        except ValueError:
+            if self.backend == 'json':
+                raise
+            document = json.loads(line)  # Reference behaviour for the lines a fast backend rejects
+            return project(document, self.fields) if self.fields is not None and isinstance(document, dict) else document
+
+
+def read_tweets(
+    file_path: str,
+    fields: Optional[Dict[str, Optional[Tuple[str, ...]]]] = TWEET_FIELDS,
+    backend: Optional[str] = None
+) -> Iterator[Dict[str, Any]]:
+    """Yields the (projected) tweets of a newline-delimited JSON file, one line at a time.
+
+    Args:
+        file_path (str): Path to the NDJSON tweets file.
+        fields (Optional[Dict[str, Optional[Tuple[str, ...]]]], optional): Projection (None keeps whole
+            records). Defaults to TWEET_FIELDS.
+        backend (Optional[str], optional): Decoder backend. Defaults to the fastest available.
+
+    Yields:
+        Dict[str, Any]: The decoded tweet record.
+
+    Assumptions:
+        - Blank lines are ignored.
+        - Lines that are not valid JSON objects are logged and skipped, mirroring
+          `ignore_unknown_values` in the BigQuery load job.
+    """
+
+    decoder = TweetDecoder(backend, fields)
+    with open(file_path, 'rb') as file:
+        for line_number, line in enumerate(file, start=1):
+            if not line.strip():
+                continue  # Skip blank lines
+            try:
+                tweet = decoder.decode(line)
+            except ValueError as e:
+                logging.warning(f"Skipping invalid JSON on line {line_number} of '{file_path}': {e}")
+                continue
+            if isinstance(tweet, dict):
+                yield tweet
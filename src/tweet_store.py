@@ -0,0 +1,227 @@
+import datetime  # For day ordinals
+from array import array  # For compact typed columns
+from collections import Counter  # For counting over integer codes
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple  # For type annotations
+
+from emojis import extract_emojis  # Emoji matcher equivalent to the top_emojis pattern
+from local import (  # Shared tie-breaking rules and the projected tweet reader
+    TOP_N, TweetAggregates, iter_tweets, mentioned_usernames, top_counts, top_dates_from_counts, tweet_day,
+    tweet_username
+)
+
+# Day code of tweets without a date (date ordinals start at 1)
+MISSING_DAY: int = 0
+
+# Code of a missing (NULL) username
+MISSING_CODE: int = -1
+
+# Typecodes of the columns: int64 ids and offsets, int32 day ordinals and dictionary codes
+COLUMN_TYPECODES: Dict[str, str] = {
+    'ids': 'q',
+    'days': 'i',
+    'authors': 'i',
+    'mention_offsets': 'q',
+    'mentions': 'i',
+    'emoji_offsets': 'q',
+    'emojis': 'i',
+}
+
+
+class StringDictionary:
+    """Interns strings as dense integer codes (dictionary encoding).
+
+    Args:
+        values (Optional[Iterable[str]], optional): Initial values, coded in order. Defaults to None.
+    """
+
+    __slots__ = ('values', 'codes')
+
+    def __init__(self, values: Optional[Iterable[str]] = None) -> None:
+        self.values: List[str] = []
+        self.codes: Dict[str, int] = {}
+        for value in values or ():
+            self.encode(value)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def encode(self, value: Optional[str]) -> int:
+        """Returns the code of a value, adding it if needed (None is MISSING_CODE)."""
+
+        if value is None:
+            return MISSING_CODE
+        code = self.codes.get(value)
+        if code is None:
+            code = self.codes[value] = len(self.values)
+            self.values.append(value)
+        return code
+
+    def decode(self, code: int) -> Optional[str]:
+        """Returns the value of a code (None for MISSING_CODE)."""
+
+        return None if code == MISSING_CODE else self.values[code]
+
+
+class TweetView:
+    """Read-only view of one tweet of a TweetStore, decoded on attribute access.
+
+    Args:
+        store (TweetStore): The store.
+        row (int): Row of the tweet.
+    """
+
+    __slots__ = ('store', 'row')
+
+    def __init__(self, store: 'TweetStore', row: int) -> None:
+        self.store = store
+        self.row = row
+
+    def __repr__(self) -> str:
+        return f'TweetView(id={self.id}, date={self.date}, username={self.username!r})'
+
+    @property
+    def id(self) -> int:
+        return self.store.ids[self.row]
+
+    @property
+    def date(self) -> Optional[datetime.date]:
+        day = self.store.days[self.row]
+        return None if day == MISSING_DAY else datetime.date.fromordinal(day)
+
+    @property
+    def username(self) -> Optional[str]:
+        return self.store.usernames.decode(self.store.authors[self.row])
+
+    @property
+    def mentioned_usernames(self) -> List[str]:
+        store = self.store
+        start, end = store.mention_offsets[self.row], store.mention_offsets[self.row + 1]
+        return [store.usernames.values[code] for code in store.mentions[start:end]]
+
+    @property
+    def emojis(self) -> List[str]:
+        store = self.store
+        start, end = store.emoji_offsets[self.row], store.emoji_offsets[self.row + 1]
+        return [store.emoji_values.values[code] for code in store.emojis[start:end]]
+
+
+class TweetStore:
+    """Columnar in-memory store of the projected tweets, sized for tens of millions of rows.
+
+    Each tweet costs a few dozen bytes instead of the kilobytes of a decoded dict:
+    - ids are an int64 array and days an int32 array of date ordinals (MISSING_DAY if undated);
+    - authors and mentioned users are codes of one shared username dictionary;
+    - mentions and emojis are flattened into value arrays, delimited per tweet by
+      offset arrays (tweet `i` owns `values[offsets[i]:offsets[i + 1]]`).
+    The content itself is not kept, only its emoji sequences.
+
+    Tweets without an id are not stored, since none of the questions counts them. The
+    `top_*` methods answer q1/q2/q3 from the columns with the tie-breaking of local.py.
+
+    Attributes:
+        ids, days, authors, mention_offsets, mentions, emoji_offsets, emojis (array): The
+            columns (see COLUMN_TYPECODES).
+        usernames (StringDictionary): Dictionary of the author and mentioned usernames.
+        emoji_values (StringDictionary): Dictionary of the emoji sequences.
+    """
+
+    def __init__(self) -> None:
+        for name, typecode in COLUMN_TYPECODES.items():
+            setattr(self, name, array(typecode))
+        self.mention_offsets.append(0)
+        self.emoji_offsets.append(0)
+        self.usernames = StringDictionary()
+        self.emoji_values = StringDictionary()
+
+    @classmethod
+    def from_tweets(cls, tweets: Iterable[Dict[str, Any]]) -> 'TweetStore':
+        """Builds a store from decoded tweet records."""
+
+        store = cls()
+        for tweet in tweets:
+            store.add(tweet)
+        return store
+
+    @classmethod
+    def from_file(cls, file_path: str) -> 'TweetStore':
+        """Builds a store from an NDJSON tweets file, streaming its projected records."""
+
+        return cls.from_tweets(iter_tweets(file_path))
+
+    def add(self, tweet: Dict[str, Any]) -> None:
+        """Appends one decoded tweet (ignored if it has no id)."""
+
+        tweet_id = tweet.get('id')
+        if tweet_id is None:
+            return
+        date_value = tweet.get('date')
+        self.ids.append(tweet_id)
+        self.days.append(datetime.date.fromisoformat(tweet_day(date_value)).toordinal() if date_value else MISSING_DAY)
+        self.authors.append(self.usernames.encode(tweet_username(tweet)))
+        self.mentions.extend(self.usernames.encode(username) for username in mentioned_usernames(tweet))
+        self.mention_offsets.append(len(self.mentions))
+        self.emojis.extend(self.emoji_values.encode(emoji) for emoji in extract_emojis(tweet.get('content')))
+        self.emoji_offsets.append(len(self.emojis))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, row: int) -> TweetView:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError(f"Row {row} is out of range (the store has {len(self)} tweets).")
+        return TweetView(self, row)
+
+    def __iter__(self) -> Iterator[TweetView]:
+        return (TweetView(self, row) for row in range(len(self)))
+
+    def nbytes(self) -> int:
+        """Returns the size of the columns in bytes (dictionaries excluded)."""
+
+        return sum(len(column) * column.itemsize for column in (getattr(self, name) for name in COLUMN_TYPECODES))
+
+    def day_counts(self) -> Tuple[Counter, Counter]:
+        """Returns the tweet counts keyed by ISO day and by (ISO day, username), undated tweets excluded."""
+
+        iso = {day: datetime.date.fromordinal(day).isoformat() for day in set(self.days) if day != MISSING_DAY}
+        day_counts = Counter({iso[day]: count for day, count in Counter(self.days).items() if day != MISSING_DAY})
+        day_user_counts = Counter({
+            (iso[day], self.usernames.decode(author)): count
+            for (day, author), count in Counter(zip(self.days, self.authors)).items() if day != MISSING_DAY
+        })
+        return day_counts, day_user_counts
+
+    def emoji_counts(self) -> Counter:
+        """Returns the emoji sequence counts."""
+
+        return Counter({self.emoji_values.values[code]: count for code, count in Counter(self.emojis).items()})
+
+    def mention_counts(self) -> Counter:
+        """Returns the mention counts keyed by mentioned username."""
+
+        return Counter({self.usernames.values[code]: count for code, count in Counter(self.mentions).items()})
+
+    def top_dates_with_top_users(self, limit: int = TOP_N) -> List[Tuple[datetime.date, str]]:
+        """Returns the top dates and their most active username (see `local.top_dates_from_counts`)."""
+
+        return top_dates_from_counts(*self.day_counts(), limit)
+
+    def top_emojis(self, limit: int = TOP_N) -> List[Tuple[str, int]]:
+        """Returns the most used emojis with their counts."""
+
+        return top_counts(self.emoji_counts(), limit)
+
+    def top_influential_users(self, limit: int = TOP_N) -> List[Tuple[str, int]]:
+        """Returns the most mentioned usernames with their mention counts."""
+
+        return top_counts(self.mention_counts(), limit)
+
+    def aggregates(self) -> TweetAggregates:
+        """Returns the exact counters of the fused scan (e.g. for `local.FUSED_QUERIES`)."""
+
+        aggregates = TweetAggregates()
+        aggregates.day_counts, aggregates.day_user_counts = self.day_counts()
+        aggregates.emoji_counts = self.emoji_counts()
+        aggregates.mention_counts = self.mention_counts()
+        return aggregates